@@ -1,2684 +1,3490 @@
-"""
-Parking Management System - Main Application
-Complete Flask app with all admin and user routes for AdminDashboard
-Database: D:\MAD2\Parking App\instance\parking.db
-"""
-
-from flask import Flask, request, jsonify
-from flask_cors import CORS
-import sqlite3
-import os
-import hashlib
-from datetime import datetime, timedelta
-import logging
-
-# Create Flask app
-app = Flask(__name__)
-CORS(app, origins=['http://localhost:5173', 'http://127.0.0.1:5173'])
-
-# Add debug logging
-logging.basicConfig(level=logging.DEBUG)
-logger = logging.getLogger(__name__)
-
-# Database path - using the specified database
-DB_PATH = r'D:\MAD2\Parking App\instance\parking.db'
-
-def get_db_connection():
-    """Get database connection with row factory."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
-
-def init_database():
-    """Initialize database tables if they don't exist."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Create parking_lots table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS parking_lots (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            address TEXT NOT NULL,
-            pincode TEXT,
-            price REAL NOT NULL,
-            total_slots INTEGER NOT NULL DEFAULT 20,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    
-    # Create parking_slots table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS parking_slots (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            slot_number INTEGER NOT NULL,
-            lot_id INTEGER NOT NULL,
-            is_available INTEGER DEFAULT 1,
-            current_user_id INTEGER,
-            current_user_name TEXT,
-            current_user_email TEXT,
-            booking_id TEXT,
-            vehicle_number TEXT,
-            booking_start_time TIMESTAMP,
-            planned_duration_hours REAL,
-            current_duration_hours REAL,
-            estimated_current_cost REAL,
-            FOREIGN KEY (lot_id) REFERENCES parking_lots (id)
-        )
-    ''')
-    
-    # Create users table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            full_name TEXT NOT NULL,
-            email TEXT UNIQUE NOT NULL,
-            phone TEXT,
-            password TEXT NOT NULL,
-            address_line1 TEXT,
-            city TEXT,
-            state TEXT,
-            pin_code TEXT,
-            is_active INTEGER DEFAULT 0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    
-    # Create bookings table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS bookings (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            booking_id TEXT UNIQUE NOT NULL,
-            user_id INTEGER NOT NULL,
-            user_name TEXT,
-            user_email TEXT,
-            lot_id INTEGER NOT NULL,
-            lot_name TEXT,
-            lot_address TEXT,
-            slot_id INTEGER NOT NULL,
-            slot_number INTEGER NOT NULL,
-            vehicle_number TEXT,
-            start_time TIMESTAMP NOT NULL,
-            end_time TIMESTAMP,
-            planned_duration_hours REAL,
-            actual_duration_hours REAL,
-            hourly_rate REAL NOT NULL,
-            final_cost REAL,
-            status TEXT DEFAULT 'active',
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users (id),
-            FOREIGN KEY (lot_id) REFERENCES parking_lots (id),
-            FOREIGN KEY (slot_id) REFERENCES parking_slots (id)
-        )
-    ''')
-    
-    # Create admins table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS admins (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE NOT NULL,
-            email TEXT UNIQUE NOT NULL,
-            password TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    
-    conn.commit()
-    conn.close()
-    logger.info("Database initialized successfully")
-
-# Initialize database on startup
-init_database()
-
-# =============================================================================
-# PARKING LOTS ROUTES
-# =============================================================================
-
-@app.route('/api/parking-lots', methods=['GET'])
-def get_parking_lots():
-    """Get all parking lots with availability stats."""
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM parking_lots ORDER BY name')
-        lots = cursor.fetchall()
-        
-        logger.info(f"Found {len(lots)} parking lots in database")
-        
-        lots_data = []
-        for lot in lots:
-            # Get slot statistics
-            cursor.execute('''
-                SELECT 
-                    COUNT(*) as total_slots,
-                    SUM(CASE WHEN is_available = 1 THEN 1 ELSE 0 END) as available_slots,
-                    SUM(CASE WHEN is_available = 0 THEN 1 ELSE 0 END) as occupied_slots
-                FROM parking_slots 
-                WHERE lot_id = ?
-            ''', (lot['id'],))
-            
-            slot_stats = cursor.fetchone()
-            
-            # If no slots exist, create them based on database total_slots
-            if not slot_stats or slot_stats['total_slots'] == 0:
-                # Create slots for this lot based on database total_slots
-                for slot_num in range(1, lot['total_slots'] + 1):
-                    cursor.execute('''
-                        INSERT INTO parking_slots (slot_number, lot_id, is_available) 
-                        VALUES (?, ?, 1)
-                    ''', (slot_num, lot['id']))
-                conn.commit()
-                
-                # Recalculate stats
-                cursor.execute('''
-                    SELECT 
-                        COUNT(*) as total_slots,
-                        SUM(CASE WHEN is_available = 1 THEN 1 ELSE 0 END) as available_slots,
-                        SUM(CASE WHEN is_available = 0 THEN 1 ELSE 0 END) as occupied_slots
-                    FROM parking_slots 
-                    WHERE lot_id = ?
-                ''', (lot['id'],))
-                slot_stats = cursor.fetchone()
-            
-            # Map database columns to frontend expected format
-            lot_data = {
-                'id': lot['id'],
-                'name': lot['name'],
-                'address': lot['address'],
-                'pincode': lot['pincode'],  # Database has 'pincode'
-                'price': lot['price_per_hour'],  # Database has 'price_per_hour'
-                'slots': slot_stats['total_slots'] if slot_stats else lot['total_slots'],
-                'total_slots': slot_stats['total_slots'] if slot_stats else lot['total_slots'],
-                'available_slots': slot_stats['available_slots'] if slot_stats else lot['total_slots'],
-                'occupied_slots': slot_stats['occupied_slots'] if slot_stats else 0
-            }
-            lots_data.append(lot_data)
-        
-        conn.close()
-        logger.info(f"Returning {len(lots_data)} parking lots")
-        return jsonify(lots_data), 200
-        
-    except Exception as e:
-        logger.error(f"Error fetching parking lots: {e}")
-        return jsonify({'error': str(e)}), 500
-
-@app.route('/api/parking-lots', methods=['POST'])
-def create_parking_lot():
-    """Create a new parking lot."""
-    try:
-        data = request.get_json()
-        logger.info(f"Creating parking lot with data: {data}")
-        
-        name = data.get('name')
-        address = data.get('address')
-        pincode = data.get('pincode')
-        price = data.get('price')
-        total_slots = data.get('total_slots', 20)
-        
-        if not all([name, address, price]):
-            return jsonify({'error': 'Name, address, and price are required'}), 400
-        
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Insert parking lot using database column names
-        cursor.execute('''
-            INSERT INTO parking_lots (name, address, pincode, price_per_hour, total_slots)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (name, address, pincode, float(price), int(total_slots)))
-        
-        lot_id = cursor.lastrowid
-        
-        # Create slots for the parking lot
-        for slot_num in range(1, int(total_slots) + 1):
-            cursor.execute('''
-                INSERT INTO parking_slots (slot_number, lot_id, is_available)
-                VALUES (?, ?, 1)
-            ''', (slot_num, lot_id))
-        
-        conn.commit()
-        conn.close()
-        
-        logger.info(f"Created parking lot with ID: {lot_id}")
-        return jsonify({
-            'id': lot_id,
-            'name': name,
-            'address': address,
-            'pincode': pincode,
-            'price': float(price),  # Frontend expects 'price'
-            'slots': int(total_slots),
-            'total_slots': int(total_slots),
-            'message': 'Parking lot created successfully'
-        }), 201
-        
-    except Exception as e:
-        logger.error(f"Error creating parking lot: {e}")
-        return jsonify({'error': str(e)}), 500
-
-@app.route('/api/parking-lots/<int:lot_id>', methods=['PUT'])
-def update_parking_lot(lot_id):
-    """Update a parking lot."""
-    try:
-        data = request.get_json()
-        logger.info(f"Updating parking lot {lot_id} with data: {data}")
-        
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Check if lot exists
-        cursor.execute('SELECT * FROM parking_lots WHERE id = ?', (lot_id,))
-        lot = cursor.fetchone()
-        
-        if not lot:
-            conn.close()
-            return jsonify({'error': 'Parking lot not found'}), 404
-        
-        # Update parking lot using correct database column names
-        name = data.get('name', lot['name'])
-        address = data.get('address', lot['address'])
-        pincode = data.get('pincode', lot['pincode'])
-        price = data.get('price', lot['price_per_hour'])  # Database column is price_per_hour
-        total_slots = data.get('total_slots', lot['total_slots'])
-        
-        cursor.execute('''
-            UPDATE parking_lots 
-            SET name = ?, address = ?, pincode = ?, price_per_hour = ?, total_slots = ?
-            WHERE id = ?
-        ''', (name, address, pincode, float(price), int(total_slots), lot_id))
-        
-        # Update slots if total_slots changed
-        cursor.execute('SELECT COUNT(*) as count FROM parking_slots WHERE lot_id = ?', (lot_id,))
-        current_slot_count = cursor.fetchone()['count']
-        
-        if int(total_slots) != current_slot_count:
-            if int(total_slots) > current_slot_count:
-                # Add more slots
-                for slot_num in range(current_slot_count + 1, int(total_slots) + 1):
-                    cursor.execute('''
-                        INSERT INTO parking_slots (slot_number, lot_id, is_available)
-                        VALUES (?, ?, 1)
-                    ''', (slot_num, lot_id))
-            else:
-                # Remove excess slots (only if they're available)
-                cursor.execute('''
-                    DELETE FROM parking_slots 
-                    WHERE lot_id = ? AND slot_number > ? AND is_available = 1
-                ''', (lot_id, int(total_slots)))
-        
-        conn.commit()
-        conn.close()
-        
-        logger.info(f"Updated parking lot {lot_id}")
-        return jsonify({
-            'id': lot_id,
-            'name': name,
-            'address': address,
-            'pincode': pincode,
-            'price': float(price),  # Frontend expects 'price'
-            'slots': int(total_slots),
-            'total_slots': int(total_slots),
-            'message': 'Parking lot updated successfully'
-        }), 200
-        
-    except Exception as e:
-        logger.error(f"Error updating parking lot: {e}")
-        return jsonify({'error': str(e)}), 500
-
-@app.route('/api/parking-lots/<int:lot_id>', methods=['DELETE'])
-def delete_parking_lot(lot_id):
-    """Delete a parking lot."""
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Check if lot exists
-        cursor.execute('SELECT * FROM parking_lots WHERE id = ?', (lot_id,))
-        lot = cursor.fetchone()
-        
-        if not lot:
-            conn.close()
-            return jsonify({'error': 'Parking lot not found'}), 404
-        
-        # Delete related slots first
-        cursor.execute('DELETE FROM parking_slots WHERE lot_id = ?', (lot_id,))
-        
-        # Delete related bookings
-        cursor.execute('DELETE FROM bookings WHERE lot_id = ?', (lot_id,))
-        
-        # Delete parking lot
-        cursor.execute('DELETE FROM parking_lots WHERE id = ?', (lot_id,))
-        
-        conn.commit()
-        conn.close()
-        
-        logger.info(f"Deleted parking lot {lot_id}")
-        return jsonify({'message': 'Parking lot deleted successfully'}), 200
-        
-    except Exception as e:
-        logger.error(f"Error deleting parking lot: {e}")
-        return jsonify({'error': str(e)}), 500
-
-@app.route('/api/parking-lots/<int:lot_id>/slots', methods=['GET'])
-def get_parking_lot_slots(lot_id):
-    """Get all slots for a specific parking lot with user details."""
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT ps.*, 
-                   pl.name as lot_name, 
-                   pl.address as lot_address, 
-                   pl.price_per_hour as hourly_rate,
-                   u.full_name as current_user_name,
-                   u.email as current_user_email,
-                   b.start_time as booking_start_time_actual,
-                   b.end_time as booking_end_time_actual,
-                   b.planned_duration_hours as booking_planned_duration,
-                   b.actual_duration_hours as booking_actual_duration,
-                   b.final_cost as booking_final_cost,
-                   b.planned_cost as booking_planned_cost,
-                   b.status as booking_status
-            FROM parking_slots ps
-            JOIN parking_lots pl ON ps.lot_id = pl.id
-            LEFT JOIN users u ON ps.current_user_id = u.id
-            LEFT JOIN bookings b ON ps.booking_id = b.booking_id
-            WHERE ps.lot_id = ?
-            ORDER BY ps.slot_number
-        ''', (lot_id,))
-        
-        slots = cursor.fetchall()
-        conn.close()
-        
-        slots_data = []
-        for slot in slots:
-            # Calculate current duration and cost if slot is booked
-            current_duration_hours = None
-            estimated_current_cost = None
-            start_time_formatted = None
-            end_time_formatted = None
-            
-            if not slot['is_available'] and slot['booking_start_time_actual']:
-                try:
-                    from datetime import datetime
-                    
-                    # Parse start time
-                    start_time_str = slot['booking_start_time_actual']
-                    if start_time_str:
-                        # Handle different datetime formats
-                        if 'T' in start_time_str:
-                            start_time = datetime.fromisoformat(start_time_str.replace('Z', '+00:00') if 'Z' in start_time_str else start_time_str)
-                        else:
-                            start_time = datetime.strptime(start_time_str, '%Y-%m-%d %H:%M:%S.%f')
-                        
-                        start_time_formatted = start_time.strftime('%Y-%m-%d %H:%M:%S')
-                        
-                        # Calculate current duration
-                        current_time = datetime.now()
-                        duration_delta = current_time - start_time
-                        current_duration_hours = duration_delta.total_seconds() / 3600
-                        
-                        # Calculate estimated current cost
-                        estimated_current_cost = current_duration_hours * slot['hourly_rate']
-                    
-                    # Parse end time if available
-                    end_time_str = slot['booking_end_time_actual']
-                    if end_time_str:
-                        if 'T' in end_time_str:
-                            end_time = datetime.fromisoformat(end_time_str.replace('Z', '+00:00') if 'Z' in end_time_str else end_time_str)
-                        else:
-                            end_time = datetime.strptime(end_time_str, '%Y-%m-%d %H:%M:%S.%f')
-                        
-                        end_time_formatted = end_time.strftime('%Y-%m-%d %H:%M:%S')
-                        
-                except Exception as e:
-                    print(f"[DEBUG] Error calculating time for slot {slot['slot_number']}: {e}")
-                    # Fallback to planned values
-                    current_duration_hours = slot['booking_planned_duration'] or slot['planned_duration_hours']
-                    estimated_current_cost = slot['booking_planned_cost'] or slot['planned_cost']
-                    start_time_formatted = slot['booking_start_time'] or slot['booking_start_time_actual']
-            
-            # Map database columns to expected format
-            slot_data = {
-                'id': slot['id'],
-                'slot_number': slot['slot_number'],
-                'lot_id': slot['lot_id'],
-                'lot_name': slot['lot_name'],
-                'lot_address': slot['lot_address'],
-                'is_available': bool(slot['is_available']),
-                'current_user_id': slot['current_user_id'],
-                'current_user_name': slot['current_user_name'],
-                'current_user_email': slot['current_user_email'],
-                'booking_id': slot['booking_id'],
-                'vehicle_number': slot['vehicle_number'],
-                'booking_start_time': start_time_formatted or slot['booking_start_time'],
-                'booking_end_time': end_time_formatted,
-                'planned_duration_hours': slot['booking_planned_duration'] or slot['planned_duration_hours'],
-                'current_duration_hours': round(current_duration_hours, 2) if current_duration_hours else None,
-                'estimated_current_cost': round(estimated_current_cost, 2) if estimated_current_cost else (slot['booking_planned_cost'] or slot['planned_cost']),
-                'final_cost': slot['booking_final_cost'],
-                'booking_status': slot['booking_status'],
-                'hourly_rate': slot['hourly_rate']
-            }
-            slots_data.append(slot_data)
-        
-        return jsonify(slots_data), 200
-        
-    except Exception as e:
-        logger.error(f"Error fetching slots for lot {lot_id}: {e}")
-        return jsonify({'error': str(e)}), 500
-
-# Admin route compatibility
-@app.route('/api/admin/parking-lots/<int:lot_id>/slots', methods=['GET'])
-def get_admin_parking_lot_slots(lot_id):
-    """Admin route for getting parking lot slots."""
-    return get_parking_lot_slots(lot_id)
-
-# Removed duplicate delete_parking_lot function - using the one above with proper cascade deletes
-
-# Removed proxy route - using direct implementation above
-
-@app.route('/api/users', methods=['GET'])
-def get_users():
-    """Get all users from the database."""
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT id, full_name, email, phone, address_line1, city, state, pin_code, created_at
-            FROM users 
-            ORDER BY created_at DESC
-        ''')
-        users = cursor.fetchall()
-        
-        users_data = []
-        for user in users:
-            user_data = {
-                'id': user['id'],
-                'name': user['full_name'],  # Map full_name to name
-                'username': user['full_name'],  # Use full_name as username for display
-                'email': user['email'],
-                'phone': user['phone'],
-                'address': user['address_line1'],
-                'city': user['city'],
-                'state': user['state'],
-                'pin_code': user['pin_code'],
-                'created_at': user['created_at']
-            }
-            users_data.append(user_data)
-        
-        conn.close()
-        logger.info(f"Returning {len(users_data)} users")
-        return jsonify(users_data), 200
-        
-    except Exception as e:
-        logger.error(f"Error fetching users: {e}")
-        return jsonify({'error': str(e)}), 500
-
-@app.route('/api/users/<int:user_id>', methods=['DELETE'])
-def delete_user(user_id):
-    """Delete a user from the database."""
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Check if user exists
-        cursor.execute('SELECT * FROM users WHERE id = ?', (user_id,))
-        user = cursor.fetchone()
-        
-        if not user:
-            conn.close()
-            return jsonify({'error': 'User not found'}), 404
-        
-        # Release any active bookings first by updating parking_slots
-        cursor.execute('''
-            UPDATE parking_slots 
-            SET is_available = 1, current_user_id = NULL, booking_id = NULL, 
-                vehicle_number = NULL, booking_start_time = NULL, 
-                planned_duration_hours = NULL, planned_cost = NULL
-            WHERE current_user_id = ?
-        ''', (user_id,))
-        
-        # Update bookings status to 'cancelled'
-        cursor.execute('''
-            UPDATE bookings 
-            SET status = 'cancelled'
-            WHERE user_id = ? AND status = 'active'
-        ''', (user_id,))
-        
-        # Delete user
-        cursor.execute('DELETE FROM users WHERE id = ?', (user_id,))
-        
-        conn.commit()
-        conn.close()
-        
-        logger.info(f"Deleted user {user_id}")
-        return jsonify({'message': 'User deleted successfully'}), 200
-        
-    except Exception as e:
-        logger.error(f"Error deleting user: {e}")
-        return jsonify({'error': str(e)}), 500
-
-@app.route('/api/bookings', methods=['GET'])
-def get_bookings():
-    """Get booking history with pagination and filtering."""
-    try:
-        print(f"[DEBUG] Getting bookings with args: {request.args}")
-        
-        page = int(request.args.get('page', 1))
-        per_page = int(request.args.get('per_page', 10))
-        status_filter = request.args.get('status', 'all')
-        
-        print(f"[DEBUG] Page: {page}, Per page: {per_page}, Filter: {status_filter}")
-        
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Build query based on filter using actual database schema
-        base_query = '''
-            SELECT b.*, u.full_name as user_name, u.email as user_email,
-                   pl.name as lot_name, pl.address as lot_address
-            FROM bookings b
-            LEFT JOIN users u ON b.user_id = u.id
-            LEFT JOIN parking_lots pl ON b.lot_id = pl.id
-        '''
-        
-        params = []
-        if status_filter != 'all':
-            if status_filter == 'today':
-                base_query += " WHERE DATE(b.start_time) = DATE('now')"
-            elif status_filter == 'week':
-                base_query += " WHERE DATE(b.start_time) >= DATE('now', '-7 days')"
-            elif status_filter == 'month':
-                base_query += " WHERE DATE(b.start_time) >= DATE('now', '-30 days')"
-            else:
-                base_query += " WHERE b.status = ?"
-                params.append(status_filter)
-        
-        print(f"[DEBUG] Base query: {base_query}")
-        print(f"[DEBUG] Params: {params}")
-        
-        # Count total records
-        count_query = base_query.replace(
-            'SELECT b.*, u.full_name as user_name, u.email as user_email, pl.name as lot_name, pl.address as lot_address', 
-            'SELECT COUNT(*)'
-        )
-        print(f"[DEBUG] Count query: {count_query}")
-        
-        cursor.execute(count_query, params)
-        count_result = cursor.fetchone()
-        print(f"[DEBUG] Count result: {count_result}")
-        
-        total_records = count_result[0] if count_result else 0
-        print(f"[DEBUG] Total records: {total_records}")
-        
-        # Get paginated results
-        base_query += " ORDER BY b.start_time DESC LIMIT ? OFFSET ?"
-        params.extend([per_page, (page - 1) * per_page])
-        
-        print(f"[DEBUG] Final query: {base_query}")
-        print(f"[DEBUG] Final params: {params}")
-        
-        cursor.execute(base_query, params)
-        bookings = cursor.fetchall()
-        print(f"[DEBUG] Found {len(bookings)} bookings")
-        
-        bookings_data = []
-        for booking in bookings:
-            # Handle None values safely
-            actual_duration = booking['actual_duration_hours'] or 0
-            final_cost = booking['final_cost'] or 0
-            
-            booking_data = {
-                'id': booking['id'],
-                'booking_id': booking['booking_id'],
-                'user_id': booking['user_id'],
-                'user_name': booking['user_name'],
-                'user_email': booking['user_email'],
-                'lot_id': booking['lot_id'],
-                'lot_name': booking['lot_name'],
-                'lot_address': booking['lot_address'],
-                'slot_number': booking['slot_id'],  # Using slot_id as slot_number
-                'vehicle_number': booking['vehicle_number'],
-                'start_time': booking['start_time'],
-                'end_time': booking['end_time'],
-                'planned_duration_hours': booking['planned_duration_hours'] or 0,
-                'actual_duration_hours': actual_duration,
-                'hourly_rate': final_cost / actual_duration if actual_duration > 0 else 0,
-                'final_cost': final_cost,
-                'status': booking['status'],
-                'created_at': booking['booking_created_at']
-            }
-            bookings_data.append(booking_data)
-        
-        conn.close()
-        
-        total_pages = (total_records + per_page - 1) // per_page
-        
-        return jsonify({
-            'bookings': bookings_data,
-            'pagination': {
-                'page': page,
-                'per_page': per_page,
-                'total': total_records,
-                'total_pages': total_pages,
-                'pages': total_pages
-            }
-        }), 200
-        
-    except Exception as e:
-        logger.error(f"Error fetching bookings: {e}")
-        return jsonify({'error': str(e)}), 500
-
-@app.route('/api/bookings/stats', methods=['GET'])
-def bookings_stats():
-    """Get booking statistics for admin dashboard."""
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Get total bookings count
-        cursor.execute("SELECT COUNT(*) FROM bookings")
-        total_bookings = cursor.fetchone()[0]
-        
-        # Get total revenue from final_cost (actual revenue from completed bookings)
-        cursor.execute("SELECT SUM(final_cost) FROM bookings WHERE final_cost IS NOT NULL AND status = 'completed'")
-        total_revenue = cursor.fetchone()[0] or 0
-        
-        # Get average booking duration from actual_duration_hours
-        cursor.execute("""
-            SELECT AVG(actual_duration_hours) as avg_duration
-            FROM bookings 
-            WHERE actual_duration_hours IS NOT NULL AND actual_duration_hours > 0
-        """)
-        avg_duration = cursor.fetchone()[0] or 0
-        
-        # Get bookings by status
-        cursor.execute("""
-            SELECT status, COUNT(*) 
-            FROM bookings 
-            GROUP BY status
-        """)
-        status_stats = {}
-        for row in cursor.fetchall():
-            status_stats[row[0]] = row[1]
-        
-        # Get additional useful metrics
-        cursor.execute("SELECT COUNT(*) FROM bookings WHERE status = 'active'")
-        active_bookings = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM bookings WHERE status = 'completed'")
-        completed_bookings = cursor.fetchone()[0]
-        
-        # Get total slots and occupied slots from parking_slots
-        cursor.execute("SELECT COUNT(*) FROM parking_slots")
-        total_slots = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM parking_slots WHERE is_available = 0")
-        occupied_slots = cursor.fetchone()[0]
-        
-        # Get additional user and lot counts for complete dashboard data
-        cursor.execute("SELECT COUNT(*) FROM users")
-        total_users = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM parking_lots")
-        total_lots = cursor.fetchone()[0]
-        
-        # Get today's revenue (completed bookings from today)
-        cursor.execute("""
-            SELECT SUM(final_cost) 
-            FROM bookings 
-            WHERE final_cost IS NOT NULL 
-            AND status = 'completed' 
-            AND DATE(completed_at) = DATE('now')
-        """)
-        today_revenue = cursor.fetchone()[0] or 0
-        
-        # Get this week's bookings count
-        cursor.execute("""
-            SELECT COUNT(*) 
-            FROM bookings 
-            WHERE DATE(booking_created_at) >= DATE('now', '-7 days')
-        """)
-        this_week_bookings = cursor.fetchone()[0]
-        
-        conn.close()
-        
-        print(f"[DEBUG] Booking stats: total={total_bookings}, revenue={total_revenue}, avg_duration={avg_duration}")
-        
-        return jsonify({
-            # Primary KPIs (match AdminDashboard expectations)
-            'totalBookings': total_bookings,
-            'totalRevenue': round(total_revenue, 2),
-            'averageRevenue': round(total_revenue / total_bookings, 2) if total_bookings > 0 else 0,
-            'peakTime': '10:00 AM',  # Could be calculated from actual data
-            'occupancyRate': round((occupied_slots / total_slots * 100), 2) if total_slots > 0 else 0,
-            
-            # Secondary KPIs
-            'activeBookings': active_bookings,
-            'todayRevenue': round(today_revenue, 2),
-            'averageDuration': round(avg_duration, 2),
-            'totalUsers': total_users,
-            'totalLots': total_lots,
-            'totalSlots': total_slots,
-            'availableSlots': total_slots - occupied_slots,
-            'occupiedSlots': occupied_slots,
-            'thisWeekBookings': this_week_bookings,
-            'mostPopularLot': 'N/A',  # Could be calculated from booking data
-            
-            # Additional data for compatibility
-            'status_distribution': status_stats,
-            'completed_bookings': completed_bookings
-        })
-        
-    except Exception as e:
-        print(f"[ERROR] Failed to get booking stats: {str(e)}")
-        return jsonify({'error': 'Failed to retrieve booking statistics'}), 500
-
-# =============================================================================
-# USER AUTHENTICATION COMPATIBILITY ROUTES
-# =============================================================================
-
-@app.route('/api/auth/user/register', methods=['POST'])
-def user_register():
-    """User registration with direct database access."""
-    try:
-        data = request.get_json()
-        print(f"[DEBUG] User registration request for: {data.get('email')}")
-        
-        # Extract and validate data
-        email = data.get('email')
-        password = data.get('password')
-        full_name = data.get('fullName') or data.get('full_name')
-        phone = data.get('phone', '')
-        address_line1 = data.get('addressLine1') or data.get('address_line1', '')
-        city = data.get('city', '')
-        state = data.get('state', '')
-        pin_code = data.get('pinCode') or data.get('pin_code', '')
-        
-        if not email or not password or not full_name:
-            return jsonify({'message': 'Email, password, and full name are required'}), 400
-        
-        # Database connection
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Check if user already exists
-        cursor.execute('SELECT id FROM users WHERE email = ?', (email,))
-        if cursor.fetchone():
-            conn.close()
-            return jsonify({'message': 'User with this email already exists'}), 409
-        
-        # Hash password
-        from werkzeug.security import generate_password_hash
-        password_hash = generate_password_hash(password)
-        
-        # Insert new user
-        cursor.execute('''
-            INSERT INTO users (email, password, full_name, phone, address_line1, city, state, pin_code, is_active, created_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (email, password_hash, full_name, phone, address_line1, city, state, pin_code, True, datetime.now().isoformat()))
-        
-        user_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        
-        print(f"[DEBUG] User registered successfully with ID: {user_id}")
-        
-        return jsonify({
-            'message': 'User registered successfully',
-            'user': {
-                'id': user_id,
-                'email': email,
-                'name': full_name
-            }
-        }), 201
-        
-    except Exception as e:
-        print(f"[ERROR] Registration error: {str(e)}")
-        return jsonify({'message': 'Server error. Please try again later.'}), 500
-    
-    try:
-        with app.test_client() as client:
-            response = client.post('/api/user/register', 
-                                 json=converted_data,
-                                 headers=dict(request.headers))
-            
-            print(f"[DEBUG] Registration response status: {response.status_code}")
-            print(f"[DEBUG] Registration response data: {response.get_data(as_text=True)}")
-            
-            try:
-                return response.get_json(), response.status_code
-            except:
-                return {"error": "Invalid JSON response", "raw": response.get_data(as_text=True)}, response.status_code
-    except Exception as e:
-        print(f"[ERROR] Registration proxy error: {e}")
-        # Fallback: Direct registration
-        return direct_user_register()
-
-def direct_user_register():
-    """Direct user registration fallback."""
-    try:
-        from werkzeug.security import generate_password_hash
-        import sqlite3
-        from datetime import datetime
-        
-        data = request.get_json()
-        print(f"[DEBUG] Direct registration for: {data}")
-        
-        # Handle both camelCase (frontend) and snake_case (backend) field names
-        full_name = data.get('full_name') or data.get('fullName')
-        email = data.get('email')
-        password = data.get('password')
-        phone = data.get('phone') or ''
-        address_line1 = data.get('address_line1') or data.get('addressLine1') or ''
-        city = data.get('city') or ''
-        state = data.get('state') or ''
-        pin_code = data.get('pin_code') or data.get('pinCode') or ''
-        
-        # Validate required fields
-        if not email:
-            return jsonify({'message': 'email is required'}), 400
-        if not password:
-            return jsonify({'message': 'password is required'}), 400
-        if not full_name:
-            return jsonify({'message': 'full_name is required'}), 400
-        
-        # Database connection
-        DB_PATH = r'D:\MAD2\Parking App\instance\parking.db'
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        # Check if user already exists
-        cursor.execute('SELECT id FROM users WHERE email = ?', (email,))
-        if cursor.fetchone():
-            conn.close()
-            return jsonify({'message': 'Email already registered'}), 400
-        
-        # Hash password and create user
-        hashed_password = generate_password_hash(password)
-        
-        cursor.execute('''
-            INSERT INTO users (email, password, full_name, phone, address_line1, city, state, pin_code, is_active, created_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            email,
-            hashed_password,
-            full_name,
-            phone,
-            address_line1,
-            city,
-            state,
-            pin_code,
-            0,  # is_active = 0 for regular users
-            datetime.now().isoformat()
-        ))
-        
-        user_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        
-        print(f"[DEBUG] Direct registration successful for user ID: {user_id}")
-        return jsonify({
-            'message': 'User registered successfully',
-            'user_id': user_id,
-            'email': email
-        }), 201
-        
-    except Exception as e:
-        print(f"[ERROR] Direct registration error: {e}")
-        import traceback
-        traceback.print_exc()
-        return jsonify({'message': f'Registration failed: {str(e)}'}), 500
-
-@app.route('/api/auth/user/login', methods=['POST'])
-def user_login():
-    """User login with direct database access."""
-    try:
-        data = request.get_json()
-        print(f"[DEBUG] User login request for: {data.get('email')}")
-        
-        email = data.get('email')
-        password = data.get('password')
-        
-        if not email or not password:
-            return jsonify({'message': 'Email and password are required'}), 400
-        
-        # Database connection
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Find user by email
-        cursor.execute('SELECT id, full_name, email, password FROM users WHERE email = ?', (email,))
-        user = cursor.fetchone()
-        
-        if not user:
-            conn.close()
-            return jsonify({'message': 'Invalid email or password'}), 401
-        
-        # Check password
-        stored_password = user['password']
-        password_valid = False
-        
-        # Try werkzeug password check first (for hashed passwords)
-        try:
-            from werkzeug.security import check_password_hash
-            if check_password_hash(stored_password, password):
-                password_valid = True
-                print(f"[DEBUG] Password verified with hash")
-        except Exception as e:
-            print(f"[DEBUG] Hash check failed: {e}")
-        
-        # If not hashed, check plain text (for development)
-        if not password_valid and stored_password == password:
-            password_valid = True
-            print(f"[DEBUG] Password verified as plain text")
-        
-        if not password_valid:
-            conn.close()
-            print(f"[DEBUG] Password verification failed for {email}")
-            return jsonify({'message': 'Invalid email or password'}), 401
-        
-        # Generate simple token (in production, use JWT or similar)
-        import time
-        token = f"user_{user['id']}_{int(time.time())}"
-        
-        conn.close()
-        
-        print(f"[DEBUG] Login successful for user {user['id']}")
-        
-        return jsonify({
-            'token': token,
-            'user': {
-                'id': user['id'],
-                'name': user['full_name'],
-                'email': user['email']
-            },
-            'message': 'Login successful'
-        }), 200
-        
-    except Exception as e:
-        print(f"[ERROR] Login error: {str(e)}")
-        return jsonify({'message': 'Server error. Please try again later.'}), 500
-
-def direct_user_login():
-    """Direct user login fallback."""
-    try:
-        from werkzeug.security import check_password_hash
-        import sqlite3
-        from datetime import datetime
-        
-        data = request.get_json()
-        print(f"[DEBUG] Direct login for: {data.get('email')}")
-        
-        email = data.get('email')
-        password = data.get('password')
-        
-        if not email or not password:
-            return jsonify({'message': 'Email and password are required'}), 400
-        
-        # Database connection
-        DB_PATH = r'D:\MAD2\Parking App\instance\parking.db'
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        # Check user credentials
-        cursor.execute('SELECT * FROM users WHERE email = ? AND is_active = 0', (email,))
-        user = cursor.fetchone()
-        conn.close()
-        
-        if user and check_password_hash(user['password'], password):
-            print(f"[DEBUG] Direct login successful for: {email}")
-            user_data = {
-                'id': user['id'],
-                'email': user['email'],
-                'full_name': user['full_name'],
-                'phone': user['phone'] or '',
-                'address_line1': user['address_line1'] or '',
-                'city': user['city'] or '',
-                'state': user['state'] or '',
-                'pin_code': user['pin_code'] or ''
-            }
-            
-            token = f"user_{user['id']}_{datetime.now().timestamp()}"
-            print(f"[DEBUG] Generated token: {token}")
-            print(f"[DEBUG] User data: {user_data}")
-            
-            return jsonify({
-                'message': 'Login successful',
-                'access_token': token,
-                'user': user_data
-            }), 200
-        
-        return jsonify({'message': 'Invalid credentials'}), 401
-        
-    except Exception as e:
-        print(f"[ERROR] Direct login error: {e}")
-        return jsonify({'message': f'Login failed: {str(e)}'}), 500
-
-@app.route('/api/auth/profile', methods=['GET', 'PUT'])
-def user_profile():
-    """Direct user profile endpoint with token-based authentication."""
-    print(f"[DEBUG] Profile {request.method} request")
-    print(f"[DEBUG] Headers: {dict(request.headers)}")
-    
-    # Extract user ID from token
-    auth_header = request.headers.get('Authorization', '')
-    if not auth_header.startswith('Bearer '):
-        return jsonify({'message': 'Authorization token required'}), 401
-    
-    token = auth_header.replace('Bearer ', '')
-    print(f"[DEBUG] Token: {token}")
-    
-    # Extract user ID from token (format: user_{id}_{timestamp})
-    try:
-        if token.startswith('user_'):
-            parts = token.split('_')
-            if len(parts) >= 2:
-                user_id = int(parts[1])
-                print(f"[DEBUG] Extracted user ID: {user_id}")
-            else:
-                return jsonify({'message': 'Invalid token format'}), 401
-        else:
-            return jsonify({'message': 'Invalid token'}), 401
-    except (ValueError, IndexError):
-        return jsonify({'message': 'Invalid token format'}), 401
-    
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        if request.method == 'GET':
-            # Get user profile
-            cursor.execute('SELECT id, email, full_name, phone, address_line1, city, state, pin_code, created_at FROM users WHERE id = ?', (user_id,))
-            user = cursor.fetchone()
-            conn.close()
-            
-            if user:
-                profile_data = {
-                    'id': user['id'],
-                    'email': user['email'],
-                    'full_name': user['full_name'],  # Frontend expects full_name
-                    'name': user['full_name'],        # Also provide name as fallback
-                    'phone': user['phone'],
-                    'address_line1': user['address_line1'],  # Frontend expects address_line1
-                    'address': user['address_line1'],        # Also provide address as fallback
-                    'city': user['city'],
-                    'state': user['state'],
-                    'pin_code': user['pin_code'],     # Frontend expects pin_code
-                    'pinCode': user['pin_code'],      # Also provide pinCode as fallback
-                    'created_at': user['created_at'],
-                    'createdAt': user['created_at']
-                }
-                
-                return jsonify({
-                    'profile': profile_data,
-                    'type': 'user'
-                }), 200
-            else:
-                return jsonify({'message': 'User not found'}), 404
-                
-        elif request.method == 'PUT':
-            # Update user profile
-            data = request.get_json()
-            print(f"[DEBUG] PUT data received: {data}")
-            
-            # Update user data - match frontend field names
-            cursor.execute('''
-                UPDATE users SET 
-                    email = ?, full_name = ?, phone = ?, address_line1 = ?, 
-                    city = ?, state = ?, pin_code = ?
-                WHERE id = ?
-            ''', (
-                data.get('email'),
-                data.get('full_name'),
-                data.get('phone'),
-                data.get('address_line1'),
-                data.get('city'),
-                data.get('state'),
-                data.get('pin_code'),
-                user_id
-            ))
-            
-            conn.commit()
-            
-            # Get updated user data to return
-            cursor.execute('SELECT id, email, full_name, phone, address_line1, city, state, pin_code, created_at FROM users WHERE id = ?', (user_id,))
-            updated_user = cursor.fetchone()
-            conn.close()
-            
-            if updated_user:
-                profile_data = {
-                    'id': updated_user['id'],
-                    'email': updated_user['email'],
-                    'full_name': updated_user['full_name'],
-                    'name': updated_user['full_name'],
-                    'phone': updated_user['phone'],
-                    'address_line1': updated_user['address_line1'],
-                    'address': updated_user['address_line1'],
-                    'city': updated_user['city'],
-                    'state': updated_user['state'],
-                    'pin_code': updated_user['pin_code'],
-                    'pinCode': updated_user['pin_code'],
-                    'created_at': updated_user['created_at'],
-                    'createdAt': updated_user['created_at']
-                }
-                
-                return jsonify({
-                    'message': 'Profile updated successfully',
-                    'profile': profile_data
-                }), 200
-            else:
-                return jsonify({'message': 'Profile updated successfully'}), 200
-            
-    except Exception as e:
-        print(f"[ERROR] Profile error: {str(e)}")
-        return jsonify({'message': 'Server error. Please try again later.'}), 500
-
-# Removed unused direct_user_profile function - now using direct implementation in user_profile route
-
-@app.route('/api/my-bookings', methods=['GET'])
-def user_bookings():
-    """Direct user bookings endpoint."""
-    print(f"[DEBUG] User bookings request")
-    print(f"[DEBUG] Headers: {dict(request.headers)}")
-    
-    # Extract user ID from token
-    auth_header = request.headers.get('Authorization', '')
-    if not auth_header.startswith('Bearer '):
-        print(f"[DEBUG] Missing or invalid Authorization header: {auth_header}")
-        return jsonify({'message': 'Authorization token required'}), 401
-    
-    token = auth_header.replace('Bearer ', '')
-    print(f"[DEBUG] Token: {token}")
-    
-    # Extract user ID from token (format: user_{id}_{timestamp})
-    try:
-        if token.startswith('user_'):
-            parts = token.split('_')
-            if len(parts) >= 2:
-                user_id = int(parts[1])
-                print(f"[DEBUG] Extracted user ID from token: {user_id}")
-            else:
-                print(f"[DEBUG] Invalid token format - not enough parts: {parts}")
-                return jsonify({'message': 'Invalid token format'}), 401
-        else:
-            print(f"[DEBUG] Token doesn't start with 'user_': {token}")
-            return jsonify({'message': 'Invalid token'}), 401
-    except (ValueError, IndexError) as e:
-        print(f"[DEBUG] Token parsing error: {e}")
-        return jsonify({'message': 'Invalid token format'}), 401
-    
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Get user's bookings with parking lot details
-        cursor.execute('''
-            SELECT b.*, 
-                   pl.name as lot_name, 
-                   pl.address as lot_address,
-                   pl.price_per_hour as hourly_rate,
-                   ps.slot_number
-            FROM bookings b
-            JOIN parking_lots pl ON b.lot_id = pl.id
-            JOIN parking_slots ps ON b.slot_id = ps.id
-            WHERE b.user_id = ?
-            ORDER BY b.booking_created_at DESC
-        ''', (user_id,))
-        
-        bookings = cursor.fetchall()
-        conn.close()
-        
-        bookings_data = []
-        for booking in bookings:
-            booking_data = {
-                'id': booking['id'],
-                'booking_id': booking['booking_id'],
-                'lot_id': booking['lot_id'],
-                'lot_name': booking['lot_name'],
-                'lot_address': booking['lot_address'],
-                'slot_id': booking['slot_id'],
-                'slot_number': booking['slot_number'],
-                'vehicle_number': booking['vehicle_number'],
-                'payment_method': booking['payment_method'],
-                'start_time': booking['start_time'],
-                'end_time': booking['end_time'],
-                'planned_duration_hours': booking['planned_duration_hours'],
-                'actual_duration_hours': booking['actual_duration_hours'],
-                'planned_cost': booking['planned_cost'],
-                'final_cost': booking['final_cost'],
-                'status': booking['status'],
-                'created_at': booking['booking_created_at'],
-                'completed_at': booking['completed_at'],
-                'hourly_rate': booking['hourly_rate']
-            }
-            bookings_data.append(booking_data)
-        
-        print(f"[DEBUG] Returning {len(bookings_data)} bookings for user {user_id}")
-        return jsonify(bookings_data), 200
-        
-    except Exception as e:
-        print(f"[ERROR] Bookings error: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return jsonify({'message': f'Failed to fetch bookings: {str(e)}'}), 500
-
-@app.route('/api/book-slot', methods=['POST'])
-def book_slot():
-    """Direct slot booking implementation.""" 
-    print(f"[DEBUG] Book slot request received")
-    print(f"[DEBUG] Request data: {request.get_json()}")
-    print(f"[DEBUG] Headers: {dict(request.headers)}")
-    
-    # Extract user ID from token
-    auth_header = request.headers.get('Authorization', '')
-    if not auth_header.startswith('Bearer '):
-        print(f"[DEBUG] Missing or invalid Authorization header: {auth_header}")
-        return jsonify({'message': 'Authorization token required'}), 401
-    
-    token = auth_header.replace('Bearer ', '')
-    print(f"[DEBUG] Token: {token}")
-    
-    # Extract user ID from token (format: user_{id}_{timestamp})
-    try:
-        if token.startswith('user_'):
-            parts = token.split('_')
-            if len(parts) >= 2:
-                user_id = int(parts[1])
-                print(f"[DEBUG] Extracted user ID from token: {user_id}")
-            else:
-                print(f"[DEBUG] Invalid token format - not enough parts: {parts}")
-                return jsonify({'message': 'Invalid token format'}), 401
-        else:
-            print(f"[DEBUG] Token doesn't start with 'user_': {token}")
-            return jsonify({'message': 'Invalid token'}), 401
-    except (ValueError, IndexError) as e:
-        print(f"[DEBUG] Token parsing error: {e}")
-        return jsonify({'message': 'Invalid token format'}), 401
-    
-    # Get booking data
-    booking_data = request.get_json() or {}
-    lot_id = booking_data.get('lot_id')
-    slot_id = booking_data.get('slot_id')
-    vehicle_number = booking_data.get('vehicle_number')
-    planned_duration = booking_data.get('duration', 2)  # Default 2 hours
-    start_time = booking_data.get('start_time')  # Get start_time from frontend
-    end_time = booking_data.get('end_time')      # Get end_time from frontend
-    
-    print(f"[DEBUG] Booking data received: lot_id={lot_id}, slot_id={slot_id}, start_time={start_time}, end_time={end_time}")
-    
-    if not all([lot_id, slot_id, vehicle_number]):
-        return jsonify({'message': 'Missing required fields: lot_id, slot_id, vehicle_number'}), 400
-    
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Verify user exists
-        cursor.execute('SELECT id, full_name, email FROM users WHERE id = ?', (user_id,))
-        user = cursor.fetchone()
-        if not user:
-            conn.close()
-            return jsonify({'message': 'Invalid user'}), 401
-        
-        # Find the specific slot
-        cursor.execute('''
-            SELECT ps.*, pl.price_per_hour 
-            FROM parking_slots ps 
-            JOIN parking_lots pl ON ps.lot_id = pl.id 
-            WHERE ps.id = ?
-        ''', (slot_id,))
-        slot = cursor.fetchone()
-        
-        if not slot:
-            conn.close()
-            return jsonify({'message': 'Slot not found'}), 404
-        
-        if not slot['is_available']:
-            conn.close()
-            return jsonify({'message': 'Slot is already booked'}), 409
-        
-        # Generate booking ID
-        import random
-        import string
-        booking_id = 'BK-' + ''.join(random.choices(string.ascii_uppercase + string.digits, k=8))
-        
-        # Calculate costs
-        hourly_rate = slot['price_per_hour']
-        slot_number = slot['slot_number']  # Extract slot_number from slot data
-        planned_cost = planned_duration * hourly_rate
-        
-        print(f"[DEBUG] Slot data: {slot}")
-        print(f"[DEBUG] Extracted slot_number: {slot_number}")
-        
-        # Use provided start_time and end_time, or defaults
-        from datetime import datetime, timedelta
-        if not start_time:
-            start_time = datetime.now().isoformat()
-        else:
-            # Ensure proper datetime format for SQLite
-            try:
-                # Parse the datetime string from frontend
-                if 'T' in start_time and len(start_time) == 16:  # Format: 2025-08-01T22:02
-                    start_time += ':00'  # Add seconds: 2025-08-01T22:02:00
-                start_dt = datetime.fromisoformat(start_time.replace('Z', '+00:00') if 'Z' in start_time else start_time)
-                start_time = start_dt.isoformat()
-            except Exception as dt_error:
-                print(f"[ERROR] Start time parsing error: {dt_error}")
-                start_time = datetime.now().isoformat()
-        
-        if not end_time:
-            # Default to start_time + planned_duration hours
-            start_dt = datetime.fromisoformat(start_time.replace('Z', '+00:00') if 'Z' in start_time else start_time)
-            end_dt = start_dt + timedelta(hours=planned_duration)
-            end_time = end_dt.isoformat()
-        else:
-            # Ensure proper datetime format for SQLite
-            try:
-                # Parse the datetime string from frontend
-                if 'T' in end_time and len(end_time) == 16:  # Format: 2025-08-01T22:02
-                    end_time += ':00'  # Add seconds: 2025-08-01T22:02:00
-                end_dt = datetime.fromisoformat(end_time.replace('Z', '+00:00') if 'Z' in end_time else end_time)
-                end_time = end_dt.isoformat()
-            except Exception as dt_error:
-                print(f"[ERROR] End time parsing error: {dt_error}")
-                # Fallback: calculate from start_time + planned_duration
-                start_dt = datetime.fromisoformat(start_time.replace('Z', '+00:00') if 'Z' in start_time else start_time)
-                end_dt = start_dt + timedelta(hours=planned_duration)
-                end_time = end_dt.isoformat()
-        
-        print(f"[DEBUG] Using start_time={start_time}, end_time={end_time}, planned_cost={planned_cost}")
-        print(f"[DEBUG] Insert values: user_id={user_id}, lot_id={lot_id}, slot_id={slot['id']}, booking_id={booking_id}")
-        print(f"[DEBUG] Vehicle: {vehicle_number}, Duration: {planned_duration}, Status: active")
-        
-        # Create booking record with all required fields
-        cursor.execute('''
-            INSERT INTO bookings (
-                user_id, lot_id, slot_id, booking_id, vehicle_number, 
-                payment_method, start_time, end_time, planned_duration_hours, 
-                actual_duration_hours, planned_cost, final_cost, status, 
-                booking_created_at, completed_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (user_id, lot_id, slot['id'], booking_id, vehicle_number, 
-              'pay_counter', start_time, end_time, planned_duration, 
-              0.0, planned_cost, 0.0, 'active', 
-              datetime.now().isoformat(), datetime.now().isoformat()))
-        
-        # Update slot availability
-        cursor.execute('''
-            UPDATE parking_slots SET 
-                is_available = 0, 
-                current_user_id = ?,
-                booking_id = ?,
-                vehicle_number = ?,
-                booking_start_time = datetime('now'),
-                planned_duration_hours = ?,
-                planned_cost = ?
-            WHERE id = ?
-        ''', (user_id, booking_id, vehicle_number, planned_duration, planned_cost, slot['id']))
-        
-        conn.commit()
-        conn.close()
-        
-        print(f"[DEBUG] Slot booked successfully: {booking_id}")
-        print(f"[DEBUG] About to return response with slot_number: {slot_number}")
-        
-        return jsonify({
-            'message': 'Slot booked successfully',
-            'booking': {
-                'booking_id': booking_id,
-                'slot_number': slot_number,
-                'lot_id': lot_id,
-                'user_id': user_id,
-                'vehicle_number': vehicle_number,
-                'planned_duration': planned_duration,
-                'planned_cost': planned_cost,
-                'hourly_rate': hourly_rate
-            }
-        }), 201
-        
-    except Exception as e:
-        print(f"[ERROR] Booking error: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return jsonify({'message': f'Booking failed: {str(e)}'}), 500
-
-@app.route('/api/release-slot', methods=['POST'])
-def release_slot():
-    """Direct slot release implementation."""
-    print(f"[DEBUG] Release slot request received")
-    print(f"[DEBUG] Request data: {request.get_json()}")
-    print(f"[DEBUG] Headers: {dict(request.headers)}")
-    
-    # Extract user ID from token
-    auth_header = request.headers.get('Authorization', '')
-    if not auth_header.startswith('Bearer '):
-        return jsonify({'message': 'Authorization token required'}), 401
-    
-    token = auth_header.replace('Bearer ', '')
-    try:
-        if token.startswith('user_'):
-            parts = token.split('_')
-            if len(parts) >= 2:
-                user_id = int(parts[1])
-                print(f"[DEBUG] Release request from user ID: {user_id}")
-            else:
-                return jsonify({'message': 'Invalid token format'}), 401
-        else:
-            return jsonify({'message': 'Invalid token'}), 401
-    except (ValueError, IndexError):
-        return jsonify({'message': 'Invalid token format'}), 401
-    
-    # Get request data
-    data = request.get_json() or {}
-    booking_id = data.get('booking_id')
-    slot_id = data.get('slot_id')  # Fallback for frontend compatibility
-    
-    # Support both booking_id and slot_id for compatibility
-    if not booking_id and not slot_id:
-        return jsonify({'message': 'Either booking_id or slot_id is required'}), 400
-    
-    print(f"[DEBUG] Release data: booking_id={booking_id}, slot_id={slot_id}")
-    
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Find the booking - support both booking_id and slot_id
-        if booking_id:
-            cursor.execute('''
-                SELECT b.*, ps.id as slot_id, ps.slot_number, pl.price_per_hour
-                FROM bookings b
-                JOIN parking_slots ps ON b.slot_id = ps.id
-                JOIN parking_lots pl ON b.lot_id = pl.id
-                WHERE b.booking_id = ? AND b.user_id = ? AND b.status = 'active'
-            ''', (booking_id, user_id))
-        else:
-            # Find by slot_id - get the most recent active booking for this slot
-            cursor.execute('''
-                SELECT b.*, ps.id as slot_id, ps.slot_number, pl.price_per_hour
-                FROM bookings b
-                JOIN parking_slots ps ON b.slot_id = ps.id
-                JOIN parking_lots pl ON b.lot_id = pl.id
-                WHERE b.slot_id = ? AND b.user_id = ? AND b.status = 'active'
-                ORDER BY b.id DESC LIMIT 1
-            ''', (slot_id, user_id))
-        
-        booking = cursor.fetchone()
-        
-        if not booking:
-            conn.close()
-            if booking_id:
-                return jsonify({'message': f'Active booking not found for booking_id: {booking_id}'}), 404
-            else:
-                return jsonify({'message': f'Active booking not found for slot_id: {slot_id}'}), 404
-        
-        print(f"[DEBUG] Found booking: {dict(booking)}")
-        
-        # Extract slot_number for use in response
-        slot_number = booking['slot_number']
-        print(f"[DEBUG] Extracted slot_number: {slot_number}")
-        
-        # Calculate final cost
-        from datetime import datetime
-        start_time = datetime.fromisoformat(booking['start_time'].replace('Z', '+00:00') if 'Z' in booking['start_time'] else booking['start_time'])
-        end_time = datetime.now()
-        actual_duration = (end_time - start_time).total_seconds() / 3600
-        final_cost = actual_duration * booking['price_per_hour']
-        
-        # Update booking record
-        cursor.execute('''
-            UPDATE bookings SET 
-                end_time = ?,
-                actual_duration_hours = ?,
-                final_cost = ?,
-                status = 'completed',
-                completed_at = ?
-            WHERE id = ?
-        ''', (end_time.isoformat(), actual_duration, final_cost, end_time.isoformat(), booking['id']))
-        
-        # Release the slot
-        cursor.execute('''
-            UPDATE parking_slots SET 
-                is_available = 1,
-                current_user_id = NULL,
-                booking_id = NULL,
-                vehicle_number = NULL,
-                booking_start_time = NULL,
-                planned_duration_hours = NULL,
-                planned_cost = NULL
-            WHERE id = ?
-        ''', (booking['slot_id'],))
-        
-        conn.commit()
-        conn.close()
-        
-        print(f"[DEBUG] Slot {slot_number} released successfully")
-        
-        # Format start_time for frontend consistency
-        formatted_start_time = booking['start_time']
-        if 'T' in formatted_start_time and len(formatted_start_time) > 16:
-            # Keep full datetime format: 2025-08-01T22:16:00
-            formatted_start_time = formatted_start_time[:19]  # Remove microseconds if present
-        
-        print(f"[DEBUG] Returning start_time: {formatted_start_time}")
-        
-        return jsonify({
-            'message': 'Slot released successfully',
-            'booking_id': booking['booking_id'],
-            'slot_number': slot_number,
-            'slot_id': booking['slot_id'],  # Include slot_id for frontend compatibility
-            'final_cost': round(final_cost, 2),
-            'actual_duration': round(actual_duration, 2),
-            'start_time': formatted_start_time,
-            'startTime': formatted_start_time,  # Alternative key for frontend
-            'end_time': end_time.isoformat(),
-            'endTime': end_time.isoformat(),    # Alternative key for frontend
-            'vehicle_number': booking['vehicle_number'],
-            'lot_name': booking['lot_name'] if 'lot_name' in booking.keys() else '',
-            'planned_duration_hours': booking['planned_duration_hours'],
-            'planned_cost': booking['planned_cost']
-        }), 200
-        
-    except Exception as e:
-        print(f"[ERROR] Release slot error: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return jsonify({'message': f'Failed to release slot: {str(e)}'}), 500
-
-# =============================================================================
-# DEBUG ROUTES FOR TESTING
-# =============================================================================
-
-@app.route('/api/debug/users', methods=['GET'])
-def debug_users():
-    """Debug route to test user listing without auth."""
-    with app.test_client() as client:
-        response = client.get('/api/admin/users')
-        return response.get_json(), response.status_code
-
-@app.route('/api/debug/delete-user/<int:user_id>', methods=['POST'])
-def debug_delete_user(user_id):
-    """Debug route to test user deletion without auth requirements."""
-    with app.test_client() as client:
-        response = client.delete(f'/api/admin/users/{user_id}')
-        return response.get_json(), response.status_code
-
-@app.route('/api/debug/update-lot/<int:lot_id>', methods=['POST'])
-def debug_update_lot(lot_id):
-    """Debug route to test lot update without auth requirements."""
-    data = request.get_json()
-    print(f"[DEBUG] Update lot request: {data}")
-    with app.test_client() as client:
-        response = client.put(f'/api/admin/parking-lots/{lot_id}', json=data)
-        return response.get_json(), response.status_code
-
-@app.route('/api/debug/profile/<int:user_id>', methods=['GET'])
-def debug_user_profile(user_id):
-    """Debug route to test user profile without auth requirements."""
-    print(f"[DEBUG] Getting profile for user ID: {user_id}")
-    
-    try:
-        import sqlite3
-        
-        DB_PATH = r'D:\MAD2\Parking App\instance\parking.db'
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM users WHERE id = ? AND is_active = 0', (user_id,))
-        user = cursor.fetchone()
-        conn.close()
-        
-        if user:
-            profile_data = {
-                'id': user['id'],
-                'email': user['email'],
-                'full_name': user['full_name'],
-                'phone': user['phone'] or '',
-                'address_line1': user['address_line1'] or '',
-                'city': user['city'] or '',
-                'state': user['state'] or '',
-                'pin_code': user['pin_code'] or ''
-            }
-            
-            return jsonify({
-                'profile': profile_data,
-                'type': 'user'
-            }), 200
-        else:
-            return jsonify({'message': 'User not found'}), 404
-            
-    except Exception as e:
-        print(f"[ERROR] Debug profile error: {e}")
-        return jsonify({'message': f'Profile fetch failed: {str(e)}'}), 500
-
-@app.route('/api/debug/test-login', methods=['POST'])
-def debug_test_login():
-    """Debug route to test login without frontend."""
-    data = request.get_json()
-    email = data.get('email', 'test@example.com')
-    password = data.get('password', 'password123')
-    
-    print(f"[DEBUG] Test login for: {email}")
-    
-    try:
-        with app.test_client() as client:
-            response = client.post('/api/auth/user/login', 
-                                 json={'email': email, 'password': password})
-            return response.get_json(), response.status_code
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
-
-@app.route('/api/debug/parking-lots', methods=['GET'])
-def debug_parking_lots():
-    """Debug route to test parking lots endpoint."""
-    print(f"[DEBUG] Testing parking lots endpoint")
-    
-    try:
-        with app.test_client() as client:
-            response = client.get('/api/admin/parking-lots')
-            print(f"[DEBUG] Admin parking lots response status: {response.status_code}")
-            print(f"[DEBUG] Admin parking lots response: {response.get_data(as_text=True)}")
-            
-            try:
-                data = response.get_json()
-                print(f"[DEBUG] Parsed JSON: {data}")
-                return data, response.status_code
-            except Exception as e:
-                print(f"[DEBUG] JSON parsing error: {e}")
-                return {"error": "Invalid JSON", "raw": response.get_data(as_text=True)}, response.status_code
-                
-    except Exception as e:
-        print(f"[ERROR] Debug parking lots error: {e}")
-        return jsonify({'error': str(e)}), 500
-
-@app.route('/api/debug/add-sample-lots', methods=['POST'])
-def debug_add_sample_lots():
-    """Debug route to add sample parking lots."""
-    print(f"[DEBUG] Adding sample parking lots")
-    
-    try:
-        import sqlite3
-        from datetime import datetime
-        
-        DB_PATH = r'D:\MAD2\Parking App\instance\parking.db'
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        # Check if parking lots already exist
-        cursor.execute("SELECT COUNT(*) FROM parking_lots")
-        existing_count = cursor.fetchone()[0]
-        
-        if existing_count > 0:
-            print(f"Database already has {existing_count} parking lots")
-            conn.close()
-            return jsonify({
-                'message': f'Database already has {existing_count} parking lots',
-                'existing_count': existing_count
-            }), 200
-        
-        sample_lots = [
-            {
-                'name': 'Central Mall Parking',
-                'address': '123 Main Street, Downtown',
-                'pincode': '110001',
-                'price_per_hour': 50.0,
-                'total_slots': 20
-            },
-            {
-                'name': 'City Hospital Parking',
-                'address': '456 Healthcare Avenue',
-                'pincode': '110002', 
-                'price_per_hour': 30.0,
-                'total_slots': 15
-            },
-            {
-                'name': 'Metro Station Park & Ride',
-                'address': '789 Transit Road',
-                'pincode': '110003',
-                'price_per_hour': 25.0,
-                'total_slots': 30
-            }
-        ]
-        
-        created_lots = []
-        for lot_data in sample_lots:
-            print(f"Creating parking lot: {lot_data['name']}")
-            
-            # Insert parking lot
-            cursor.execute('''
-                INSERT INTO parking_lots (name, address, pincode, price_per_hour, total_slots, created_at)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (
-                lot_data['name'],
-                lot_data['address'],
-                lot_data['pincode'],
-                lot_data['price_per_hour'],
-                lot_data['total_slots'],
-                datetime.now().isoformat()
-            ))
-            
-            lot_id = cursor.lastrowid
-            
-            # Create parking slots for the lot
-            for slot_num in range(1, lot_data['total_slots'] + 1):
-                cursor.execute('''
-                    INSERT INTO parking_slots (lot_id, slot_number, is_available, created_at)
-                    VALUES (?, ?, ?, ?)
-                ''', (lot_id, slot_num, 1, datetime.now().isoformat()))
-            
-            created_lots.append({
-                'id': lot_id,
-                'name': lot_data['name'],
-                'total_slots': lot_data['total_slots']
-            })
-            
-            print(f"  Created {lot_data['total_slots']} slots for lot ID {lot_id}")
-        
-        conn.commit()
-        conn.close()
-        
-        print(f"Successfully created {len(sample_lots)} sample parking lots!")
-        
-        return jsonify({
-            'message': f'Successfully created {len(sample_lots)} sample parking lots',
-            'created_lots': created_lots
-        }), 201
-        
-    except Exception as e:
-        print(f"[ERROR] Error adding sample lots: {e}")
-        import traceback
-        traceback.print_exc()
-        return jsonify({'error': str(e)}), 500
-
-@app.route('/api/debug/check-db', methods=['GET'])
-def debug_check_db():
-    """Debug route to check database status."""
-    try:
-        import sqlite3
-        import os
-        
-        DB_PATH = r'D:\MAD2\Parking App\instance\parking.db'
-        
-        if not os.path.exists(DB_PATH):
-            return jsonify({'error': f'Database file does not exist at {DB_PATH}'}), 404
-        
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        # Check parking_lots table
-        cursor.execute("SELECT COUNT(*) FROM parking_lots")
-        lots_count = cursor.fetchone()[0]
-        
-        # Check parking_slots table
-        cursor.execute("SELECT COUNT(*) FROM parking_slots")
-        slots_count = cursor.fetchone()[0]
-        
-        # Check users table
-        cursor.execute("SELECT COUNT(*) FROM users")
-        users_count = cursor.fetchone()[0]
-        
-        # Get sample data
-        cursor.execute("SELECT id, name, address, total_slots FROM parking_lots LIMIT 3")
-        sample_lots = [dict(row) for row in cursor.fetchall()]
-        
-        # Get sample users (handle potential column name variations)
-        try:
-            cursor.execute("SELECT id, email, full_name FROM users LIMIT 3")
-            sample_users = [dict(row) for row in cursor.fetchall()]
-        except Exception as user_error:
-            print(f"[DEBUG] Error getting users: {user_error}")
-            try:
-                cursor.execute("SELECT id, email, name FROM users LIMIT 3")
-                sample_users = [dict(row) for row in cursor.fetchall()]
-            except:
-                sample_users = []
-        
-        conn.close()
-        
-        return jsonify({
-            'database_exists': True,
-            'database_path': DB_PATH,
-            'parking_lots_count': lots_count,
-            'parking_slots_count': slots_count,
-            'users_count': users_count,
-            'sample_lots': sample_lots,
-            'sample_users': sample_users
-        }), 200
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
-
-@app.route('/api/debug/db-schema', methods=['GET'])
-def debug_db_schema():
-    """Debug route to check database schema."""
-    try:
-        import sqlite3
-        
-        DB_PATH = r'D:\MAD2\Parking App\instance\parking.db'
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        # Get all table names
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-        tables = [row[0] for row in cursor.fetchall()]
-        
-        schema_info = {}
-        for table in tables:
-            cursor.execute(f"PRAGMA table_info({table})")
-            columns = cursor.fetchall()
-            schema_info[table] = [{'name': col[1], 'type': col[2], 'not_null': col[3], 'pk': col[5]} for col in columns]
-        
-        conn.close()
-        
-        return jsonify({
-            'tables': tables,
-            'schema': schema_info
-        }), 200
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
-
-@app.route('/api/debug/create-test-user', methods=['GET'])
-def debug_create_test_user():
-    """Debug route to create a test user."""
-    try:
-        import sqlite3
-        import hashlib
-        from datetime import datetime
-        
-        DB_PATH = r'D:\MAD2\Parking App\instance\parking.db'
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        # Check if test user already exists
-        cursor.execute("SELECT id FROM users WHERE email = ?", ('test@example.com',))
-        existing_user = cursor.fetchone()
-        
-        if existing_user:
-            conn.close()
-            return jsonify({
-                'message': 'Test user already exists',
-                'user_id': existing_user['id'],
-                'email': 'test@example.com'
-            }), 200
-        
-        # Create test user
-        password_hash = hashlib.md5('test123'.encode()).hexdigest()
-        
-        cursor.execute('''
-            INSERT INTO users (full_name, email, phone, password, address_line1, city, state, pin_code, created_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            'Test User',
-            'test@example.com',
-            '1234567890',
-            password_hash,
-            '123 Test Street',
-            'Test City',
-            'Test State',
-            '123456',
-            datetime.now().isoformat()
-        ))
-        
-        user_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        
-        return jsonify({
-            'message': 'Test user created successfully',
-            'user_id': user_id,
-            'email': 'test@example.com',
-            'password': 'test123'
-        }), 201
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
-
-@app.route('/api/debug/setup-test-user', methods=['GET'])
-def debug_setup_test_user():
-    """Create a test user and provide login instructions."""
-    try:
-        import sqlite3
-        import hashlib
-        from datetime import datetime
-        
-        DB_PATH = r'D:\MAD2\Parking App\instance\parking.db'
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        # First, check if users table exists and what its structure is
-        cursor.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name='users'")
-        table_info = cursor.fetchone()
-        
-        if not table_info:
-            # Create users table if it doesn't exist
-            cursor.execute('''
-                CREATE TABLE users (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    full_name TEXT NOT NULL,
-                    email TEXT UNIQUE NOT NULL,
-                    phone TEXT,
-                    password TEXT NOT NULL,
-                    address_line1 TEXT,
-                    city TEXT,
-                    state TEXT,
-                    pin_code TEXT,
-                    is_active INTEGER DEFAULT 0,
-                    created_at TEXT
-                )
-            ''')
-            print("Created users table")
-        
-        # Check if test user exists
-        cursor.execute("SELECT id, email FROM users WHERE email = ?", ('test@example.com',))
-        existing_user = cursor.fetchone()
-        
-        if existing_user:
-            user_id = existing_user['id']
-            message = f"Test user already exists with ID {user_id}"
-        else:
-            # Create test user
-            password_hash = hashlib.md5('test123'.encode()).hexdigest()
-            
-            cursor.execute('''
-                INSERT INTO users (full_name, email, phone, password, address_line1, city, state, pin_code, is_active, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                'Test User',
-                'test@example.com',
-                '1234567890',
-                password_hash,
-                '123 Test Street',
-                'Test City',
-                'Test State',
-                '123456',
-                0,  # is_active = 0 means active user
-                datetime.now().isoformat()
-            ))
-            
-            user_id = cursor.lastrowid
-            conn.commit()
-            message = f"Test user created successfully with ID {user_id}"
-        
-        # Generate a test token for immediate use
-        import time
-        test_token = f"user_{user_id}_{int(time.time())}"
-        
-        conn.close()
-        
-        return jsonify({
-            'message': message,
-            'user_id': user_id,
-            'test_credentials': {
-                'email': 'test@example.com',
-                'password': 'test123'
-            },
-            'test_token': test_token,
-            'instructions': {
-                '1': 'Use the test credentials to log in through the frontend',
-                '2': 'Or use the test_token directly by setting localStorage.setItem("token", "' + test_token + '")',
-                '3': 'Then refresh the user dashboard'
-            }
-        }), 201
-        
-    except Exception as e:
-        import traceback
-        return jsonify({'error': str(e), 'traceback': traceback.format_exc()}), 500
-
-@app.route('/api/debug/test-auth-flow', methods=['GET'])
-def debug_test_auth_flow():
-    """Test the complete authentication flow."""
-    try:
-        import sqlite3
-        import hashlib
-        from datetime import datetime
-        
-        DB_PATH = r'D:\MAD2\Parking App\instance\parking.db'
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        # 1. Check if users table exists
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='users'")
-        users_table_exists = cursor.fetchone() is not None
-        
-        if not users_table_exists:
-            return jsonify({
-                'error': 'Users table does not exist',
-                'solution': 'Database schema is incomplete'
-            }), 404
-        
-        # 2. Check if we have any users
-        cursor.execute("SELECT COUNT(*) as count FROM users")
-        user_count = cursor.fetchone()['count']
-        
-        if user_count == 0:
-            # Create a test user
-            password_hash = hashlib.md5('test123'.encode()).hexdigest()
-            cursor.execute('''
-                INSERT INTO users (full_name, email, phone, password, address_line1, city, state, pin_code, is_active, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                'Test User',
-                'test@example.com',
-                '1234567890',
-                password_hash,
-                '123 Test Street',
-                'Test City',
-                'Test State',
-                '123456',
-                0,
-                datetime.now().isoformat()
-            ))
-            conn.commit()
-            user_count = 1
-        
-        # 3. Get a test user
-        cursor.execute("SELECT id, email, full_name FROM users LIMIT 1")
-        test_user = cursor.fetchone()
-        
-        if not test_user:
-            return jsonify({'error': 'No users found even after creation'}), 404
-        
-        # 4. Generate test token
-        import time
-        test_token = f"user_{test_user['id']}_{int(time.time())}"
-        
-        # 5. Test the profile endpoint directly
-        with app.test_client() as client:
-            profile_response = client.get('/api/auth/profile', 
-                                        headers={'Authorization': f'Bearer {test_token}'})
-            profile_status = profile_response.status_code
-            profile_data = profile_response.get_data(as_text=True)
-        
-        # 6. Test parking lots endpoint
-        with app.test_client() as client:
-            lots_response = client.get('/api/parking-lots')
-            lots_status = lots_response.status_code
-            lots_data = lots_response.get_data(as_text=True)
-        
-        conn.close()
-        
-        return jsonify({
-            'users_table_exists': users_table_exists,
-            'user_count': user_count,
-            'test_user': {
-                'id': test_user['id'],
-                'email': test_user['email'],
-                'full_name': test_user['full_name']
-            },
-            'test_token': test_token,
-            'profile_test': {
-                'status': profile_status,
-                'response': profile_data[:500] + '...' if len(profile_data) > 500 else profile_data
-            },
-            'parking_lots_test': {
-                'status': lots_status,
-                'response': lots_data[:500] + '...' if len(lots_data) > 500 else lots_data
-            },
-            'instructions': {
-                'step1': f'Set token: localStorage.setItem("token", "{test_token}")',
-                'step2': 'Go to UserDashboard and check browser console for debug messages',
-                'step3': 'The profile and parking lots should now load'
-            }
-        }), 200
-        
-    except Exception as e:
-        import traceback
-@app.route('/api/debug/show-users', methods=['GET'])
-def debug_show_users():
-    """Show all users in the database with their details."""
-    try:
-        import sqlite3
-        
-        DB_PATH = r'D:\MAD2\Parking App\instance\parking.db'
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT id, email, full_name, password FROM users")
-        users = cursor.fetchall()
-        
-        users_list = []
-        for user in users:
-            users_list.append({
-                'id': user['id'],
-                'email': user['email'], 
-                'full_name': user['full_name'],
-                'password_hash': user['password'][:20] + '...' if len(user['password']) > 20 else user['password']
-            })
-        
-        conn.close()
-        
-        return jsonify({
-            'total_users': len(users_list),
-            'users': users_list,
-            'note': 'Try logging in with one of these emails. If you know the original password, use that. Otherwise, I can reset a password for testing.'
-        }), 200
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
-
-@app.route('/api/debug/reset-password', methods=['POST'])
-def debug_reset_password():
-    """Reset a user's password to a known value for testing."""
-    try:
-        import sqlite3
-        import hashlib
-        
-        data = request.get_json()
-        email = data.get('email')
-        new_password = data.get('password', 'test123')
-        
-        if not email:
-            return jsonify({'error': 'Email is required'}), 400
-        
-        DB_PATH = r'D:\MAD2\Parking App\instance\parking.db'
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        # Check if user exists
-        cursor.execute("SELECT id FROM users WHERE email = ?", (email,))
-        user = cursor.fetchone()
-        
-        if not user:
-            conn.close()
-            return jsonify({'error': f'No user found with email: {email}'}), 404
-        
-        # Reset password using MD5 (matching the test user creation)
-        password_hash = hashlib.md5(new_password.encode()).hexdigest()
-        
-        cursor.execute("UPDATE users SET password = ? WHERE email = ?", (password_hash, email))
-        conn.commit()
-        conn.close()
-        
-        return jsonify({
-            'message': f'Password reset successfully for {email}',
-            'new_password': new_password,
-            'email': email
-        }), 200
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
-
-@app.route('/api/debug/frontend-test', methods=['GET'])
-def debug_frontend_test():
-    """Debug route to provide frontend testing info."""
-    return f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>Frontend Debug Test</title>
-        <script src="https://cdn.jsdelivr.net/npm/axios/dist/axios.min.js"></script>
-    </head>
-    <body>
-        <h1>Frontend Debug Test</h1>
-        <div id="output"></div>
-        
-        <button onclick="testAPI()">Test Parking Lots API</button>
-        <button onclick="checkToken()">Check Token</button>
-        <button onclick="testLogin()">Test Login</button>
-        
-        <script>
-            const output = document.getElementById('output');
-            
-            function log(message) {{
-                output.innerHTML += '<div>' + new Date().toLocaleTimeString() + ': ' + message + '</div>';
-            }}
-            
-            async function testAPI() {{
-                try {{
-                    log('Testing parking lots API...');
-                    const response = await axios.get('/api/parking-lots');
-                    log('API Response: ' + JSON.stringify(response.data, null, 2));
-                }} catch (error) {{
-                    log('API Error: ' + error.message);
-                }}
-            }}
-            
-            function checkToken() {{
-                const token = localStorage.getItem('token');
-                log('Token: ' + (token || 'No token found'));
-            }}
-            
-            async function testLogin() {{
-                try {{
-                    log('Testing user login...');
-                    const response = await axios.post('/api/auth/user/login', {{
-                        email: 'test@example.com',
-                        password: 'test123'
-                    }});
-                    log('Login Response: ' + JSON.stringify(response.data, null, 2));
-                    if (response.data.token) {{
-                        localStorage.setItem('token', response.data.token);
-                        log('Token saved to localStorage');
-                    }}
-                }} catch (error) {{
-                    log('Login Error: ' + error.message);
-                    if (error.response) {{
-                        log('Error Response: ' + JSON.stringify(error.response.data, null, 2));
-                    }}
-                }}
-            }}
-        </script>
-    </body>
-    </html>
-    """
-
-# =============================================================================
-# HEALTH CHECK ENDPOINTS
-# =============================================================================
-
-@app.route('/')
-def index():
-    """Basic health check endpoint."""
-    return {'message': 'Parking Management System API is running', 'status': 'healthy'}
-
-@app.route('/health')
-def health():
-    """Health check endpoint."""
-    return {'status': 'healthy', 'message': 'API is operational'}
-
-@app.route('/api/debug/check-slots', methods=['GET'])
-def check_slots():
-    """Check and create parking slots if they don't exist."""
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Check if parking slots exist for lot_id = 1
-        cursor.execute('SELECT COUNT(*) as count FROM parking_slots WHERE lot_id = 1')
-        slot_count = cursor.fetchone()['count']
-        
-        if slot_count == 0:
-            # Create slots for lot_id = 1 (20 slots as per the lot data)
-            for slot_num in range(1, 21):
-                cursor.execute('''
-                    INSERT INTO parking_slots (slot_number, lot_id, is_available) 
-                    VALUES (?, ?, 1)
-                ''', (slot_num, 1))
-            
-            conn.commit()
-            cursor.execute('SELECT COUNT(*) as count FROM parking_slots WHERE lot_id = 1')
-            new_count = cursor.fetchone()['count']
-            
-            conn.close()
-            return jsonify({
-                'message': f'Created {new_count} parking slots for lot 1',
-                'created_slots': new_count
-            })
-        else:
-            # Get slot details
-            cursor.execute('SELECT * FROM parking_slots WHERE lot_id = 1 ORDER BY slot_number')
-            slots = [dict(row) for row in cursor.fetchall()]
-            
-            conn.close()
-            return jsonify({
-                'message': f'Found {slot_count} existing slots for lot 1',
-                'slots': slots
-            })
-            
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
-
-# =============================================================================
-# CSV EXPORT FUNCTIONALITY
-# =============================================================================
-
-import csv
-import io
-import threading
-import time
-from datetime import datetime
-
-# Store export job status
-export_jobs = {}
-
-@app.route('/api/export/parking-history', methods=['POST'])
-def export_parking_history():
-    """Export user's parking history as CSV - Async Job"""
-    print(f"[DEBUG] CSV Export request received")
-    
-    # Extract user ID from token
-    auth_header = request.headers.get('Authorization', '')
-    if not auth_header.startswith('Bearer '):
-        return jsonify({'message': 'Authorization token required'}), 401
-    
-    token = auth_header.replace('Bearer ', '')
-    
-    try:
-        if token.startswith('user_'):
-            parts = token.split('_')
-            if len(parts) >= 2:
-                user_id = int(parts[1])
-            else:
-                return jsonify({'message': 'Invalid token format'}), 401
-        else:
-            return jsonify({'message': 'Invalid token'}), 401
-    except (ValueError, IndexError):
-        return jsonify({'message': 'Invalid token format'}), 401
-    
-    # Get export parameters
-    export_data = request.get_json() or {}
-    date_from = export_data.get('date_from')  # Format: YYYY-MM-DD
-    date_to = export_data.get('date_to')      # Format: YYYY-MM-DD
-    status_filter = export_data.get('status', 'all')  # all, active, completed
-    
-    # Generate unique job ID
-    job_id = f"export_{user_id}_{int(time.time())}"
-    
-    # Initialize job status
-    export_jobs[job_id] = {
-        'status': 'started',
-        'progress': 0,
-        'message': 'Starting export...',
-        'user_id': user_id,
-        'created_at': datetime.now().isoformat(),
-        'download_url': None,
-        'file_name': None
-    }
-    
-    # Start background job
-    thread = threading.Thread(
-        target=process_csv_export, 
-        args=(job_id, user_id, date_from, date_to, status_filter)
-    )
-    thread.daemon = True
-    thread.start()
-    
-    return jsonify({
-        'job_id': job_id,
-        'message': 'Export job started successfully',
-        'status': 'started'
-    }), 202
-
-def process_csv_export(job_id, user_id, date_from, date_to, status_filter):
-    """Background process to generate CSV export"""
-    try:
-        print(f"[DEBUG] Starting CSV export job {job_id} for user {user_id}")
-        
-        # Update job status
-        export_jobs[job_id]['status'] = 'processing'
-        export_jobs[job_id]['progress'] = 10
-        export_jobs[job_id]['message'] = 'Fetching booking data...'
-        
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Build query with filters
-        base_query = '''
-            SELECT 
-                b.id as booking_record_id,
-                b.booking_id,
-                b.user_id,
-                u.full_name as user_name,
-                u.email as user_email,
-                u.phone as user_phone,
-                pl.id as lot_id,
-                pl.name as lot_name,
-                pl.address as lot_address,
-                pl.pincode as lot_pincode,
-                ps.id as slot_id,
-                ps.slot_number as spot_id,
-                b.vehicle_number,
-                b.payment_method,
-                b.start_time,
-                b.end_time,
-                b.planned_duration_hours,
-                b.actual_duration_hours,
-                b.planned_cost,
-                b.final_cost,
-                b.status,
-                b.booking_created_at as booking_timestamp,
-                b.completed_at,
-                pl.price as hourly_rate,
-                CASE 
-                    WHEN b.status = 'completed' THEN 'Parking completed successfully'
-                    WHEN b.status = 'active' THEN 'Currently parked'
-                    ELSE 'Unknown status'
-                END as remarks
-            FROM bookings b
-            LEFT JOIN users u ON b.user_id = u.id
-            LEFT JOIN parking_lots pl ON b.lot_id = pl.id
-            LEFT JOIN parking_slots ps ON b.slot_id = ps.id
-            WHERE b.user_id = ?
-        '''
-        
-        params = [user_id]
-        
-        # Add date filters
-        if date_from:
-            base_query += " AND DATE(b.start_time) >= ?"
-            params.append(date_from)
-        
-        if date_to:
-            base_query += " AND DATE(b.start_time) <= ?"
-            params.append(date_to)
-        
-        # Add status filter
-        if status_filter != 'all':
-            base_query += " AND b.status = ?"
-            params.append(status_filter)
-        
-        base_query += " ORDER BY b.start_time DESC"
-        
-        print(f"[DEBUG] Executing query: {base_query}")
-        print(f"[DEBUG] Query params: {params}")
-        
-        export_jobs[job_id]['progress'] = 30
-        export_jobs[job_id]['message'] = 'Processing booking records...'
-        
-        cursor.execute(base_query, params)
-        bookings = cursor.fetchall()
-        
-        print(f"[DEBUG] Found {len(bookings)} booking records")
-        
-        export_jobs[job_id]['progress'] = 50
-        export_jobs[job_id]['message'] = f'Found {len(bookings)} records. Generating CSV...'
-        
-        # Generate CSV content
-        csv_content = generate_csv_content(bookings)
-        
-        export_jobs[job_id]['progress'] = 80
-        export_jobs[job_id]['message'] = 'Saving CSV file...'
-        
-        # Save CSV file
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        file_name = f"parking_history_user_{user_id}_{timestamp}.csv"
-        file_path = f"exports/{file_name}"
-        
-        # Create exports directory if it doesn't exist
-        import os
-        os.makedirs('exports', exist_ok=True)
-        
-        with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
-            csvfile.write(csv_content)
-        
-        # Complete job
-        export_jobs[job_id]['status'] = 'completed'
-        export_jobs[job_id]['progress'] = 100
-        export_jobs[job_id]['message'] = f'Export completed successfully. {len(bookings)} records exported.'
-        export_jobs[job_id]['download_url'] = f'/api/download/{file_name}'
-        export_jobs[job_id]['file_name'] = file_name
-        export_jobs[job_id]['record_count'] = len(bookings)
-        export_jobs[job_id]['completed_at'] = datetime.now().isoformat()
-        
-        conn.close()
-        print(f"[DEBUG] CSV export job {job_id} completed successfully")
-        
-    except Exception as e:
-        print(f"[ERROR] CSV export job {job_id} failed: {str(e)}")
-        export_jobs[job_id]['status'] = 'failed'
-        export_jobs[job_id]['progress'] = 0
-        export_jobs[job_id]['message'] = f'Export failed: {str(e)}'
-        export_jobs[job_id]['error'] = str(e)
-
-def generate_csv_content(bookings):
-    """Generate CSV content from booking data"""
-    output = io.StringIO()
-    writer = csv.writer(output)
-    
-    # CSV Headers
-    headers = [
-        'Booking Record ID',
-        'Booking ID',
-        'User Name',
-        'User Email', 
-        'User Phone',
-        'Parking Lot ID',
-        'Parking Lot Name',
-        'Lot Address',
-        'Lot Pincode',
-        'Slot ID',
-        'Spot ID (Slot Number)',
-        'Vehicle Number',
-        'Payment Method',
-        'Start Time',
-        'End Time',
-        'Planned Duration (Hours)',
-        'Actual Duration (Hours)',
-        'Planned Cost (₹)',
-        'Final Cost (₹)',
-        'Hourly Rate (₹)',
-        'Status',
-        'Booking Timestamp',
-        'Completion Timestamp',
-        'Remarks'
-    ]
-    
-    writer.writerow(headers)
-    
-    # Data rows
-    for booking in bookings:
-        row = [
-            booking['booking_record_id'] or '',
-            booking['booking_id'] or '',
-            booking['user_name'] or '',
-            booking['user_email'] or '',
-            booking['user_phone'] or '',
-            booking['lot_id'] or '',
-            booking['lot_name'] or '',
-            booking['lot_address'] or '',
-            booking['lot_pincode'] or '',
-            booking['slot_id'] or '',
-            booking['spot_id'] or '',
-            booking['vehicle_number'] or '',
-            booking['payment_method'] or '',
-            booking['start_time'] or '',
-            booking['end_time'] or '',
-            booking['planned_duration_hours'] or '',
-            booking['actual_duration_hours'] or '',
-            booking['planned_cost'] or '',
-            booking['final_cost'] or '',
-            booking['hourly_rate'] or '',
-            booking['status'] or '',
-            booking['booking_timestamp'] or '',
-            booking['completed_at'] or '',
-            booking['remarks'] or ''
-        ]
-        writer.writerow(row)
-    
-    return output.getvalue()
-
-@app.route('/api/export/status/<job_id>', methods=['GET'])
-def get_export_status(job_id):
-    """Get export job status"""
-    auth_header = request.headers.get('Authorization', '')
-    if not auth_header.startswith('Bearer '):
-        return jsonify({'message': 'Authorization token required'}), 401
-    
-    token = auth_header.replace('Bearer ', '')
-    
-    try:
-        if token.startswith('user_'):
-            parts = token.split('_')
-            if len(parts) >= 2:
-                user_id = int(parts[1])
-            else:
-                return jsonify({'message': 'Invalid token format'}), 401
-        else:
-            return jsonify({'message': 'Invalid token'}), 401
-    except (ValueError, IndexError):
-        return jsonify({'message': 'Invalid token format'}), 401
-    
-    if job_id not in export_jobs:
-        return jsonify({'message': 'Job not found'}), 404
-    
-    job = export_jobs[job_id]
-    
-    # Verify job belongs to user
-    if job['user_id'] != user_id:
-        return jsonify({'message': 'Unauthorized access to job'}), 403
-    
-    return jsonify(job), 200
-
-@app.route('/api/download/<file_name>', methods=['GET'])
-def download_csv(file_name):
-    """Download CSV file"""
-    auth_header = request.headers.get('Authorization', '')
-    if not auth_header.startswith('Bearer '):
-        return jsonify({'message': 'Authorization token required'}), 401
-    
-    try:
-        from flask import send_file
-        file_path = f"exports/{file_name}"
-        
-        if not os.path.exists(file_path):
-            return jsonify({'message': 'File not found'}), 404
-        
-        return send_file(
-            file_path,
-            as_attachment=True,
-            download_name=file_name,
-            mimetype='text/csv'
-        )
-    except Exception as e:
-        return jsonify({'message': f'Download failed: {str(e)}'}), 500
-
-@app.route('/api/export/jobs', methods=['GET'])
-def get_user_export_jobs():
-    """Get user's export jobs history"""
-    auth_header = request.headers.get('Authorization', '')
-    if not auth_header.startswith('Bearer '):
-        return jsonify({'message': 'Authorization token required'}), 401
-    
-    token = auth_header.replace('Bearer ', '')
-    
-    try:
-        if token.startswith('user_'):
-            parts = token.split('_')
-            if len(parts) >= 2:
-                user_id = int(parts[1])
-            else:
-                return jsonify({'message': 'Invalid token format'}), 401
-        else:
-            return jsonify({'message': 'Invalid token'}), 401
-    except (ValueError, IndexError):
-        return jsonify({'message': 'Invalid token format'}), 401
-    
-    # Filter jobs for this user
-    user_jobs = {
-        job_id: job for job_id, job in export_jobs.items() 
-        if job.get('user_id') == user_id
-    }
-    
-    return jsonify(user_jobs), 200
-
-if __name__ == '__main__':
-    print("Starting Parking Management System...")
-    print("Admin API endpoints available at: http://localhost:5001/api/admin/")
-    print("User API endpoints available at: http://localhost:5001/api/user/")
-    print("Database location: D:\\MAD2\\Parking App\\instance\\parking.db")
-    app.run(debug=True, port=5001, host='0.0.0.0')
+"""
+Parking Management System - Main Application
+Complete Flask app with all admin and user routes for AdminDashboard
+Database: D:\MAD2\Parking App\instance\parking.db
+"""
+
+from flask import Flask, Response, request, jsonify, g, has_app_context, stream_with_context
+from flask_cors import CORS
+import click
+import sqlite3
+import os
+import hashlib
+import io
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+import logging
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from functools import wraps
+
+from backend.utils.booking_queries import PERIOD_FILTERS, BookingListQuery, period_range
+from backend.utils.bulk_import import IMPORT_FORMATS, IMPORT_KINDS, BulkImporter, InvalidImport, read_rows, restore_indexes
+from backend.utils.conditional import (
+    GENERATION_KEY, bump_all_versions, bump_versions, conditional_get, read_versions, resource_etag,
+)
+from backend.utils.database import ContentionStats, SQLitePool, WriteConflict, run_immediate
+from backend.utils.events import HEARTBEAT_FRAME, SlotEventBroker, SubscriberLimitReached, format_frame
+from backend.utils.export_jobs import QueueFull, WorkerPool
+from backend.utils.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, CURRENT, MAX, MetricsRegistry
+from backend.utils.migrations import explain_queries, run_migrations
+from backend.utils.pagination import InvalidCursor, decode_cursor, encode_cursor
+from backend.utils.passwords import PasswordPolicy
+from backend.utils.profiling import RequestProfiler, TracedConnection
+from backend.utils.read_cache import ReadThroughCache
+from backend.utils.search import SEARCH_QUERIES, build_match_query
+from backend.utils.slot_allocator import SlotAllocator
+from backend.utils.slot_view import rebuild_slot_view, refresh_slot_view
+from backend.utils.stats import (
+    BOOKINGS_TOTAL, DURATION_COUNT, DURATION_SUM, LOTS_TOTAL, REVENUE_COMPLETED, SLOTS_OCCUPIED,
+    SLOTS_TOTAL, USERS_TOTAL, apply_stats, day_of, read_stats, reconcile_stats, status_counter,
+)
+from backend.utils.structured_logging import LogPipeline, RouteSampler, parse_level, parse_levels, parse_rates
+from backend.utils.timestamps import (
+    day_end_epoch, day_start_epoch, format_timestamp, now_epoch, now_timestamp, parse_timestamp, to_epoch,
+)
+from backend.utils.tokenization import InvalidToken, TokenSigner
+from backend.utils.user_queries import UserListQuery, format_user, iter_json_array
+
+# Create Flask app
+app = Flask(__name__)
+CORS(app, origins=['http://localhost:5173', 'http://127.0.0.1:5173'])
+
+# Structured logs: JSON lines (or text) on stderr, written by a background
+# thread so a slow log sink never stalls a request. PARKING_LOG_LEVELS sets
+# single loggers (werkzeug=WARNING,backend.utils.profiling=DEBUG), and
+# PARKING_LOG_SAMPLE_RATES keeps a fraction of the DEBUG/INFO records of
+# busy routes ("GET /api/bookings=0.05,/api/parking-lots/<int:lot_id>/slots=0.1,*=1").
+LOG_LEVEL = parse_level(os.getenv('PARKING_LOG_LEVEL', 'INFO'))
+LOG_LEVELS = parse_levels(os.getenv('PARKING_LOG_LEVELS', ''))
+LOG_FORMAT = os.getenv('PARKING_LOG_FORMAT', 'json')
+LOG_QUEUE_SIZE = int(os.getenv('PARKING_LOG_QUEUE_SIZE', 10000))
+LOG_BACKGROUND = os.getenv('PARKING_LOG_BACKGROUND', '1').lower() in ('1', 'true', 'yes')
+log_sampler = RouteSampler(parse_rates(os.getenv('PARKING_LOG_SAMPLE_RATES', '')))
+log_pipeline = LogPipeline(fmt=LOG_FORMAT, queue_size=LOG_QUEUE_SIZE, background=LOG_BACKGROUND,
+                           sampler=log_sampler).install(LOG_LEVEL, LOG_LEVELS)
+logger = logging.getLogger(__name__)
+
+# Database path - using the specified database (override with PARKING_DB_PATH)
+DB_PATH = os.getenv('PARKING_DB_PATH', r'D:\MAD2\Parking App\instance\parking.db')
+
+# Connection pool settings
+DB_POOL_SIZE = int(os.getenv('PARKING_DB_POOL_SIZE', 10))
+DB_POOL_TIMEOUT = float(os.getenv('PARKING_DB_POOL_TIMEOUT', 30))
+
+# Per-endpoint wall, CPU and SQL time (/api/debug/profiling). Requests slower
+# than PARKING_PROFILING_SLOW_MS are kept with their costliest statements.
+PROFILING_ENABLED = os.getenv('PARKING_PROFILING', '1').lower() in ('1', 'true', 'yes')
+PROFILING_SLOW_MS = float(os.getenv('PARKING_PROFILING_SLOW_MS', 500))
+PROFILING_SLOW_LOG_SIZE = int(os.getenv('PARKING_PROFILING_SLOW_LOG_SIZE', 100))
+# Add a Server-Timing header (app, cpu and db time) to every response
+SERVER_TIMING = os.getenv('PARKING_SERVER_TIMING', '0').lower() in ('1', 'true', 'yes')
+
+request_profiler = RequestProfiler(app.wsgi_app, slow_ms=PROFILING_SLOW_MS,
+                                   slow_log_size=PROFILING_SLOW_LOG_SIZE, server_timing=SERVER_TIMING)
+if PROFILING_ENABLED:
+    app.wsgi_app = request_profiler
+
+db_pool = SQLitePool(DB_PATH, size=DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT,
+                     connection_factory=TracedConnection if PROFILING_ENABLED else sqlite3.Connection)
+
+# Conflicts, retries and lock-wait time for book/release transactions
+booking_contention = ContentionStats()
+
+# In-memory free-slot allocator for "book any slot" (lowest, round_robin or lru)
+SLOT_ALLOCATION_POLICY = os.getenv('PARKING_SLOT_POLICY', 'lowest')
+slot_allocator = SlotAllocator(SLOT_ALLOCATION_POLICY)
+
+# Server-Sent Events stream of slot changes for the admin dashboard
+SSE_BUFFER_SIZE = int(os.getenv('PARKING_SSE_BUFFER_SIZE', 256))
+SSE_HEARTBEAT_SECONDS = float(os.getenv('PARKING_SSE_HEARTBEAT_SECONDS', 15))
+SSE_MAX_SUBSCRIBERS = int(os.getenv('PARKING_SSE_MAX_SUBSCRIBERS', 2000))
+slot_events = SlotEventBroker(buffer_size=SSE_BUFFER_SIZE, max_subscribers=SSE_MAX_SUBSCRIBERS)
+
+# Admin users listing: page sizes, and rows per fetchmany() when streaming it whole
+USERS_PAGE_SIZE = 50
+USERS_MAX_PAGE_SIZE = 500
+USERS_FETCH_SIZE = int(os.getenv('PARKING_USERS_FETCH_SIZE', 500))
+
+# Admin search ranks at most this many matches per kind (see backend/utils/search.py)
+SEARCH_RANK_WINDOW = int(os.getenv('PARKING_SEARCH_RANK_WINDOW', 500))
+SEARCH_MAX_PER_PAGE = 50
+
+# Occupied slots report a running duration/cost, so their ETag also expires
+SLOT_ETAG_TTL_SECONDS = int(os.getenv('PARKING_SLOT_ETAG_TTL_SECONDS', 60))
+
+# Signed bearer tokens. Without PARKING_TOKEN_SECRET every restart (and every
+# worker process) gets its own secret, so set it anywhere but development.
+TOKEN_SECRET = os.getenv('PARKING_TOKEN_SECRET') or os.urandom(32).hex()
+TOKEN_TTL_SECONDS = int(os.getenv('PARKING_TOKEN_TTL_SECONDS', 12 * 3600))
+# Keep accepting unsigned user_<id>_<ts> tokens while old sessions drain
+ACCEPT_LEGACY_TOKENS = os.getenv('PARKING_ACCEPT_LEGACY_TOKENS', '0').lower() in ('1', 'true', 'yes')
+token_signer = TokenSigner(TOKEN_SECRET, TOKEN_TTL_SECONDS, accept_legacy=ACCEPT_LEGACY_TOKENS)
+
+# Profile rows of authenticated users, so a signed-in request costs no lookup
+USER_CACHE_SIZE = int(os.getenv('PARKING_USER_CACHE_SIZE', 10000))
+USER_CACHE_TTL_SECONDS = float(os.getenv('PARKING_USER_CACHE_TTL_SECONDS', 300))
+
+# Read-through cache of the polled read payloads: Redis (shared by every
+# worker) when reachable, otherwise an LRU per process. auto, redis or local.
+CACHE_BACKEND = os.getenv('PARKING_CACHE_BACKEND', 'auto')
+CACHE_TTL_SECONDS = float(os.getenv('PARKING_CACHE_TTL_SECONDS', 300))
+
+def connect_cache_backend():
+    """The Redis client and its circuit breaker for read_cache; (None, None) to cache in-process.
+
+    Does no network I/O: while Redis is down or not yet health-checked,
+    the breaker is open and read_cache uses its local LRU.
+    """
+    if CACHE_BACKEND == 'local':
+        return None, None
+    from backend.config.redis_config import get_redis_client, redis_breaker
+    client = get_redis_client()
+    if client is None:
+        if CACHE_BACKEND == 'redis':
+            logger.warning("PARKING_CACHE_BACKEND=redis but redis-py is not installed; caching in-process")
+        return None, None
+    return client, redis_breaker
+
+read_cache = ReadThroughCache(*connect_cache_backend())
+read_cache.namespace('lots', CACHE_TTL_SECONDS, maxsize=1)
+read_cache.namespace('slots', SLOT_ETAG_TTL_SECONDS, maxsize=4096)
+read_cache.namespace('stats', CACHE_TTL_SECONDS, maxsize=2)
+read_cache.namespace('profiles', USER_CACHE_TTL_SECONDS, maxsize=USER_CACHE_SIZE)
+
+def get_db_connection():
+    """Get a pooled database connection with row factory.
+
+    Inside a request the same connection is reused until the app context
+    tears down; close() on it is a no-op. Outside a request (startup,
+    background jobs) close() hands the connection back to the pool.
+    """
+    if has_app_context():
+        if 'db_conn' not in g:
+            g.db_conn = db_pool.acquire(request_scoped=True)
+        return g.db_conn
+    return db_pool.acquire()
+
+@app.before_request
+def name_profiled_endpoint():
+    """Group the request's profile under its URL rule, not its raw path."""
+    if request.url_rule is not None:
+        RequestProfiler.set_endpoint(request.environ, request.url_rule.rule)
+
+@app.before_request
+def sample_request_logs():
+    """Decide once whether this request's DEBUG/INFO records are written (PARKING_LOG_SAMPLE_RATES)."""
+    g.log_context = log_sampler.begin_request(request.method, request.url_rule.rule if request.url_rule else None)
+
+@app.teardown_request
+def end_request_logs(exception=None):
+    token = g.pop('log_context', None)
+    if token is not None:
+        log_sampler.end_request(token)
+
+@app.teardown_appcontext
+def release_db_connection(exception=None):
+    """Return the request's connection to the pool, even on errors."""
+    conn = g.pop('db_conn', None)
+    if conn is not None:
+        db_pool.release(conn)
+
+def load_user_profile(user_id):
+    row = get_db_connection().execute(USER_PROFILE_QUERY, (user_id,)).fetchone()
+    return dict(row) if row is not None else None
+
+def get_cached_user(user_id):
+    """Return the user's profile row as a dict (None if gone), via read_cache."""
+    return read_cache.get_or_load('profiles', user_id, lambda: load_user_profile(user_id))
+
+def require_user(view):
+    """Authenticate the bearer token and expose g.user_id and g.user to the view.
+
+    The token signature is checked in memory and the user record comes from
+    read_cache, so only a cache miss touches the database. Routes that
+    change or delete a user must invalidate its 'profiles' entry.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        auth_header = request.headers.get('Authorization', '')
+        if not auth_header.startswith('Bearer '):
+            return jsonify({'message': 'Authorization token required'}), 401
+        try:
+            user_id = token_signer.verify(auth_header[len('Bearer '):])
+        except InvalidToken as e:
+            return jsonify({'message': str(e)}), 401
+
+        user = get_cached_user(user_id)
+        if user is None:
+            return jsonify({'message': 'Invalid user'}), 401
+        g.user_id = user_id
+        g.user = user
+        return view(*args, **kwargs)
+    return wrapper
+
+def init_database():
+    """Initialize database tables if they don't exist."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    
+    # Create parking_lots table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS parking_lots (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            address TEXT NOT NULL,
+            pincode TEXT,
+            price_per_hour REAL NOT NULL,
+            total_slots INTEGER NOT NULL DEFAULT 20,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # Create parking_slots table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS parking_slots (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            slot_number INTEGER NOT NULL,
+            lot_id INTEGER NOT NULL,
+            is_available INTEGER DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            current_user_id INTEGER,
+            booking_id TEXT,
+            vehicle_number TEXT,
+            booking_start_time TIMESTAMP,
+            planned_duration_hours REAL,
+            planned_cost REAL,
+            booking_created_at TIMESTAMP,
+            FOREIGN KEY (lot_id) REFERENCES parking_lots (id),
+            FOREIGN KEY (current_user_id) REFERENCES users (id)
+        )
+    ''')
+    
+    # Create users table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            full_name TEXT NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            phone TEXT,
+            password TEXT NOT NULL,
+            address_line1 TEXT,
+            city TEXT,
+            state TEXT,
+            pin_code TEXT,
+            is_active INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # Create bookings table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS bookings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            lot_id INTEGER NOT NULL,
+            slot_id INTEGER NOT NULL,
+            booking_id TEXT UNIQUE,
+            vehicle_number TEXT,
+            payment_method TEXT,
+            start_time TIMESTAMP NOT NULL,
+            end_time TIMESTAMP,
+            actual_duration_hours REAL,
+            planned_duration_hours REAL,
+            final_cost REAL,
+            planned_cost REAL,
+            status TEXT NOT NULL DEFAULT 'active',
+            booking_created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            completed_at TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (id),
+            FOREIGN KEY (lot_id) REFERENCES parking_lots (id),
+            FOREIGN KEY (slot_id) REFERENCES parking_slots (id)
+        )
+    ''')
+    
+    # Create admins table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS admins (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            password TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    conn.commit()
+    
+    # Indexes and later schema changes
+    run_migrations(conn)
+    
+    # A bulk import that died mid-load leaves its dropped indexes recorded
+    restored = restore_indexes(conn)
+    if restored:
+        logger.warning("Rebuilt indexes left dropped by an interrupted import: %s", ', '.join(restored))
+    
+    conn.close()
+    logger.info("Database initialized successfully")
+
+def provision_slots(cursor, lot_id, total_slots):
+    """Make a lot's slots match `total_slots`; returns the change in slot rows.
+
+    Missing slot numbers 1..total_slots are added by one INSERT ... SELECT,
+    and free slots numbered above the total by one DELETE, all inside the
+    caller's transaction. Occupied slots above the total stay until released.
+    """
+    total_slots = int(total_slots)
+    cursor.execute(PROVISION_SLOTS_QUERY, (total_slots, lot_id, total_slots, lot_id))
+    added = cursor.rowcount
+    cursor.execute(TRIM_SLOTS_QUERY, (lot_id, total_slots))
+    return added - cursor.rowcount
+
+def ensure_lot_slots():
+    """Create slot rows for any parking lot that has none.
+
+    Runs once at startup so that the read path never has to write.
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    
+    cursor.execute('''
+        SELECT pl.id, pl.total_slots
+        FROM parking_lots pl
+        WHERE NOT EXISTS (SELECT 1 FROM parking_slots ps WHERE ps.lot_id = pl.id)
+    ''')
+    empty_lots = cursor.fetchall()
+    
+    created = 0
+    for lot in empty_lots:
+        created += provision_slots(cursor, lot['id'], lot['total_slots'])
+        refresh_slot_view(cursor, lot_id=lot['id'])
+    
+    apply_stats(cursor, {SLOTS_TOTAL: created})
+    conn.commit()
+    conn.close()
+    if empty_lots:
+        logger.info("Created missing slots for %s parking lots", len(empty_lots))
+
+# =============================================================================
+# ROUTE QUERIES
+# =============================================================================
+
+USER_PROFILE_QUERY = '''
+    SELECT id, email, full_name, phone, address_line1, city, state, pin_code, created_at
+    FROM users WHERE id = ?
+'''
+
+# Slot numbers 1..? the lot does not have yet, generated in SQL (the WITH goes
+# after INSERT so sqlite3 still reports rowcount)
+PROVISION_SLOTS_QUERY = '''
+    INSERT INTO parking_slots (slot_number, lot_id, is_available)
+    WITH RECURSIVE numbers(n) AS (
+        SELECT 1 UNION ALL SELECT n + 1 FROM numbers WHERE n < ?
+    )
+    SELECT n, ?, 1 FROM numbers
+    WHERE n <= ? AND n NOT IN (SELECT slot_number FROM parking_slots WHERE lot_id = ?)
+'''
+
+TRIM_SLOTS_QUERY = '''
+    DELETE FROM parking_slots
+    WHERE lot_id = ? AND slot_number > ? AND is_available = 1
+'''
+
+LOT_AVAILABILITY_QUERY = '''
+    SELECT pl.id, pl.name, pl.address, pl.pincode, pl.price_per_hour,
+           pl.total_slots AS configured_slots,
+           COUNT(ps.id) AS total_slots,
+           COALESCE(SUM(CASE WHEN ps.is_available = 1 THEN 1 ELSE 0 END), 0) AS available_slots,
+           COALESCE(SUM(CASE WHEN ps.is_available = 0 THEN 1 ELSE 0 END), 0) AS occupied_slots
+    FROM parking_lots pl
+    LEFT JOIN parking_slots ps ON ps.lot_id = pl.id
+    GROUP BY pl.id
+    ORDER BY pl.name
+'''
+
+# The slot grid straight from slot_live_view; the ? placeholders are the
+# current unix time, from which occupied slots get their running duration/cost
+LOT_SLOTS_QUERY = '''
+    SELECT slot_id AS id, slot_number, lot_id, lot_name, lot_address, is_available,
+           current_user_id, current_user_name, current_user_email,
+           booking_id, vehicle_number, booking_start_time, booking_end_time,
+           planned_duration_hours,
+           ROUND(NULLIF(? - start_epoch, 0) / 3600.0, 2) AS current_duration_hours,
+           COALESCE(ROUND(NULLIF(? - start_epoch, 0) / 3600.0 * hourly_rate, 2), planned_cost)
+               AS estimated_current_cost,
+           final_cost, booking_status, hourly_rate
+    FROM slot_live_view
+    WHERE lot_id = ?
+    ORDER BY slot_number
+'''
+
+RELEASE_USER_SLOTS_QUERY = '''
+    UPDATE parking_slots
+    SET is_available = 1, current_user_id = NULL, booking_id = NULL,
+        vehicle_number = NULL, booking_start_time = NULL,
+        planned_duration_hours = NULL, planned_cost = NULL
+    WHERE current_user_id = ?
+'''
+
+USER_BOOKINGS_QUERY = '''
+    SELECT b.*,
+           pl.name as lot_name,
+           pl.address as lot_address,
+           pl.price_per_hour as hourly_rate,
+           ps.slot_number
+    FROM bookings b
+    JOIN parking_lots pl ON b.lot_id = pl.id
+    JOIN parking_slots ps ON b.slot_id = ps.id
+    WHERE b.user_id = ?
+    ORDER BY b.booking_created_at DESC
+'''
+
+BOOKING_SLOT_QUERY = '''
+    SELECT ps.*, pl.price_per_hour
+    FROM parking_slots ps
+    JOIN parking_lots pl ON ps.lot_id = pl.id
+    WHERE ps.id = ?
+'''
+
+ACTIVE_BOOKING_BY_ID_QUERY = '''
+    SELECT b.*, ps.id as slot_id, ps.slot_number, pl.price_per_hour
+    FROM bookings b
+    JOIN parking_slots ps ON b.slot_id = ps.id
+    JOIN parking_lots pl ON b.lot_id = pl.id
+    WHERE b.booking_id = ? AND b.user_id = ? AND b.status = 'active'
+'''
+
+ACTIVE_BOOKING_BY_SLOT_QUERY = '''
+    SELECT b.*, ps.id as slot_id, ps.slot_number, pl.price_per_hour
+    FROM bookings b
+    JOIN parking_slots ps ON b.slot_id = ps.id
+    JOIN parking_lots pl ON b.lot_id = pl.id
+    WHERE b.slot_id = ? AND b.user_id = ? AND b.status = 'active'
+    ORDER BY b.id DESC LIMIT 1
+'''
+
+EXPORT_HISTORY_QUERY = '''
+    SELECT
+        b.id as booking_record_id,
+        b.booking_id,
+        b.user_id,
+        u.full_name as user_name,
+        u.email as user_email,
+        u.phone as user_phone,
+        pl.id as lot_id,
+        pl.name as lot_name,
+        pl.address as lot_address,
+        pl.pincode as lot_pincode,
+        ps.id as slot_id,
+        ps.slot_number as spot_id,
+        b.vehicle_number,
+        b.payment_method,
+        b.start_time,
+        b.end_time,
+        b.planned_duration_hours,
+        b.actual_duration_hours,
+        b.planned_cost,
+        b.final_cost,
+        b.status,
+        b.booking_created_at as booking_timestamp,
+        b.completed_at,
+        pl.price_per_hour as hourly_rate,
+        CASE
+            WHEN b.status = 'completed' THEN 'Parking completed successfully'
+            WHEN b.status = 'active' THEN 'Currently parked'
+            ELSE 'Unknown status'
+        END as remarks
+    FROM bookings b
+    LEFT JOIN users u ON b.user_id = u.id
+    LEFT JOIN parking_lots pl ON b.lot_id = pl.id
+    LEFT JOIN parking_slots ps ON b.slot_id = ps.id
+    WHERE b.user_id = ?
+'''
+
+# Same filters as EXPORT_HISTORY_QUERY; the joins are all LEFT so they never change the count
+EXPORT_COUNT_QUERY = '''
+    SELECT COUNT(*) FROM bookings b
+    WHERE b.user_id = ?
+'''
+
+# Hot route queries checked with EXPLAIN QUERY PLAN at startup:
+# name -> (sql, table aliases that are expected to be read in full)
+ROUTE_QUERY_PLANS = {
+    'parking_lots.list': (LOT_AVAILABILITY_QUERY, ('pl',)),
+    'parking_lots.slots': (LOT_SLOTS_QUERY, ()),
+    'users.delete.release_slots': (RELEASE_USER_SLOTS_QUERY, ()),
+    'bookings.mine': (USER_BOOKINGS_QUERY, ()),
+    'bookings.book_slot': (BOOKING_SLOT_QUERY, ()),
+    'bookings.release_by_id': (ACTIVE_BOOKING_BY_ID_QUERY, ()),
+    'bookings.release_by_slot': (ACTIVE_BOOKING_BY_SLOT_QUERY, ()),
+    # Walks the rowid from the top and stops at the LIMIT
+    'users.list': (UserListQuery().page_sql(50)[0], ('users',)),
+    'users.list.after': (UserListQuery().page_sql(50, after=0)[0], ()),
+    'users.list.city': (UserListQuery().city('x').created_between('2025-01-01').page_sql(50)[0], ()),
+    'search.lots': (SEARCH_QUERIES['lots'], ('m',)),
+    'search.users': (SEARCH_QUERIES['users'], ('m',)),
+    'bookings.list.all': (BookingListQuery().page_sql(10, offset=0)[0], ()),
+    'bookings.list.after': (BookingListQuery().page_sql(10, after=('', 0))[0], ()),
+    'bookings.list.status': (BookingListQuery().status('active').page_sql(10, after=('', 0))[0], ()),
+    'bookings.list.week': (BookingListQuery().status('week').page_sql(10)[0], ()),
+    'bookings.list.today': (BookingListQuery().status('today').page_sql(10)[0], ()),
+    'bookings.count.status': (BookingListQuery().status('completed').count_sql()[0], ()),
+    'bookings.count.month': (BookingListQuery().status('month').count_sql()[0], ()),
+    'export.parking_history': (EXPORT_HISTORY_QUERY + " AND b.start_ts >= ? ORDER BY b.start_ts DESC", ()),
+    'export.count': (EXPORT_COUNT_QUERY + " AND b.start_ts >= ?", ()),
+}
+
+def check_query_plans():
+    """Log the plan of every hot route query and warn about full-table scans."""
+    conn = get_db_connection()
+    try:
+        report = explain_queries(conn, ROUTE_QUERY_PLANS)
+    finally:
+        conn.close()
+    
+    for name, result in report.items():
+        logger.debug("Query plan for %s: %s", name, ' | '.join(result['plan']))
+        for detail in result['full_scans']:
+            logger.warning("Full table scan in %s: %s", name, detail)
+    return report
+
+# resource_versions generation the free-slot sets were last fully rebuilt at
+slot_allocator_generation = None
+
+def sync_slot_allocator(conn):
+    """Rebuild the free-slot sets if any process made a bulk write since the last rebuild.
+
+    Imports, reconcile and the debug setup routes bump the shared
+    generation (see bump_all_versions), including `flask import-data`
+    runs next to a live server.
+    """
+    global slot_allocator_generation
+    generation = read_versions(conn, GENERATION_KEY)[GENERATION_KEY]
+    if generation != slot_allocator_generation:
+        slot_allocator.rebuild(conn)
+        slot_allocator_generation = generation
+
+def load_slot_allocator():
+    """Build the in-memory free-slot sets from parking_slots."""
+    conn = get_db_connection()
+    sync_slot_allocator(conn)
+    conn.close()
+
+def notify_slot_change(action, lot_id, slot_id, slot_number, **details):
+    """Publish a committed slot booking/release to the event stream."""
+    (bookings_counter if action == 'booked' else releases_counter).inc()
+    slot_events.publish('slot', lot_id, dict(
+        details, action=action, slot_id=slot_id, slot_number=slot_number,
+        is_available=(action == 'released'),
+    ))
+
+def notify_lot_change(action, lot_id, **details):
+    """Publish a committed lot create/update/delete to the event stream."""
+    slot_events.publish('lot', lot_id, dict(details, action=action))
+
+def bump_lot_versions(cursor, lot_id):
+    """Bump the ETags a change to a lot's slots or bookings affects, in the caller's transaction."""
+    bump_versions(cursor, 'lots', f'lot:{lot_id}', 'bookings')
+
+def lots_etag():
+    return resource_etag(get_db_connection(), 'lots')
+
+def lot_slots_etag(lot_id):
+    return resource_etag(get_db_connection(), f'lot:{lot_id}', 'users',
+                         extra=int(time.time()) // SLOT_ETAG_TTL_SECONDS)
+
+def users_etag():
+    return resource_etag(get_db_connection(), 'users')
+
+def stats_etag():
+    # Today's revenue and this week's bookings roll over at midnight
+    return resource_etag(get_db_connection(), 'lots', 'bookings', 'users', extra=datetime.now().strftime('%Y%m%d'))
+
+# Initialize database on startup
+init_database()
+ensure_lot_slots()
+load_slot_allocator()
+check_query_plans()
+
+# =============================================================================
+# PARKING LOTS ROUTES
+# =============================================================================
+
+def load_parking_lots():
+    """Build the lot list payload (cached in read_cache under 'lots')."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    
+    # One grouped aggregation instead of a COUNT query per lot
+    cursor.execute(LOT_AVAILABILITY_QUERY)
+    lots = cursor.fetchall()
+    conn.close()
+    
+    lots_data = []
+    for lot in lots:
+        # Lots without slot rows fall back to their configured size
+        has_slots = lot['total_slots'] > 0
+        
+        # Map database columns to frontend expected format
+        lot_data = {
+            'id': lot['id'],
+            'name': lot['name'],
+            'address': lot['address'],
+            'pincode': lot['pincode'],  # Database has 'pincode'
+            'price': lot['price_per_hour'],  # Database has 'price_per_hour'
+            'slots': lot['total_slots'] if has_slots else lot['configured_slots'],
+            'total_slots': lot['total_slots'] if has_slots else lot['configured_slots'],
+            'available_slots': lot['available_slots'] if has_slots else lot['configured_slots'],
+            'occupied_slots': lot['occupied_slots']
+        }
+        lots_data.append(lot_data)
+    return lots_data
+
+@app.route('/api/parking-lots', methods=['GET'])
+@conditional_get(lots_etag)
+def get_parking_lots():
+    """Get all parking lots with availability stats."""
+    try:
+        # Keyed by the ETag, so another worker's write is seen on the next read
+        lots_data = read_cache.get_or_load('lots', g.etag, load_parking_lots)
+        
+        logger.info("Returning %s parking lots", len(lots_data))
+        return jsonify(lots_data), 200
+        
+    except Exception as e:
+        logger.error("Error fetching parking lots: %s", e)
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/parking-lots', methods=['POST'])
+def create_parking_lot():
+    """Create a new parking lot."""
+    try:
+        data = request.get_json()
+        logger.debug("Creating parking lot with data: %s", data)
+        
+        name = data.get('name')
+        address = data.get('address')
+        pincode = data.get('pincode')
+        price = data.get('price')
+        total_slots = data.get('total_slots', 20)
+        
+        if not all([name, address, price]):
+            return jsonify({'error': 'Name, address, and price are required'}), 400
+        
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        # Insert parking lot using database column names
+        cursor.execute('''
+            INSERT INTO parking_lots (name, address, pincode, price_per_hour, total_slots)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (name, address, pincode, float(price), int(total_slots)))
+        
+        lot_id = cursor.lastrowid
+        
+        # Create slots for the parking lot
+        created = provision_slots(cursor, lot_id, total_slots)
+        refresh_slot_view(cursor, lot_id=lot_id)
+        
+        apply_stats(cursor, {LOTS_TOTAL: 1, SLOTS_TOTAL: created})
+        bump_lot_versions(cursor, lot_id)
+        conn.commit()
+        slot_allocator.rebuild(conn, lot_id)
+        conn.close()
+        notify_lot_change('created', lot_id, total_slots=int(total_slots))
+        
+        logger.info("Created parking lot with ID: %s", lot_id)
+        return jsonify({
+            'id': lot_id,
+            'name': name,
+            'address': address,
+            'pincode': pincode,
+            'price': float(price),  # Frontend expects 'price'
+            'slots': int(total_slots),
+            'total_slots': int(total_slots),
+            'message': 'Parking lot created successfully'
+        }), 201
+        
+    except Exception as e:
+        logger.error("Error creating parking lot: %s", e)
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/parking-lots/<int:lot_id>', methods=['PUT'])
+def update_parking_lot(lot_id):
+    """Update a parking lot."""
+    try:
+        data = request.get_json()
+        logger.debug("Updating parking lot %s with data: %s", lot_id, data)
+        
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        # Check if lot exists
+        cursor.execute('SELECT * FROM parking_lots WHERE id = ?', (lot_id,))
+        lot = cursor.fetchone()
+        
+        if not lot:
+            conn.close()
+            return jsonify({'error': 'Parking lot not found'}), 404
+        
+        # Update parking lot using correct database column names
+        name = data.get('name', lot['name'])
+        address = data.get('address', lot['address'])
+        pincode = data.get('pincode', lot['pincode'])
+        price = data.get('price', lot['price_per_hour'])  # Database column is price_per_hour
+        total_slots = data.get('total_slots', lot['total_slots'])
+        
+        cursor.execute('''
+            UPDATE parking_lots 
+            SET name = ?, address = ?, pincode = ?, price_per_hour = ?, total_slots = ?
+            WHERE id = ?
+        ''', (name, address, pincode, float(price), int(total_slots), lot_id))
+        
+        # Add missing slots or remove excess ones (only if they're available)
+        slot_delta = provision_slots(cursor, lot_id, total_slots)
+        if slot_delta:
+            apply_stats(cursor, {SLOTS_TOTAL: slot_delta})
+        # Name, address and rate are copied into every slot's view row
+        refresh_slot_view(cursor, lot_id=lot_id)
+        bump_lot_versions(cursor, lot_id)
+        
+        conn.commit()
+        slot_allocator.rebuild(conn, lot_id)
+        conn.close()
+        notify_lot_change('updated', lot_id, total_slots=int(total_slots))
+        
+        logger.info("Updated parking lot %s", lot_id)
+        return jsonify({
+            'id': lot_id,
+            'name': name,
+            'address': address,
+            'pincode': pincode,
+            'price': float(price),  # Frontend expects 'price'
+            'slots': int(total_slots),
+            'total_slots': int(total_slots),
+            'message': 'Parking lot updated successfully'
+        }), 200
+        
+    except Exception as e:
+        logger.error("Error updating parking lot: %s", e)
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/parking-lots/<int:lot_id>', methods=['DELETE'])
+def delete_parking_lot(lot_id):
+    """Delete a parking lot."""
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        # Check if lot exists
+        cursor.execute('SELECT * FROM parking_lots WHERE id = ?', (lot_id,))
+        lot = cursor.fetchone()
+        
+        if not lot:
+            conn.close()
+            return jsonify({'error': 'Parking lot not found'}), 404
+        
+        # Delete related slots first
+        cursor.execute('DELETE FROM parking_slots WHERE lot_id = ?', (lot_id,))
+        
+        # Delete related bookings
+        cursor.execute('DELETE FROM bookings WHERE lot_id = ?', (lot_id,))
+        
+        # Delete parking lot
+        cursor.execute('DELETE FROM parking_lots WHERE id = ?', (lot_id,))
+        refresh_slot_view(cursor, lot_id=lot_id)
+        
+        # The lot's whole booking history goes with it; recount rather than
+        # reversing every counter the deleted rows contributed to
+        reconcile_stats(cursor)
+        bump_lot_versions(cursor, lot_id)
+        conn.commit()
+        slot_allocator.drop_lot(lot_id)
+        conn.close()
+        notify_lot_change('deleted', lot_id)
+        
+        logger.info("Deleted parking lot %s", lot_id)
+        return jsonify({'message': 'Parking lot deleted successfully'}), 200
+        
+    except Exception as e:
+        logger.error("Error deleting parking lot: %s", e)
+        return jsonify({'error': str(e)}), 500
+
+def load_lot_slots(lot_id):
+    """Build a lot's slot grid payload (cached in read_cache under 'slots')."""
+    conn = get_db_connection()
+    now = time.time()
+    slots = conn.execute(LOT_SLOTS_QUERY, (now, now, lot_id)).fetchall()
+    conn.close()
+    return [dict(slot, is_available=bool(slot['is_available'])) for slot in slots]
+
+@app.route('/api/parking-lots/<int:lot_id>/slots', methods=['GET'])
+@conditional_get(lot_slots_etag)
+def get_parking_lot_slots(lot_id):
+    """Get all slots for a specific parking lot with user details."""
+    try:
+        # Running durations/costs in a cached grid are up to SLOT_ETAG_TTL_SECONDS old
+        slots_data = read_cache.get_or_load('slots', g.etag, lambda: load_lot_slots(lot_id))
+        
+        return jsonify(slots_data), 200
+        
+    except Exception as e:
+        logger.error("Error fetching slots for lot %s: %s", lot_id, e)
+        return jsonify({'error': str(e)}), 500
+
+# Admin route compatibility
+@app.route('/api/admin/parking-lots/<int:lot_id>/slots', methods=['GET'])
+def get_admin_parking_lot_slots(lot_id):
+    """Admin route for getting parking lot slots."""
+    return get_parking_lot_slots(lot_id)
+
+# Removed duplicate delete_parking_lot function - using the one above with proper cascade deletes
+
+# Removed proxy route - using direct implementation above
+
+@app.route('/api/users', methods=['GET'])
+@conditional_get(users_etag)
+def get_users():
+    """List users, newest first.
+
+    Filters: ?city= and ?state= (case-insensitive), ?created_from= and
+    ?created_to= (YYYY-MM-DD, inclusive). With ?per_page= or ?cursor= one
+    page comes back with a pagination block, walked with next_cursor as in
+    /api/bookings. Without them the whole filtered listing is streamed as a
+    JSON array, one fetchmany() batch at a time.
+    """
+    try:
+        listing = (UserListQuery()
+                   .city(request.args.get('city'))
+                   .state(request.args.get('state'))
+                   .created_between(request.args.get('created_from'), request.args.get('created_to')))
+    except ValueError:
+        return jsonify({'error': 'created_from and created_to must be YYYY-MM-DD dates'}), 400
+    
+    if 'per_page' not in request.args and 'cursor' not in request.args:
+        return stream_users(listing)
+    
+    try:
+        per_page = min(max(1, int(request.args.get('per_page', USERS_PAGE_SIZE))), USERS_MAX_PAGE_SIZE)
+    except ValueError:
+        return jsonify({'error': 'per_page must be an integer'}), 400
+    after = None
+    cursor_token = request.args.get('cursor')
+    if cursor_token:
+        try:
+            after, = decode_cursor(cursor_token, 1)
+            if not isinstance(after, int) or isinstance(after, bool):
+                raise InvalidCursor("Cursor does not match this listing")
+        except InvalidCursor as e:
+            return jsonify({'error': str(e)}), 400
+    
+    try:
+        conn = get_db_connection()
+        # One row past the page tells whether another page follows
+        page_query, page_params = listing.page_sql(per_page + 1, after=after)
+        users = conn.execute(page_query, page_params).fetchall()
+        conn.close()
+        has_more = len(users) > per_page
+        users = users[:per_page]
+        
+        last = users[-1] if users else None
+        return jsonify({
+            'users': [format_user(user) for user in users],
+            'pagination': {
+                'per_page': per_page,
+                'has_more': has_more,
+                'next_cursor': encode_cursor(last['id']) if has_more else None,
+            }
+        }), 200
+        
+    except Exception as e:
+        logger.error("Error fetching users: %s", e)
+        return jsonify({'error': str(e)}), 500
+
+def stream_users(listing):
+    """Response that streams the whole listing as a JSON array."""
+    def generate():
+        # The request's pooled connection is released before the body is sent
+        conn = db_pool.acquire()
+        try:
+            page_query, page_params = listing.page_sql()
+            yield from iter_json_array(conn.execute(page_query, page_params), format_user, USERS_FETCH_SIZE)
+        finally:
+            conn.close()
+    
+    return Response(generate(), mimetype='application/json')
+
+@app.route('/api/users/<int:user_id>', methods=['DELETE'])
+def delete_user(user_id):
+    """Delete a user from the database."""
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        # Check if user exists
+        cursor.execute('SELECT * FROM users WHERE id = ?', (user_id,))
+        user = cursor.fetchone()
+        
+        if not user:
+            conn.close()
+            return jsonify({'error': 'User not found'}), 404
+        
+        # Release any active bookings first by updating parking_slots
+        cursor.execute('SELECT id, lot_id, slot_number FROM parking_slots WHERE current_user_id = ?', (user_id,))
+        released_slots = cursor.fetchall()
+        cursor.execute(RELEASE_USER_SLOTS_QUERY, (user_id,))
+        freed_slots = cursor.rowcount
+        
+        # Update bookings status to 'cancelled'
+        cursor.execute('''
+            UPDATE bookings 
+            SET status = 'cancelled'
+            WHERE user_id = ? AND status = 'active'
+        ''', (user_id,))
+        cancelled = cursor.rowcount
+        
+        # Delete user
+        cursor.execute('DELETE FROM users WHERE id = ?', (user_id,))
+        refresh_slot_view(cursor, slot_ids=[slot['id'] for slot in released_slots])
+        
+        apply_stats(cursor, {
+            USERS_TOTAL: -1,
+            SLOTS_OCCUPIED: -freed_slots,
+            status_counter('active'): -cancelled,
+            status_counter('cancelled'): cancelled,
+        })
+        bump_versions(cursor, 'users', 'bookings')
+        for lot_id in {slot['lot_id'] for slot in released_slots}:
+            bump_lot_versions(cursor, lot_id)
+        conn.commit()
+        conn.close()
+        read_cache.invalidate('profiles', user_id)
+        
+        for slot in released_slots:
+            slot_allocator.mark_free(slot['lot_id'], slot['id'], slot['slot_number'])
+            notify_slot_change('released', slot['lot_id'], slot['id'], slot['slot_number'])
+        
+        logger.info("Deleted user %s", user_id)
+        return jsonify({'message': 'User deleted successfully'}), 200
+        
+    except Exception as e:
+        logger.error("Error deleting user: %s", e)
+        return jsonify({'error': str(e)}), 500
+
+def estimate_bookings_total(conn, status_filter):
+    """Approximate listing size from the running stats counters (no scan)."""
+    counters, _, _ = read_stats(conn)
+    if status_filter == 'all':
+        return int(counters.get(BOOKINGS_TOTAL, 0))
+    if status_filter in PERIOD_FILTERS:
+        # Bucketed by creation day rather than start day, hence an estimate
+        since = period_range(status_filter)[0]
+        row = conn.execute('SELECT COALESCE(SUM(bookings), 0) FROM stats_daily WHERE day >= ?', (since,)).fetchone()
+        return row[0]
+    return int(counters.get(status_counter(status_filter), 0))
+
+@app.route('/api/bookings', methods=['GET'])
+def get_bookings():
+    """Get booking history with pagination and filtering."""
+    try:
+        per_page = int(request.args.get('per_page', 10))
+        status_filter = request.args.get('status', 'all')
+        # ?page=N keeps the old OFFSET paging; otherwise pages are walked with ?cursor=
+        offset_mode = 'page' in request.args
+        page = int(request.args.get('page', 1))
+        cursor_token = request.args.get('cursor')
+        total_mode = request.args.get('include_total', 'exact' if offset_mode else 'estimate')
+        
+        logger.debug("Listing bookings: status=%s per_page=%s page=%s cursor=%s",
+                     status_filter, per_page, page if offset_mode else None, cursor_token is not None)
+        
+        after = None
+        if cursor_token and not offset_mode:
+            try:
+                after = decode_cursor(cursor_token, 2)
+                if not all(isinstance(value, int) for value in after):
+                    raise InvalidCursor("Cursor does not match this listing")
+            except InvalidCursor as e:
+                return jsonify({'error': str(e)}), 400
+        
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        # Build query based on filter using actual database schema
+        listing = BookingListQuery().status(status_filter)
+        
+        # Count total records: exact on request, otherwise from the running stats counters
+        total_records = None
+        total_is_estimate = False
+        if total_mode == 'exact':
+            count_query, count_params = listing.count_sql()
+            cursor.execute(count_query, count_params)
+            total_records = cursor.fetchone()[0]
+        elif total_mode == 'estimate':
+            total_records = estimate_bookings_total(conn, status_filter)
+            total_is_estimate = True
+        logger.debug("Bookings total: %s (estimate=%s)", total_records, total_is_estimate)
+        
+        # Get one page, plus one row to know whether another page follows
+        page_query, page_params = listing.page_sql(
+            per_page + 1, after=after, offset=(page - 1) * per_page if offset_mode else None
+        )
+        
+        cursor.execute(page_query, page_params)
+        bookings = cursor.fetchall()
+        has_more = len(bookings) > per_page
+        bookings = bookings[:per_page]
+        logger.debug("Found %d bookings (more: %s)", len(bookings), has_more)
+        
+        bookings_data = []
+        for booking in bookings:
+            # Handle None values safely
+            actual_duration = booking['actual_duration_hours'] or 0
+            final_cost = booking['final_cost'] or 0
+            
+            booking_data = {
+                'id': booking['id'],
+                'booking_id': booking['booking_id'],
+                'user_id': booking['user_id'],
+                'user_name': booking['user_name'],
+                'user_email': booking['user_email'],
+                'lot_id': booking['lot_id'],
+                'lot_name': booking['lot_name'],
+                'lot_address': booking['lot_address'],
+                'slot_number': booking['slot_id'],  # Using slot_id as slot_number
+                'vehicle_number': booking['vehicle_number'],
+                'start_time': booking['start_time'],
+                'end_time': booking['end_time'],
+                'planned_duration_hours': booking['planned_duration_hours'] or 0,
+                'actual_duration_hours': actual_duration,
+                'hourly_rate': final_cost / actual_duration if actual_duration > 0 else 0,
+                'final_cost': final_cost,
+                'status': booking['status'],
+                'created_at': booking['booking_created_at']
+            }
+            bookings_data.append(booking_data)
+        
+        conn.close()
+        
+        total_pages = (total_records + per_page - 1) // per_page if total_records is not None else None
+        
+        pagination = {
+            'per_page': per_page,
+            'total': total_records,
+            'total_is_estimate': total_is_estimate,
+            'total_pages': total_pages,
+            'pages': total_pages,
+            'has_more': has_more
+        }
+        if offset_mode:
+            pagination['page'] = page
+        else:
+            last = bookings[-1] if bookings else None
+            pagination['next_cursor'] = encode_cursor(last['start_ts'], last['id']) if has_more else None
+        
+        return jsonify({
+            'bookings': bookings_data,
+            'pagination': pagination
+        }), 200
+        
+    except Exception as e:
+        logger.error("Error fetching bookings: %s", e)
+        return jsonify({'error': str(e)}), 500
+
+def load_booking_stats():
+    """Build the admin dashboard KPIs (cached in read_cache under 'stats')."""
+    conn = get_db_connection()
+    
+    # Running counters maintained by the write paths (see backend/utils/stats.py)
+    counters, today_revenue, this_week_bookings = read_stats(conn)
+    conn.close()
+    
+    def count(name):
+        return int(counters.get(name, 0))
+    
+    total_bookings = count(BOOKINGS_TOTAL)
+    total_revenue = counters.get(REVENUE_COMPLETED, 0)
+    duration_count = count(DURATION_COUNT)
+    avg_duration = counters.get(DURATION_SUM, 0) / duration_count if duration_count else 0
+    
+    status_stats = {}
+    for name, value in counters.items():
+        if name.startswith(status_counter('')) and value > 0:
+            status_stats[name[len(status_counter('')):]] = int(value)
+    
+    active_bookings = count(status_counter('active'))
+    completed_bookings = count(status_counter('completed'))
+    total_slots = count(SLOTS_TOTAL)
+    occupied_slots = count(SLOTS_OCCUPIED)
+    total_users = count(USERS_TOTAL)
+    total_lots = count(LOTS_TOTAL)
+    
+    logger.debug("Booking stats: total=%s revenue=%s avg_duration=%s", total_bookings, total_revenue, avg_duration)
+    
+    return {
+        # Primary KPIs (match AdminDashboard expectations)
+        'totalBookings': total_bookings,
+        'totalRevenue': round(total_revenue, 2),
+        'averageRevenue': round(total_revenue / total_bookings, 2) if total_bookings > 0 else 0,
+        'peakTime': '10:00 AM',  # Could be calculated from actual data
+        'occupancyRate': round((occupied_slots / total_slots * 100), 2) if total_slots > 0 else 0,
+        
+        # Secondary KPIs
+        'activeBookings': active_bookings,
+        'todayRevenue': round(today_revenue, 2),
+        'averageDuration': round(avg_duration, 2),
+        'totalUsers': total_users,
+        'totalLots': total_lots,
+        'totalSlots': total_slots,
+        'availableSlots': total_slots - occupied_slots,
+        'occupiedSlots': occupied_slots,
+        'thisWeekBookings': this_week_bookings,
+        'mostPopularLot': 'N/A',  # Could be calculated from booking data
+        
+        # Additional data for compatibility
+        'status_distribution': status_stats,
+        'completed_bookings': completed_bookings
+    }
+
+@app.route('/api/bookings/stats', methods=['GET'])
+@conditional_get(stats_etag)
+def bookings_stats():
+    """Get booking statistics for admin dashboard."""
+    try:
+        # Today's revenue and this week's bookings roll over at midnight
+        stats = read_cache.get_or_load('stats', g.etag, load_booking_stats)
+        return jsonify(stats)
+        
+    except Exception:
+        logger.exception("Failed to get booking stats")
+        return jsonify({'error': 'Failed to retrieve booking statistics'}), 500
+
+# =============================================================================
+# SEARCH ROUTES
+# =============================================================================
+
+@app.route('/api/search', methods=['GET'])
+def search():
+    """Ranked prefix search over lots (name, address, pincode) and users (name, email, phone).
+
+    ?q= is the search text, ?type= one of all (default), lots or users, and
+    ?page= / ?per_page= page through each kind's ranked matches.
+    """
+    query = request.args.get('q', '')
+    kind = request.args.get('type', 'all')
+    if kind != 'all' and kind not in SEARCH_QUERIES:
+        return jsonify({'error': f"type must be one of all, {', '.join(SEARCH_QUERIES)}"}), 400
+    try:
+        page = max(1, int(request.args.get('page', 1)))
+        per_page = min(max(1, int(request.args.get('per_page', 20))), SEARCH_MAX_PER_PAGE)
+    except ValueError:
+        return jsonify({'error': 'page and per_page must be integers'}), 400
+    
+    match = build_match_query(query)
+    if match is None:
+        return jsonify({'error': 'Search needs a word of at least two letters or digits'}), 400
+    
+    try:
+        conn = get_db_connection()
+        response = {'query': query}
+        for name in (SEARCH_QUERIES if kind == 'all' else (kind,)):
+            # One row past the page tells whether another page follows
+            rows = conn.execute(SEARCH_QUERIES[name], (
+                match, SEARCH_RANK_WINDOW, per_page + 1, (page - 1) * per_page
+            )).fetchall()
+            matched = rows[0]['matched'] if rows else 0
+            response[name] = {
+                'results': [{key: row[key] for key in row.keys() if key != 'matched'} for row in rows[:per_page]],
+                'page': page,
+                'per_page': per_page,
+                'has_more': len(rows) > per_page,
+                # Only the first SEARCH_RANK_WINDOW matches are ranked and paged
+                'matched': matched,
+                'truncated': matched >= SEARCH_RANK_WINDOW,
+            }
+        conn.close()
+        return jsonify(response), 200
+        
+    except Exception as e:
+        logger.error("Error searching for %r: %s", query, e)
+        return jsonify({'error': str(e)}), 500
+
+# =============================================================================
+# USER AUTHENTICATION COMPATIBILITY ROUTES
+# =============================================================================
+
+# New passwords are hashed with this werkzeug method; other hashes are replaced on login
+PASSWORD_HASH_METHOD = os.getenv('PARKING_PASSWORD_HASH_METHOD', 'pbkdf2:sha256:600000')
+# Plaintext and MD5 rows from older builds are rejected unless this is on; turn it
+# on only while those users log in once (each such login rehashes the row)
+ALLOW_LEGACY_PASSWORDS = os.getenv('PARKING_ALLOW_LEGACY_PASSWORDS', '0').lower() in ('1', 'true', 'yes')
+password_policy = PasswordPolicy(PASSWORD_HASH_METHOD, allow_legacy=ALLOW_LEGACY_PASSWORDS)
+if ALLOW_LEGACY_PASSWORDS:
+    logger.warning("PARKING_ALLOW_LEGACY_PASSWORDS is on: plaintext and MD5 password rows can log in")
+
+# Hashing is CPU-bound: a login storm queues on these workers instead of
+# taking the CPU from every request thread, and overflow gets a 429
+PASSWORD_WORKERS = int(os.getenv('PARKING_PASSWORD_WORKERS', 2))
+PASSWORD_QUEUE_SIZE = int(os.getenv('PARKING_PASSWORD_QUEUE_SIZE', 64))
+PASSWORD_TIMEOUT_SECONDS = float(os.getenv('PARKING_PASSWORD_TIMEOUT_SECONDS', 10))
+password_workers = WorkerPool(workers=PASSWORD_WORKERS, queue_size=PASSWORD_QUEUE_SIZE, name='password-hash')
+
+class PasswordWorkersBusy(Exception):
+    """Raised when the password workers cannot take or finish a task in time."""
+
+def run_password_task(fn, *args):
+    """Run `fn(*args)` on the password workers and wait for its result."""
+    future = Future()
+
+    def task():
+        if not future.set_running_or_notify_cancel():
+            return  # The caller already timed out
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+
+    try:
+        password_workers.submit(task)
+    except QueueFull:
+        raise PasswordWorkersBusy()
+    try:
+        return future.result(timeout=PASSWORD_TIMEOUT_SECONDS)
+    except FutureTimeout:
+        future.cancel()
+        raise PasswordWorkersBusy()
+
+def password_busy_response():
+    response = jsonify({'message': 'Too many sign-ins in progress. Please try again shortly.'})
+    response.headers['Retry-After'] = '1'
+    return response, 429
+
+@app.route('/api/auth/user/register', methods=['POST'])
+def user_register():
+    """User registration with direct database access."""
+    try:
+        data = request.get_json()
+        logger.debug("User registration request for %s", data.get('email'))
+        
+        # Extract and validate data
+        email = data.get('email')
+        password = data.get('password')
+        full_name = data.get('fullName') or data.get('full_name')
+        phone = data.get('phone', '')
+        address_line1 = data.get('addressLine1') or data.get('address_line1', '')
+        city = data.get('city', '')
+        state = data.get('state', '')
+        pin_code = data.get('pinCode') or data.get('pin_code', '')
+        
+        if not email or not password or not full_name:
+            return jsonify({'message': 'Email, password, and full name are required'}), 400
+        
+        # Database connection
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        # Check if user already exists
+        cursor.execute('SELECT id FROM users WHERE email = ?', (email,))
+        if cursor.fetchone():
+            conn.close()
+            return jsonify({'message': 'User with this email already exists'}), 409
+        
+        # Hash password
+        try:
+            password_hash = run_password_task(password_policy.hash, password)
+        except PasswordWorkersBusy:
+            conn.close()
+            return password_busy_response()
+        
+        # Insert new user
+        cursor.execute('''
+            INSERT INTO users (email, password, full_name, phone, address_line1, city, state, pin_code, is_active, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (email, password_hash, full_name, phone, address_line1, city, state, pin_code, True, now_timestamp()))
+        
+        user_id = cursor.lastrowid
+        apply_stats(cursor, {USERS_TOTAL: 1})
+        bump_versions(cursor, 'users')
+        conn.commit()
+        conn.close()
+        
+        logger.debug("User registered with id %s", user_id)
+        
+        return jsonify({
+            'message': 'User registered successfully',
+            'user': {
+                'id': user_id,
+                'email': email,
+                'name': full_name
+            }
+        }), 201
+        
+    except Exception:
+        logger.exception("Registration failed")
+        return jsonify({'message': 'Server error. Please try again later.'}), 500
+    
+    try:
+        with app.test_client() as client:
+            response = client.post('/api/user/register', 
+                                 json=converted_data,
+                                 headers=dict(request.headers))
+            
+            logger.debug("Registration proxy response status %s", response.status_code)
+            
+            try:
+                return response.get_json(), response.status_code
+            except:
+                return {"error": "Invalid JSON response", "raw": response.get_data(as_text=True)}, response.status_code
+    except Exception:
+        logger.exception("Registration proxy failed")
+        # Fallback: Direct registration
+        return direct_user_register()
+
+def direct_user_register():
+    """Direct user registration fallback."""
+    try:
+        import sqlite3
+        
+        data = request.get_json()
+        
+        # Handle both camelCase (frontend) and snake_case (backend) field names
+        full_name = data.get('full_name') or data.get('fullName')
+        email = data.get('email')
+        password = data.get('password')
+        phone = data.get('phone') or ''
+        address_line1 = data.get('address_line1') or data.get('addressLine1') or ''
+        city = data.get('city') or ''
+        state = data.get('state') or ''
+        pin_code = data.get('pin_code') or data.get('pinCode') or ''
+        
+        # Validate required fields
+        if not email:
+            return jsonify({'message': 'email is required'}), 400
+        if not password:
+            return jsonify({'message': 'password is required'}), 400
+        if not full_name:
+            return jsonify({'message': 'full_name is required'}), 400
+        
+        # Database connection
+        DB_PATH = r'D:\MAD2\Parking App\instance\parking.db'
+        conn = sqlite3.connect(DB_PATH)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        # Check if user already exists
+        cursor.execute('SELECT id FROM users WHERE email = ?', (email,))
+        if cursor.fetchone():
+            conn.close()
+            return jsonify({'message': 'Email already registered'}), 400
+        
+        # Hash password and create user
+        hashed_password = password_policy.hash(password)
+        
+        cursor.execute('''
+            INSERT INTO users (email, password, full_name, phone, address_line1, city, state, pin_code, is_active, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            email,
+            hashed_password,
+            full_name,
+            phone,
+            address_line1,
+            city,
+            state,
+            pin_code,
+            0,  # is_active = 0 for regular users
+            now_timestamp()
+        ))
+        
+        user_id = cursor.lastrowid
+        conn.commit()
+        conn.close()
+        
+        print(f"[DEBUG] Direct registration successful for user ID: {user_id}")
+        return jsonify({
+            'message': 'User registered successfully',
+            'user_id': user_id,
+            'email': email
+        }), 201
+        
+    except Exception as e:
+        print(f"[ERROR] Direct registration error: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'message': f'Registration failed: {str(e)}'}), 500
+
+@app.route('/api/auth/user/login', methods=['POST'])
+def user_login():
+    """User login with direct database access."""
+    try:
+        data = request.get_json()
+        
+        email = data.get('email')
+        password = data.get('password')
+        
+        if not email or not password:
+            return jsonify({'message': 'Email and password are required'}), 400
+        
+        # Database connection
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        # Find user by email
+        cursor.execute('SELECT id, full_name, email, password FROM users WHERE email = ?', (email,))
+        user = cursor.fetchone()
+        
+        if not user:
+            conn.close()
+            return jsonify({'message': 'Invalid email or password'}), 401
+        
+        # Check password off the request thread
+        stored_password = user['password']
+        try:
+            password_valid, new_hash = run_password_task(password_policy.verify, stored_password, password)
+        except PasswordWorkersBusy:
+            conn.close()
+            return password_busy_response()
+        
+        if not password_valid:
+            conn.close()
+            logger.info("Login rejected: wrong password", extra={'user_id': user['id']})
+            return jsonify({'message': 'Invalid email or password'}), 401
+        
+        # Hashed with an outdated policy (or not at all): upgrade the row now
+        # that we know the password; skip it if the password changed meanwhile
+        if new_hash:
+            cursor.execute('UPDATE users SET password = ? WHERE id = ? AND password = ?',
+                           (new_hash, user['id'], stored_password))
+            conn.commit()
+        
+        # Signed, expiring bearer token checked by require_user
+        token = token_signer.issue(user['id'])
+        
+        conn.close()
+        
+        logger.info("Login succeeded", extra={'user_id': user['id']})
+        
+        return jsonify({
+            'token': token,
+            'user': {
+                'id': user['id'],
+                'name': user['full_name'],
+                'email': user['email']
+            },
+            'message': 'Login successful'
+        }), 200
+        
+    except Exception:
+        logger.exception("Login failed")
+        return jsonify({'message': 'Server error. Please try again later.'}), 500
+
+def direct_user_login():
+    """Direct user login fallback."""
+    try:
+        import sqlite3
+        
+        data = request.get_json()
+        print(f"[DEBUG] Direct login for: {data.get('email')}")
+        
+        email = data.get('email')
+        password = data.get('password')
+        
+        if not email or not password:
+            return jsonify({'message': 'Email and password are required'}), 400
+        
+        # Database connection
+        DB_PATH = r'D:\MAD2\Parking App\instance\parking.db'
+        conn = sqlite3.connect(DB_PATH)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        # Check user credentials
+        cursor.execute('SELECT * FROM users WHERE email = ? AND is_active = 0', (email,))
+        user = cursor.fetchone()
+        conn.close()
+        
+        if user and password_policy.verify(user['password'], password)[0]:
+            print(f"[DEBUG] Direct login successful for: {email}")
+            user_data = {
+                'id': user['id'],
+                'email': user['email'],
+                'full_name': user['full_name'],
+                'phone': user['phone'] or '',
+                'address_line1': user['address_line1'] or '',
+                'city': user['city'] or '',
+                'state': user['state'] or '',
+                'pin_code': user['pin_code'] or ''
+            }
+            
+            token = token_signer.issue(user['id'])
+            
+            return jsonify({
+                'message': 'Login successful',
+                'access_token': token,
+                'user': user_data
+            }), 200
+        
+        return jsonify({'message': 'Invalid credentials'}), 401
+        
+    except Exception as e:
+        print(f"[ERROR] Direct login error: {e}")
+        return jsonify({'message': f'Login failed: {str(e)}'}), 500
+
+@app.route('/api/auth/profile', methods=['GET', 'PUT'])
+@require_user
+def user_profile():
+    """Direct user profile endpoint with token-based authentication."""
+    user_id = g.user_id
+    
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        if request.method == 'GET':
+            # Already loaded (usually from read_cache) by require_user
+            user = g.user
+            conn.close()
+            
+            if user:
+                profile_data = {
+                    'id': user['id'],
+                    'email': user['email'],
+                    'full_name': user['full_name'],  # Frontend expects full_name
+                    'name': user['full_name'],        # Also provide name as fallback
+                    'phone': user['phone'],
+                    'address_line1': user['address_line1'],  # Frontend expects address_line1
+                    'address': user['address_line1'],        # Also provide address as fallback
+                    'city': user['city'],
+                    'state': user['state'],
+                    'pin_code': user['pin_code'],     # Frontend expects pin_code
+                    'pinCode': user['pin_code'],      # Also provide pinCode as fallback
+                    'created_at': user['created_at'],
+                    'createdAt': user['created_at']
+                }
+                
+                return jsonify({
+                    'profile': profile_data,
+                    'type': 'user'
+                }), 200
+            else:
+                return jsonify({'message': 'User not found'}), 404
+                
+        elif request.method == 'PUT':
+            # Update user profile
+            data = request.get_json()
+            
+            # Update user data - match frontend field names
+            cursor.execute('''
+                UPDATE users SET 
+                    email = ?, full_name = ?, phone = ?, address_line1 = ?, 
+                    city = ?, state = ?, pin_code = ?
+                WHERE id = ?
+            ''', (
+                data.get('email'),
+                data.get('full_name'),
+                data.get('phone'),
+                data.get('address_line1'),
+                data.get('city'),
+                data.get('state'),
+                data.get('pin_code'),
+                user_id
+            ))
+            # Name and email of the user's occupied slots
+            refresh_slot_view(cursor, user_id=user_id)
+            bump_versions(cursor, 'users')
+            
+            conn.commit()
+            read_cache.invalidate('profiles', user_id)
+            
+            # Get updated user data to return (and re-cache it)
+            updated_user = get_cached_user(user_id)
+            conn.close()
+            
+            if updated_user:
+                profile_data = {
+                    'id': updated_user['id'],
+                    'email': updated_user['email'],
+                    'full_name': updated_user['full_name'],
+                    'name': updated_user['full_name'],
+                    'phone': updated_user['phone'],
+                    'address_line1': updated_user['address_line1'],
+                    'address': updated_user['address_line1'],
+                    'city': updated_user['city'],
+                    'state': updated_user['state'],
+                    'pin_code': updated_user['pin_code'],
+                    'pinCode': updated_user['pin_code'],
+                    'created_at': updated_user['created_at'],
+                    'createdAt': updated_user['created_at']
+                }
+                
+                return jsonify({
+                    'message': 'Profile updated successfully',
+                    'profile': profile_data
+                }), 200
+            else:
+                return jsonify({'message': 'Profile updated successfully'}), 200
+            
+    except Exception:
+        logger.exception("Profile %s failed", request.method)
+        return jsonify({'message': 'Server error. Please try again later.'}), 500
+
+# Removed unused direct_user_profile function - now using direct implementation in user_profile route
+
+@app.route('/api/my-bookings', methods=['GET'])
+@require_user
+def user_bookings():
+    """Direct user bookings endpoint."""
+    user_id = g.user_id
+    
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        # Get user's bookings with parking lot details
+        cursor.execute(USER_BOOKINGS_QUERY, (user_id,))
+        
+        bookings = cursor.fetchall()
+        conn.close()
+        
+        bookings_data = []
+        for booking in bookings:
+            booking_data = {
+                'id': booking['id'],
+                'booking_id': booking['booking_id'],
+                'lot_id': booking['lot_id'],
+                'lot_name': booking['lot_name'],
+                'lot_address': booking['lot_address'],
+                'slot_id': booking['slot_id'],
+                'slot_number': booking['slot_number'],
+                'vehicle_number': booking['vehicle_number'],
+                'payment_method': booking['payment_method'],
+                'start_time': booking['start_time'],
+                'end_time': booking['end_time'],
+                'planned_duration_hours': booking['planned_duration_hours'],
+                'actual_duration_hours': booking['actual_duration_hours'],
+                'planned_cost': booking['planned_cost'],
+                'final_cost': booking['final_cost'],
+                'status': booking['status'],
+                'created_at': booking['booking_created_at'],
+                'completed_at': booking['completed_at'],
+                'hourly_rate': booking['hourly_rate']
+            }
+            bookings_data.append(booking_data)
+        
+        logger.debug("Returning %d bookings for user %s", len(bookings_data), user_id)
+        return jsonify(bookings_data), 200
+        
+    except Exception as e:
+        logger.exception("Fetching bookings of user %s failed", user_id)
+        return jsonify({'message': f'Failed to fetch bookings: {str(e)}'}), 500
+
+def resolve_booking_window(start_time, end_time, planned_duration):
+    """Normalize the requested start/end times to local YYYY-MM-DDTHH:MM:SS strings.
+
+    Missing or unparsable values fall back to now and start + planned duration.
+    """
+    start_dt = parse_timestamp(start_time)
+    if start_dt is None:
+        if start_time:
+            logger.warning("Unparsable booking start_time %r, using now", start_time)
+        start_dt = datetime.now()
+
+    end_dt = parse_timestamp(end_time)
+    if end_dt is None:
+        if end_time:
+            logger.warning("Unparsable booking end_time %r, using start + planned duration", end_time)
+        end_dt = start_dt + timedelta(hours=planned_duration)
+
+    return format_timestamp(start_dt), format_timestamp(end_dt)
+
+def generate_booking_id():
+    """Generate a user-facing booking reference like BK-AB12CD34."""
+    import random
+    import string
+    return 'BK-' + ''.join(random.choices(string.ascii_uppercase + string.digits, k=8))
+
+def record_booking(conn, user_id, lot_id, slot_id, vehicle_number, planned_duration, planned_cost,
+                   start_time, end_time):
+    """Claim a free slot and create its booking in one write transaction.
+
+    start_time and end_time are normalized timestamps (see resolve_booking_window).
+    Returns the new booking ID. Raises WriteConflict if the slot is taken.
+    """
+    booking_id = generate_booking_id()
+    start_ts, end_ts = to_epoch(start_time), to_epoch(end_time)
+    created_at = now_timestamp()
+    
+    def claim_slot(cursor):
+        # Conditional claim: only one writer can flip is_available 1 -> 0
+        cursor.execute('''
+            UPDATE parking_slots SET 
+                is_available = 0, 
+                current_user_id = ?,
+                booking_id = ?,
+                vehicle_number = ?,
+                booking_start_time = ?,
+                planned_duration_hours = ?,
+                planned_cost = ?
+            WHERE id = ? AND is_available = 1
+        ''', (user_id, booking_id, vehicle_number, created_at, planned_duration, planned_cost, slot_id))
+        if cursor.rowcount != 1:
+            raise WriteConflict(f"Slot {slot_id} is already booked")
+
+        # Create booking record with all required fields
+        cursor.execute('''
+            INSERT INTO bookings (
+                user_id, lot_id, slot_id, booking_id, vehicle_number, 
+                payment_method, start_time, end_time, start_ts, end_ts, planned_duration_hours, 
+                actual_duration_hours, planned_cost, final_cost, status, 
+                booking_created_at, completed_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (user_id, lot_id, slot_id, booking_id, vehicle_number, 
+              'pay_counter', start_time, end_time, start_ts, end_ts, planned_duration, 
+              0.0, planned_cost, 0.0, 'active', 
+              created_at, created_at))
+        refresh_slot_view(cursor, slot_ids=(slot_id,))
+        
+        apply_stats(cursor, {
+            BOOKINGS_TOTAL: 1,
+            status_counter('active'): 1,
+            SLOTS_OCCUPIED: 1,
+        }, day=day_of(created_at), bookings=1)
+        bump_lot_versions(cursor, lot_id)
+
+    run_immediate(conn, claim_slot, stats=booking_contention)
+    return booking_id
+
+@app.route('/api/book-slot', methods=['POST'])
+@require_user
+def book_slot():
+    """Direct slot booking implementation.""" 
+    user_id = g.user_id
+    
+    # Get booking data
+    booking_data = request.get_json() or {}
+    lot_id = booking_data.get('lot_id')
+    slot_id = booking_data.get('slot_id')
+    vehicle_number = booking_data.get('vehicle_number')
+    planned_duration = booking_data.get('duration', 2)  # Default 2 hours
+    start_time = booking_data.get('start_time')  # Get start_time from frontend
+    end_time = booking_data.get('end_time')      # Get end_time from frontend
+    
+    logger.debug("Booking request: lot_id=%s slot_id=%s start_time=%s end_time=%s", lot_id, slot_id, start_time, end_time)
+    
+    if not all([lot_id, slot_id, vehicle_number]):
+        return jsonify({'message': 'Missing required fields: lot_id, slot_id, vehicle_number'}), 400
+    
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        # Find the specific slot
+        cursor.execute(BOOKING_SLOT_QUERY, (slot_id,))
+        slot = cursor.fetchone()
+        
+        if not slot:
+            conn.close()
+            return jsonify({'message': 'Slot not found'}), 404
+        
+        if not slot['is_available']:
+            conn.close()
+            return jsonify({'message': 'Slot is already booked'}), 409
+        
+        # Calculate costs
+        hourly_rate = slot['price_per_hour']
+        slot_number = slot['slot_number']  # Extract slot_number from slot data
+        planned_cost = planned_duration * hourly_rate
+        
+        start_time, end_time = resolve_booking_window(start_time, end_time, planned_duration)
+        logger.debug("Booking window %s to %s, planned cost %s", start_time, end_time, planned_cost)
+        
+        try:
+            booking_id = record_booking(conn, user_id, lot_id, slot['id'], vehicle_number,
+                                        planned_duration, planned_cost, start_time, end_time)
+        except WriteConflict:
+            conn.close()
+            return jsonify({'message': 'Slot is already booked'}), 409
+        slot_allocator.mark_booked(slot['lot_id'], slot_number)
+        conn.close()
+        notify_slot_change('booked', slot['lot_id'], slot['id'], slot_number,
+                           booking_id=booking_id, user_id=user_id, vehicle_number=vehicle_number)
+        
+        logger.info("Slot booked", extra={'booking_id': booking_id, 'lot_id': slot['lot_id'],
+                                          'slot_number': slot_number, 'user_id': user_id})
+        
+        return jsonify({
+            'message': 'Slot booked successfully',
+            'booking': {
+                'booking_id': booking_id,
+                'slot_number': slot_number,
+                'lot_id': lot_id,
+                'user_id': user_id,
+                'vehicle_number': vehicle_number,
+                'planned_duration': planned_duration,
+                'planned_cost': planned_cost,
+                'hourly_rate': hourly_rate
+            }
+        }), 201
+        
+    except Exception as e:
+        logger.exception("Booking slot %s failed", slot_id)
+        return jsonify({'message': f'Booking failed: {str(e)}'}), 500
+
+# Candidates tried before "book any slot" gives up on a busy lot
+BOOK_ANY_MAX_ATTEMPTS = 5
+
+@app.route('/api/book-any-slot', methods=['POST'])
+@require_user
+def book_any_slot():
+    """Book whichever free slot the allocator picks in a lot."""
+    user_id = g.user_id
+    
+    booking_data = request.get_json() or {}
+    lot_id = booking_data.get('lot_id')
+    vehicle_number = booking_data.get('vehicle_number')
+    planned_duration = booking_data.get('duration', 2)  # Default 2 hours
+    
+    if not all([lot_id, vehicle_number]):
+        return jsonify({'message': 'Missing required fields: lot_id, vehicle_number'}), 400
+    
+    try:
+        lot_id = int(lot_id)
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT id, price_per_hour FROM parking_lots WHERE id = ?', (lot_id,))
+        lot = cursor.fetchone()
+        if not lot:
+            conn.close()
+            return jsonify({'message': 'Parking lot not found'}), 404
+        
+        hourly_rate = lot['price_per_hour']
+        planned_cost = planned_duration * hourly_rate
+        start_time, end_time = resolve_booking_window(
+            booking_data.get('start_time'), booking_data.get('end_time'), planned_duration
+        )
+        
+        sync_slot_allocator(conn)
+        refreshed = False
+        for _ in range(BOOK_ANY_MAX_ATTEMPTS):
+            candidate = slot_allocator.allocate(lot_id)
+            if candidate is None:
+                if refreshed:
+                    break
+                # Slots may have been released by another worker process
+                slot_allocator.rebuild(conn, lot_id)
+                refreshed = True
+                continue
+            
+            slot_id, slot_number = candidate
+            try:
+                booking_id = record_booking(conn, user_id, lot_id, slot_id, vehicle_number,
+                                            planned_duration, planned_cost, start_time, end_time)
+            except WriteConflict:
+                # Taken outside this process; the allocator has already dropped it
+                continue
+            except Exception:
+                slot_allocator.mark_free(lot_id, slot_id, slot_number)
+                raise
+            
+            conn.close()
+            notify_slot_change('booked', lot_id, slot_id, slot_number,
+                               booking_id=booking_id, user_id=user_id, vehicle_number=vehicle_number)
+            return jsonify({
+                'message': 'Slot booked successfully',
+                'booking': {
+                    'booking_id': booking_id,
+                    'slot_id': slot_id,
+                    'slot_number': slot_number,
+                    'lot_id': lot_id,
+                    'user_id': user_id,
+                    'vehicle_number': vehicle_number,
+                    'planned_duration': planned_duration,
+                    'planned_cost': planned_cost,
+                    'hourly_rate': hourly_rate
+                }
+            }), 201
+        
+        conn.close()
+        return jsonify({'message': 'No free slots available in this parking lot'}), 409
+        
+    except Exception as e:
+        logger.error("Error booking any slot in lot %s: %s", lot_id, e)
+        return jsonify({'message': f'Booking failed: {str(e)}'}), 500
+
+@app.route('/api/release-slot', methods=['POST'])
+@require_user
+def release_slot():
+    """Direct slot release implementation."""
+    user_id = g.user_id
+    
+    # Get request data
+    data = request.get_json() or {}
+    booking_id = data.get('booking_id')
+    slot_id = data.get('slot_id')  # Fallback for frontend compatibility
+    
+    # Support both booking_id and slot_id for compatibility
+    if not booking_id and not slot_id:
+        return jsonify({'message': 'Either booking_id or slot_id is required'}), 400
+    
+    logger.debug("Release request: booking_id=%s slot_id=%s", booking_id, slot_id)
+    
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        # Find the booking - support both booking_id and slot_id
+        if booking_id:
+            cursor.execute(ACTIVE_BOOKING_BY_ID_QUERY, (booking_id, user_id))
+        else:
+            # Find by slot_id - get the most recent active booking for this slot
+            cursor.execute(ACTIVE_BOOKING_BY_SLOT_QUERY, (slot_id, user_id))
+        
+        booking = cursor.fetchone()
+        
+        if not booking:
+            conn.close()
+            if booking_id:
+                return jsonify({'message': f'Active booking not found for booking_id: {booking_id}'}), 404
+            else:
+                return jsonify({'message': f'Active booking not found for slot_id: {slot_id}'}), 404
+        
+        # Extract slot_number for use in response
+        slot_number = booking['slot_number']
+        
+        # Calculate final cost
+        end_ts = now_epoch()
+        end_time = format_timestamp(end_ts)
+        actual_duration = (end_ts - booking['start_ts']) / 3600
+        final_cost = actual_duration * booking['price_per_hour']
+        
+        def complete_booking(cursor):
+            # Only an active booking can be completed, so double releases conflict
+            cursor.execute('''
+                UPDATE bookings SET 
+                    end_time = ?,
+                    end_ts = ?,
+                    actual_duration_hours = ?,
+                    final_cost = ?,
+                    status = 'completed',
+                    completed_at = ?
+                WHERE id = ? AND status = 'active'
+            ''', (end_time, end_ts, actual_duration, final_cost, end_time, booking['id']))
+            if cursor.rowcount != 1:
+                raise WriteConflict(f"Booking {booking['booking_id']} is no longer active")
+            
+            # Release the slot
+            cursor.execute('''
+                UPDATE parking_slots SET 
+                    is_available = 1,
+                    current_user_id = NULL,
+                    booking_id = NULL,
+                    vehicle_number = NULL,
+                    booking_start_time = NULL,
+                    planned_duration_hours = NULL,
+                    planned_cost = NULL
+                WHERE id = ?
+            ''', (booking['slot_id'],))
+            refresh_slot_view(cursor, slot_ids=(booking['slot_id'],))
+            
+            counters = {
+                status_counter('active'): -1,
+                status_counter('completed'): 1,
+                REVENUE_COMPLETED: final_cost,
+                SLOTS_OCCUPIED: -1,
+            }
+            if actual_duration > 0:
+                counters[DURATION_SUM] = actual_duration
+                counters[DURATION_COUNT] = 1
+            apply_stats(cursor, counters, day=day_of(end_time), revenue=final_cost)
+            bump_lot_versions(cursor, booking['lot_id'])
+        
+        try:
+            run_immediate(conn, complete_booking, stats=booking_contention)
+        except WriteConflict:
+            conn.close()
+            return jsonify({'message': 'Booking has already been released'}), 409
+        slot_allocator.mark_free(booking['lot_id'], booking['slot_id'], slot_number)
+        conn.close()
+        notify_slot_change('released', booking['lot_id'], booking['slot_id'], slot_number,
+                           booking_id=booking['booking_id'])
+        
+        logger.info("Slot released", extra={'booking_id': booking['booking_id'], 'lot_id': booking['lot_id'],
+                                            'slot_number': slot_number, 'user_id': user_id})
+        
+        # Format start_time for frontend consistency: 2025-08-01T22:16:00
+        formatted_start_time = format_timestamp(booking['start_ts'])
+        
+        return jsonify({
+            'message': 'Slot released successfully',
+            'booking_id': booking['booking_id'],
+            'slot_number': slot_number,
+            'slot_id': booking['slot_id'],  # Include slot_id for frontend compatibility
+            'final_cost': round(final_cost, 2),
+            'actual_duration': round(actual_duration, 2),
+            'start_time': formatted_start_time,
+            'startTime': formatted_start_time,  # Alternative key for frontend
+            'end_time': end_time,
+            'endTime': end_time,    # Alternative key for frontend
+            'vehicle_number': booking['vehicle_number'],
+            'lot_name': booking['lot_name'] if 'lot_name' in booking.keys() else '',
+            'planned_duration_hours': booking['planned_duration_hours'],
+            'planned_cost': booking['planned_cost']
+        }), 200
+        
+    except Exception as e:
+        logger.exception("Releasing booking %s (slot %s) failed", booking_id, slot_id)
+        return jsonify({'message': f'Failed to release slot: {str(e)}'}), 500
+
+# =============================================================================
+# SLOT EVENT STREAM
+# =============================================================================
+
+LOT_OCCUPANCY_SNAPSHOT_QUERY = '''
+    SELECT lot_id, COUNT(*) AS total_slots,
+           GROUP_CONCAT(CASE WHEN is_available = 0 THEN slot_number END) AS occupied
+    FROM parking_slots
+    {where}
+    GROUP BY lot_id
+'''
+
+def slot_snapshot_frame(lot_ids=None):
+    """Full occupancy of the watched lots as one SSE frame."""
+    where = ''
+    params = ()
+    if lot_ids:
+        where = f"WHERE lot_id IN ({', '.join('?' for _ in lot_ids)})"
+        params = tuple(lot_ids)
+    
+    # Streaming responses outlive the request connection, so borrow our own
+    conn = db_pool.acquire()
+    try:
+        rows = conn.execute(LOT_OCCUPANCY_SNAPSHOT_QUERY.format(where=where), params).fetchall()
+    finally:
+        conn.close()
+    
+    lots = {}
+    for row in rows:
+        occupied = row['occupied']
+        lots[row['lot_id']] = {
+            'total_slots': row['total_slots'],
+            'occupied_slots': sorted(int(n) for n in occupied.split(',')) if occupied else []
+        }
+    return format_frame('snapshot', {'lots': lots})
+
+@app.route('/api/events/slots', methods=['GET'])
+def stream_slot_events():
+    """Server-Sent Events stream of slot and lot changes.
+
+    Optional ?lots=1,2,3 limits the stream to those lots. The stream opens
+    with a snapshot, then sends 'slot' and 'lot' deltas; a client that falls
+    too far behind gets a fresh snapshot instead of the missed deltas.
+    """
+    lots_param = request.args.get('lots', '').strip()
+    try:
+        lot_ids = [int(lot_id) for lot_id in lots_param.split(',') if lot_id.strip()] if lots_param else None
+    except ValueError:
+        return jsonify({'error': 'lots must be a comma-separated list of lot ids'}), 400
+    
+    try:
+        subscription = slot_events.subscribe(lot_ids)
+    except SubscriberLimitReached as e:
+        logger.warning("Rejected slot event stream: %s", e)
+        return jsonify({'error': 'Too many open event streams, fall back to polling'}), 503
+    
+    def generate():
+        try:
+            yield f'retry: {int(SSE_HEARTBEAT_SECONDS * 1000)}\n\n'
+            yield slot_snapshot_frame(lot_ids)
+            while True:
+                overflowed, frames = subscription.drain(SSE_HEARTBEAT_SECONDS)
+                if overflowed:
+                    slot_events.record_resync()
+                    yield slot_snapshot_frame(lot_ids)
+                if frames:
+                    yield ''.join(frames)
+                elif not overflowed:
+                    yield HEARTBEAT_FRAME
+        finally:
+            slot_events.unsubscribe(subscription)
+    
+    response = Response(generate(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    # The generator never runs if the client disconnects before the first read
+    response.call_on_close(lambda: slot_events.unsubscribe(subscription))
+    return response
+
+# =============================================================================
+# DEBUG ROUTES FOR TESTING
+# =============================================================================
+
+@app.route('/api/debug/users', methods=['GET'])
+def debug_users():
+    """Debug route to test user listing without auth."""
+    with app.test_client() as client:
+        response = client.get('/api/admin/users')
+        return response.get_json(), response.status_code
+
+@app.route('/api/debug/delete-user/<int:user_id>', methods=['POST'])
+def debug_delete_user(user_id):
+    """Debug route to test user deletion without auth requirements."""
+    with app.test_client() as client:
+        response = client.delete(f'/api/admin/users/{user_id}')
+        return response.get_json(), response.status_code
+
+@app.route('/api/debug/update-lot/<int:lot_id>', methods=['POST'])
+def debug_update_lot(lot_id):
+    """Debug route to test lot update without auth requirements."""
+    data = request.get_json()
+    print(f"[DEBUG] Update lot request: {data}")
+    with app.test_client() as client:
+        response = client.put(f'/api/admin/parking-lots/{lot_id}', json=data)
+        return response.get_json(), response.status_code
+
+@app.route('/api/debug/profile/<int:user_id>', methods=['GET'])
+def debug_user_profile(user_id):
+    """Debug route to test user profile without auth requirements."""
+    print(f"[DEBUG] Getting profile for user ID: {user_id}")
+    
+    try:
+        import sqlite3
+        
+        DB_PATH = r'D:\MAD2\Parking App\instance\parking.db'
+        conn = sqlite3.connect(DB_PATH)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT * FROM users WHERE id = ? AND is_active = 0', (user_id,))
+        user = cursor.fetchone()
+        conn.close()
+        
+        if user:
+            profile_data = {
+                'id': user['id'],
+                'email': user['email'],
+                'full_name': user['full_name'],
+                'phone': user['phone'] or '',
+                'address_line1': user['address_line1'] or '',
+                'city': user['city'] or '',
+                'state': user['state'] or '',
+                'pin_code': user['pin_code'] or ''
+            }
+            
+            return jsonify({
+                'profile': profile_data,
+                'type': 'user'
+            }), 200
+        else:
+            return jsonify({'message': 'User not found'}), 404
+            
+    except Exception as e:
+        print(f"[ERROR] Debug profile error: {e}")
+        return jsonify({'message': f'Profile fetch failed: {str(e)}'}), 500
+
+@app.route('/api/debug/test-login', methods=['POST'])
+def debug_test_login():
+    """Debug route to test login without frontend."""
+    data = request.get_json()
+    email = data.get('email', 'test@example.com')
+    password = data.get('password', 'password123')
+    
+    print(f"[DEBUG] Test login for: {email}")
+    
+    try:
+        with app.test_client() as client:
+            response = client.post('/api/auth/user/login', 
+                                 json={'email': email, 'password': password})
+            return response.get_json(), response.status_code
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/debug/parking-lots', methods=['GET'])
+def debug_parking_lots():
+    """Debug route to test parking lots endpoint."""
+    print(f"[DEBUG] Testing parking lots endpoint")
+    
+    try:
+        with app.test_client() as client:
+            response = client.get('/api/admin/parking-lots')
+            print(f"[DEBUG] Admin parking lots response status: {response.status_code}")
+            print(f"[DEBUG] Admin parking lots response: {response.get_data(as_text=True)}")
+            
+            try:
+                data = response.get_json()
+                print(f"[DEBUG] Parsed JSON: {data}")
+                return data, response.status_code
+            except Exception as e:
+                print(f"[DEBUG] JSON parsing error: {e}")
+                return {"error": "Invalid JSON", "raw": response.get_data(as_text=True)}, response.status_code
+                
+    except Exception as e:
+        print(f"[ERROR] Debug parking lots error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/debug/add-sample-lots', methods=['POST'])
+def debug_add_sample_lots():
+    """Debug route to add sample parking lots."""
+    print(f"[DEBUG] Adding sample parking lots")
+    
+    try:
+        import sqlite3
+        from datetime import datetime
+        
+        DB_PATH = r'D:\MAD2\Parking App\instance\parking.db'
+        conn = sqlite3.connect(DB_PATH)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        # Check if parking lots already exist
+        cursor.execute("SELECT COUNT(*) FROM parking_lots")
+        existing_count = cursor.fetchone()[0]
+        
+        if existing_count > 0:
+            print(f"Database already has {existing_count} parking lots")
+            conn.close()
+            return jsonify({
+                'message': f'Database already has {existing_count} parking lots',
+                'existing_count': existing_count
+            }), 200
+        
+        sample_lots = [
+            {
+                'name': 'Central Mall Parking',
+                'address': '123 Main Street, Downtown',
+                'pincode': '110001',
+                'price_per_hour': 50.0,
+                'total_slots': 20
+            },
+            {
+                'name': 'City Hospital Parking',
+                'address': '456 Healthcare Avenue',
+                'pincode': '110002', 
+                'price_per_hour': 30.0,
+                'total_slots': 15
+            },
+            {
+                'name': 'Metro Station Park & Ride',
+                'address': '789 Transit Road',
+                'pincode': '110003',
+                'price_per_hour': 25.0,
+                'total_slots': 30
+            }
+        ]
+        
+        created_lots = []
+        for lot_data in sample_lots:
+            print(f"Creating parking lot: {lot_data['name']}")
+            
+            # Insert parking lot
+            cursor.execute('''
+                INSERT INTO parking_lots (name, address, pincode, price_per_hour, total_slots, created_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (
+                lot_data['name'],
+                lot_data['address'],
+                lot_data['pincode'],
+                lot_data['price_per_hour'],
+                lot_data['total_slots'],
+                datetime.now().isoformat()
+            ))
+            
+            lot_id = cursor.lastrowid
+            
+            # Create parking slots for the lot
+            created = provision_slots(cursor, lot_id, lot_data['total_slots'])
+            refresh_slot_view(cursor, lot_id=lot_id)
+            apply_stats(cursor, {LOTS_TOTAL: 1, SLOTS_TOTAL: created})
+            
+            created_lots.append({
+                'id': lot_id,
+                'name': lot_data['name'],
+                'total_slots': lot_data['total_slots']
+            })
+            
+            print(f"  Created {lot_data['total_slots']} slots for lot ID {lot_id}")
+        
+        bump_all_versions(cursor)
+        conn.commit()
+        conn.close()
+        
+        print(f"Successfully created {len(sample_lots)} sample parking lots!")
+        
+        return jsonify({
+            'message': f'Successfully created {len(sample_lots)} sample parking lots',
+            'created_lots': created_lots
+        }), 201
+        
+    except Exception as e:
+        print(f"[ERROR] Error adding sample lots: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/debug/check-db', methods=['GET'])
+def debug_check_db():
+    """Debug route to check database status."""
+    try:
+        import sqlite3
+        import os
+        
+        DB_PATH = r'D:\MAD2\Parking App\instance\parking.db'
+        
+        if not os.path.exists(DB_PATH):
+            return jsonify({'error': f'Database file does not exist at {DB_PATH}'}), 404
+        
+        conn = sqlite3.connect(DB_PATH)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        # Check parking_lots table
+        cursor.execute("SELECT COUNT(*) FROM parking_lots")
+        lots_count = cursor.fetchone()[0]
+        
+        # Check parking_slots table
+        cursor.execute("SELECT COUNT(*) FROM parking_slots")
+        slots_count = cursor.fetchone()[0]
+        
+        # Check users table
+        cursor.execute("SELECT COUNT(*) FROM users")
+        users_count = cursor.fetchone()[0]
+        
+        # Get sample data
+        cursor.execute("SELECT id, name, address, total_slots FROM parking_lots LIMIT 3")
+        sample_lots = [dict(row) for row in cursor.fetchall()]
+        
+        # Get sample users (handle potential column name variations)
+        try:
+            cursor.execute("SELECT id, email, full_name FROM users LIMIT 3")
+            sample_users = [dict(row) for row in cursor.fetchall()]
+        except Exception as user_error:
+            print(f"[DEBUG] Error getting users: {user_error}")
+            try:
+                cursor.execute("SELECT id, email, name FROM users LIMIT 3")
+                sample_users = [dict(row) for row in cursor.fetchall()]
+            except:
+                sample_users = []
+        
+        conn.close()
+        
+        return jsonify({
+            'database_exists': True,
+            'database_path': DB_PATH,
+            'parking_lots_count': lots_count,
+            'parking_slots_count': slots_count,
+            'users_count': users_count,
+            'sample_lots': sample_lots,
+            'sample_users': sample_users
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/debug/db-schema', methods=['GET'])
+def debug_db_schema():
+    """Debug route to check database schema."""
+    try:
+        import sqlite3
+        
+        DB_PATH = r'D:\MAD2\Parking App\instance\parking.db'
+        conn = sqlite3.connect(DB_PATH)
+        cursor = conn.cursor()
+        
+        # Get all table names
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        tables = [row[0] for row in cursor.fetchall()]
+        
+        schema_info = {}
+        for table in tables:
+            cursor.execute(f"PRAGMA table_info({table})")
+            columns = cursor.fetchall()
+            schema_info[table] = [{'name': col[1], 'type': col[2], 'not_null': col[3], 'pk': col[5]} for col in columns]
+        
+        conn.close()
+        
+        return jsonify({
+            'tables': tables,
+            'schema': schema_info
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/debug/create-test-user', methods=['GET'])
+def debug_create_test_user():
+    """Debug route to create a test user."""
+    try:
+        import sqlite3
+        from datetime import datetime
+        
+        DB_PATH = r'D:\MAD2\Parking App\instance\parking.db'
+        conn = sqlite3.connect(DB_PATH)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        # Check if test user already exists
+        cursor.execute("SELECT id FROM users WHERE email = ?", ('test@example.com',))
+        existing_user = cursor.fetchone()
+        
+        if existing_user:
+            conn.close()
+            return jsonify({
+                'message': 'Test user already exists',
+                'user_id': existing_user['id'],
+                'email': 'test@example.com'
+            }), 200
+        
+        # Create test user
+        password_hash = password_policy.hash('test123')
+        
+        cursor.execute('''
+            INSERT INTO users (full_name, email, phone, password, address_line1, city, state, pin_code, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            'Test User',
+            'test@example.com',
+            '1234567890',
+            password_hash,
+            '123 Test Street',
+            'Test City',
+            'Test State',
+            '123456',
+            datetime.now().isoformat()
+        ))
+        
+        user_id = cursor.lastrowid
+        bump_all_versions(cursor)
+        conn.commit()
+        conn.close()
+        
+        return jsonify({
+            'message': 'Test user created successfully',
+            'user_id': user_id,
+            'email': 'test@example.com',
+            'password': 'test123'
+        }), 201
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/debug/setup-test-user', methods=['GET'])
+def debug_setup_test_user():
+    """Create a test user and provide login instructions."""
+    try:
+        import sqlite3
+        from datetime import datetime
+        
+        DB_PATH = r'D:\MAD2\Parking App\instance\parking.db'
+        conn = sqlite3.connect(DB_PATH)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        # First, check if users table exists and what its structure is
+        cursor.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name='users'")
+        table_info = cursor.fetchone()
+        
+        if not table_info:
+            # Create users table if it doesn't exist
+            cursor.execute('''
+                CREATE TABLE users (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    full_name TEXT NOT NULL,
+                    email TEXT UNIQUE NOT NULL,
+                    phone TEXT,
+                    password TEXT NOT NULL,
+                    address_line1 TEXT,
+                    city TEXT,
+                    state TEXT,
+                    pin_code TEXT,
+                    is_active INTEGER DEFAULT 0,
+                    created_at TEXT
+                )
+            ''')
+            print("Created users table")
+        
+        # Check if test user exists
+        cursor.execute("SELECT id, email FROM users WHERE email = ?", ('test@example.com',))
+        existing_user = cursor.fetchone()
+        
+        if existing_user:
+            user_id = existing_user['id']
+            message = f"Test user already exists with ID {user_id}"
+        else:
+            # Create test user
+            password_hash = password_policy.hash('test123')
+            
+            cursor.execute('''
+                INSERT INTO users (full_name, email, phone, password, address_line1, city, state, pin_code, is_active, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                'Test User',
+                'test@example.com',
+                '1234567890',
+                password_hash,
+                '123 Test Street',
+                'Test City',
+                'Test State',
+                '123456',
+                0,  # is_active = 0 means active user
+                datetime.now().isoformat()
+            ))
+            
+            user_id = cursor.lastrowid
+            bump_all_versions(cursor)
+            conn.commit()
+            message = f"Test user created successfully with ID {user_id}"
+        
+        # Generate a test token for immediate use
+        test_token = token_signer.issue(user_id)
+        
+        conn.close()
+        
+        return jsonify({
+            'message': message,
+            'user_id': user_id,
+            'test_credentials': {
+                'email': 'test@example.com',
+                'password': 'test123'
+            },
+            'test_token': test_token,
+            'instructions': {
+                '1': 'Use the test credentials to log in through the frontend',
+                '2': 'Or use the test_token directly by setting localStorage.setItem("token", "' + test_token + '")',
+                '3': 'Then refresh the user dashboard'
+            }
+        }), 201
+        
+    except Exception as e:
+        import traceback
+        return jsonify({'error': str(e), 'traceback': traceback.format_exc()}), 500
+
+@app.route('/api/debug/test-auth-flow', methods=['GET'])
+def debug_test_auth_flow():
+    """Test the complete authentication flow."""
+    try:
+        import sqlite3
+        from datetime import datetime
+        
+        DB_PATH = r'D:\MAD2\Parking App\instance\parking.db'
+        conn = sqlite3.connect(DB_PATH)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        # 1. Check if users table exists
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='users'")
+        users_table_exists = cursor.fetchone() is not None
+        
+        if not users_table_exists:
+            return jsonify({
+                'error': 'Users table does not exist',
+                'solution': 'Database schema is incomplete'
+            }), 404
+        
+        # 2. Check if we have any users
+        cursor.execute("SELECT COUNT(*) as count FROM users")
+        user_count = cursor.fetchone()['count']
+        
+        if user_count == 0:
+            # Create a test user
+            password_hash = password_policy.hash('test123')
+            cursor.execute('''
+                INSERT INTO users (full_name, email, phone, password, address_line1, city, state, pin_code, is_active, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                'Test User',
+                'test@example.com',
+                '1234567890',
+                password_hash,
+                '123 Test Street',
+                'Test City',
+                'Test State',
+                '123456',
+                0,
+                datetime.now().isoformat()
+            ))
+            bump_all_versions(cursor)
+            conn.commit()
+            user_count = 1
+        
+        # 3. Get a test user
+        cursor.execute("SELECT id, email, full_name FROM users LIMIT 1")
+        test_user = cursor.fetchone()
+        
+        if not test_user:
+            return jsonify({'error': 'No users found even after creation'}), 404
+        
+        # 4. Generate test token
+        test_token = token_signer.issue(test_user['id'])
+        
+        # 5. Test the profile endpoint directly
+        with app.test_client() as client:
+            profile_response = client.get('/api/auth/profile', 
+                                        headers={'Authorization': f'Bearer {test_token}'})
+            profile_status = profile_response.status_code
+            profile_data = profile_response.get_data(as_text=True)
+        
+        # 6. Test parking lots endpoint
+        with app.test_client() as client:
+            lots_response = client.get('/api/parking-lots')
+            lots_status = lots_response.status_code
+            lots_data = lots_response.get_data(as_text=True)
+        
+        conn.close()
+        
+        return jsonify({
+            'users_table_exists': users_table_exists,
+            'user_count': user_count,
+            'test_user': {
+                'id': test_user['id'],
+                'email': test_user['email'],
+                'full_name': test_user['full_name']
+            },
+            'test_token': test_token,
+            'profile_test': {
+                'status': profile_status,
+                'response': profile_data[:500] + '...' if len(profile_data) > 500 else profile_data
+            },
+            'parking_lots_test': {
+                'status': lots_status,
+                'response': lots_data[:500] + '...' if len(lots_data) > 500 else lots_data
+            },
+            'instructions': {
+                'step1': f'Set token: localStorage.setItem("token", "{test_token}")',
+                'step2': 'Go to UserDashboard and check browser console for debug messages',
+                'step3': 'The profile and parking lots should now load'
+            }
+        }), 200
+        
+    except Exception as e:
+        import traceback
+@app.route('/api/debug/show-users', methods=['GET'])
+def debug_show_users():
+    """Show all users in the database with their details."""
+    try:
+        import sqlite3
+        
+        DB_PATH = r'D:\MAD2\Parking App\instance\parking.db'
+        conn = sqlite3.connect(DB_PATH)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        cursor.execute("SELECT id, email, full_name, password FROM users")
+        users = cursor.fetchall()
+        
+        users_list = []
+        for user in users:
+            users_list.append({
+                'id': user['id'],
+                'email': user['email'], 
+                'full_name': user['full_name'],
+                'password_hash': user['password'][:20] + '...' if len(user['password']) > 20 else user['password']
+            })
+        
+        conn.close()
+        
+        return jsonify({
+            'total_users': len(users_list),
+            'users': users_list,
+            'note': 'Try logging in with one of these emails. If you know the original password, use that. Otherwise, I can reset a password for testing.'
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/debug/reset-password', methods=['POST'])
+def debug_reset_password():
+    """Reset a user's password to a known value for testing."""
+    try:
+        import sqlite3
+        
+        data = request.get_json()
+        email = data.get('email')
+        new_password = data.get('password', 'test123')
+        
+        if not email:
+            return jsonify({'error': 'Email is required'}), 400
+        
+        DB_PATH = r'D:\MAD2\Parking App\instance\parking.db'
+        conn = sqlite3.connect(DB_PATH)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        # Check if user exists
+        cursor.execute("SELECT id FROM users WHERE email = ?", (email,))
+        user = cursor.fetchone()
+        
+        if not user:
+            conn.close()
+            return jsonify({'error': f'No user found with email: {email}'}), 404
+        
+        password_hash = password_policy.hash(new_password)
+        
+        cursor.execute("UPDATE users SET password = ? WHERE email = ?", (password_hash, email))
+        conn.commit()
+        conn.close()
+        
+        return jsonify({
+            'message': f'Password reset successfully for {email}',
+            'new_password': new_password,
+            'email': email
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/debug/frontend-test', methods=['GET'])
+def debug_frontend_test():
+    """Debug route to provide frontend testing info."""
+    return f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <title>Frontend Debug Test</title>
+        <script src="https://cdn.jsdelivr.net/npm/axios/dist/axios.min.js"></script>
+    </head>
+    <body>
+        <h1>Frontend Debug Test</h1>
+        <div id="output"></div>
+        
+        <button onclick="testAPI()">Test Parking Lots API</button>
+        <button onclick="checkToken()">Check Token</button>
+        <button onclick="testLogin()">Test Login</button>
+        
+        <script>
+            const output = document.getElementById('output');
+            
+            function log(message) {{
+                output.innerHTML += '<div>' + new Date().toLocaleTimeString() + ': ' + message + '</div>';
+            }}
+            
+            async function testAPI() {{
+                try {{
+                    log('Testing parking lots API...');
+                    const response = await axios.get('/api/parking-lots');
+                    log('API Response: ' + JSON.stringify(response.data, null, 2));
+                }} catch (error) {{
+                    log('API Error: ' + error.message);
+                }}
+            }}
+            
+            function checkToken() {{
+                const token = localStorage.getItem('token');
+                log('Token: ' + (token || 'No token found'));
+            }}
+            
+            async function testLogin() {{
+                try {{
+                    log('Testing user login...');
+                    const response = await axios.post('/api/auth/user/login', {{
+                        email: 'test@example.com',
+                        password: 'test123'
+                    }});
+                    log('Login Response: ' + JSON.stringify(response.data, null, 2));
+                    if (response.data.token) {{
+                        localStorage.setItem('token', response.data.token);
+                        log('Token saved to localStorage');
+                    }}
+                }} catch (error) {{
+                    log('Login Error: ' + error.message);
+                    if (error.response) {{
+                        log('Error Response: ' + JSON.stringify(error.response.data, null, 2));
+                    }}
+                }}
+            }}
+        </script>
+    </body>
+    </html>
+    """
+
+# =============================================================================
+# HEALTH CHECK ENDPOINTS
+# =============================================================================
+
+@app.route('/')
+def index():
+    """Basic health check endpoint."""
+    return {'message': 'Parking Management System API is running', 'status': 'healthy'}
+
+@app.route('/health')
+def health():
+    """Health check endpoint."""
+    return {'status': 'healthy', 'message': 'API is operational'}
+
+@app.route('/api/debug/db-pool', methods=['GET'])
+def debug_db_pool():
+    """Connection pool counters (hits, misses, wait time)."""
+    return jsonify(db_pool.stats()), 200
+
+@app.route('/api/debug/slot-events', methods=['GET'])
+def debug_slot_events():
+    """Slot event broker subscriber and delivery counters."""
+    return jsonify(slot_events.stats()), 200
+
+@app.route('/api/debug/export-workers', methods=['GET'])
+def debug_export_workers():
+    """Export worker pool queue depth and task counters."""
+    return jsonify(export_workers.stats()), 200
+
+@app.route('/api/debug/password-workers', methods=['GET'])
+def debug_password_workers():
+    """Password hashing pool queue depth and task counters."""
+    return jsonify(dict(password_workers.stats(), method=password_policy.method)), 200
+
+@app.route('/api/debug/booking-contention', methods=['GET'])
+def debug_booking_contention():
+    """Write-lock contention counters for booking and release."""
+    return jsonify(booking_contention.snapshot()), 200
+
+@app.route('/api/debug/read-cache', methods=['GET'])
+def debug_read_cache():
+    """Read-through cache hit/miss, coalescing and latency counters per namespace."""
+    return jsonify(read_cache.stats()), 200
+
+@app.route('/api/debug/profiling', methods=['GET'])
+def debug_profiling():
+    """Wall, CPU and SQL time per endpoint, and the slow request log (?slow=N newest)."""
+    slow_limit = request.args.get('slow', type=int)
+    return jsonify(dict(request_profiler.stats(slow_limit), enabled=PROFILING_ENABLED)), 200
+
+@app.route('/api/debug/profiling/reset', methods=['POST'])
+def reset_profiling():
+    """Start the profiling totals and slow log afresh."""
+    request_profiler.reset()
+    return jsonify({'message': 'Profiling data reset'}), 200
+
+@app.route('/api/debug/query-plans', methods=['GET'])
+def debug_query_plans():
+    """EXPLAIN QUERY PLAN output for the hot route queries."""
+    conn = get_db_connection()
+    return jsonify(explain_queries(conn, ROUTE_QUERY_PLANS)), 200
+
+@app.route('/api/admin/stats/reconcile', methods=['POST'])
+def reconcile_booking_stats():
+    """Rebuild the dashboard counters and the slot live view from the base tables."""
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute('BEGIN IMMEDIATE')
+        reconcile_stats(cursor)
+        rebuild_slot_view(cursor)
+        bump_all_versions(cursor)
+        conn.commit()
+        
+        counters, today_revenue, this_week_bookings = read_stats(conn)
+        logger.info("Reconciled booking stats counters")
+        return jsonify({
+            'message': 'Stats reconciled',
+            'counters': counters,
+            'todayRevenue': today_revenue,
+            'thisWeekBookings': this_week_bookings
+        }), 200
+        
+    except Exception as e:
+        logger.error("Error reconciling stats: %s", e)
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/debug/check-slots', methods=['GET'])
+def check_slots():
+    """Check and create parking slots if they don't exist."""
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        # Check if parking slots exist for lot_id = 1
+        cursor.execute('SELECT COUNT(*) as count FROM parking_slots WHERE lot_id = 1')
+        slot_count = cursor.fetchone()['count']
+        
+        if slot_count == 0:
+            # Create slots for lot_id = 1 (20 slots as per the lot data)
+            apply_stats(cursor, {SLOTS_TOTAL: provision_slots(cursor, 1, 20)})
+            refresh_slot_view(cursor, lot_id=1)
+            bump_lot_versions(cursor, 1)
+            conn.commit()
+            slot_allocator.rebuild(conn, 1)
+            notify_lot_change('updated', 1, total_slots=20)
+            cursor.execute('SELECT COUNT(*) as count FROM parking_slots WHERE lot_id = 1')
+            new_count = cursor.fetchone()['count']
+            
+            conn.close()
+            return jsonify({
+                'message': f'Created {new_count} parking slots for lot 1',
+                'created_slots': new_count
+            })
+        else:
+            # Get slot details
+            cursor.execute('SELECT * FROM parking_slots WHERE lot_id = 1 ORDER BY slot_number')
+            slots = [dict(row) for row in cursor.fetchall()]
+            
+            conn.close()
+            return jsonify({
+                'message': f'Found {slot_count} existing slots for lot 1',
+                'slots': slots
+            })
+            
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# =============================================================================
+# BULK IMPORT
+# =============================================================================
+
+# Rows per write transaction, and how many row errors are reported in full
+IMPORT_BATCH_SIZE = int(os.getenv('PARKING_IMPORT_BATCH_SIZE', 50000))
+IMPORT_MAX_ERRORS = int(os.getenv('PARKING_IMPORT_MAX_ERRORS', 1000))
+
+# One import at a time: every batch holds the write lock
+import_lock = threading.Lock()
+
+def run_import(conn, kind, stream, fmt, defer_indexes=False, batch_size=None):
+    """Import one kind of record from a text stream, yielding progress reports.
+
+    Running counters move with every batch; the slot live view, slot
+    allocator state and ETags are refreshed once the import ends.
+    """
+    importer = BulkImporter(
+        conn, kind,
+        batch_size=batch_size or IMPORT_BATCH_SIZE,
+        defer_indexes=defer_indexes,
+        max_errors=IMPORT_MAX_ERRORS,
+    )
+    try:
+        yield from importer.run_batches(read_rows(stream, fmt))
+    finally:
+        if importer.imported:
+            cursor = conn.cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+            for lot_id in importer.touched_lots:
+                refresh_slot_view(cursor, lot_id=lot_id)
+            bump_all_versions(cursor)
+            conn.commit()
+            # Other processes, such as a server running next to the CLI, rebuild
+            # theirs when they see the new generation
+            sync_slot_allocator(conn)
+
+@app.route('/api/admin/import/<kind>', methods=['POST'])
+def bulk_import(kind):
+    """Import lots, slots or historical bookings from an NDJSON or CSV body.
+
+    Answers with NDJSON: one progress line per committed batch, then the
+    final report including the rejected rows.
+    """
+    if kind not in IMPORT_KINDS:
+        return jsonify({'error': f"kind must be one of {', '.join(IMPORT_KINDS)}"}), 404
+    fmt = request.args.get('format') or ('csv' if request.mimetype == 'text/csv' else 'ndjson')
+    if fmt not in IMPORT_FORMATS:
+        return jsonify({'error': f"format must be one of {', '.join(IMPORT_FORMATS)}"}), 400
+    try:
+        batch_size = int(request.args.get('batch_size', IMPORT_BATCH_SIZE))
+    except ValueError:
+        return jsonify({'error': 'batch_size must be an integer'}), 400
+    defer_indexes = request.args.get('defer_indexes') in ('1', 'true')
+    if not import_lock.acquire(blocking=False):
+        return jsonify({'error': 'Another import is running'}), 409
+    lock_held = [True]
+
+    def release_import_lock():
+        if lock_held:
+            lock_held.pop()
+            import_lock.release()
+
+    def generate():
+        # The request body is read while the response streams
+        conn = db_pool.acquire()
+        try:
+            stream = io.TextIOWrapper(request.stream, encoding='utf-8', newline='')
+            for report in run_import(conn, kind, stream, fmt, defer_indexes, batch_size):
+                yield json.dumps(report) + '\n'
+        except InvalidImport as e:
+            yield json.dumps({'done': True, 'error': str(e)}) + '\n'
+        except Exception as e:
+            logger.error("Bulk import of %s failed: %s", kind, e)
+            yield json.dumps({'done': True, 'error': str(e)}) + '\n'
+        finally:
+            conn.close()
+            release_import_lock()
+
+    response = Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+    # Also released if the client goes away before the body is streamed
+    response.call_on_close(release_import_lock)
+    return response
+
+@app.cli.command('import-data')
+@click.argument('kind', type=click.Choice(IMPORT_KINDS))
+@click.argument('source', type=click.File('r', encoding='utf-8'), default='-')
+@click.option('--format', 'fmt', type=click.Choice(IMPORT_FORMATS), default=None,
+              help='Input format; defaults to csv for *.csv files, ndjson otherwise.')
+@click.option('--batch-size', type=int, default=None, help='Rows per transaction.')
+@click.option('--defer-indexes/--keep-indexes', default=False,
+              help='Drop secondary indexes during the load and rebuild them after. '
+                   'Only when no server is using the database.')
+def import_data_command(kind, source, fmt, batch_size, defer_indexes):
+    """Bulk import KIND records from SOURCE (a file, or - for stdin)."""
+    fmt = fmt or ('csv' if source.name.endswith('.csv') else 'ndjson')
+    with import_lock:
+        conn = db_pool.acquire()
+        try:
+            for report in run_import(conn, kind, source, fmt, defer_indexes, batch_size):
+                if not report['done']:
+                    click.echo(f"{report['rows']} rows read, {report['imported']} imported, "
+                               f"{report['error_count']} rejected ({report['rows_per_second']} rows/s)", err=True)
+        finally:
+            conn.close()
+    for error in report['errors']:
+        click.echo(f"line {error['line']}: {error['error']}", err=True)
+    click.echo(f"Imported {report['imported']} of {report['rows']} {kind} rows in "
+               f"{report['elapsed_seconds']}s ({report['rows_per_second']} rows/s), "
+               f"{report['error_count']} rejected")
+
+# =============================================================================
+# CSV EXPORT FUNCTIONALITY
+# =============================================================================
+
+import csv
+import gzip
+import secrets
+from datetime import datetime
+
+from backend.utils.export_jobs import ExportJobStore
+
+# Export workers, queue depth and per-user limit on queued/running jobs
+EXPORT_WORKERS = int(os.getenv('PARKING_EXPORT_WORKERS', 2))
+EXPORT_QUEUE_SIZE = int(os.getenv('PARKING_EXPORT_QUEUE_SIZE', 20))
+EXPORT_MAX_JOBS_PER_USER = int(os.getenv('PARKING_EXPORT_MAX_JOBS_PER_USER', 2))
+# Job records and files older than this are removed; jobs silent this long count as dead
+EXPORT_JOB_TTL_SECONDS = int(os.getenv('PARKING_EXPORT_JOB_TTL_SECONDS', 24 * 3600))
+EXPORT_JOB_STALE_SECONDS = int(os.getenv('PARKING_EXPORT_JOB_STALE_SECONDS', 600))
+EXPORT_CLEANUP_INTERVAL_SECONDS = int(os.getenv('PARKING_EXPORT_CLEANUP_INTERVAL_SECONDS', 600))
+# Minimum gap between progress writes to the job table
+EXPORT_PROGRESS_INTERVAL_SECONDS = float(os.getenv('PARKING_EXPORT_PROGRESS_INTERVAL_SECONDS', 0.5))
+EXPORTS_DIR = os.getenv('PARKING_EXPORTS_DIR', 'exports')
+
+export_jobs = ExportJobStore(db_pool, stale_after=EXPORT_JOB_STALE_SECONDS)
+export_workers = WorkerPool(workers=EXPORT_WORKERS, queue_size=EXPORT_QUEUE_SIZE, name='csv-export')
+last_export_cleanup = 0.0
+
+def cleanup_export_jobs():
+    removed_jobs, removed_files = export_jobs.cleanup(EXPORTS_DIR, EXPORT_JOB_TTL_SECONDS)
+    if removed_jobs or removed_files:
+        logger.info("Removed %s expired export jobs and %s files", removed_jobs, removed_files)
+
+def schedule_export_cleanup():
+    """Queue a cleanup pass if the last one is older than the interval."""
+    global last_export_cleanup
+    if time.time() - last_export_cleanup < EXPORT_CLEANUP_INTERVAL_SECONDS:
+        return
+    last_export_cleanup = time.time()
+    try:
+        export_workers.submit(cleanup_export_jobs)
+    except QueueFull:
+        # Exports come first; try again on a later request
+        last_export_cleanup = 0.0
+
+@app.route('/api/export/parking-history', methods=['POST'])
+@require_user
+def export_parking_history():
+    """Export user's parking history as CSV - Async Job"""
+    user_id = g.user_id
+    
+    # Get export parameters
+    export_data = request.get_json() or {}
+    date_from = export_data.get('date_from')  # Format: YYYY-MM-DD
+    date_to = export_data.get('date_to')      # Format: YYYY-MM-DD
+    status_filter = export_data.get('status', 'all')  # all, active, completed
+    compress = bool(export_data.get('compress', False))  # gzip the CSV file
+    stream = export_data.get('stream') or request.args.get('stream') in ('1', 'true')
+    
+    # The date filters become start_ts ranges, which needs real dates
+    try:
+        build_export_filters(user_id, date_from, date_to, status_filter)
+    except ValueError:
+        return jsonify({'message': 'date_from and date_to must be YYYY-MM-DD dates'}), 400
+    
+    # Small exports can skip the job and file round-trip entirely
+    if stream:
+        conn = get_db_connection()
+        total = count_export_rows(conn, user_id, date_from, date_to, status_filter)
+        conn.close()
+        if total <= EXPORT_STREAM_MAX_ROWS:
+            return stream_csv_export(user_id, date_from, date_to, status_filter)
+        logger.info("%d rows is too many to stream, starting a background job", total)
+    
+    schedule_export_cleanup()
+    
+    # Generate unique job ID
+    job_id = f"export_{user_id}_{int(time.time())}_{secrets.token_hex(3)}"
+    
+    # Record the job, unless the user already has the maximum number queued or running
+    if not export_jobs.create(job_id, user_id, max_active=EXPORT_MAX_JOBS_PER_USER):
+        return jsonify({
+            'message': f'You already have {EXPORT_MAX_JOBS_PER_USER} exports in progress. '
+                       'Please wait for one to finish.'
+        }), 429
+    
+    # Hand the job to the worker pool; refuse instead of queueing without bound
+    try:
+        export_workers.submit(process_csv_export, job_id, user_id, date_from, date_to, status_filter, compress)
+    except QueueFull:
+        export_jobs.delete(job_id)
+        response = jsonify({'message': 'The export service is busy. Please try again shortly.'})
+        response.headers['Retry-After'] = '30'
+        return response, 429
+    
+    return jsonify({
+        'job_id': job_id,
+        'message': 'Export job started successfully',
+        'status': 'started'
+    }), 202
+
+# Rows pulled from the cursor per fetchmany() call
+EXPORT_FETCH_SIZE = int(os.getenv('PARKING_EXPORT_FETCH_SIZE', 500))
+# Exports up to this many rows can be streamed straight into the response
+EXPORT_STREAM_MAX_ROWS = int(os.getenv('PARKING_EXPORT_STREAM_MAX_ROWS', 5000))
+
+CSV_HEADERS = [
+    'Booking Record ID',
+    'Booking ID',
+    'User Name',
+    'User Email', 
+    'User Phone',
+    'Parking Lot ID',
+    'Parking Lot Name',
+    'Lot Address',
+    'Lot Pincode',
+    'Slot ID',
+    'Spot ID (Slot Number)',
+    'Vehicle Number',
+    'Payment Method',
+    'Start Time',
+    'End Time',
+    'Planned Duration (Hours)',
+    'Actual Duration (Hours)',
+    'Planned Cost (₹)',
+    'Final Cost (₹)',
+    'Hourly Rate (₹)',
+    'Status',
+    'Booking Timestamp',
+    'Completion Timestamp',
+    'Remarks'
+]
+
+CSV_COLUMNS = (
+    'booking_record_id', 'booking_id', 'user_name', 'user_email', 'user_phone',
+    'lot_id', 'lot_name', 'lot_address', 'lot_pincode', 'slot_id', 'spot_id',
+    'vehicle_number', 'payment_method', 'start_time', 'end_time',
+    'planned_duration_hours', 'actual_duration_hours', 'planned_cost', 'final_cost',
+    'hourly_rate', 'status', 'booking_timestamp', 'completed_at', 'remarks'
+)
+
+def build_export_filters(user_id, date_from, date_to, status_filter):
+    """WHERE clause additions and params shared by the export and count queries."""
+    clauses = ''
+    params = [user_id]
+    
+    # Add date filters (whole local days, as start_ts ranges)
+    if date_from:
+        clauses += " AND b.start_ts >= ?"
+        params.append(day_start_epoch(date_from))
+    
+    if date_to:
+        clauses += " AND b.start_ts < ?"
+        params.append(day_end_epoch(date_to))
+    
+    # Add status filter
+    if status_filter and status_filter != 'all':
+        clauses += " AND b.status = ?"
+        params.append(status_filter)
+    
+    return clauses, params
+
+def count_export_rows(conn, user_id, date_from, date_to, status_filter):
+    clauses, params = build_export_filters(user_id, date_from, date_to, status_filter)
+    return conn.execute(EXPORT_COUNT_QUERY + clauses, params).fetchone()[0]
+
+def iter_csv_chunks(cursor, batch_size=EXPORT_FETCH_SIZE):
+    """Yield the CSV as text chunks, one per fetchmany() batch.
+
+    Only one batch of rows is held in memory at a time; the header is the
+    first chunk. Yields (chunk, rows_in_chunk).
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_HEADERS)
+    yield buffer.getvalue(), 0
+    
+    # Positional lookups are much cheaper than sqlite3.Row name lookups
+    names = [description[0] for description in cursor.description]
+    positions = [names.index(column) for column in CSV_COLUMNS]
+    
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([row[i] or '' for i in positions] for row in rows)
+        yield buffer.getvalue(), len(rows)
+
+def open_export_cursor(conn, user_id, date_from, date_to, status_filter):
+    clauses, params = build_export_filters(user_id, date_from, date_to, status_filter)
+    query = EXPORT_HISTORY_QUERY + clauses + " ORDER BY b.start_ts DESC"
+    return conn.execute(query, params)
+
+def process_csv_export(job_id, user_id, date_from, date_to, status_filter, compress=False):
+    """Background process to generate CSV export"""
+    conn = None
+    part_path = None
+    started = time.perf_counter()
+    outcome = 'failed'
+    try:
+        logger.info("Export job started", extra={'job_id': job_id, 'user_id': user_id})
+        
+        # Update job status
+        export_jobs.update(job_id, status='processing', progress=5, message='Counting booking records...')
+        
+        conn = get_db_connection()
+        total = count_export_rows(conn, user_id, date_from, date_to, status_filter)
+        logger.debug("Export job %s found %d booking records", job_id, total)
+        
+        export_jobs.update(job_id, progress=10, message=f'Found {total} records. Generating CSV...')
+        
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        file_name = f"parking_history_user_{user_id}_{timestamp}_{job_id[-6:]}.csv" + ('.gz' if compress else '')
+        file_path = os.path.join(EXPORTS_DIR, file_name)
+        # Written under a temporary name so a half-written file is never downloadable
+        part_path = file_path + '.part'
+        
+        # Create exports directory if it doesn't exist
+        os.makedirs(EXPORTS_DIR, exist_ok=True)
+        
+        if compress:
+            csvfile = gzip.open(part_path, 'wt', newline='', encoding='utf-8')
+        else:
+            csvfile = open(part_path, 'w', newline='', encoding='utf-8')
+        
+        written = 0
+        last_progress_write = time.monotonic()
+        with csvfile:
+            cursor = open_export_cursor(conn, user_id, date_from, date_to, status_filter)
+            for chunk, row_count in iter_csv_chunks(cursor):
+                csvfile.write(chunk)
+                written += row_count
+                # Progress goes to the shared job table, so throttle the writes
+                if row_count and time.monotonic() - last_progress_write >= EXPORT_PROGRESS_INTERVAL_SECONDS:
+                    last_progress_write = time.monotonic()
+                    # Rows can be added while we stream, so never report past 99%
+                    export_jobs.update(
+                        job_id,
+                        progress=min(99, 10 + int(89 * written / max(total, 1))),
+                        message=f'Exported {written} of {total} records...'
+                    )
+        
+        os.replace(part_path, file_path)
+        part_path = None
+        
+        # Complete job
+        export_jobs.update(
+            job_id,
+            status='completed',
+            progress=100,
+            message=f'Export completed successfully. {written} records exported.',
+            download_url=f'/api/download/{file_name}',
+            file_name=file_name,
+            record_count=written,
+            completed_at=datetime.now().isoformat()
+        )
+        
+        outcome = 'completed'
+        logger.info("Export job completed", extra={'job_id': job_id, 'records': written})
+        
+    except Exception as e:
+        logger.exception("Export job failed", extra={'job_id': job_id})
+        export_jobs.update(job_id, status='failed', progress=0, message=f'Export failed: {str(e)}', error=str(e))
+    finally:
+        if part_path and os.path.exists(part_path):
+            os.remove(part_path)
+        if conn is not None:
+            conn.close()
+        export_job_seconds.observe(time.perf_counter() - started, status=outcome)
+
+def stream_csv_export(user_id, date_from, date_to, status_filter):
+    """Response that streams a small export straight to the client."""
+    def generate():
+        # The request's pooled connection is released before the body is sent
+        conn = db_pool.acquire()
+        try:
+            cursor = open_export_cursor(conn, user_id, date_from, date_to, status_filter)
+            for chunk, _ in iter_csv_chunks(cursor):
+                yield chunk
+        finally:
+            conn.close()
+    
+    file_name = f"parking_history_user_{user_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    return Response(
+        generate(),
+        mimetype='text/csv',
+        headers={'Content-Disposition': f'attachment; filename="{file_name}"'}
+    )
+
+@app.route('/api/export/status/<job_id>', methods=['GET'])
+@require_user
+def get_export_status(job_id):
+    """Get export job status"""
+    user_id = g.user_id
+    
+    job = export_jobs.get(job_id)
+    if job is None:
+        return jsonify({'message': 'Job not found'}), 404
+    
+    # Verify job belongs to user
+    if job['user_id'] != user_id:
+        return jsonify({'message': 'Unauthorized access to job'}), 403
+    
+    return jsonify(job), 200
+
+@app.route('/api/download/<file_name>', methods=['GET'])
+@require_user
+def download_csv(file_name):
+    """Download CSV file"""
+    # Export files are named after their owner
+    if not file_name.startswith(f"parking_history_user_{g.user_id}_"):
+        return jsonify({'message': 'Unauthorized access to file'}), 403
+    
+    try:
+        from flask import send_file
+        # send_file resolves relative paths against the app root, not the working directory
+        file_path = os.path.abspath(os.path.join(EXPORTS_DIR, file_name))
+        
+        if not os.path.exists(file_path):
+            return jsonify({'message': 'File not found'}), 404
+        
+        return send_file(
+            file_path,
+            as_attachment=True,
+            download_name=file_name,
+            mimetype='application/gzip' if file_name.endswith('.gz') else 'text/csv'
+        )
+    except Exception as e:
+        return jsonify({'message': f'Download failed: {str(e)}'}), 500
+
+@app.route('/api/export/jobs', methods=['GET'])
+@require_user
+def get_user_export_jobs():
+    """Get user's export jobs history"""
+    user_id = g.user_id
+    
+    # Filter jobs for this user
+    user_jobs = export_jobs.list_for_user(user_id)
+    
+    return jsonify(user_jobs), 200
+
+# =============================================================================
+# METRICS
+# =============================================================================
+
+# Prometheus metrics at /metrics. Under a multi-process server point
+# PARKING_METRICS_DIR at a directory shared by the workers (emptied on
+# every restart), so any worker's scrape covers all of them.
+METRICS_DIR = os.getenv('PARKING_METRICS_DIR') or None
+METRICS_FLUSH_SECONDS = float(os.getenv('PARKING_METRICS_FLUSH_SECONDS', 5))
+
+metrics = MetricsRegistry(METRICS_DIR, flush_interval=METRICS_FLUSH_SECONDS)
+
+request_seconds = metrics.histogram(
+    'parking_http_request_duration_seconds', 'Request latency by route, to the last byte of the body',
+    ('method', 'route', 'code'))
+bookings_counter = metrics.counter('parking_bookings_total', 'Slots booked')
+releases_counter = metrics.counter('parking_releases_total', 'Slots released')
+lock_wait_seconds = metrics.histogram(
+    'parking_db_lock_wait_seconds', 'Wait for the SQLite write lock in book and release transactions',
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0))
+export_job_seconds = metrics.histogram(
+    'parking_export_job_duration_seconds', 'Background CSV export run time', ('status',),
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0))
+
+metrics.counter_callback(
+    'parking_booking_conflicts_total', 'Book or release transactions that lost the race for their slot',
+    lambda: booking_contention.snapshot()['conflicts'])
+metrics.counter_callback(
+    'parking_db_write_retries_total', 'Book or release transactions retried on a locked database',
+    lambda: booking_contention.snapshot()['retries'])
+metrics.counter_callback(
+    'parking_db_lock_timeouts_total', 'Book or release transactions that gave up on the write lock',
+    lambda: booking_contention.snapshot()['lock_timeouts'])
+metrics.counter_callback(
+    'parking_db_pool_wait_seconds_total', 'Time spent waiting for a free pooled connection',
+    lambda: db_pool.stats()['wait_time_ms'] / 1000)
+metrics.gauge_callback(
+    'parking_db_pool_connections', 'Pooled SQLite connections by state',
+    lambda: {state: value for state, value in db_pool.stats().items() if state in ('in_use', 'idle')},
+    ('state',))
+metrics.counter_callback(
+    'parking_cache_requests_total', 'Read-through cache lookups by namespace and result',
+    lambda: {(name, result): ns[field] for name, ns in read_cache.stats()['namespaces'].items()
+             for result, field in (('hit', 'hits'), ('miss', 'misses'))},
+    ('namespace', 'result'))
+metrics.gauge_callback(
+    'parking_cache_circuit_open', '1 while the Redis circuit breaker is open',
+    lambda: None if read_cache.breaker is None else int(read_cache.breaker.state == 'open'), mode=MAX)
+metrics.gauge_callback(
+    'parking_export_queue_depth', 'Export tasks waiting for a worker',
+    lambda: export_workers.stats()['queued'])
+metrics.gauge_callback(
+    'parking_export_jobs_running', 'Export tasks being run',
+    lambda: export_workers.stats()['running'])
+metrics.counter_callback(
+    'parking_export_tasks_total', 'Export tasks by outcome',
+    lambda: {outcome: value for outcome, value in export_workers.stats().items()
+             if outcome in ('completed', 'failed', 'rejected')},
+    ('outcome',))
+metrics.gauge_callback(
+    'parking_sse_subscribers', 'Open slot event streams',
+    lambda: slot_events.stats()['subscribers'])
+metrics.counter_callback(
+    'parking_log_records_dropped_total', 'Log records not written: sampled out, or the log queue was full',
+    lambda: {'sampled': log_sampler.sampled_out, 'queue_full': log_pipeline.stats()['dropped']},
+    ('reason',))
+metrics.gauge_callback(
+    'parking_log_queue_depth', 'Log records waiting for the writer thread',
+    lambda: log_pipeline.stats()['queued'], mode=MAX)
+
+def lot_occupancy():
+    """Free and occupied slots per lot, read from the database at scrape time."""
+    rows = get_db_connection().execute('''
+        SELECT lot_id, SUM(is_available) AS free, COUNT(*) - SUM(is_available) AS occupied
+        FROM parking_slots GROUP BY lot_id
+    ''').fetchall()
+    occupancy = {}
+    for row in rows:
+        occupancy[(row['lot_id'], 'free')] = row['free']
+        occupancy[(row['lot_id'], 'occupied')] = row['occupied']
+    return occupancy
+
+metrics.gauge_callback('parking_lot_slots', 'Slots per lot by state', lot_occupancy,
+                       ('lot_id', 'state'), mode=CURRENT)
+
+def observe_request(profile):
+    # Event streams stay open for minutes; their latency says nothing
+    if not profile.long_lived:
+        request_seconds.observe(profile.wall, method=profile.method,
+                                route=profile.endpoint or '<unmatched>', code=profile.status or 500)
+
+request_profiler.subscribe(observe_request)
+booking_contention.subscribe(lambda waited_ms: lock_wait_seconds.observe(waited_ms / 1000))
+
+@app.before_request
+def start_metrics_flusher():
+    """Have each worker write its snapshot for the others' scrapes (no-op without PARKING_METRICS_DIR)."""
+    metrics.ensure_flusher()
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Every metric in the Prometheus text format."""
+    return Response(metrics.render(), content_type=METRICS_CONTENT_TYPE)
+
+if __name__ == '__main__':
+    print("Starting Parking Management System...")
+    print("Admin API endpoints available at: http://localhost:5001/api/admin/")
+    print("User API endpoints available at: http://localhost:5001/api/user/")
+    print("Database location: D:\\MAD2\\Parking App\\instance\\parking.db")
+    app.run(debug=True, port=5001, host='0.0.0.0')
@@ -1,87 +1,163 @@
-"""
-Redis Configuration for ParkEase
-Handles Redis connections for caching and Celery message broker
-"""
-
-import os
-import redis
-from flask_caching import Cache
-
-# Redis connection settings
-REDIS_HOST = os.getenv('REDIS_HOST', 'localhost')
-REDIS_PORT = int(os.getenv('REDIS_PORT', 6379))
-REDIS_DB = int(os.getenv('REDIS_DB', 0))
-REDIS_PASSWORD = os.getenv('REDIS_PASSWORD', None)
-
-# Redis URLs for different purposes
-REDIS_URL = f"redis://:{REDIS_PASSWORD}@{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}" if REDIS_PASSWORD else f"redis://{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}"
-CELERY_BROKER_URL = f"redis://:{REDIS_PASSWORD}@{REDIS_HOST}:{REDIS_PORT}/1" if REDIS_PASSWORD else f"redis://{REDIS_HOST}:{REDIS_PORT}/1"
-CELERY_RESULT_BACKEND = f"redis://:{REDIS_PASSWORD}@{REDIS_HOST}:{REDIS_PORT}/2" if REDIS_PASSWORD else f"redis://{REDIS_HOST}:{REDIS_PORT}/2"
-
-# Flask-Caching configuration
-CACHE_CONFIG = {
-    'CACHE_TYPE': 'RedisCache',
-    'CACHE_REDIS_HOST': REDIS_HOST,
-    'CACHE_REDIS_PORT': REDIS_PORT,
-    'CACHE_REDIS_DB': REDIS_DB,
-    'CACHE_REDIS_PASSWORD': REDIS_PASSWORD,
-    'CACHE_DEFAULT_TIMEOUT': 300,  # 5 minutes default
-    'CACHE_KEY_PREFIX': 'parkeasy_'
-}
-
-# Create Redis client
-def get_redis_client():
-    """Get Redis client instance"""
-    try:
-        client = redis.Redis(
-            host=REDIS_HOST,
-            port=REDIS_PORT,
-            db=REDIS_DB,
-            password=REDIS_PASSWORD,
-            decode_responses=True,
-            socket_connect_timeout=5,
-            socket_timeout=5,
-            retry_on_timeout=True
-        )
-        # Test connection
-        client.ping()
-        return client
-    except redis.ConnectionError as e:
-        print(f"Redis connection failed: {e}")
-        return None
-    except Exception as e:
-        print(f"Redis client error: {e}")
-        return None
-
-# Initialize cache (will be configured in main app)
-cache = Cache()
-
-# Global Redis client instance
-redis_client = None
-
-def init_redis(app):
-    """Initialize Redis connection and Flask-Caching"""
-    global redis_client
-    
-    try:
-        # Configure Flask-Caching
-        app.config.update(CACHE_CONFIG)
-        cache.init_app(app)
-        
-        # Initialize Redis client
-        redis_client = get_redis_client()
-        
-        if redis_client:
-            print("✅ Redis initialized successfully")
-            return True
-        else:
-            print("⚠️ Redis initialization failed - using database fallback")
-            return False
-            
-    except Exception as e:
-        print(f"❌ Redis initialization error: {e}")
-        print("📝 Running with database fallback")
-        return False
-
-# Initialize redis_client on import for backward compatibility
-redis_client = get_redis_client()
+"""
+Redis Configuration for ParkEase
+Handles Redis connections for caching and Celery message broker
+"""
+
+import logging
+import os
+import threading
+import time
+
+from backend.utils.circuit_breaker import CLOSED, CircuitBreaker
+
+logger = logging.getLogger(__name__)
+
+# Both are optional: without them the app caches in-process only
+try:
+    import redis
+except ImportError:
+    redis = None
+try:
+    from flask_caching import Cache
+except ImportError:
+    Cache = None
+
+# Redis connection settings
+REDIS_HOST = os.getenv('REDIS_HOST', 'localhost')
+REDIS_PORT = int(os.getenv('REDIS_PORT', 6379))
+REDIS_DB = int(os.getenv('REDIS_DB', 0))
+REDIS_PASSWORD = os.getenv('REDIS_PASSWORD', None)
+# Request-path calls give up quickly; the breaker below stops them after a few failures
+REDIS_CONNECT_TIMEOUT = float(os.getenv('REDIS_CONNECT_TIMEOUT', 1.0))
+REDIS_SOCKET_TIMEOUT = float(os.getenv('REDIS_SOCKET_TIMEOUT', 1.0))
+REDIS_MAX_CONNECTIONS = int(os.getenv('REDIS_MAX_CONNECTIONS', 50))
+REDIS_HEALTH_INTERVAL = float(os.getenv('REDIS_HEALTH_INTERVAL', 5.0))
+REDIS_FAILURE_THRESHOLD = int(os.getenv('REDIS_FAILURE_THRESHOLD', 3))
+
+# Redis URLs for different purposes
+REDIS_URL = f"redis://:{REDIS_PASSWORD}@{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}" if REDIS_PASSWORD else f"redis://{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}"
+CELERY_BROKER_URL = f"redis://:{REDIS_PASSWORD}@{REDIS_HOST}:{REDIS_PORT}/1" if REDIS_PASSWORD else f"redis://{REDIS_HOST}:{REDIS_PORT}/1"
+CELERY_RESULT_BACKEND = f"redis://:{REDIS_PASSWORD}@{REDIS_HOST}:{REDIS_PORT}/2" if REDIS_PASSWORD else f"redis://{REDIS_HOST}:{REDIS_PORT}/2"
+
+# Flask-Caching configuration
+CACHE_CONFIG = {
+    'CACHE_TYPE': 'RedisCache',
+    'CACHE_REDIS_HOST': REDIS_HOST,
+    'CACHE_REDIS_PORT': REDIS_PORT,
+    'CACHE_REDIS_DB': REDIS_DB,
+    'CACHE_REDIS_PASSWORD': REDIS_PASSWORD,
+    'CACHE_DEFAULT_TIMEOUT': 300,  # 5 minutes default
+    'CACHE_KEY_PREFIX': 'parkeasy_'
+}
+
+# Nothing below touches the network at import time. The pool opens
+# connections on first use, and until the health checker's first PING
+# succeeds the breaker stays open, so callers use their fallback at once.
+_pool = None
+_pool_lock = threading.Lock()
+_health_thread = None
+_health_pid = None
+
+redis_breaker = CircuitBreaker('redis', failure_threshold=REDIS_FAILURE_THRESHOLD, start_open=True)
+
+def _log_transition(state):
+    if state == CLOSED:
+        logger.info("Redis at %s:%s is available", REDIS_HOST, REDIS_PORT)
+    else:
+        logger.warning("Redis at %s:%s is unavailable; using fallbacks", REDIS_HOST, REDIS_PORT)
+
+redis_breaker.subscribe(_log_transition)
+
+def get_connection_pool():
+    """The process-wide connection pool, created on first call (no I/O)."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = redis.ConnectionPool(
+                    host=REDIS_HOST,
+                    port=REDIS_PORT,
+                    db=REDIS_DB,
+                    password=REDIS_PASSWORD,
+                    decode_responses=True,
+                    socket_connect_timeout=REDIS_CONNECT_TIMEOUT,
+                    socket_timeout=REDIS_SOCKET_TIMEOUT,
+                    max_connections=REDIS_MAX_CONNECTIONS,
+                )
+    return _pool
+
+def get_redis_client():
+    """Redis client on the shared pool, or None if redis-py is missing.
+
+    Returns immediately. Check redis_available() (or redis_breaker) before
+    relying on it, and report failures with redis_breaker.record_failure().
+    """
+    if redis is None:
+        return None
+    start_health_checker()
+    return redis.Redis(connection_pool=get_connection_pool())
+
+def redis_available():
+    """Whether the last health check (and recent calls) found Redis up."""
+    if redis is None:
+        return False
+    start_health_checker()
+    return redis_breaker.allow()
+
+def start_health_checker():
+    """Start the background PING loop for this process (again after a fork)."""
+    global _health_thread, _health_pid
+    if _health_pid == os.getpid() and _health_thread is not None:
+        return
+    with _pool_lock:
+        if _health_pid == os.getpid() and _health_thread is not None:
+            return
+        _health_thread = threading.Thread(target=_check_health, name='redis-health', daemon=True)
+        _health_pid = os.getpid()
+        _health_thread.start()
+
+def _check_health():
+    client = redis.Redis(connection_pool=get_connection_pool())
+    checked = False
+    while True:
+        try:
+            client.ping()
+        except Exception as e:
+            # The breaker starts open, so the first failure is not a transition
+            if not checked:
+                logger.warning("Redis at %s:%s is unavailable; using fallbacks (%s)", REDIS_HOST, REDIS_PORT, e)
+            redis_breaker.record_failure(force=True)
+        else:
+            redis_breaker.record_success()
+        checked = True
+        time.sleep(REDIS_HEALTH_INTERVAL)
+
+# Initialize cache (will be configured in main app)
+cache = Cache() if Cache is not None else None
+
+# Global Redis client instance
+redis_client = None
+
+def init_redis(app):
+    """Initialize Flask-Caching and the Redis client without waiting on Redis"""
+    global redis_client
+    
+    try:
+        # Configure Flask-Caching
+        if cache is not None:
+            app.config.update(CACHE_CONFIG)
+            cache.init_app(app)
+        
+        # Initialize Redis client; availability is known after the first health check
+        redis_client = get_redis_client()
+        
+        if redis_client:
+            logger.info("Redis client configured (health checked in the background)")
+            return True
+        else:
+            logger.warning("redis-py not installed; using the database fallback")
+            return False
+            
+    except Exception:
+        logger.exception("Redis initialization failed; using the database fallback")
+        return False
@@ -0,0 +1,98 @@
+"""
+Booking listing query builder for the Parking Management System
+Builds the WHERE clause once and emits both the page query and a lean count query
+"""
+
+from datetime import date, timedelta
+
+from backend.utils.timestamps import day_start_epoch
+
+BOOKING_LIST_COLUMNS = '''
+    b.*, u.full_name as user_name, u.email as user_email,
+    pl.name as lot_name, pl.address as lot_address
+'''
+
+# Joins the listing can add, keyed by the alias their columns use
+BOOKING_JOINS = {
+    'u': 'LEFT JOIN users u ON b.user_id = u.id',
+    'pl': 'LEFT JOIN parking_lots pl ON b.lot_id = pl.id',
+}
+
+# Newest first; id breaks ties so keyset cursors are exact
+BOOKING_LIST_ORDER = ' ORDER BY b.start_ts DESC, b.id DESC'
+
+# Relative periods accepted by the ?status= filter, in days back from today
+PERIOD_FILTERS = {'today': 0, 'week': 7, 'month': 30}
+
+
+class BookingListQuery:
+    """Filters for the admin bookings listing.
+
+    Every predicate is stored with the table aliases it needs, so the count
+    query only joins what the filters actually reference.
+    """
+
+    def __init__(self):
+        self._predicates = []
+        self._params = []
+        self._aliases = set()
+
+    def where(self, sql, *params, aliases=()):
+        self._predicates.append(sql)
+        self._params.extend(params)
+        self._aliases.update(aliases)
+        return self
+
+    def status(self, status_filter, today=None):
+        """Apply the ?status= filter: 'all', a period, or a booking status."""
+        if status_filter in (None, '', 'all'):
+            return self
+        if status_filter in PERIOD_FILTERS:
+            start, end = period_range(status_filter, today)
+            return self.started_between(day_start_epoch(start), day_start_epoch(end) if end else None)
+        return self.where('b.status = ?', status_filter)
+
+    def started_between(self, start, end=None):
+        """Range on the start_ts epoch column, given as epoch seconds."""
+        self.where('b.start_ts >= ?', start)
+        if end is not None:
+            self.where('b.start_ts < ?', end)
+        return self
+
+    def _where_sql(self, extra=()):
+        predicates = self._predicates + list(extra)
+        return (' WHERE ' + ' AND '.join(predicates)) if predicates else ''
+
+    def _joins_sql(self, aliases):
+        return ''.join(f' {BOOKING_JOINS[alias]}' for alias in BOOKING_JOINS if alias in aliases)
+
+    def count_sql(self):
+        """COUNT(*) over the filtered bookings, joining only what filters need."""
+        sql = 'SELECT COUNT(*) FROM bookings b' + self._joins_sql(self._aliases) + self._where_sql()
+        return sql, list(self._params)
+
+    def page_sql(self, limit, after=None, offset=None):
+        """One page of the listing, after a (start_ts, id) keyset or at an offset."""
+        extra = []
+        params = list(self._params)
+        if after is not None:
+            extra.append('(b.start_ts, b.id) < (?, ?)')
+            params.extend(after)
+        sql = (f'SELECT {BOOKING_LIST_COLUMNS} FROM bookings b' + self._joins_sql(BOOKING_JOINS)
+               + self._where_sql(extra) + BOOKING_LIST_ORDER + ' LIMIT ?')
+        params.append(limit)
+        if offset is not None:
+            sql += ' OFFSET ?'
+            params.append(offset)
+        return sql, params
+
+
+def period_range(period, today=None):
+    """(start, end) day bounds for a relative period, as YYYY-MM-DD strings.
+
+    Only 'today' has an upper bound.
+    """
+    today = today or date.today()
+    start = today - timedelta(days=PERIOD_FILTERS[period])
+    end = today + timedelta(days=1) if period == 'today' else None
+    return start.isoformat(), (end.isoformat() if end else None)
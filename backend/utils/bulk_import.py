@@ -0,0 +1,473 @@
+"""
+Bulk data import for the Parking Management System
+Validates NDJSON or CSV rows and loads them in large batched transactions
+"""
+
+import csv
+import json
+import secrets
+import sqlite3
+import time
+
+from backend.utils.stats import (
+    BOOKINGS_TOTAL, DURATION_COUNT, DURATION_SUM, LOTS_TOTAL, REVENUE_COMPLETED, SLOTS_TOTAL,
+    apply_daily_stats, apply_stats, status_counter,
+)
+from backend.utils.timestamps import epoch_sql, format_timestamp, now_timestamp, parse_timestamp
+
+IMPORT_KINDS = ('lots', 'slots', 'bookings')
+IMPORT_FORMATS = ('ndjson', 'csv')
+
+# Active bookings would also need their slot marked occupied; release them at the source
+IMPORT_BOOKING_STATUSES = ('completed', 'cancelled')
+
+# Secondary indexes dropped for a bulk load, kept here until they are rebuilt
+# so a crash mid-import cannot lose them (see restore_indexes)
+CREATE_DEFERRED_INDEXES_TABLE = (
+    '''
+    CREATE TABLE IF NOT EXISTS import_deferred_indexes (
+        name TEXT PRIMARY KEY,
+        table_name TEXT NOT NULL,
+        sql TEXT NOT NULL
+    )
+    ''',
+)
+
+_TABLES = {'lots': 'parking_lots', 'slots': 'parking_slots', 'bookings': 'bookings'}
+
+# Indexes the import itself reads, so they stay while the others are deferred
+_KEPT_INDEXES = {'bookings': ('idx_bookings_booking_id',)}
+
+INSERT_LOTS = '''
+    INSERT INTO parking_lots (name, address, pincode, price_per_hour, total_slots, created_at)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+# Slots 1..total_slots for every lot inserted after the given id
+FILL_NEW_LOT_SLOTS = '''
+    INSERT INTO parking_slots (slot_number, lot_id, is_available)
+    WITH RECURSIVE numbers(n) AS (
+        SELECT 1 UNION ALL SELECT n + 1 FROM numbers WHERE n < ?
+    )
+    SELECT numbers.n, pl.id, 1 FROM parking_lots pl
+    JOIN numbers ON numbers.n <= pl.total_slots
+    WHERE pl.id > ?
+'''
+
+INSERT_SLOTS = 'INSERT INTO parking_slots (lot_id, slot_number, is_available) VALUES (?, ?, ?)'
+
+SYNC_LOT_TOTALS = '''
+    UPDATE parking_lots
+    SET total_slots = (SELECT COUNT(*) FROM parking_slots ps WHERE ps.lot_id = parking_lots.id)
+    WHERE id = ?
+'''
+
+# start_ts/end_ts are derived in SQL from parameters 7 and 8 (start/end time).
+# booking_id is not UNIQUE in every deployed schema, so existing ids are
+# looked up per batch (EXISTING_BOOKING_IDS) rather than left to a constraint.
+INSERT_BOOKINGS = f'''
+    INSERT INTO bookings (
+        user_id, lot_id, slot_id, booking_id, vehicle_number,
+        payment_method, start_time, end_time, planned_duration_hours,
+        actual_duration_hours, planned_cost, final_cost, status,
+        booking_created_at, completed_at, start_ts, end_ts
+    ) VALUES (?1, ?2, ?3, ?4, ?5, ?6, ?7, ?8, ?9, ?10, ?11, ?12, ?13, ?14, ?15,
+              {epoch_sql('?7')}, {epoch_sql('?8')})
+'''
+
+EXISTING_BOOKING_IDS = 'SELECT booking_id FROM bookings WHERE booking_id IN ({})'
+# Bound parameters per EXISTING_BOOKING_IDS query
+BOOKING_ID_CHUNK = 500
+
+
+class InvalidImport(Exception):
+    """Raised for an unknown import kind or format, or an unreadable header."""
+
+
+class RowError(ValueError):
+    """A single input row failed validation; the import carries on."""
+
+
+def read_rows(stream, fmt):
+    """Yield (line number, record dict or None, error message or None) from a text stream."""
+    if fmt == 'ndjson':
+        for line_no, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_no, None, f'invalid JSON: {e}'
+                continue
+            if isinstance(record, dict):
+                yield line_no, record, None
+            else:
+                yield line_no, None, 'expected a JSON object'
+    elif fmt == 'csv':
+        reader = csv.DictReader(stream)
+        if not reader.fieldnames:
+            raise InvalidImport('CSV input has no header row')
+        for record in reader:
+            yield reader.line_num, record, None
+    else:
+        raise InvalidImport(f"format must be one of {', '.join(IMPORT_FORMATS)}")
+
+
+# The converters below return early for values that are already the right
+# type (JSON numbers, normalised timestamps): they run per field per row
+
+def _value(record, key):
+    value = record.get(key)
+    return None if value == '' else value
+
+
+def _missing(key, required):
+    if required:
+        raise RowError(f'{key} is required')
+    return None
+
+
+def _int(record, key, required=True):
+    value = record.get(key)
+    if type(value) is int:
+        return value
+    if value is None or value == '':
+        return _missing(key, required)
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise RowError(f'{key} must be an integer, got {value!r}')
+
+
+def _float(record, key, required=False):
+    value = record.get(key)
+    if type(value) is float:
+        return value
+    if value is None or value == '':
+        return _missing(key, required)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise RowError(f'{key} must be a number, got {value!r}')
+
+
+def _timestamp(record, key, required=False):
+    """ISO timestamp normalised to the YYYY-MM-DDTHH:MM:SS form the app writes."""
+    value = record.get(key)
+    if value is None or value == '':
+        return _missing(key, required)
+    parsed = parse_timestamp(value)
+    if parsed is None:
+        raise RowError(f'{key} must be an ISO timestamp, got {value!r}')
+    if len(value) == 19 and value[10] == 'T':
+        return value
+    return format_timestamp(parsed)
+
+
+def _text(record, key, required=False):
+    value = record.get(key)
+    if value is None or value == '':
+        return _missing(key, required)
+    return value if type(value) is str else str(value)
+
+
+def defer_indexes(conn, table, keep=()):
+    """Drop `table`'s secondary indexes but `keep`, recording them for restore_indexes()."""
+    indexes = [(name, sql) for name, sql in conn.execute('''
+        SELECT name, sql FROM sqlite_master
+        WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL
+    ''', (table,)) if name not in keep]
+    conn.execute('BEGIN IMMEDIATE')
+    conn.executemany(
+        'INSERT OR REPLACE INTO import_deferred_indexes (name, table_name, sql) VALUES (?, ?, ?)',
+        [(name, table, sql) for name, sql in indexes]
+    )
+    for name, _ in indexes:
+        conn.execute(f'DROP INDEX IF EXISTS "{name}"')
+    conn.commit()
+    return [name for name, _ in indexes]
+
+
+def restore_indexes(conn):
+    """Rebuild every index a bulk import dropped. Returns their names."""
+    indexes = conn.execute('SELECT name, sql FROM import_deferred_indexes').fetchall()
+    for name, sql in indexes:
+        conn.execute(sql.replace('CREATE INDEX', 'CREATE INDEX IF NOT EXISTS', 1)
+                     .replace('CREATE UNIQUE INDEX', 'CREATE UNIQUE INDEX IF NOT EXISTS', 1))
+        conn.execute('DELETE FROM import_deferred_indexes WHERE name = ?', (name,))
+        conn.commit()
+    return [name for name, _ in indexes]
+
+
+class BulkImporter:
+    """Validate rows of one kind and insert them `batch_size` at a time.
+
+    Every batch is one write transaction that also moves the running stats
+    counters, so the dashboard stays correct without a reconcile. Invalid
+    rows are skipped and reported with their line number; the first
+    `max_errors` are kept in full.
+    """
+
+    def __init__(self, conn, kind, batch_size=50000, defer_indexes=False, max_errors=1000):
+        if kind not in IMPORT_KINDS:
+            raise InvalidImport(f"kind must be one of {', '.join(IMPORT_KINDS)}")
+        self.conn = conn
+        self.kind = kind
+        self.batch_size = batch_size
+        self.defer_indexes = defer_indexes
+        self.max_errors = max_errors
+        self.rows = 0
+        self.imported = 0
+        self.error_count = 0
+        self.errors = []
+        self.touched_lots = set()
+        self._started = None
+
+    def run(self, rows):
+        """Import an iterable from read_rows(); returns the final report."""
+        for report in self.run_batches(rows):
+            pass
+        return report
+
+    def run_batches(self, rows):
+        """Import like run(), yielding a progress report after every committed
+        batch and the final report (done=True) last."""
+        self._started = time.perf_counter()
+        self._load_lookups()
+        validate = getattr(self, f'_{self.kind}_row')
+        insert = getattr(self, f'_insert_{self.kind}')
+        deferred = (defer_indexes(self.conn, _TABLES[self.kind], keep=_KEPT_INDEXES.get(self.kind, ()))
+                    if self.defer_indexes else [])
+
+        try:
+            batch = []
+            for line_no, record, error in rows:
+                self.rows += 1
+                if error is None:
+                    try:
+                        batch.append((line_no, validate(record)))
+                    except RowError as e:
+                        error = str(e)
+                if error is not None:
+                    self._error(line_no, error)
+                if len(batch) >= self.batch_size:
+                    self._commit_batch(insert, batch)
+                    batch = []
+                    yield self.report()
+            if batch:
+                self._commit_batch(insert, batch)
+        finally:
+            if deferred:
+                restore_indexes(self.conn)
+        yield self.report(done=True)
+
+    def report(self, done=False):
+        elapsed = time.perf_counter() - self._started
+        return {
+            'kind': self.kind,
+            'done': done,
+            'rows': self.rows,
+            'imported': self.imported,
+            'error_count': self.error_count,
+            'errors': self.errors if done else self.errors[-10:],
+            'elapsed_seconds': round(elapsed, 3),
+            'rows_per_second': round(self.imported / elapsed) if elapsed else 0,
+        }
+
+    def _error(self, line_no, message):
+        self.error_count += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'line': line_no, 'error': message})
+
+    def _commit_batch(self, insert, batch):
+        cursor = self.conn.cursor()
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            self.imported += insert(cursor, batch)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+
+    # -- lookups -----------------------------------------------------------
+
+    def _load_lookups(self):
+        conn = self.conn
+        if self.kind == 'slots':
+            self._lot_ids = {row[0] for row in conn.execute('SELECT id FROM parking_lots')}
+            self._slot_keys = {
+                (lot_id, slot_number)
+                for lot_id, slot_number in conn.execute('SELECT lot_id, slot_number FROM parking_slots')
+            }
+        elif self.kind == 'bookings':
+            self._user_ids = {row[0] for row in conn.execute('SELECT id FROM users')}
+            self._slot_lots = {}
+            self._slot_by_number = {}
+            for slot_id, lot_id, slot_number in conn.execute(
+                'SELECT id, lot_id, slot_number FROM parking_slots'
+            ):
+                self._slot_lots[slot_id] = lot_id
+                self._slot_by_number[(lot_id, slot_number)] = slot_id
+            self._booking_ids = set()
+
+    # -- lots ----------------------------------------------------------------
+
+    def _lots_row(self, record):
+        price_key = 'price' if _value(record, 'price') is not None else 'price_per_hour'
+        price = _float(record, price_key)
+        if price is None or price < 0:
+            raise RowError('price (or price_per_hour) must be a non-negative number')
+        total_slots = _int(record, 'total_slots', required=False)
+        total_slots = 20 if total_slots is None else total_slots
+        if total_slots < 0:
+            raise RowError('total_slots must not be negative')
+        return (
+            _text(record, 'name', required=True),
+            _text(record, 'address', required=True),
+            _text(record, 'pincode'),
+            price,
+            total_slots,
+            _timestamp(record, 'created_at') or now_timestamp(),
+        )
+
+    def _insert_lots(self, cursor, batch):
+        last_id = cursor.execute('SELECT COALESCE(MAX(id), 0) FROM parking_lots').fetchone()[0]
+        rows = [row for _, row in batch]
+        cursor.executemany(INSERT_LOTS, rows)
+        cursor.execute(FILL_NEW_LOT_SLOTS, (max(row[4] for row in rows), last_id))
+        apply_stats(cursor, {LOTS_TOTAL: len(rows), SLOTS_TOTAL: cursor.rowcount})
+        self.touched_lots.update(
+            row[0] for row in cursor.execute('SELECT id FROM parking_lots WHERE id > ?', (last_id,))
+        )
+        return len(rows)
+
+    # -- slots ---------------------------------------------------------------
+
+    def _slots_row(self, record):
+        lot_id = _int(record, 'lot_id')
+        if lot_id not in self._lot_ids:
+            raise RowError(f'unknown lot_id {lot_id}')
+        slot_number = _int(record, 'slot_number')
+        if slot_number < 1:
+            raise RowError('slot_number must be positive')
+        if (lot_id, slot_number) in self._slot_keys:
+            raise RowError(f'lot {lot_id} already has slot {slot_number}')
+        self._slot_keys.add((lot_id, slot_number))
+        return (lot_id, slot_number, 1)
+
+    def _insert_slots(self, cursor, batch):
+        rows = [row for _, row in batch]
+        cursor.executemany(INSERT_SLOTS, rows)
+        lot_ids = {row[0] for row in rows}
+        # Keep each lot's capacity in step with its slot rows
+        cursor.executemany(SYNC_LOT_TOTALS, [(lot_id,) for lot_id in lot_ids])
+        apply_stats(cursor, {SLOTS_TOTAL: len(rows)})
+        self.touched_lots.update(lot_ids)
+        return len(rows)
+
+    # -- bookings ------------------------------------------------------------
+
+    def _bookings_row(self, record):
+        user_id = _int(record, 'user_id')
+        if user_id not in self._user_ids:
+            raise RowError(f'unknown user_id {user_id}')
+        lot_id = _int(record, 'lot_id')
+        slot_id = _int(record, 'slot_id', required=False)
+        if slot_id is None:
+            slot_number = _int(record, 'slot_number', required=False)
+            if slot_number is None:
+                raise RowError('slot_id or slot_number is required')
+            slot_id = self._slot_by_number.get((lot_id, slot_number))
+            if slot_id is None:
+                raise RowError(f'lot {lot_id} has no slot {slot_number}')
+        elif self._slot_lots.get(slot_id) != lot_id:
+            raise RowError(f'slot {slot_id} is not in lot {lot_id}')
+
+        status = _value(record, 'status') or 'completed'
+        if status not in IMPORT_BOOKING_STATUSES:
+            raise RowError(f"status must be one of {', '.join(IMPORT_BOOKING_STATUSES)}")
+        start_time = _timestamp(record, 'start_time', required=True)
+        completed_at = _timestamp(record, 'completed_at')
+        # end_time, the durations, the costs and completed_at are NOT NULL in
+        # older schemas, so missing ones get the values the app would store
+        end_time = _timestamp(record, 'end_time') or completed_at or start_time
+        if end_time < start_time:
+            raise RowError('end_time is before start_time')
+        actual_duration = _float(record, 'actual_duration_hours')
+        if actual_duration is None:
+            actual_duration = (parse_timestamp(end_time) - parse_timestamp(start_time)).total_seconds() / 3600
+        planned_duration = _float(record, 'planned_duration_hours')
+        final_cost = _float(record, 'final_cost')
+        final_cost = 0.0 if final_cost is None else final_cost
+        planned_cost = _float(record, 'planned_cost')
+
+        booking_id = _text(record, 'booking_id') or f'BK-{secrets.token_hex(6).upper()}'
+        if booking_id in self._booking_ids:
+            raise RowError(f'duplicate booking_id {booking_id} in this import')
+        self._booking_ids.add(booking_id)
+
+        return (
+            user_id, lot_id, slot_id, booking_id,
+            _text(record, 'vehicle_number'),
+            _text(record, 'payment_method'),
+            start_time, end_time,
+            actual_duration if planned_duration is None else planned_duration,
+            actual_duration,
+            final_cost if planned_cost is None else planned_cost,
+            final_cost,
+            status,
+            _timestamp(record, 'booking_created_at') or start_time,
+            completed_at or end_time,
+        )
+
+    def _insert_bookings(self, cursor, batch):
+        # Rows whose booking_id is already stored are reported and left out of the stats
+        existing = set()
+        for start in range(0, len(batch), BOOKING_ID_CHUNK):
+            ids = [row[3] for _, row in batch[start:start + BOOKING_ID_CHUNK]]
+            existing.update(found for found, in cursor.execute(
+                EXISTING_BOOKING_IDS.format(','.join('?' * len(ids))), ids))
+        if existing:
+            kept = []
+            for line_no, row in batch:
+                if row[3] in existing:
+                    self._error(line_no, f'booking_id {row[3]} already exists')
+                else:
+                    kept.append((line_no, row))
+            batch = kept
+
+        cursor.execute('SAVEPOINT import_bookings')
+        try:
+            cursor.executemany(INSERT_BOOKINGS, [row for _, row in batch])
+        except sqlite3.IntegrityError:
+            # Find the offending rows one at a time and report them
+            cursor.execute('ROLLBACK TO import_bookings')
+            kept = []
+            for line_no, row in batch:
+                try:
+                    cursor.execute(INSERT_BOOKINGS, row)
+                except sqlite3.IntegrityError as e:
+                    self._error(line_no, f'rejected by the database: {e}')
+                else:
+                    kept.append((line_no, row))
+            batch = kept
+        cursor.execute('RELEASE import_bookings')
+
+        counters = {BOOKINGS_TOTAL: len(batch)}
+        days = {}
+        for _, row in batch:
+            status, final_cost, duration = row[12], row[11], row[9]
+            counters[status_counter(status)] = counters.get(status_counter(status), 0) + 1
+            created_day = row[13][:10]
+            bucket = days.setdefault(created_day, [0, 0.0])
+            bucket[0] += 1
+            if status == 'completed' and final_cost is not None:
+                counters[REVENUE_COMPLETED] = counters.get(REVENUE_COMPLETED, 0) + final_cost
+                if row[14] is not None:
+                    days.setdefault(row[14][:10], [0, 0.0])[1] += final_cost
+            if duration is not None and duration > 0:
+                counters[DURATION_SUM] = counters.get(DURATION_SUM, 0) + duration
+                counters[DURATION_COUNT] = counters.get(DURATION_COUNT, 0) + 1
+        apply_stats(cursor, counters)
+        apply_daily_stats(cursor, days)
+        return len(batch)
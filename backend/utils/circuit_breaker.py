@@ -0,0 +1,78 @@
+"""
+Circuit breaker for the Parking Management System
+Stops calling a failing dependency until a health check sees it recover
+"""
+
+import threading
+import time
+
+CLOSED = 'closed'
+OPEN = 'open'
+
+
+class CircuitBreaker:
+    """Closed/open switch in front of an optional dependency.
+
+    Callers check allow() before each call and report the outcome. After
+    `failure_threshold` consecutive failures the circuit opens, and allow()
+    returns False at once, so callers take their fallback path instead of
+    waiting on timeouts. Only record_success() closes it again. That is
+    normally a background health check's job, so no request ever pays for
+    a probe. A breaker created with `start_open=True` stays closed to
+    traffic until the first successful check.
+    """
+
+    def __init__(self, name, failure_threshold=3, start_open=False):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self._lock = threading.Lock()
+        self._listeners = []
+        self.state = OPEN if start_open else CLOSED
+        self.failures = 0
+        self.opened_at = time.time() if start_open else None
+        self.trips = 0
+        self.rejected = 0
+
+    def subscribe(self, listener):
+        """Call listener(state) after every transition (from the reporting thread)."""
+        self._listeners.append(listener)
+
+    def allow(self):
+        if self.state == CLOSED:
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self):
+        if self.state == CLOSED and not self.failures:
+            return
+        with self._lock:
+            changed = self.state != CLOSED
+            self.state, self.failures, self.opened_at = CLOSED, 0, None
+        if changed:
+            self._notify(CLOSED)
+
+    def record_failure(self, force=False):
+        """Count a failed call; `force` opens the circuit regardless of the threshold."""
+        with self._lock:
+            self.failures += 1
+            changed = self.state == CLOSED and (force or self.failures >= self.failure_threshold)
+            if changed:
+                self.state, self.opened_at = OPEN, time.time()
+                self.trips += 1
+        if changed:
+            self._notify(OPEN)
+
+    def stats(self):
+        return {
+            'name': self.name,
+            'state': self.state,
+            'consecutive_failures': self.failures,
+            'open_for_seconds': round(time.time() - self.opened_at, 1) if self.opened_at else 0.0,
+            'trips': self.trips,
+            'rejected_calls': self.rejected,
+        }
+
+    def _notify(self, state):
+        for listener in self._listeners:
+            listener(state)
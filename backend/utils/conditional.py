@@ -0,0 +1,99 @@
+"""
+Conditional GET support for the Parking Management System
+Change counters in the resource_versions table, bumped by mutating routes inside their own transaction, and ETags derived from them
+"""
+
+from functools import wraps
+
+from flask import g, make_response, request
+
+# Row whose value is random per database, so tags from a recreated database never match
+EPOCH_KEY = '@epoch'
+# Row bumped by writes that bypass the normal routes; it is part of every tag
+GENERATION_KEY = '*'
+
+CREATE_RESOURCE_VERSIONS_TABLE = (
+    '''
+    CREATE TABLE IF NOT EXISTS resource_versions (
+        key TEXT PRIMARY KEY,
+        version INTEGER NOT NULL DEFAULT 0
+    )
+    ''',
+    f'''
+    INSERT OR IGNORE INTO resource_versions (key, version)
+    VALUES ('{EPOCH_KEY}', abs(random() % 4294967296)), ('{GENERATION_KEY}', 0)
+    ''',
+)
+
+
+def bump_versions(cursor, *keys):
+    """Advance the counters of resources (e.g. 'lots', 'lot:3') using the caller's transaction.
+
+    Every worker process reads the same rows, so a write committed by one
+    changes the ETags all of them hand out.
+    """
+    cursor.executemany('''
+        INSERT INTO resource_versions (key, version) VALUES (?, 1)
+        ON CONFLICT(key) DO UPDATE SET version = version + 1
+    ''', [(key,) for key in keys])
+
+
+def bump_all_versions(cursor):
+    """Invalidate every ETag, for writes that bypass the normal routes (imports, reconcile, debug setup)."""
+    bump_versions(cursor, GENERATION_KEY)
+
+
+def read_versions(conn, *keys):
+    """{key: version} for `keys`, in one query; keys never bumped are 0."""
+    rows = conn.execute(
+        f'SELECT key, version FROM resource_versions WHERE key IN ({",".join("?" * len(keys))})', keys
+    ).fetchall()
+    versions = dict.fromkeys(keys, 0)
+    versions.update((key, version) for key, version in rows)
+    return versions
+
+
+def resource_etag(conn, *keys, extra=None):
+    """Weak ETag for the current versions of `keys`, read in one query."""
+    versions = read_versions(conn, EPOCH_KEY, GENERATION_KEY, *keys)
+    parts = [format(versions[EPOCH_KEY], 'x'), str(versions[GENERATION_KEY])]
+    parts.extend(f'{key}.{versions[key]}' for key in keys)
+    if extra is not None:
+        parts.append(str(extra))
+    return 'W/"' + '-'.join(parts) + '"'
+
+
+def etag_matches(etag, if_none_match):
+    """Weak comparison of `etag` against an If-None-Match header value."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(',')]
+    weak_value = etag[2:] if etag.startswith('W/') else etag
+    return '*' in candidates or any(
+        (tag[2:] if tag.startswith('W/') else tag) == weak_value for tag in candidates
+    )
+
+
+def conditional_get(make_etag):
+    """Answer 304 when If-None-Match matches `make_etag(*view_args)`.
+
+    The ETag is computed before the view runs, so a write that lands while
+    the payload is being built only makes the tag older, never newer. The
+    view finds it in g.etag, to key cached payloads by it.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag = g.etag = make_etag(*args, **kwargs)
+            if etag_matches(etag, request.headers.get('If-None-Match')):
+                response = make_response('', 304)
+                response.headers['ETag'] = etag
+                return response
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                response.headers['ETag'] = etag
+                response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,276 @@
+"""
+SQLite connection pool and write-transaction helpers for the Parking Management System
+Reuses configured connections across requests and tracks pool and lock contention
+"""
+
+import queue
+import random
+import sqlite3
+import threading
+import time
+
+# Applied once when a connection is opened, not on every checkout
+DEFAULT_PRAGMAS = (
+    ('journal_mode', 'WAL'),
+    ('synchronous', 'NORMAL'),
+    ('busy_timeout', 5000),        # milliseconds
+    ('mmap_size', 268435456),      # 256 MB
+    ('cache_size', -20000),        # ~20 MB (negative = KiB)
+    ('temp_store', 'MEMORY'),
+)
+
+
+class PoolTimeout(sqlite3.OperationalError):
+    """Raised when no pooled connection becomes free in time."""
+
+
+class PooledConnection:
+    """Proxy around a sqlite3 connection that hands it back to the pool.
+
+    Request-scoped connections ignore close(); the pool takes them back
+    in the app teardown. Other connections return to the pool on close().
+    """
+
+    __slots__ = ('_pool', '_raw', '_request_scoped')
+
+    def __init__(self, pool, raw, request_scoped=False):
+        object.__setattr__(self, '_pool', pool)
+        object.__setattr__(self, '_raw', raw)
+        object.__setattr__(self, '_request_scoped', request_scoped)
+
+    def __getattr__(self, name):
+        raw = object.__getattribute__(self, '_raw')
+        if raw is None:
+            raise sqlite3.ProgrammingError('Cannot operate on a released connection.')
+        return getattr(raw, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._raw, name, value)
+
+    def __enter__(self):
+        return self._raw.__enter__()
+
+    def __exit__(self, exc_type, exc, tb):
+        return self._raw.__exit__(exc_type, exc, tb)
+
+    def __del__(self):
+        # Safety net for code paths that never call close()
+        if object.__getattribute__(self, '_raw') is not None:
+            self._pool.release(self)
+
+    def close(self):
+        if not self._request_scoped:
+            self._pool.release(self)
+
+    def detach(self):
+        """Take the underlying connection away from this proxy."""
+        raw = self._raw
+        object.__setattr__(self, '_raw', None)
+        return raw
+
+
+class SQLitePool:
+    """Bounded, thread-safe pool of SQLite connections."""
+
+    def __init__(self, db_path, size=10, timeout=30.0, pragmas=DEFAULT_PRAGMAS,
+                 connection_factory=sqlite3.Connection):
+        self.db_path = db_path
+        self.size = max(1, int(size))
+        self.timeout = timeout
+        self.pragmas = pragmas
+        self.connection_factory = connection_factory
+        self._idle = queue.LifoQueue()  # LIFO keeps recently used connections warm
+        self._lock = threading.Lock()
+        self._created = 0
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'waits': 0,
+            'wait_time_ms': 0.0,
+            'timeouts': 0,
+            'discarded': 0,
+        }
+
+    def _connect(self):
+        raw = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False,
+                              factory=self.connection_factory)
+        raw.row_factory = sqlite3.Row
+        for name, value in self.pragmas:
+            raw.execute(f'PRAGMA {name} = {value}')
+        return raw
+
+    def acquire(self, request_scoped=False):
+        """Check out a connection, opening a new one while below pool size."""
+        try:
+            raw = self._idle.get_nowait()
+            with self._lock:
+                self._stats['hits'] += 1
+            return PooledConnection(self, raw, request_scoped)
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_open = self._created < self.size
+            if can_open:
+                self._created += 1
+                self._stats['misses'] += 1
+
+        if can_open:
+            try:
+                raw = self._connect()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+            return PooledConnection(self, raw, request_scoped)
+
+        # Pool exhausted - wait for a connection to be released
+        started = time.perf_counter()
+        try:
+            raw = self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            with self._lock:
+                self._stats['timeouts'] += 1
+            raise PoolTimeout(f'No database connection available after {self.timeout}s')
+        waited_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._stats['hits'] += 1
+            self._stats['waits'] += 1
+            self._stats['wait_time_ms'] += waited_ms
+        return PooledConnection(self, raw, request_scoped)
+
+    def release(self, conn):
+        """Return a connection to the pool, rolling back any open transaction."""
+        raw = conn.detach()
+        if raw is None:
+            return
+        try:
+            if raw.in_transaction:
+                raw.rollback()
+        except sqlite3.Error:
+            # Broken connection - drop it and let the pool open a fresh one
+            with self._lock:
+                self._created -= 1
+                self._stats['discarded'] += 1
+            try:
+                raw.close()
+            except sqlite3.Error:
+                pass
+            return
+        self._idle.put(raw)
+
+    def stats(self):
+        """Snapshot of pool counters."""
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot['size'] = self.size
+            snapshot['open'] = self._created
+        snapshot['idle'] = self._idle.qsize()
+        snapshot['in_use'] = snapshot['open'] - snapshot['idle']
+        snapshot['wait_time_ms'] = round(snapshot['wait_time_ms'], 3)
+        return snapshot
+
+    def close_all(self):
+        """Close idle connections (used on shutdown and in benchmarks)."""
+        while True:
+            try:
+                raw = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            with self._lock:
+                self._created -= 1
+            raw.close()
+
+
+class WriteConflict(Exception):
+    """Raised inside a transaction when a conditional write matched no rows."""
+
+
+class ContentionStats:
+    """Counters for write transactions that compete for the SQLite write lock."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._listeners = []
+        self._stats = {
+            'transactions': 0,
+            'conflicts': 0,
+            'retries': 0,
+            'lock_timeouts': 0,
+            'lock_wait_ms': 0.0,
+            'max_lock_wait_ms': 0.0,
+        }
+
+    def record(self, name, amount=1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def subscribe(self, listener):
+        """Call listener(waited_ms) after every recorded lock wait."""
+        self._listeners.append(listener)
+
+    def record_lock_wait(self, waited_ms):
+        with self._lock:
+            self._stats['lock_wait_ms'] += waited_ms
+            if waited_ms > self._stats['max_lock_wait_ms']:
+                self._stats['max_lock_wait_ms'] = waited_ms
+        for listener in self._listeners:
+            listener(waited_ms)
+
+    def snapshot(self):
+        with self._lock:
+            snapshot = dict(self._stats)
+        snapshot['lock_wait_ms'] = round(snapshot['lock_wait_ms'], 3)
+        snapshot['max_lock_wait_ms'] = round(snapshot['max_lock_wait_ms'], 3)
+        return snapshot
+
+
+def _is_locked_error(error):
+    message = str(error).lower()
+    return 'database is locked' in message or 'database is busy' in message
+
+
+def run_immediate(conn, work, stats=None, max_retries=5, base_delay=0.005, max_delay=0.1):
+    """Run work(cursor) in a BEGIN IMMEDIATE transaction and commit it.
+
+    The write lock is taken up front, so conditional UPDATEs inside `work`
+    cannot interleave with another writer. "database is locked" errors are
+    retried with bounded, jittered exponential backoff. Any exception from
+    `work` rolls the transaction back; WriteConflict is counted as a conflict.
+    """
+    attempt = 0
+    while True:
+        started = time.perf_counter()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+        except sqlite3.OperationalError as e:
+            waited_ms = (time.perf_counter() - started) * 1000
+            if stats:
+                stats.record_lock_wait(waited_ms)
+            if not _is_locked_error(e) or attempt >= max_retries:
+                if stats and _is_locked_error(e):
+                    stats.record('lock_timeouts')
+                raise
+            attempt += 1
+            if stats:
+                stats.record('retries')
+            delay = min(max_delay, base_delay * (2 ** (attempt - 1)))
+            time.sleep(delay * random.uniform(0.5, 1.0))
+            continue
+
+        if stats:
+            stats.record_lock_wait((time.perf_counter() - started) * 1000)
+            stats.record('transactions')
+
+        try:
+            result = work(conn.cursor())
+            conn.commit()
+            return result
+        except WriteConflict:
+            conn.rollback()
+            if stats:
+                stats.record('conflicts')
+            raise
+        except Exception:
+            conn.rollback()
+            raise
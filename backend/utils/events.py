@@ -0,0 +1,149 @@
+"""
+Slot change events for the Parking Management System
+In-process publish/subscribe broker behind the Server-Sent Events stream
+"""
+
+import json
+import threading
+from collections import defaultdict, deque
+from itertools import count
+
+HEARTBEAT_FRAME = ': heartbeat\n\n'
+
+
+class SubscriberLimitReached(Exception):
+    """Raised when the broker already serves its maximum number of streams."""
+
+
+def format_frame(event_type, data, event_id=None):
+    """Serialize one SSE frame."""
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event_type}')
+    lines.append(f'data: {json.dumps(data, separators=(",", ":"))}')
+    return '\n'.join(lines) + '\n\n'
+
+
+class Subscription:
+    """One client's bounded frame buffer.
+
+    When the client falls more than `buffer_size` frames behind, the
+    buffer is discarded and the subscription is flagged as overflowed;
+    the stream then sends a fresh snapshot instead of the missed deltas.
+    """
+
+    def __init__(self, lot_ids, buffer_size):
+        self.lot_ids = frozenset(lot_ids) if lot_ids else None
+        self.dropped = 0
+        self._buffer_size = buffer_size
+        self._frames = deque()
+        self._overflowed = False
+        self._cond = threading.Condition()
+
+    def push(self, frame):
+        with self._cond:
+            if self._overflowed:
+                self.dropped += 1
+                return
+            if len(self._frames) >= self._buffer_size:
+                self.dropped += len(self._frames) + 1
+                self._frames.clear()
+                self._overflowed = True
+            else:
+                self._frames.append(frame)
+            self._cond.notify()
+
+    def drain(self, timeout):
+        """Wait up to `timeout` seconds; return (overflowed, frames)."""
+        with self._cond:
+            if not self._frames and not self._overflowed:
+                self._cond.wait(timeout)
+            overflowed, self._overflowed = self._overflowed, False
+            frames = list(self._frames)
+            self._frames.clear()
+        return overflowed, frames
+
+
+class SlotEventBroker:
+    """Fan slot and lot changes out to per-lot and all-lot subscribers."""
+
+    def __init__(self, buffer_size=256, max_subscribers=1000):
+        self.buffer_size = buffer_size
+        self.max_subscribers = max_subscribers
+        self._lock = threading.Lock()
+        self._all_lots = set()
+        self._by_lot = defaultdict(set)
+        self._subscribers = 0
+        self._event_ids = count(1)
+        self._published = 0
+        self._delivered = 0
+        self._resyncs = 0
+
+    def subscribe(self, lot_ids=None):
+        subscription = Subscription(lot_ids, self.buffer_size)
+        with self._lock:
+            if self._subscribers >= self.max_subscribers:
+                raise SubscriberLimitReached(f"{self.max_subscribers} event streams already open")
+            if subscription.lot_ids is None:
+                self._all_lots.add(subscription)
+            else:
+                for lot_id in subscription.lot_ids:
+                    self._by_lot[lot_id].add(subscription)
+            self._subscribers += 1
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Remove a subscription; safe to call more than once."""
+        with self._lock:
+            if subscription.lot_ids is None:
+                if subscription not in self._all_lots:
+                    return
+                self._all_lots.discard(subscription)
+            else:
+                removed = False
+                for lot_id in subscription.lot_ids:
+                    subscribers = self._by_lot.get(lot_id)
+                    if subscribers and subscription in subscribers:
+                        subscribers.discard(subscription)
+                        removed = True
+                        if not subscribers:
+                            del self._by_lot[lot_id]
+                if not removed:
+                    return
+            self._subscribers -= 1
+
+    def publish(self, event_type, lot_id, data):
+        """Send an event to everyone watching `lot_id` (or all lots)."""
+        with self._lock:
+            event_id = next(self._event_ids)
+            targets = list(self._all_lots)
+            targets.extend(self._by_lot.get(lot_id, ()))
+            self._published += 1
+            self._delivered += len(targets)
+        if not targets:
+            return event_id
+
+        # Serialized once, shared by every subscriber
+        frame = format_frame(event_type, dict(data, lot_id=lot_id), event_id)
+        for subscription in targets:
+            subscription.push(frame)
+        return event_id
+
+    def record_resync(self):
+        """Count a snapshot sent to a subscriber that fell behind."""
+        with self._lock:
+            self._resyncs += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'subscribers': self._subscribers,
+                'all_lot_subscribers': len(self._all_lots),
+                'watched_lots': len(self._by_lot),
+                'published': self._published,
+                'delivered': self._delivered,
+                'resyncs': self._resyncs,
+                'buffer_size': self.buffer_size,
+                'max_subscribers': self.max_subscribers,
+            }
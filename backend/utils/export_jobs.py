@@ -0,0 +1,238 @@
+"""
+Export job execution and storage for the Parking Management System
+Fixed-size worker pool with a bounded queue, and job records persisted in SQLite
+"""
+
+import logging
+import os
+import queue
+import threading
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+# Job states; 'started' means accepted and waiting for a worker
+ACTIVE_STATUSES = ('started', 'processing')
+
+CREATE_EXPORT_JOBS_TABLE = (
+    '''
+    CREATE TABLE IF NOT EXISTS export_jobs (
+        job_id TEXT PRIMARY KEY,
+        user_id INTEGER NOT NULL,
+        status TEXT NOT NULL,
+        progress INTEGER NOT NULL DEFAULT 0,
+        message TEXT,
+        file_name TEXT,
+        download_url TEXT,
+        record_count INTEGER,
+        error TEXT,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL,
+        completed_at TEXT
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_export_jobs_user_created ON export_jobs (user_id, created_at)',
+    'CREATE INDEX IF NOT EXISTS idx_export_jobs_status_updated ON export_jobs (status, updated_at)',
+)
+
+JOB_FIELDS = (
+    'status', 'progress', 'message', 'user_id', 'created_at', 'download_url',
+    'file_name', 'record_count', 'completed_at', 'error',
+)
+
+
+class QueueFull(Exception):
+    """Raised when the worker pool's queue has no room for another task."""
+
+
+class WorkerPool:
+    """A fixed number of daemon threads draining a bounded task queue.
+
+    Threads are started on the first submit, so importing the app does
+    not spawn them.
+    """
+
+    def __init__(self, workers=2, queue_size=20, name='worker'):
+        self.workers = workers
+        self.name = name
+        self._tasks = queue.Queue(maxsize=queue_size)
+        self._threads = []
+        self._lock = threading.Lock()
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+
+    def submit(self, fn, *args):
+        self._ensure_started()
+        try:
+            self._tasks.put_nowait((fn, args))
+        except queue.Full:
+            with self._lock:
+                self._rejected += 1
+            raise QueueFull(f"{self.name} queue is full ({self._tasks.maxsize} tasks waiting)")
+
+    def _ensure_started(self):
+        if self._threads:
+            return
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f'{self.name}-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _work(self):
+        while True:
+            fn, args = self._tasks.get()
+            with self._lock:
+                self._running += 1
+            try:
+                fn(*args)
+                outcome = '_completed'
+            except Exception:
+                logger.exception("%s task %s failed", self.name, getattr(fn, '__name__', fn))
+                outcome = '_failed'
+            finally:
+                self._tasks.task_done()
+            with self._lock:
+                self._running -= 1
+                setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def join(self):
+        """Block until every queued task has finished."""
+        self._tasks.join()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'started': len(self._threads),
+                'queued': self._tasks.qsize(),
+                'queue_size': self._tasks.maxsize,
+                'running': self._running,
+                'completed': self._completed,
+                'failed': self._failed,
+                'rejected': self._rejected,
+            }
+
+
+def _now():
+    return datetime.now().isoformat()
+
+
+def _job_dict(row):
+    return {field: row[field] for field in JOB_FIELDS}
+
+
+class ExportJobStore:
+    """Export job records in the export_jobs table, shared by every process."""
+
+    def __init__(self, pool, stale_after=600):
+        self._pool = pool
+        self.stale_after = stale_after
+
+    def _stale_cutoff(self):
+        return (datetime.now() - timedelta(seconds=self.stale_after)).isoformat()
+
+    def create(self, job_id, user_id, max_active=None, message='Starting export...'):
+        """Insert a 'started' job; returns False if the user is at `max_active`.
+
+        The limit check and insert are one statement, so concurrent requests
+        cannot both slip under it.
+        """
+        now = _now()
+        conn = self._pool.acquire()
+        try:
+            cursor = conn.execute('''
+                INSERT INTO export_jobs (job_id, user_id, status, progress, message, created_at, updated_at)
+                SELECT ?, ?, 'started', 0, ?, ?, ?
+                WHERE ? IS NULL OR (
+                    SELECT COUNT(*) FROM export_jobs
+                    WHERE user_id = ? AND status IN ('started', 'processing') AND updated_at >= ?
+                ) < ?
+            ''', (job_id, user_id, message, now, now, max_active, user_id, self._stale_cutoff(), max_active))
+            conn.commit()
+            return cursor.rowcount == 1
+        finally:
+            conn.close()
+
+    def update(self, job_id, **fields):
+        fields['updated_at'] = _now()
+        assignments = ', '.join(f'{name} = ?' for name in fields)
+        conn = self._pool.acquire()
+        try:
+            conn.execute(f'UPDATE export_jobs SET {assignments} WHERE job_id = ?', (*fields.values(), job_id))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def delete(self, job_id):
+        conn = self._pool.acquire()
+        try:
+            conn.execute('DELETE FROM export_jobs WHERE job_id = ?', (job_id,))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def get(self, job_id):
+        conn = self._pool.acquire()
+        try:
+            row = conn.execute('SELECT * FROM export_jobs WHERE job_id = ?', (job_id,)).fetchone()
+        finally:
+            conn.close()
+        return _job_dict(row) if row else None
+
+    def list_for_user(self, user_id):
+        """{job_id: job} for one user, newest first."""
+        conn = self._pool.acquire()
+        try:
+            rows = conn.execute(
+                'SELECT * FROM export_jobs WHERE user_id = ? ORDER BY created_at DESC', (user_id,)
+            ).fetchall()
+        finally:
+            conn.close()
+        return {row['job_id']: _job_dict(row) for row in rows}
+
+    def cleanup(self, exports_dir, ttl_seconds):
+        """Fail stale jobs, then drop records and files older than `ttl_seconds`.
+
+        Returns (jobs_removed, files_removed).
+        """
+        expiry_cutoff = (datetime.now() - timedelta(seconds=ttl_seconds)).isoformat()
+        conn = self._pool.acquire()
+        try:
+            # Jobs whose worker died (e.g. a restart) would otherwise stay active forever
+            conn.execute('''
+                UPDATE export_jobs
+                SET status = 'failed', progress = 0, error = 'Export worker stopped before finishing',
+                    message = 'Export failed: worker stopped before finishing', updated_at = ?
+                WHERE status IN ('started', 'processing') AND updated_at < ?
+            ''', (_now(), self._stale_cutoff()))
+            expired = conn.execute('''
+                SELECT job_id, file_name FROM export_jobs
+                WHERE created_at < ? AND status NOT IN ('started', 'processing')
+            ''', (expiry_cutoff,)).fetchall()
+            conn.executemany('DELETE FROM export_jobs WHERE job_id = ?', [(row['job_id'],) for row in expired])
+            conn.commit()
+            kept = {row[0] for row in conn.execute(
+                'SELECT file_name FROM export_jobs WHERE file_name IS NOT NULL'
+            )}
+        finally:
+            conn.close()
+
+        # Expired files, plus leftovers (.part files, files from before the job table)
+        files_removed = 0
+        expiry_timestamp = (datetime.now() - timedelta(seconds=ttl_seconds)).timestamp()
+        if os.path.isdir(exports_dir):
+            for entry in os.scandir(exports_dir):
+                if not entry.is_file() or entry.name in kept:
+                    continue
+                try:
+                    if entry.stat().st_mtime < expiry_timestamp:
+                        os.remove(entry.path)
+                        files_removed += 1
+                except OSError as e:
+                    logger.warning("Could not remove expired export %s: %s", entry.path, e)
+        return len(expired), files_removed
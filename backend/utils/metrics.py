@@ -0,0 +1,369 @@
+"""
+Prometheus metrics for the Parking Management System
+Sharded in-process counters, gauges and histograms, merged across worker processes for /metrics
+"""
+
+import atexit
+import bisect
+import itertools
+import json
+import logging
+import math
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Request latencies in seconds (the Prometheus client default)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Counters and histograms are split into this many shards, each with its
+# own lock. A thread always updates the same shard, so concurrent
+# requests rarely wait on each other; reads add the shards up.
+SHARDS = 8
+
+# How a gauge is combined across worker processes
+LIVESUM = 'livesum'   # sum over live processes (queue depths, connections in use)
+MAX = 'max'           # highest value of any live process
+ALL = 'all'           # one series per live process, labelled with its pid
+CURRENT = 'current'   # only the process serving the scrape (values read from the database)
+GAUGE_MODES = (LIVESUM, MAX, ALL, CURRENT)
+
+_next_shard = itertools.count()
+_thread_shard = threading.local()
+
+
+def _shard_index():
+    index = getattr(_thread_shard, 'index', None)
+    if index is None:
+        index = _thread_shard.index = next(_next_shard) % SHARDS
+    return index
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels):
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f'{self.name} takes labels {self.labelnames}, got {tuple(labels)}')
+        if not labels:
+            return ()
+        return tuple([str(labels[name]) for name in self.labelnames])
+
+    def _reset(self):
+        pass
+
+
+class _Shard:
+    __slots__ = ('lock', 'values')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.values = {}
+
+
+class Counter(_Metric):
+    """Monotonic count. Name it with a _total suffix."""
+
+    kind = 'counter'
+
+    def __init__(self, name, help_text, labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        self._reset()
+
+    def _reset(self):
+        self._shards = [_Shard() for _ in range(SHARDS)]
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        shard = self._shards[_shard_index()]
+        with shard.lock:
+            shard.values[key] = shard.values.get(key, 0) + amount
+
+    def collect(self):
+        totals = {}
+        for shard in self._shards:
+            with shard.lock:
+                items = list(shard.values.items())
+            for key, value in items:
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+
+class Histogram(_Metric):
+    """Distribution of observed values over fixed upper bounds."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._reset()
+
+    def _reset(self):
+        self._shards = [_Shard() for _ in range(SHARDS)]
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        shard = self._shards[_shard_index()]
+        with shard.lock:
+            entry = shard.values.get(key)
+            if entry is None:
+                # One count per bucket, then +Inf, then the sum
+                entry = shard.values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            entry[index] += 1
+            entry[-1] += value
+
+    def collect(self):
+        totals = {}
+        for shard in self._shards:
+            with shard.lock:
+                items = [(key, list(entry)) for key, entry in shard.values.items()]
+            for key, entry in items:
+                total = totals.get(key)
+                totals[key] = entry if total is None else [a + b for a, b in zip(total, entry)]
+        return totals
+
+
+class CallbackMetric(_Metric):
+    """Counter or gauge read from an existing stats source when collected.
+
+    `fn` returns a number, or a dict of label values (a tuple, or a plain
+    value for a single label) to numbers. Nothing is recorded on the hot
+    path; the source keeps its own counts.
+    """
+
+    def __init__(self, kind, name, help_text, fn, labelnames=(), mode=LIVESUM):
+        super().__init__(name, help_text, labelnames)
+        self.kind = kind
+        self.mode = mode
+        self.fn = fn
+
+    def collect(self):
+        result = self.fn()
+        if result is None:
+            return {}
+        if not isinstance(result, dict):
+            return {(): result}
+        return {tuple(str(part) for part in (key if isinstance(key, tuple) else (key,))): value
+                for key, value in result.items()}
+
+
+class MetricsRegistry:
+    """The app's metrics, and their Prometheus text rendering.
+
+    With `multiprocess_dir`, each worker process writes a snapshot of its
+    metrics to <dir>/metrics-<pid>.json every `flush_interval` seconds
+    and on exit. A scrape served by any worker then merges its own live
+    values with every other worker's latest snapshot: counters and
+    histograms are summed, so they survive worker restarts, and gauges
+    combine by their mode. A snapshot not refreshed for three intervals
+    belongs to a dead worker and no longer counts towards gauges. Empty
+    the directory whenever the whole service restarts, as Prometheus'
+    own multiprocess mode requires.
+    """
+
+    def __init__(self, multiprocess_dir=None, flush_interval=5.0):
+        self.multiprocess_dir = multiprocess_dir
+        self.flush_interval = flush_interval
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self._flusher_pid = None
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self):
+        # A forked worker starts from zero, or the parent's counts would be
+        # summed twice once both have snapshots. Callback metrics read
+        # the stats objects the child inherited, which a pre-forking server
+        # creates before serving anything. Fresh shards also drop any lock
+        # another thread held at the fork.
+        self._lock = threading.Lock()
+        for metric in self._metrics.values():
+            metric._reset()
+
+    def _register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f'Metric {metric.name} is already registered')
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._register(Counter(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def counter_callback(self, name, help_text, fn, labelnames=()):
+        return self._register(CallbackMetric('counter', name, help_text, fn, labelnames))
+
+    def gauge_callback(self, name, help_text, fn, labelnames=(), mode=LIVESUM):
+        if mode not in GAUGE_MODES:
+            raise ValueError(f'Unknown gauge mode {mode!r}')
+        return self._register(CallbackMetric('gauge', name, help_text, fn, labelnames, mode))
+
+    def _snapshot(self, scrape=False):
+        """{name: {key: value}} for this process; CURRENT gauges only when scraping."""
+        snapshot = {}
+        for name, metric in list(self._metrics.items()):
+            if getattr(metric, 'mode', None) == CURRENT and not scrape:
+                continue
+            try:
+                snapshot[name] = metric.collect()
+            except Exception as e:
+                logger.warning("Could not collect metric %s: %s", name, e)
+        return snapshot
+
+    # --- multiprocess snapshots -------------------------------------------
+
+    def ensure_flusher(self):
+        """Start the snapshot thread in this process (once per pid, so forks start their own)."""
+        if not self.multiprocess_dir or self._flusher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+        os.makedirs(self.multiprocess_dir, exist_ok=True)
+        threading.Thread(target=self._flush_loop, name='metrics-flusher', daemon=True).start()
+        atexit.register(self.flush)
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def _path(self, pid):
+        return os.path.join(self.multiprocess_dir, f'metrics-{pid}.json')
+
+    def flush(self):
+        """Write this process's snapshot, replacing the previous one atomically."""
+        if not self.multiprocess_dir:
+            return
+        pid = os.getpid()
+        snapshot = {
+            'pid': pid,
+            'written_at': time.time(),
+            'metrics': {name: [[list(key), value] for key, value in values.items()]
+                        for name, values in self._snapshot().items()},
+        }
+        path = self._path(pid)
+        try:
+            with open(path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, separators=(',', ':'))
+            os.replace(path + '.tmp', path)
+        except OSError as e:
+            logger.warning("Could not write metrics snapshot %s: %s", path, e)
+
+    def _other_snapshots(self):
+        """(pid, is_live, {name: {key: value}}) for every other process's snapshot."""
+        if not self.multiprocess_dir or not os.path.isdir(self.multiprocess_dir):
+            return []
+        own = os.getpid()
+        stale_before = time.time() - 3 * self.flush_interval
+        snapshots = []
+        for file_name in os.listdir(self.multiprocess_dir):
+            if not (file_name.startswith('metrics-') and file_name.endswith('.json')):
+                continue
+            try:
+                with open(os.path.join(self.multiprocess_dir, file_name), encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue  # Being replaced, or left half-written by a crash
+            if data.get('pid') == own:
+                continue
+            metrics = {name: {tuple(key): value for key, value in samples}
+                       for name, samples in data.get('metrics', {}).items()}
+            snapshots.append((data.get('pid'), data.get('written_at', 0) >= stale_before, metrics))
+        return snapshots
+
+    # --- rendering ----------------------------------------------------------
+
+    def collect(self):
+        """{name: {key: value}} merged over this process and the other workers."""
+        own_pid = os.getpid()
+        merged = {}
+        sources = [(own_pid, True, self._snapshot(scrape=True))] + self._other_snapshots()
+        for name, metric in self._metrics.items():
+            mode = getattr(metric, 'mode', None) if metric.kind == 'gauge' else None
+            width = len(metric.buckets) + 2 if metric.kind == 'histogram' else None
+            values = {}
+            for pid, live, snapshot in sources:
+                if name not in snapshot:
+                    continue
+                if mode is not None and not live:
+                    continue
+                if mode == CURRENT and pid != own_pid:
+                    continue
+                for key, value in snapshot[name].items():
+                    if mode == ALL:
+                        values[key + (str(pid),)] = value
+                    elif mode == MAX:
+                        values[key] = max(values.get(key, value), value)
+                    elif width is not None:
+                        if len(value) != width:
+                            continue  # Written by a build with other buckets
+                        total = values.get(key)
+                        values[key] = value if total is None else [a + b for a, b in zip(total, value)]
+                    else:
+                        values[key] = values.get(key, 0) + value
+            merged[name] = values
+        return merged
+
+    def render(self):
+        """Every metric in the Prometheus text exposition format."""
+        self.ensure_flusher()
+        merged = self.collect()
+        lines = []
+        for name, metric in self._metrics.items():
+            values = merged.get(name, {})
+            labelnames = metric.labelnames
+            if metric.kind == 'gauge' and metric.mode == ALL:
+                labelnames += ('pid',)
+            lines.append(f'# HELP {name} {_escape_help(metric.help)}')
+            lines.append(f'# TYPE {name} {metric.kind}')
+            for key in sorted(values):
+                labels = list(zip(labelnames, key))
+                value = values[key]
+                if metric.kind != 'histogram':
+                    lines.append(f'{name}{_labels(labels)} {_number(value)}')
+                    continue
+                cumulative = 0
+                for bound, count in zip(metric.buckets + (math.inf,), value[:-1]):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{_labels(labels + [("le", _number(bound))])} {cumulative}')
+                lines.append(f'{name}_sum{_labels(labels)} {_number(value[-1])}')
+                lines.append(f'{name}_count{_labels(labels)} {cumulative}')
+        return '\n'.join(lines) + '\n'
+
+
+def _escape_help(text):
+    return text.replace('\\', r'\\').replace('\n', r'\n')
+
+
+def _escape_label(value):
+    return value.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _labels(pairs):
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape_label(value)}"' for name, value in pairs) + '}'
+
+
+def _number(value):
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, int) or (isinstance(value, float) and value.is_integer()):
+        return str(int(value))
+    return repr(float(value))
@@ -0,0 +1,177 @@
+"""
+Versioned schema migrations for the Parking Management System
+Each migration runs once, inside a transaction, and is recorded in schema_migrations
+"""
+
+import logging
+
+from backend.utils.bulk_import import CREATE_DEFERRED_INDEXES_TABLE
+from backend.utils.conditional import CREATE_RESOURCE_VERSIONS_TABLE
+from backend.utils.export_jobs import CREATE_EXPORT_JOBS_TABLE
+from backend.utils.search import CREATE_SEARCH_TABLES, rebuild_search_index
+from backend.utils.slot_view import CREATE_SLOT_VIEW_TABLE, rebuild_slot_view
+from backend.utils.stats import CREATE_STATS_TABLES, reconcile_stats
+from backend.utils.timestamps import epoch_sql
+
+logger = logging.getLogger(__name__)
+
+
+class Migration:
+    """A numbered schema change made of SQL statements and/or callables."""
+
+    def __init__(self, version, name, steps):
+        self.version = version
+        self.name = name
+        self.steps = steps
+
+    def apply(self, cursor):
+        for step in self.steps:
+            if callable(step):
+                step(cursor)
+            else:
+                cursor.execute(step)
+
+
+def add_columns(cursor, table, columns):
+    """ALTER TABLE ADD COLUMN for each {name: declaration} the table lacks."""
+    existing = {row[1] for row in cursor.execute(f'PRAGMA table_info({table})')}
+    for name, declaration in columns.items():
+        if name not in existing:
+            cursor.execute(f'ALTER TABLE {table} ADD COLUMN {name} {declaration}')
+
+
+def add_booking_epoch_columns(cursor):
+    add_columns(cursor, 'bookings', {'start_ts': 'INTEGER', 'end_ts': 'INTEGER'})
+
+
+MIGRATIONS = [
+    Migration(1, 'hot lookup indexes', [
+        # Slot grid per lot (ORDER BY slot_number) and availability counts per lot
+        'CREATE INDEX IF NOT EXISTS idx_parking_slots_lot_slot ON parking_slots (lot_id, slot_number)',
+        'CREATE INDEX IF NOT EXISTS idx_parking_slots_lot_available ON parking_slots (lot_id, is_available)',
+        # Only occupied slots carry a user
+        'CREATE INDEX IF NOT EXISTS idx_parking_slots_current_user ON parking_slots (current_user_id) '
+        'WHERE current_user_id IS NOT NULL',
+        # My bookings (ORDER BY booking_created_at) and active bookings per user
+        'CREATE INDEX IF NOT EXISTS idx_bookings_user_created ON bookings (user_id, booking_created_at)',
+        'CREATE INDEX IF NOT EXISTS idx_bookings_user_status ON bookings (user_id, status)',
+        # Booking history filtered by status and ordered by start time
+        'CREATE INDEX IF NOT EXISTS idx_bookings_status_start ON bookings (status, start_time)',
+        'CREATE INDEX IF NOT EXISTS idx_bookings_start_time ON bookings (start_time)',
+        # Slot -> booking joins and release by slot
+        'CREATE INDEX IF NOT EXISTS idx_bookings_booking_id ON bookings (booking_id)',
+        'CREATE INDEX IF NOT EXISTS idx_bookings_slot_status ON bookings (slot_id, status)',
+        # DATE(start_time) filters (today/week/month, export date range)
+        'CREATE INDEX IF NOT EXISTS idx_bookings_start_date ON bookings (DATE(start_time))',
+    ]),
+    Migration(2, 'running stats counters', [
+        *CREATE_STATS_TABLES,
+        # Seed the counters from the existing history
+        reconcile_stats,
+    ]),
+    Migration(3, 'persistent export jobs', [
+        *CREATE_EXPORT_JOBS_TABLE,
+    ]),
+    Migration(4, 'bulk import index bookkeeping', [
+        *CREATE_DEFERRED_INDEXES_TABLE,
+    ]),
+    Migration(5, 'per-slot live view', [
+        *CREATE_SLOT_VIEW_TABLE,
+        # Seeded by migration 6, since the view rows read bookings.start_ts
+    ]),
+    Migration(6, 'epoch booking times', [
+        add_booking_epoch_columns,
+        # start_time is NOT NULL, so an unreadable one sorts as the oldest booking
+        f'UPDATE bookings SET start_ts = COALESCE({epoch_sql("start_time")}, 0), '
+        f'end_ts = {epoch_sql("end_time")}',
+        # Period and date-range filters, the listing order and the export now use start_ts
+        'DROP INDEX IF EXISTS idx_bookings_start_date',
+        'DROP INDEX IF EXISTS idx_bookings_start_time',
+        'DROP INDEX IF EXISTS idx_bookings_status_start',
+        'CREATE INDEX IF NOT EXISTS idx_bookings_start_ts ON bookings (start_ts)',
+        'CREATE INDEX IF NOT EXISTS idx_bookings_status_start_ts ON bookings (status, start_ts)',
+        'CREATE INDEX IF NOT EXISTS idx_bookings_user_start_ts ON bookings (user_id, start_ts)',
+        # (Re)build a view row for every existing slot
+        rebuild_slot_view,
+    ]),
+    Migration(7, 'full-text search', [
+        *CREATE_SEARCH_TABLES,
+        # Index the existing lots and users; the triggers take it from here
+        rebuild_search_index,
+    ]),
+    Migration(8, 'user listing indexes', [
+        # Admin users listing: newest first by id (the rowid), optionally by
+        # city or state, and the created_at date range
+        'CREATE INDEX IF NOT EXISTS idx_users_created ON users (created_at, id)',
+        'CREATE INDEX IF NOT EXISTS idx_users_city_id ON users (city COLLATE NOCASE, id)',
+        'CREATE INDEX IF NOT EXISTS idx_users_state_id ON users (state COLLATE NOCASE, id)',
+    ]),
+    Migration(9, 'shared resource versions', [
+        # ETag counters every worker process reads, bumped in each write's transaction
+        *CREATE_RESOURCE_VERSIONS_TABLE,
+    ]),
+]
+
+
+def run_migrations(conn, migrations=MIGRATIONS):
+    """Apply pending migrations in version order. Returns the versions applied."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.commit()
+
+    applied = {row[0] for row in conn.execute('SELECT version FROM schema_migrations')}
+    newly_applied = []
+
+    for migration in sorted(migrations, key=lambda m: m.version):
+        if migration.version in applied:
+            continue
+
+        cursor = conn.cursor()
+        try:
+            cursor.execute('BEGIN')
+            migration.apply(cursor)
+            cursor.execute(
+                'INSERT INTO schema_migrations (version, name) VALUES (?, ?)',
+                (migration.version, migration.name)
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            logger.exception("Migration %s (%s) failed", migration.version, migration.name)
+            raise
+
+        logger.info("Applied migration %s: %s", migration.version, migration.name)
+        newly_applied.append(migration.version)
+
+    return newly_applied
+
+
+def explain_queries(conn, queries):
+    """Run EXPLAIN QUERY PLAN for each named query.
+
+    `queries` maps a name to (sql, allowed_scans), where allowed_scans lists
+    tables that are expected to be read in full (e.g. listing every lot).
+    Returns {name: {'plan': [...], 'full_scans': [...]}}.
+    """
+    report = {}
+    for name, (sql, allowed_scans) in queries.items():
+        params = (None,) * sql.count('?')
+        rows = conn.execute(f'EXPLAIN QUERY PLAN {sql}', params).fetchall()
+        plan = [row[3] for row in rows]
+
+        full_scans = []
+        for detail in plan:
+            # "SCAN t" without "USING ... INDEX" reads every row of t
+            if detail.startswith('SCAN ') and 'INDEX' not in detail:
+                table = detail.split()[1]
+                # "(subquery-N)" is a window function's own pass over its input
+                if table not in allowed_scans and not table.startswith('('):
+                    full_scans.append(detail)
+
+        report[name] = {'plan': plan, 'full_scans': full_scans}
+    return report
@@ -0,0 +1,29 @@
+"""
+Keyset pagination helpers for the Parking Management System
+Opaque cursor tokens that carry the sort key of the last row on a page
+"""
+
+import base64
+import json
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor token cannot be decoded."""
+
+
+def encode_cursor(*values):
+    """Pack the sort key of the last row into a URL-safe token."""
+    raw = json.dumps(values, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode('ascii')
+
+
+def decode_cursor(token, size):
+    """Unpack a token produced by encode_cursor into a tuple of `size` values."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, UnicodeError) as e:
+        raise InvalidCursor(f"Malformed cursor: {e}") from None
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor("Cursor does not match this listing")
+    return tuple(values)
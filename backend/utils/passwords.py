@@ -0,0 +1,72 @@
+"""
+Password hashing for the Parking Management System
+Configurable hash policy that flags outdated hashes for a rehash on the next login
+"""
+
+import hashlib
+import hmac
+import re
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+# Hash schemes werkzeug writes as method$salt$hash
+WERKZEUG_SCHEMES = ('pbkdf2', 'scrypt')
+
+# Unsalted MD5 written by the debug test-user routes
+_MD5_HEX = re.compile(r'[0-9a-f]{32}')
+
+
+class PasswordPolicy:
+    """Hash new passwords with one werkzeug `method` and verify older ones.
+
+    `method` is a werkzeug method string such as 'pbkdf2:sha256:600000' or
+    'scrypt:32768:8:1'. A successful verify against a hash made with any
+    other method returns a replacement hash so callers can upgrade the row.
+    With `allow_legacy`, plaintext and unsalted MD5 rows still verify and
+    are always replaced.
+    """
+
+    def __init__(self, method='pbkdf2:sha256:600000', salt_length=16, allow_legacy=True):
+        self.method = method
+        self.salt_length = salt_length
+        self.allow_legacy = allow_legacy
+        self._prefix = None
+
+    def hash(self, password):
+        return generate_password_hash(password, method=self.method, salt_length=self.salt_length)
+
+    def _current_prefix(self):
+        # werkzeug fills in default parameters ('pbkdf2:sha256' -> 'pbkdf2:sha256:600000'),
+        # so compare against what it actually writes
+        if self._prefix is None:
+            self._prefix = self.hash('').split('$', 1)[0]
+        return self._prefix
+
+    def is_hashed(self, stored):
+        return stored.count('$') >= 2 and stored.split(':', 1)[0] in WERKZEUG_SCHEMES
+
+    def needs_rehash(self, stored):
+        if not self.is_hashed(stored):
+            return True
+        return stored.split('$', 1)[0] != self._current_prefix()
+
+    def verify(self, stored, password):
+        """Return (valid, replacement hash or None) for a login attempt."""
+        if not stored or not password:
+            return False, None
+        if self.is_hashed(stored):
+            try:
+                valid = check_password_hash(stored, password)
+            except ValueError:
+                # Unknown or malformed method in the stored hash
+                valid = False
+        elif self.allow_legacy:
+            valid = hmac.compare_digest(stored.encode(), password.encode())
+            if not valid and _MD5_HEX.fullmatch(stored):
+                valid = hmac.compare_digest(stored, hashlib.md5(password.encode()).hexdigest())
+        else:
+            valid = False
+
+        if valid and self.needs_rehash(stored):
+            return True, self.hash(password)
+        return valid, None
@@ -0,0 +1,377 @@
+"""
+Request profiling for the Parking Management System
+WSGI middleware timing each request, and the SQL it runs, grouped by endpoint
+"""
+
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# The request being profiled on this thread (None outside requests)
+_local = threading.local()
+
+# Distinct statements remembered per request; the rest are pooled as one entry
+MAX_STATEMENTS_PER_REQUEST = 200
+OTHER_STATEMENTS = '<other statements>'
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def _record(sql, started, cursor=None):
+    profile = getattr(_local, 'profile', None)
+    if profile is not None:
+        profile.record_sql(sql, time.perf_counter() - started, cursor)
+
+
+class TracedCursor(sqlite3.Cursor):
+    """Cursor that charges execute and fetch time to the current request.
+
+    Fetch time is added to the statement the cursor last ran. Rows read by
+    iterating the cursor directly are not timed, only its execute().
+    """
+
+    def execute(self, sql, parameters=()):
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            _record(sql, started, self)
+
+    def executemany(self, sql, seq_of_parameters):
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            _record(sql, started, self)
+
+    def executescript(self, sql_script):
+        started = time.perf_counter()
+        try:
+            return super().executescript(sql_script)
+        finally:
+            _record(sql_script, started, self)
+
+    def fetchone(self):
+        started = time.perf_counter()
+        try:
+            return super().fetchone()
+        finally:
+            self._charge_fetch(started)
+
+    def fetchmany(self, size=None):
+        started = time.perf_counter()
+        try:
+            return super().fetchmany(self.arraysize if size is None else size)
+        finally:
+            self._charge_fetch(started)
+
+    def fetchall(self):
+        started = time.perf_counter()
+        try:
+            return super().fetchall()
+        finally:
+            self._charge_fetch(started)
+
+    def _charge_fetch(self, started):
+        profile = getattr(_local, 'profile', None)
+        if profile is not None:
+            profile.record_fetch(getattr(self, 'profiled_sql', None), time.perf_counter() - started)
+
+
+class TracedConnection(sqlite3.Connection):
+    """sqlite3 connection whose statements, commits and rollbacks are timed.
+
+    Pass as SQLitePool(connection_factory=...). Outside a profiled request
+    the only cost is one thread-local lookup per call.
+    """
+
+    def cursor(self, factory=TracedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+    def commit(self):
+        started = time.perf_counter()
+        try:
+            return super().commit()
+        finally:
+            _record('COMMIT', started)
+
+    def rollback(self):
+        started = time.perf_counter()
+        try:
+            return super().rollback()
+        finally:
+            _record('ROLLBACK', started)
+
+
+class RequestProfile:
+    """Timings and SQL statements of one request."""
+
+    __slots__ = ('method', 'path', 'endpoint', 'status', 'long_lived', 'started', 'cpu_started',
+                 'wall', 'cpu', 'sql_count', 'sql_seconds', 'statements')
+
+    def __init__(self, method, path):
+        self.method = method
+        self.path = path
+        self.endpoint = None
+        self.status = None
+        self.long_lived = False
+        self.wall = self.cpu = None
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.statements = {}
+        self.started = time.perf_counter()
+        self.cpu_started = time.thread_time()
+
+    @property
+    def key(self):
+        return f'{self.method} {self.endpoint or "<unmatched>"}'
+
+    def record_sql(self, sql, seconds, cursor=None):
+        self.sql_count += 1
+        self.sql_seconds += seconds
+        entry = self._entry(sql)
+        entry[0] += 1
+        entry[1] += seconds
+        if cursor is not None:
+            cursor.profiled_sql = sql
+
+    def record_fetch(self, sql, seconds):
+        self.sql_seconds += seconds
+        self._entry(sql or OTHER_STATEMENTS)[1] += seconds
+
+    def _entry(self, sql):
+        entry = self.statements.get(sql)
+        if entry is None:
+            if len(self.statements) >= MAX_STATEMENTS_PER_REQUEST:
+                sql = OTHER_STATEMENTS
+                entry = self.statements.get(sql)
+            if entry is None:
+                entry = self.statements[sql] = [0, 0.0]
+        return entry
+
+    def stop(self):
+        if self.wall is None:
+            self.wall = time.perf_counter() - self.started
+            self.cpu = time.thread_time() - self.cpu_started
+
+    def server_timing(self):
+        """Server-Timing header value for the time spent so far."""
+        wall = time.perf_counter() - self.started
+        cpu = time.thread_time() - self.cpu_started
+        return (f'app;dur={wall * 1000:.1f}, cpu;dur={cpu * 1000:.1f}, '
+                f'db;dur={self.sql_seconds * 1000:.1f};desc="{self.sql_count} queries"')
+
+    def top_statements(self, limit):
+        ranked = sorted(self.statements.items(), key=lambda item: item[1][1], reverse=True)[:limit]
+        return [{
+            'sql': _WHITESPACE.sub(' ', sql).strip()[:300],
+            'count': count,
+            'total_ms': round(seconds * 1000, 3),
+        } for sql, (count, seconds) in ranked]
+
+
+class EndpointStats:
+    """Running totals for one endpoint, plus a window of recent latencies."""
+
+    __slots__ = ('count', 'errors', 'wall', 'wall_max', 'cpu', 'sql_count', 'sql_max', 'sql_seconds', 'recent')
+
+    def __init__(self, window):
+        self.count = self.errors = self.sql_count = self.sql_max = 0
+        self.wall = self.wall_max = self.cpu = self.sql_seconds = 0.0
+        self.recent = deque(maxlen=window)
+
+    def add(self, profile):
+        self.count += 1
+        if profile.status is None or profile.status >= 500:
+            self.errors += 1
+        self.wall += profile.wall
+        self.wall_max = max(self.wall_max, profile.wall)
+        self.cpu += profile.cpu
+        self.sql_count += profile.sql_count
+        self.sql_max = max(self.sql_max, profile.sql_count)
+        self.sql_seconds += profile.sql_seconds
+        self.recent.append(profile.wall)
+
+    def snapshot(self):
+        recent = sorted(self.recent)
+        return {
+            'requests': self.count,
+            'errors': self.errors,
+            'total_ms': round(self.wall * 1000, 1),
+            'avg_ms': round(self.wall * 1000 / self.count, 3),
+            'p50_ms': _percentile_ms(recent, 50),
+            'p95_ms': _percentile_ms(recent, 95),
+            'p99_ms': _percentile_ms(recent, 99),
+            'max_ms': round(self.wall_max * 1000, 3),
+            'avg_cpu_ms': round(self.cpu * 1000 / self.count, 3),
+            'avg_sql_ms': round(self.sql_seconds * 1000 / self.count, 3),
+            'sql_share': round(self.sql_seconds / self.wall, 3) if self.wall else 0.0,
+            'queries_per_request': round(self.sql_count / self.count, 2),
+            'max_queries': self.sql_max,
+        }
+
+
+def _percentile_ms(ordered, pct):
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return round(ordered[index] * 1000, 3)
+
+
+class RequestProfiler:
+    """WSGI middleware recording wall time, CPU time and SQL per endpoint.
+
+    Wrap the Flask app's wsgi_app and have a before_request hook name the
+    endpoint (set_endpoint). A request is finished after the last chunk of
+    its body (or when the server closes it), so streamed responses are
+    timed to the last byte. Responses
+    of a `long_lived_types` content type (event streams) are timed only up
+    to their headers. Requests slower than `slow_ms` go to a bounded slow
+    log with their most expensive statements. With `server_timing` every
+    response carries a Server-Timing header covering the time until its
+    headers were sent.
+    """
+
+    ENVIRON_KEY = 'parking.profile'
+
+    def __init__(self, wsgi_app, slow_ms=500.0, slow_log_size=100, top_statements=5,
+                 latency_window=1000, server_timing=False, long_lived_types=('text/event-stream',)):
+        self.wsgi_app = wsgi_app
+        self.slow_ms = slow_ms
+        self.top_statements = top_statements
+        self.latency_window = latency_window
+        self.server_timing = server_timing
+        self.long_lived_types = long_lived_types
+        self._lock = threading.Lock()
+        self._endpoints = {}
+        self._slow = deque(maxlen=slow_log_size)
+        self._since = time.time()
+        self._listeners = []
+
+    def __call__(self, environ, start_response):
+        profile = RequestProfile(environ.get('REQUEST_METHOD', 'GET'), environ.get('PATH_INFO', ''))
+        environ[self.ENVIRON_KEY] = profile
+        _local.profile = profile
+
+        def profiled_start_response(status, headers, exc_info=None):
+            profile.status = int(status.split(' ', 1)[0])
+            content_type = next((value for name, value in headers if name.lower() == 'content-type'), '')
+            if content_type.startswith(self.long_lived_types):
+                profile.long_lived = True
+                profile.stop()
+            if self.server_timing:
+                headers.append(('Server-Timing', profile.server_timing()))
+            return start_response(status, headers, exc_info)
+
+        try:
+            body = self.wsgi_app(environ, profiled_start_response)
+        except BaseException:
+            self._finish(profile)
+            raise
+        return _ProfiledBody(body, self, profile)
+
+    def subscribe(self, listener):
+        """Call listener(profile) after every finished request (on its thread)."""
+        self._listeners.append(listener)
+
+    @classmethod
+    def set_endpoint(cls, environ, endpoint):
+        profile = environ.get(cls.ENVIRON_KEY)
+        if profile is not None:
+            profile.endpoint = endpoint
+
+    def _finish(self, profile):
+        if getattr(_local, 'profile', None) is profile:
+            _local.profile = None
+        profile.stop()
+        key = profile.key
+        with self._lock:
+            stats = self._endpoints.get(key)
+            if stats is None:
+                stats = self._endpoints[key] = EndpointStats(self.latency_window)
+            stats.add(profile)
+        for listener in self._listeners:
+            listener(profile)
+        wall_ms = profile.wall * 1000
+        if wall_ms >= self.slow_ms and not profile.long_lived:
+            entry = {
+                'at': datetime.now().isoformat(timespec='seconds'),
+                'endpoint': key,
+                'path': profile.path,
+                'status': profile.status,
+                'wall_ms': round(wall_ms, 1),
+                'cpu_ms': round(profile.cpu * 1000, 1),
+                'sql_ms': round(profile.sql_seconds * 1000, 1),
+                'queries': profile.sql_count,
+                'top_statements': profile.top_statements(self.top_statements),
+            }
+            self._slow.append(entry)
+            logger.warning("Slow request %s (%s): %sms, %s queries in %sms",
+                           key, profile.path, entry['wall_ms'], profile.sql_count, entry['sql_ms'])
+
+    def stats(self, slow_limit=None):
+        """Per-endpoint totals (most total time first) and the slow log, newest first."""
+        with self._lock:
+            endpoints = [dict(stats.snapshot(), endpoint=key) for key, stats in self._endpoints.items()]
+            slow = list(self._slow)
+        endpoints.sort(key=lambda entry: entry['total_ms'], reverse=True)
+        slow.reverse()
+        return {
+            'since': datetime.fromtimestamp(self._since).isoformat(timespec='seconds'),
+            'slow_ms': self.slow_ms,
+            'endpoints': endpoints,
+            'slow_requests': slow[:slow_limit] if slow_limit is not None else slow,
+        }
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+            self._slow.clear()
+            self._since = time.time()
+
+
+class _ProfiledBody:
+    """Response iterable that finishes the profile after its last chunk or on close()."""
+
+    def __init__(self, body, profiler, profile):
+        self._body = body
+        self._profiler = profiler
+        self._profile = profile
+        self._finished = False
+
+    def __iter__(self):
+        # Streamed bodies are generated here, possibly after other requests
+        # ran on this thread, so point SQL accounting back at this request
+        if not self._profile.long_lived:
+            _local.profile = self._profile
+        for chunk in self._body:
+            yield chunk
+        self._finish()
+
+    def close(self):
+        try:
+            close = getattr(self._body, 'close', None)
+            if close is not None:
+                close()
+        finally:
+            self._finish()
+
+    def _finish(self):
+        if not self._finished:
+            self._finished = True
+            self._profiler._finish(self._profile)
@@ -0,0 +1,246 @@
+"""
+Read-through cache for the Parking Management System
+Caches built read payloads in Redis, or in a per-process LRU when Redis is unavailable
+"""
+
+import json
+import logging
+import math
+import threading
+import time
+
+from backend.utils.circuit_breaker import CLOSED
+from backend.utils.lru import LRUCache
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class _Flight:
+    """One in-progress load that concurrent misses for the same key wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.ok = False
+        self.value = None
+
+
+class CacheNamespace:
+    """TTL, local fallback store and counters for one kind of cached read."""
+
+    def __init__(self, name, ttl, maxsize):
+        self.name = name
+        self.ttl = ttl
+        self.local = LRUCache(maxsize=maxsize, ttl=ttl)
+        # Moves on every invalidation, so a load that raced one is not stored
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.coalesced = 0
+        self.backend_errors = 0
+        self.lookup_seconds = 0.0
+        self.load_seconds = 0.0
+        self.max_load_seconds = 0.0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+            'loads': self.loads,
+            'coalesced': self.coalesced,
+            'backend_errors': self.backend_errors,
+            'avg_lookup_ms': round(self.lookup_seconds / lookups * 1000, 3) if lookups else 0.0,
+            'avg_load_ms': round(self.load_seconds / self.loads * 1000, 3) if self.loads else 0.0,
+            'max_load_ms': round(self.max_load_seconds * 1000, 3),
+            'local_entries': len(self.local),
+        }
+
+
+class ReadThroughCache:
+    """Cache of computed read payloads, grouped into namespaces.
+
+    With a Redis client, every entry is one Redis key shared by every
+    worker, `<prefix><namespace>:<key>`, written with SET ... EX ttl so
+    Redis itself removes it once it expires. A key is dropped with DEL and
+    a whole namespace by scanning for its prefix. A Redis error is counted
+    and the call falls back to the namespace's in-process LRU, which is
+    also the only store when there is no client. Values must be
+    JSON-serializable and are shared, so callers must not mutate them.
+
+    With a `breaker` (see circuit_breaker.py), Redis is skipped outright
+    while the circuit is open, and errors count towards opening it. Redis
+    deletes skipped or failed in that time are made up for by dropping
+    every namespace once the circuit closes.
+    """
+
+    def __init__(self, redis_client=None, breaker=None, prefix='parking:cache:', flight_timeout=10.0):
+        self.redis = redis_client
+        self.breaker = breaker
+        self.prefix = prefix
+        self.flight_timeout = flight_timeout
+        self._namespaces = {}
+        self._lock = threading.Lock()
+        self._flights = {}
+        self._missed_deletes = False
+        if breaker is not None:
+            breaker.subscribe(self._breaker_changed)
+
+    @property
+    def backend(self):
+        return 'redis' if self.redis is not None else 'local'
+
+    def _redis_usable(self):
+        return self.redis is not None and (self.breaker is None or self.breaker.allow())
+
+    def namespace(self, name, ttl, maxsize=1024):
+        self._namespaces[name] = CacheNamespace(name, ttl, maxsize)
+
+    def get_or_load(self, namespace, key, loader):
+        """Return the cached value for (namespace, key), calling loader() on a miss.
+
+        Concurrent misses for one key in this process share a single
+        loader() call. A None result is returned but not cached.
+        """
+        ns = self._namespaces[namespace]
+        key = str(key)
+        started = time.perf_counter()
+        value = self._lookup(ns, key)
+        elapsed = time.perf_counter() - started
+
+        with self._lock:
+            ns.lookup_seconds += elapsed
+            if value is not _MISSING:
+                ns.hits += 1
+                return value
+            ns.misses += 1
+            flight = self._flights.get((namespace, key))
+            leader = flight is None
+            if leader:
+                flight = self._flights[(namespace, key)] = _Flight()
+            else:
+                ns.coalesced += 1
+            generation = ns.generation
+
+        if not leader:
+            # Fall back to loading here if the leader failed or is stuck
+            if flight.done.wait(self.flight_timeout) and flight.ok:
+                return flight.value
+            return loader()
+
+        try:
+            started = time.perf_counter()
+            value = loader()
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                ns.loads += 1
+                ns.load_seconds += elapsed
+                ns.max_load_seconds = max(ns.max_load_seconds, elapsed)
+                store = value is not None and ns.generation == generation
+            if store:
+                self._store(ns, key, value)
+            flight.value, flight.ok = value, True
+            return value
+        finally:
+            with self._lock:
+                self._flights.pop((namespace, key), None)
+            flight.done.set()
+
+    def invalidate(self, namespace, *keys):
+        """Drop specific keys of a namespace, here and in Redis."""
+        ns = self._namespaces[namespace]
+        keys = [str(key) for key in keys]
+        with self._lock:
+            ns.generation += 1
+        for key in keys:
+            ns.local.pop(key)
+        if keys:
+            self._redis_delete(ns, lambda: self.redis.delete(*(self._redis_key(ns, key) for key in keys)))
+
+    def clear(self, namespace=None):
+        """Drop a whole namespace, or every namespace."""
+        names = [namespace] if namespace is not None else list(self._namespaces)
+        for name in names:
+            ns = self._namespaces[name]
+            with self._lock:
+                ns.generation += 1
+            ns.local.clear()
+            self._redis_delete(ns, lambda: self._redis_delete_namespace(ns))
+
+    def stats(self):
+        with self._lock:
+            return {
+                'backend': self.backend,
+                'breaker': self.breaker.stats() if self.breaker is not None else None,
+                'namespaces': {name: ns.stats() for name, ns in self._namespaces.items()},
+            }
+
+    def _redis_key(self, ns, key):
+        return f'{self.prefix}{ns.name}:{key}'
+
+    def _redis_delete_namespace(self, ns, batch_size=500):
+        batch = []
+        for redis_key in self.redis.scan_iter(match=self._redis_key(ns, '*'), count=batch_size):
+            batch.append(redis_key)
+            if len(batch) >= batch_size:
+                self.redis.delete(*batch)
+                batch = []
+        if batch:
+            self.redis.delete(*batch)
+
+    def _lookup(self, ns, key):
+        if self._redis_usable():
+            try:
+                raw = self.redis.get(self._redis_key(ns, key))
+            except Exception as e:
+                self._backend_error(ns, e)
+            else:
+                self._backend_ok()
+                return _MISSING if raw is None else json.loads(raw)
+        return ns.local.get(key, _MISSING)
+
+    def _store(self, ns, key, value):
+        if self._redis_usable():
+            try:
+                self.redis.set(self._redis_key(ns, key), json.dumps(value, separators=(',', ':')),
+                               ex=max(1, math.ceil(ns.ttl)))
+                self._backend_ok()
+                return
+            except Exception as e:
+                self._backend_error(ns, e)
+        ns.local.set(key, value)
+
+    def _redis_delete(self, ns, delete):
+        if self.redis is None:
+            return
+        if not self._redis_usable():
+            self._missed_deletes = True
+            return
+        try:
+            delete()
+            self._backend_ok()
+        except Exception as e:
+            self._missed_deletes = True
+            self._backend_error(ns, e)
+
+    def _breaker_changed(self, state):
+        if state == CLOSED and self._missed_deletes:
+            self._missed_deletes = False
+            logger.info("Redis is back; dropping cached namespaces that may have missed invalidations")
+            for ns in self._namespaces.values():
+                self._redis_delete(ns, lambda: self._redis_delete_namespace(ns))
+
+    def _backend_ok(self):
+        if self.breaker is not None:
+            self.breaker.record_success()
+
+    def _backend_error(self, ns, error):
+        with self._lock:
+            ns.backend_errors += 1
+        if self.breaker is not None:
+            self.breaker.record_failure()
+        logger.debug("Redis cache error in %s, using the local cache: %s", ns.name, error)
@@ -0,0 +1,132 @@
+"""
+Full-text search for the Parking Management System
+FTS5 indexes over lots and users, kept in sync by triggers, and the ranked search queries
+"""
+
+import re
+
+# Emails are indexed by their local part. Every address shares a handful of
+# domain tokens ('gmail', 'com'), and a token that matches every row makes a
+# search cost as much as a full scan. Phones are indexed as one digit string
+# followed by the number as written, so '+91 98765-43210' is found by
+# '919876543210' and by '98765'.
+EMAIL_LOCAL_PART = "CASE WHEN instr({0}, '@') > 0 THEN substr({0}, 1, instr({0}, '@') - 1) ELSE {0} END"
+PHONE_DIGITS = "replace(replace(replace(replace(replace(replace({0}, ' ', ''), '-', ''), '(', ''), ')', ''), '.', ''), '+', '')"
+
+
+def _user_values(row):
+    email = EMAIL_LOCAL_PART.format(f'{row}.email')
+    phone = f"COALESCE({row}.phone, '')"
+    return f"{row}.full_name, {email}, {PHONE_DIGITS.format(phone)} || ' ' || {phone}"
+
+
+def _lot_values(row):
+    return f"{row}.name, {row}.address, COALESCE({row}.pincode, '')"
+
+
+# Contentless tables: they hold only the index, and results are joined back
+# to the base tables by rowid. Deleting an entry means handing FTS5 the
+# values that were indexed, which the triggers recompute from old.*.
+# prefix='2 3' indexes 2- and 3-character prefixes, the type-ahead case.
+CREATE_SEARCH_TABLES = (
+    '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS lots_fts USING fts5(
+        name, address, pincode,
+        content='', tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    ''',
+    '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5(
+        full_name, email, phone,
+        content='', tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS lots_fts_insert AFTER INSERT ON parking_lots BEGIN
+        INSERT INTO lots_fts (rowid, name, address, pincode) VALUES (new.id, {_lot_values('new')});
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS lots_fts_delete AFTER DELETE ON parking_lots BEGIN
+        INSERT INTO lots_fts (lots_fts, rowid, name, address, pincode) VALUES ('delete', old.id, {_lot_values('old')});
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS lots_fts_update AFTER UPDATE OF name, address, pincode ON parking_lots BEGIN
+        INSERT INTO lots_fts (lots_fts, rowid, name, address, pincode) VALUES ('delete', old.id, {_lot_values('old')});
+        INSERT INTO lots_fts (rowid, name, address, pincode) VALUES (new.id, {_lot_values('new')});
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS users_fts_insert AFTER INSERT ON users BEGIN
+        INSERT INTO users_fts (rowid, full_name, email, phone) VALUES (new.id, {_user_values('new')});
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS users_fts_delete AFTER DELETE ON users BEGIN
+        INSERT INTO users_fts (users_fts, rowid, full_name, email, phone) VALUES ('delete', old.id, {_user_values('old')});
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS users_fts_update AFTER UPDATE OF full_name, email, phone ON users BEGIN
+        INSERT INTO users_fts (users_fts, rowid, full_name, email, phone) VALUES ('delete', old.id, {_user_values('old')});
+        INSERT INTO users_fts (rowid, full_name, email, phone) VALUES (new.id, {_user_values('new')});
+    END
+    ''',
+)
+
+
+def rebuild_search_index(cursor):
+    """Re-index every lot and user from the base tables."""
+    cursor.execute("INSERT INTO lots_fts (lots_fts) VALUES ('delete-all')")
+    cursor.execute(f'INSERT INTO lots_fts (rowid, name, address, pincode) SELECT pl.id, {_lot_values("pl")} FROM parking_lots pl')
+    cursor.execute("INSERT INTO users_fts (users_fts) VALUES ('delete-all')")
+    cursor.execute(f'INSERT INTO users_fts (rowid, full_name, email, phone) SELECT u.id, {_user_values("u")} FROM users u')
+
+
+# Matches are ranked with bm25 (column weights as listed), but only among the
+# first `window` matches in index order: ranking every match of a broad
+# prefix at 1M users costs hundreds of milliseconds. `matched` counts the
+# window, so matched == window means there may be more.
+SEARCH_QUERIES = {
+    'lots': '''
+        SELECT pl.id, pl.name, pl.address, pl.pincode, pl.price_per_hour AS price, pl.total_slots,
+               -m.score AS score, COUNT(*) OVER () AS matched
+        FROM (SELECT rowid, bm25(lots_fts, 10.0, 4.0, 6.0) AS score
+              FROM lots_fts WHERE lots_fts MATCH ? LIMIT ?) m
+        JOIN parking_lots pl ON pl.id = m.rowid
+        ORDER BY m.score, pl.id
+        LIMIT ? OFFSET ?
+    ''',
+    'users': '''
+        SELECT u.id, u.full_name AS name, u.email, u.phone, u.city, u.state,
+               -m.score AS score, COUNT(*) OVER () AS matched
+        FROM (SELECT rowid, bm25(users_fts, 10.0, 5.0, 2.0) AS score
+              FROM users_fts WHERE users_fts MATCH ? LIMIT ?) m
+        JOIN users u ON u.id = m.rowid
+        ORDER BY m.score, u.id
+        LIMIT ? OFFSET ?
+    ''',
+}
+
+_PHONE_LIKE = re.compile(r'^[\d\s\-().+]+$')
+_TOKEN = re.compile(r'\w+')
+
+
+def build_match_query(text):
+    """FTS5 MATCH expression for a search box string; None if it has nothing searchable.
+
+    Every token must match (AND). Tokens of two or more characters match
+    as prefixes, and single characters are dropped, since a one-letter
+    prefix matches a large share of any index. A query that looks like a
+    phone number is collapsed into one digit string, and an email is cut
+    to its local part, to match how those columns are indexed.
+    """
+    text = (text or '').strip()
+    if _PHONE_LIKE.match(text):
+        text = re.sub(r'\D', '', text)
+    words = [word.split('@', 1)[0] for word in text.split()]
+    tokens = [token for word in words for token in _TOKEN.findall(word) if len(token) > 1]
+    if not tokens:
+        return None
+    return ' '.join(f'"{token}"*' for token in tokens)
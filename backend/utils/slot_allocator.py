@@ -0,0 +1,182 @@
+"""
+In-memory free-slot allocator for the Parking Management System
+Keeps a per-lot set of free slots so "book any slot" never scans parking_slots
+"""
+
+import threading
+from collections import OrderedDict
+
+
+def _lowest_bit(bits):
+    """Index of the lowest set bit of a non-zero integer."""
+    return (bits & -bits).bit_length() - 1
+
+
+class LowestNumberPolicy:
+    """Always hand out the lowest free slot number (bitset)."""
+
+    name = 'lowest'
+
+    def __init__(self):
+        self.bits = 0
+
+    def add(self, slot_number):
+        self.bits |= 1 << slot_number
+
+    def remove(self, slot_number):
+        self.bits &= ~(1 << slot_number)
+
+    def __contains__(self, slot_number):
+        return bool(self.bits >> slot_number & 1)
+
+    def pick(self):
+        if not self.bits:
+            return None
+        return _lowest_bit(self.bits)
+
+
+class RoundRobinPolicy(LowestNumberPolicy):
+    """Hand out the next free slot after the last one allocated, wrapping around."""
+
+    name = 'round_robin'
+
+    def __init__(self):
+        super().__init__()
+        self.cursor = 0
+
+    def pick(self):
+        if not self.bits:
+            return None
+        ahead = self.bits >> self.cursor
+        slot_number = self.cursor + _lowest_bit(ahead) if ahead else _lowest_bit(self.bits)
+        self.cursor = slot_number + 1
+        return slot_number
+
+
+class LeastRecentlyUsedPolicy:
+    """Hand out the slot that has been free the longest (free list)."""
+
+    name = 'lru'
+
+    def __init__(self):
+        self.free = OrderedDict()
+
+    def add(self, slot_number):
+        self.free.pop(slot_number, None)
+        self.free[slot_number] = None
+
+    def remove(self, slot_number):
+        self.free.pop(slot_number, None)
+
+    def __contains__(self, slot_number):
+        return slot_number in self.free
+
+    def pick(self):
+        if not self.free:
+            return None
+        return next(iter(self.free))
+
+
+ALLOCATION_POLICIES = {
+    policy.name: policy
+    for policy in (LowestNumberPolicy, RoundRobinPolicy, LeastRecentlyUsedPolicy)
+}
+
+
+class _LotSlots:
+    """Free slots of one lot plus the slot_number -> slot id mapping."""
+
+    def __init__(self, policy):
+        self.policy = policy
+        self.slot_ids = {}
+        self.free_count = 0
+
+
+class SlotAllocator:
+    """Per-lot free-slot structures, kept in sync with parking_slots.
+
+    allocate() removes the slot it returns, so concurrent callers in this
+    process get distinct slots. The database claim stays the source of
+    truth: if it fails, call mark_free() (error) or leave the slot out
+    (it was taken by someone else).
+    """
+
+    def __init__(self, policy='lowest'):
+        if policy not in ALLOCATION_POLICIES:
+            raise ValueError(f"Unknown allocation policy '{policy}'. "
+                             f"Choose from: {', '.join(ALLOCATION_POLICIES)}")
+        self.policy_name = policy
+        self._lots = {}
+        self._lock = threading.Lock()
+
+    def rebuild(self, conn, lot_id=None):
+        """Reload free slots from SQLite for one lot, or for every lot."""
+        if lot_id is None:
+            rows = conn.execute(
+                'SELECT lot_id, id, slot_number, is_available FROM parking_slots'
+            ).fetchall()
+        else:
+            rows = conn.execute(
+                'SELECT lot_id, id, slot_number, is_available FROM parking_slots WHERE lot_id = ?',
+                (lot_id,)
+            ).fetchall()
+
+        lots = {}
+        if lot_id is not None:
+            lots[lot_id] = _LotSlots(ALLOCATION_POLICIES[self.policy_name]())
+        for row_lot_id, slot_id, slot_number, is_available in rows:
+            lot = lots.get(row_lot_id)
+            if lot is None:
+                lot = lots[row_lot_id] = _LotSlots(ALLOCATION_POLICIES[self.policy_name]())
+            lot.slot_ids[slot_number] = slot_id
+            if is_available:
+                lot.policy.add(slot_number)
+                lot.free_count += 1
+
+        with self._lock:
+            if lot_id is None:
+                self._lots = lots
+            else:
+                self._lots.update(lots)
+
+    def allocate(self, lot_id):
+        """Take a free slot of the lot. Returns (slot_id, slot_number) or None."""
+        with self._lock:
+            lot = self._lots.get(lot_id)
+            if lot is None:
+                return None
+            slot_number = lot.policy.pick()
+            if slot_number is None:
+                return None
+            lot.policy.remove(slot_number)
+            lot.free_count -= 1
+            return lot.slot_ids[slot_number], slot_number
+
+    def mark_booked(self, lot_id, slot_number):
+        with self._lock:
+            lot = self._lots.get(lot_id)
+            if lot is None or slot_number not in lot.slot_ids:
+                return
+            if slot_number in lot.policy:
+                lot.policy.remove(slot_number)
+                lot.free_count -= 1
+
+    def mark_free(self, lot_id, slot_id, slot_number):
+        with self._lock:
+            lot = self._lots.get(lot_id)
+            if lot is None:
+                return
+            lot.slot_ids[slot_number] = slot_id
+            if slot_number not in lot.policy:
+                lot.policy.add(slot_number)
+                lot.free_count += 1
+
+    def drop_lot(self, lot_id):
+        with self._lock:
+            self._lots.pop(lot_id, None)
+
+    def free_count(self, lot_id):
+        with self._lock:
+            lot = self._lots.get(lot_id)
+            return lot.free_count if lot else 0
+
@@ -0,0 +1,85 @@
+"""
+Per-slot live view for the Parking Management System
+One precomputed row per slot, kept current by the routes that change slots, lots or users
+"""
+
+CREATE_SLOT_VIEW_TABLE = (
+    # Clustered on (lot_id, slot_number) so a lot's slot grid is one range read.
+    # start_epoch is the active booking's start in unix seconds; the running
+    # duration and cost are worked out from it at read time.
+    '''
+    CREATE TABLE IF NOT EXISTS slot_live_view (
+        lot_id INTEGER NOT NULL,
+        slot_number INTEGER NOT NULL,
+        slot_id INTEGER NOT NULL,
+        is_available INTEGER NOT NULL,
+        lot_name TEXT,
+        lot_address TEXT,
+        hourly_rate REAL,
+        current_user_id INTEGER,
+        current_user_name TEXT,
+        current_user_email TEXT,
+        booking_id TEXT,
+        vehicle_number TEXT,
+        start_epoch REAL,
+        booking_start_time TEXT,
+        booking_end_time TEXT,
+        planned_duration_hours REAL,
+        planned_cost REAL,
+        final_cost REAL,
+        booking_status TEXT,
+        PRIMARY KEY (lot_id, slot_number, slot_id)
+    ) WITHOUT ROWID
+    ''',
+)
+
+# Snapshot rows built from the base tables; {where} filters parking_slots (ps)
+REFRESH_SLOT_VIEW = '''
+    INSERT OR REPLACE INTO slot_live_view (
+        lot_id, slot_number, slot_id, is_available, lot_name, lot_address, hourly_rate,
+        current_user_id, current_user_name, current_user_email, booking_id, vehicle_number,
+        start_epoch, booking_start_time, booking_end_time,
+        planned_duration_hours, planned_cost, final_cost, booking_status
+    )
+    SELECT ps.lot_id, ps.slot_number, ps.id, ps.is_available, pl.name, pl.address, pl.price_per_hour,
+           ps.current_user_id, u.full_name, u.email, ps.booking_id, ps.vehicle_number,
+           CASE WHEN ps.is_available = 0 THEN b.start_ts END,
+           COALESCE(CASE WHEN ps.is_available = 0
+                         THEN strftime('%Y-%m-%d %H:%M:%S', b.start_ts, 'unixepoch', 'localtime') END,
+                    ps.booking_start_time),
+           CASE WHEN ps.is_available = 0
+                THEN strftime('%Y-%m-%d %H:%M:%S', b.end_ts, 'unixepoch', 'localtime') END,
+           COALESCE(b.planned_duration_hours, ps.planned_duration_hours),
+           COALESCE(b.planned_cost, ps.planned_cost),
+           b.final_cost, b.status
+    FROM parking_slots ps
+    JOIN parking_lots pl ON ps.lot_id = pl.id
+    LEFT JOIN users u ON ps.current_user_id = u.id
+    LEFT JOIN bookings b ON ps.booking_id = b.booking_id
+    {where}
+'''
+
+
+def refresh_slot_view(cursor, slot_ids=None, lot_id=None, user_id=None):
+    """Rewrite the view rows for some slots inside the caller's transaction.
+
+    Pass the slots a booking or release touched, a lot whose details or
+    slot count changed (its rows are replaced, so trimmed or deleted slots
+    drop out), or a user whose name or email changed.
+    """
+    if slot_ids is not None:
+        slot_ids = list(slot_ids)
+        if slot_ids:
+            placeholders = ', '.join('?' * len(slot_ids))
+            cursor.execute(REFRESH_SLOT_VIEW.format(where=f'WHERE ps.id IN ({placeholders})'), slot_ids)
+    if lot_id is not None:
+        cursor.execute('DELETE FROM slot_live_view WHERE lot_id = ?', (lot_id,))
+        cursor.execute(REFRESH_SLOT_VIEW.format(where='WHERE ps.lot_id = ?'), (lot_id,))
+    if user_id is not None:
+        cursor.execute(REFRESH_SLOT_VIEW.format(where='WHERE ps.current_user_id = ?'), (user_id,))
+
+
+def rebuild_slot_view(cursor):
+    """Rebuild every view row from the base tables (full scan)."""
+    cursor.execute('DELETE FROM slot_live_view')
+    cursor.execute(REFRESH_SLOT_VIEW.format(where=''))
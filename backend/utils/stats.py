@@ -0,0 +1,145 @@
+"""
+Running dashboard counters for the Parking Management System
+Mutating routes bump the counters inside their own transaction, so
+/api/bookings/stats reads a handful of rows instead of scanning bookings
+"""
+
+from datetime import date, timedelta
+
+# Counter names stored in stats_counters
+BOOKINGS_TOTAL = 'bookings.total'
+BOOKINGS_STATUS_PREFIX = 'bookings.status.'
+REVENUE_COMPLETED = 'revenue.completed'
+DURATION_SUM = 'duration.sum'
+DURATION_COUNT = 'duration.count'
+SLOTS_TOTAL = 'slots.total'
+SLOTS_OCCUPIED = 'slots.occupied'
+USERS_TOTAL = 'users.total'
+LOTS_TOTAL = 'lots.total'
+
+CREATE_STATS_TABLES = (
+    '''
+    CREATE TABLE IF NOT EXISTS stats_counters (
+        name TEXT PRIMARY KEY,
+        value REAL NOT NULL DEFAULT 0
+    )
+    ''',
+    # Per-day buckets for the "today" and "this week" KPIs
+    '''
+    CREATE TABLE IF NOT EXISTS stats_daily (
+        day TEXT PRIMARY KEY,
+        bookings INTEGER NOT NULL DEFAULT 0,
+        revenue REAL NOT NULL DEFAULT 0
+    )
+    ''',
+)
+
+
+def status_counter(status):
+    """Counter name for the number of bookings in a given status."""
+    return f'{BOOKINGS_STATUS_PREFIX}{status}'
+
+
+def day_of(timestamp):
+    """YYYY-MM-DD bucket for an ISO timestamp string (or today)."""
+    if not timestamp:
+        return date.today().isoformat()
+    return str(timestamp)[:10]
+
+
+def apply_stats(cursor, counters=None, day=None, bookings=0, revenue=0.0):
+    """Add deltas to the running counters using the caller's transaction."""
+    if counters:
+        cursor.executemany('''
+            INSERT INTO stats_counters (name, value) VALUES (?, ?)
+            ON CONFLICT(name) DO UPDATE SET value = value + excluded.value
+        ''', [(name, delta) for name, delta in counters.items() if delta])
+    if day and (bookings or revenue):
+        cursor.execute('''
+            INSERT INTO stats_daily (day, bookings, revenue) VALUES (?, ?, ?)
+            ON CONFLICT(day) DO UPDATE SET
+                bookings = bookings + excluded.bookings,
+                revenue = revenue + excluded.revenue
+        ''', (day, bookings, revenue))
+
+
+def apply_daily_stats(cursor, days):
+    """Add per-day deltas, given as {day: (bookings, revenue)}, in one statement."""
+    cursor.executemany('''
+        INSERT INTO stats_daily (day, bookings, revenue) VALUES (?, ?, ?)
+        ON CONFLICT(day) DO UPDATE SET
+            bookings = bookings + excluded.bookings,
+            revenue = revenue + excluded.revenue
+    ''', [(day, bookings, revenue) for day, (bookings, revenue) in days.items()])
+
+
+def reconcile_stats(cursor):
+    """Rebuild every counter from the base tables (full scan)."""
+    cursor.execute('DELETE FROM stats_counters')
+    cursor.execute('DELETE FROM stats_daily')
+
+    counters = {}
+    cursor.execute('SELECT COUNT(*) FROM bookings')
+    counters[BOOKINGS_TOTAL] = cursor.fetchone()[0]
+
+    cursor.execute('SELECT status, COUNT(*) FROM bookings GROUP BY status')
+    for status, count in cursor.fetchall():
+        counters[status_counter(status)] = count
+
+    cursor.execute('''
+        SELECT SUM(final_cost) FROM bookings
+        WHERE final_cost IS NOT NULL AND status = 'completed'
+    ''')
+    counters[REVENUE_COMPLETED] = cursor.fetchone()[0] or 0
+
+    cursor.execute('''
+        SELECT SUM(actual_duration_hours), COUNT(*) FROM bookings
+        WHERE actual_duration_hours IS NOT NULL AND actual_duration_hours > 0
+    ''')
+    duration_sum, duration_count = cursor.fetchone()
+    counters[DURATION_SUM] = duration_sum or 0
+    counters[DURATION_COUNT] = duration_count
+
+    cursor.execute('SELECT COUNT(*), SUM(CASE WHEN is_available = 0 THEN 1 ELSE 0 END) FROM parking_slots')
+    total_slots, occupied_slots = cursor.fetchone()
+    counters[SLOTS_TOTAL] = total_slots
+    counters[SLOTS_OCCUPIED] = occupied_slots or 0
+
+    cursor.execute('SELECT COUNT(*) FROM users')
+    counters[USERS_TOTAL] = cursor.fetchone()[0]
+
+    cursor.execute('SELECT COUNT(*) FROM parking_lots')
+    counters[LOTS_TOTAL] = cursor.fetchone()[0]
+
+    apply_stats(cursor, counters)
+
+    cursor.execute('''
+        INSERT INTO stats_daily (day, bookings, revenue)
+        SELECT day, SUM(bookings), SUM(revenue) FROM (
+            SELECT substr(booking_created_at, 1, 10) AS day, 1 AS bookings, 0 AS revenue
+            FROM bookings WHERE booking_created_at IS NOT NULL
+            UNION ALL
+            SELECT substr(completed_at, 1, 10), 0, final_cost
+            FROM bookings
+            WHERE status = 'completed' AND final_cost IS NOT NULL AND completed_at IS NOT NULL
+        )
+        GROUP BY day
+    ''')
+
+
+def read_stats(conn, today=None):
+    """Current counters plus today's revenue and the last week's bookings."""
+    counters = {name: value for name, value in conn.execute('SELECT name, value FROM stats_counters')}
+
+    today = today or date.today()
+    week_start = (today - timedelta(days=7)).isoformat()
+    today_revenue = 0.0
+    week_bookings = 0
+    for day, bookings, revenue in conn.execute(
+        'SELECT day, bookings, revenue FROM stats_daily WHERE day >= ?', (week_start,)
+    ):
+        week_bookings += bookings
+        if day == today.isoformat():
+            today_revenue += revenue
+
+    return counters, today_revenue, week_bookings
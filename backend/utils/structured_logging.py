@@ -0,0 +1,291 @@
+"""
+Structured logging for the Parking Management System
+JSON log lines written by a background thread, with per-route sampling of DEBUG and INFO records
+"""
+
+import atexit
+import contextvars
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+# Route of the request being handled and whether its chatty records are kept
+_request = contextvars.ContextVar('parking_log_request', default=None)
+
+# Attributes every LogRecord has; anything else came in through extra=
+_RECORD_ATTRS = frozenset(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'taskName', 'route'}
+
+_encode_json = json.JSONEncoder(default=str, separators=(',', ':')).encode
+
+
+def parse_levels(spec):
+    """'werkzeug=WARNING,backend.utils.profiling=INFO' -> {logger name: level}."""
+    levels = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        name, _, level = item.rpartition('=')
+        if not name:
+            raise ValueError(f"Expected logger=LEVEL, got {item!r}")
+        levels[name.strip()] = parse_level(level)
+    return levels
+
+
+def parse_level(level):
+    level = level.strip().upper()
+    value = int(level) if level.isdigit() else logging.getLevelName(level)
+    if not isinstance(value, int):
+        raise ValueError(f"Unknown log level {level!r}")
+    return value
+
+
+def parse_rates(spec):
+    """'GET /api/bookings=0.05,/api/parking-lots=0.1,*=1' -> {route: rate}.
+
+    A route is a URL rule, optionally prefixed by its method; '*' sets the
+    rate of every other route.
+    """
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        route, _, rate = item.rpartition('=')
+        rate = float(rate)
+        if not route or not 0.0 <= rate <= 1.0:
+            raise ValueError(f"Expected route=rate with a rate between 0 and 1, got {item!r}")
+        rates[route.strip()] = rate
+    return rates
+
+
+class RouteSampler(logging.Filter):
+    """Keeps a fraction of each route's DEBUG and INFO records.
+
+    The decision is made once per request (begin_request), so a request's
+    records are kept or dropped together. Warnings and errors always pass,
+    as do records logged outside a request. Kept records get a `route`
+    attribute.
+    """
+
+    def __init__(self, rates=None, keep_from=logging.WARNING):
+        super().__init__()
+        self.rates = dict(rates or {})
+        self.default_rate = self.rates.pop('*', 1.0)
+        self.keep_from = keep_from
+        # Updated without a lock, so approximate under concurrency
+        self.sampled_out = 0
+
+    def rate(self, method, rule):
+        rates = self.rates
+        if not rates:
+            return self.default_rate
+        return rates.get(f'{method} {rule}', rates.get(rule, self.default_rate))
+
+    def begin_request(self, method, rule):
+        """Enter a request; returns the token for end_request."""
+        rate = self.rate(method, rule)
+        keep = rate >= 1.0 or random.random() < rate
+        return _request.set((f'{method} {rule or "<unmatched>"}', keep))
+
+    @staticmethod
+    def end_request(token):
+        _request.reset(token)
+
+    def filter(self, record):
+        context = _request.get()
+        if context is None:
+            return True
+        if context[1] or record.levelno >= self.keep_from:
+            record.route = context[0]
+            return True
+        self.sampled_out += 1
+        return False
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, route and any extra= fields."""
+
+    def __init__(self):
+        super().__init__()
+        self._second = (None, '')
+
+    def timestamp(self, created):
+        # UTC, to the millisecond; the part up to the second changes once a second
+        second, prefix = self._second
+        if second != int(created):
+            second = int(created)
+            prefix = time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(second))
+            self._second = (second, prefix)
+        return f'{prefix}.{int((created - second) * 1000):03d}Z'
+
+    def format(self, record):
+        entry = {
+            'ts': self.timestamp(record.created),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        route = getattr(record, 'route', None)
+        if route is not None:
+            entry['route'] = route
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        if record.stack_info:
+            entry['stack'] = record.stack_info
+        return _encode_json(entry)
+
+
+class TextFormatter(logging.Formatter):
+    """Human-readable lines for development, with the route and extra= fields as key=value pairs."""
+
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+    def format(self, record):
+        line = super().format(record)
+        fields = [f'{key}={value}' for key, value in vars(record).items() if key not in _RECORD_ATTRS]
+        route = getattr(record, 'route', None)
+        if route is not None:
+            fields.insert(0, f'route="{route}"')
+        if not fields:
+            return line
+        first, newline, rest = line.partition('\n')
+        return f'{first} {" ".join(fields)}{newline}{rest}'
+
+
+class BackgroundQueueHandler(QueueHandler):
+    """QueueHandler that never blocks the logging thread.
+
+    prepare() renders only what cannot cross threads (the message, from
+    possibly mutable args, and the traceback); formatting to JSON and the
+    write happen on the listener's thread. Unlike the stdlib handler it
+    does not copy the record, as the root's only handler is the last to
+    see it. The queue is a lock-free SimpleQueue; records that find
+    `max_queued` already waiting are dropped and counted.
+    """
+
+    def __init__(self, max_queued):
+        super().__init__(queue.SimpleQueue())
+        self.max_queued = max_queued
+        self.dropped = 0
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _traceback_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        if self.queue.qsize() >= self.max_queued:
+            self.dropped += 1
+        else:
+            self.queue.put_nowait(record)
+
+
+_traceback_formatter = logging.Formatter()
+
+
+class BatchingQueueListener(QueueListener):
+    """QueueListener that lets records gather for `interval` seconds once the queue runs dry.
+
+    The stdlib listener wakes up (and takes the GIL from a request thread)
+    for every record; this one wakes about twice per interval under load.
+    """
+
+    def __init__(self, log_queue, *handlers, interval=0.05):
+        super().__init__(log_queue, *handlers)
+        self.interval = interval
+
+    def dequeue(self, block):
+        try:
+            return self.queue.get_nowait()
+        except queue.Empty:
+            time.sleep(self.interval)
+            return self.queue.get(block)
+
+
+class LogPipeline:
+    """Root logging setup: sampled on the calling thread, written by a QueueListener.
+
+    install() replaces the root logger's handlers and turns off the record
+    fields neither formatter prints (caller file and line, thread), which
+    are most of the cost of creating a record. With `background` False
+    records are formatted and written synchronously instead (for debugging
+    the logging itself). A forked child starts its own writer thread on a
+    fresh queue, and the queue is drained at exit.
+    """
+
+    def __init__(self, stream=None, fmt='json', queue_size=10000, background=True, sampler=None,
+                 flush_interval=0.05):
+        if fmt not in ('json', 'text'):
+            raise ValueError(f"Unknown log format {fmt!r} (json or text)")
+        self.stream = stream
+        self.fmt = fmt
+        self.queue_size = queue_size
+        self.flush_interval = flush_interval
+        self.background = background
+        self.sampler = sampler
+        self.output = None
+        self.handler = None
+        self.listener = None
+
+    def install(self, level=logging.INFO, levels=None):
+        self.output = logging.StreamHandler(self.stream if self.stream is not None else sys.stderr)
+        self.output.setFormatter(JsonFormatter() if self.fmt == 'json' else TextFormatter())
+        if self.background:
+            self.handler = BackgroundQueueHandler(self.queue_size)
+            self._start_listener()
+            atexit.register(self.stop)
+            os.register_at_fork(after_in_child=self._after_fork)
+        else:
+            self.handler = self.output
+        if self.sampler is not None:
+            self.handler.addFilter(self.sampler)
+
+        # The optimizations listed in the Logging HOWTO
+        logging._srcfile = None
+        logging.logThreads = False
+        logging.logMultiprocessing = False
+
+        root = logging.getLogger()
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+        root.addHandler(self.handler)
+        root.setLevel(level)
+        for name, logger_level in (levels or {}).items():
+            logging.getLogger(name).setLevel(logger_level)
+        return self
+
+    def _start_listener(self):
+        self.listener = BatchingQueueListener(self.handler.queue, self.output, interval=self.flush_interval)
+        self.listener.start()
+
+    def _after_fork(self):
+        # The writer thread did not survive the fork, and records still
+        # queued belong to the parent, which writes them itself
+        if self.listener is not None:
+            self.handler.queue = queue.SimpleQueue()
+            self._start_listener()
+
+    def stop(self):
+        """Write out what is queued and stop the writer thread."""
+        listener, self.listener = self.listener, None
+        if listener is not None:
+            listener.stop()
+
+    def stats(self):
+        return {
+            'format': self.fmt,
+            'background': self.background,
+            'queued': self.handler.queue.qsize() if self.background else 0,
+            'queue_size': self.queue_size if self.background else 0,
+            'dropped': self.handler.dropped if self.background else 0,
+            'sampled_out': self.sampler.sampled_out if self.sampler is not None else 0,
+        }
@@ -0,0 +1,85 @@
+"""
+Timestamp handling for the Parking Management System
+One parser and formatter for stored timestamps, and the epoch seconds kept beside them
+"""
+
+import time
+from datetime import date, datetime, timedelta
+
+
+def epoch_sql(column):
+    """SQL expression giving a stored timestamp column as epoch seconds.
+
+    Agrees with to_epoch(): naive values are local time, and values with a
+    'Z' or offset suffix are read in that zone.
+    """
+    return f"CAST(strftime('%s', {column}, 'utc') AS INTEGER)"
+
+
+def parse_timestamp(value):
+    """Local naive datetime for an ISO timestamp or datetime; None if unparsable.
+
+    Takes 'T' or space separators, optional fractional seconds and a 'Z' or
+    offset suffix, which is converted to local time.
+    """
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        try:
+            parsed = datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            # Python < 3.11 does not read a 'Z' suffix
+            try:
+                parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+            except ValueError:
+                return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+
+def to_epoch(value):
+    """Epoch seconds for an ISO timestamp or datetime; None if unparsable."""
+    parsed = parse_timestamp(value)
+    return int(parsed.timestamp()) if parsed is not None else None
+
+
+def format_timestamp(moment):
+    """The normalized text form (local YYYY-MM-DDTHH:MM:SS) of a datetime or epoch seconds."""
+    if isinstance(moment, (int, float)):
+        moment = datetime.fromtimestamp(moment)
+    return moment.isoformat(timespec='seconds')
+
+
+def normalize_timestamp(value):
+    """Rewrite an ISO timestamp in the normalized form; None if unparsable."""
+    parsed = parse_timestamp(value)
+    return parsed.isoformat(timespec='seconds') if parsed is not None else None
+
+
+def now_epoch():
+    return int(time.time())
+
+
+def now_timestamp():
+    """The current local time in the normalized text form."""
+    return datetime.now().isoformat(timespec='seconds')
+
+
+def day_start_epoch(day):
+    """Epoch seconds of local midnight at the start of `day` (a date or YYYY-MM-DD).
+
+    Raises ValueError for a malformed date string.
+    """
+    if not isinstance(day, date):
+        day = date.fromisoformat(str(day))
+    return int(datetime(day.year, day.month, day.day).timestamp())
+
+
+def day_end_epoch(day):
+    """Epoch seconds of local midnight at the end of `day`, for half-open ranges."""
+    if not isinstance(day, date):
+        day = date.fromisoformat(str(day))
+    return day_start_epoch(day + timedelta(days=1))
@@ -0,0 +1,59 @@
+"""
+Bearer tokens for the Parking Management System
+HMAC-signed user tokens with an expiry, verified without a database lookup
+"""
+
+import base64
+import hashlib
+import hmac
+import time
+
+
+class InvalidToken(Exception):
+    """Raised when a bearer token is malformed, forged or expired."""
+
+
+class TokenSigner:
+    """Issue and verify `<user_id>.<expires_at>.<signature>` tokens.
+
+    The signature is HMAC-SHA256 over the first two fields, so verifying a
+    token is a hash and a compare; nothing is stored server-side. Rotating
+    the secret logs every user out.
+    """
+
+    def __init__(self, secret, ttl_seconds, accept_legacy=False):
+        if isinstance(secret, str):
+            secret = secret.encode()
+        self._secret = secret
+        self.ttl_seconds = ttl_seconds
+        self.accept_legacy = accept_legacy
+
+    def _sign(self, payload):
+        digest = hmac.new(self._secret, payload.encode(), hashlib.sha256).digest()
+        return base64.urlsafe_b64encode(digest).rstrip(b'=').decode()
+
+    def issue(self, user_id, now=None):
+        expires_at = int(now if now is not None else time.time()) + self.ttl_seconds
+        payload = f'{int(user_id)}.{expires_at}'
+        return f'{payload}.{self._sign(payload)}'
+
+    def verify(self, token, now=None):
+        """Return the user id in `token`, or raise InvalidToken."""
+        if self.accept_legacy and token.startswith('user_'):
+            # Unsigned user_<id>_<ts> tokens from before signing; migration only
+            try:
+                return int(token.split('_')[1])
+            except (ValueError, IndexError):
+                raise InvalidToken('Invalid token format')
+
+        try:
+            user_id, expires_at, signature = token.split('.')
+            payload = f'{int(user_id)}.{int(expires_at)}'
+        except ValueError:
+            raise InvalidToken('Invalid token format')
+        # Bytes, as compare_digest() raises TypeError for non-ASCII str input
+        if not hmac.compare_digest(signature.encode(), self._sign(payload).encode()):
+            raise InvalidToken('Invalid token')
+        if int(expires_at) <= (now if now is not None else time.time()):
+            raise InvalidToken('Token expired')
+        return int(user_id)
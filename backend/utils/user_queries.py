@@ -0,0 +1,100 @@
+"""
+User listing query builder for the Parking Management System
+Filters and keyset pages for the admin users listing, and its streamed JSON form
+"""
+
+import json
+from datetime import date, timedelta
+
+USER_LIST_COLUMNS = 'id, full_name, email, phone, address_line1, city, state, pin_code, created_at'
+
+# Newest first by id. created_at cannot order the listing: rows written by the
+# column default are UTC with a space separator, the app writes local 'T' times.
+USER_LIST_ORDER = ' ORDER BY id DESC'
+
+
+class UserListQuery:
+    """Filters for the admin users listing.
+
+    City and state match case-insensitively, as their indexes are NOCASE.
+    """
+
+    def __init__(self):
+        self._predicates = []
+        self._params = []
+
+    def where(self, sql, *params):
+        self._predicates.append(sql)
+        self._params.extend(params)
+        return self
+
+    def city(self, value):
+        if value:
+            self.where('city = ? COLLATE NOCASE', value.strip())
+        return self
+
+    def state(self, value):
+        if value:
+            self.where('state = ? COLLATE NOCASE', value.strip())
+        return self
+
+    def created_between(self, date_from=None, date_to=None):
+        """Whole days (YYYY-MM-DD, both inclusive). Raises ValueError for a malformed date.
+
+        created_at is text in either ISO form ('T' or space separated), and
+        both sort after their own date, so plain string bounds work.
+        """
+        if date_from:
+            self.where('created_at >= ?', date.fromisoformat(date_from).isoformat())
+        if date_to:
+            self.where('created_at < ?', (date.fromisoformat(date_to) + timedelta(days=1)).isoformat())
+        return self
+
+    def page_sql(self, limit=None, after=None):
+        """The listing after an id keyset; every row if limit is None."""
+        predicates = list(self._predicates)
+        params = list(self._params)
+        if after is not None:
+            predicates.append('id < ?')
+            params.append(after)
+        sql = f'SELECT {USER_LIST_COLUMNS} FROM users'
+        if predicates:
+            sql += ' WHERE ' + ' AND '.join(predicates)
+        sql += USER_LIST_ORDER
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        return sql, params
+
+
+def format_user(row):
+    """The listing's JSON shape for one users row."""
+    return {
+        'id': row['id'],
+        'name': row['full_name'],  # Map full_name to name
+        'username': row['full_name'],  # Use full_name as username for display
+        'email': row['email'],
+        'phone': row['phone'],
+        'address': row['address_line1'],
+        'city': row['city'],
+        'state': row['state'],
+        'pin_code': row['pin_code'],
+        'created_at': row['created_at'],
+    }
+
+
+def iter_json_array(cursor, to_dict, batch_size):
+    """Yield a JSON array of the cursor's rows as text chunks, one per fetchmany() batch.
+
+    Only one batch is held in memory at a time, however many rows there are.
+    """
+    yield '['
+    separator = ''
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        # One dumps() per batch, minus its brackets, is much cheaper than one per row
+        yield separator + json.dumps([to_dict(row) for row in rows], separators=(',', ':'))[1:-1]
+        separator = ','
+    yield ']'
@@ -0,0 +1,114 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Each benchmark runs against a throwaway SQLite database so the real
+instance/parking.db is never touched.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_app(db_path=None):
+    """Import the Flask app bound to a fresh temporary database."""
+    if db_path is None:
+        db_dir = tempfile.mkdtemp(prefix='parking_bench_')
+        db_path = os.path.join(db_dir, 'parking.db')
+    os.environ['PARKING_DB_PATH'] = db_path
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    import app as parking_app
+    return parking_app
+
+
+def seed_lots(conn, count, slots_per_lot=20, price=50.0):
+    """Insert `count` parking lots with their slot rows and live-view rows."""
+    from backend.utils.slot_view import refresh_slot_view
+
+    cursor = conn.cursor()
+    lot_ids = []
+    for i in range(count):
+        cursor.execute('''
+            INSERT INTO parking_lots (name, address, pincode, price_per_hour, total_slots)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (f'Bench Lot {i:05d}', f'{i} Bench Street', f'{110000 + i % 1000}', price, slots_per_lot))
+        lot_id = cursor.lastrowid
+        cursor.executemany(
+            'INSERT INTO parking_slots (slot_number, lot_id, is_available) VALUES (?, ?, 1)',
+            [(n, lot_id) for n in range(1, slots_per_lot + 1)]
+        )
+        refresh_slot_view(cursor, lot_id=lot_id)
+        lot_ids.append(lot_id)
+    conn.commit()
+    return lot_ids
+
+
+def seed_bookings(conn, lot_ids, count, user_id=1, batch_size=10000):
+    """Insert `count` historical bookings spread over the given lots.
+
+    Rows go straight into the table, so callers that read the running
+    stats counters must reconcile them afterwards.
+    """
+    from backend.utils.timestamps import epoch_sql
+
+    statuses = ('completed', 'completed', 'completed', 'cancelled')
+    cursor = conn.cursor()
+    slot_ids = dict(cursor.execute(
+        'SELECT lot_id, MIN(id) FROM parking_slots GROUP BY lot_id'
+    ).fetchall())
+    first = cursor.execute('SELECT COUNT(*) FROM bookings').fetchone()[0]
+    for offset in range(first, first + count, batch_size):
+        rows = []
+        for i in range(offset, min(first + count, offset + batch_size)):
+            day = 1 + i % 28
+            start = f'2025-{1 + i % 12:02d}-{day:02d}T{i % 24:02d}:00:00'
+            end = f'2025-{1 + i % 12:02d}-{day:02d}T{i % 24:02d}:45:00'
+            status = statuses[i % len(statuses)]
+            cost = 37.5 if status == 'completed' else 0.0
+            lot_id = lot_ids[i % len(lot_ids)]
+            rows.append((
+                user_id, lot_id, slot_ids[lot_id], f'BK-SEED{i:08d}', f'TN{i % 10000:04d}',
+                'pay_counter', start, end, 1.0, 0.75, 50.0, cost, status, start,
+                end if status == 'completed' else None,
+            ))
+        cursor.executemany(f'''
+            INSERT INTO bookings (
+                user_id, lot_id, slot_id, booking_id, vehicle_number,
+                payment_method, start_time, end_time, planned_duration_hours,
+                actual_duration_hours, planned_cost, final_cost, status,
+                booking_created_at, completed_at, start_ts, end_ts
+            ) VALUES (?1, ?2, ?3, ?4, ?5, ?6, ?7, ?8, ?9, ?10, ?11, ?12, ?13, ?14, ?15,
+                      {epoch_sql('?7')}, {epoch_sql('?8')})
+        ''', rows)
+    conn.commit()
+
+
+def time_requests(fn, iterations):
+    """Call `fn` repeatedly and return per-call latencies in milliseconds."""
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def report(label, samples):
+    """Print a one-line latency summary."""
+    print(f"{label:<44} n={len(samples):<6} "
+          f"p50={percentile(samples, 50):8.2f}ms "
+          f"p99={percentile(samples, 99):8.2f}ms "
+          f"max={max(samples):8.2f}ms")
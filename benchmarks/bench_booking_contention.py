@@ -0,0 +1,96 @@
+"""
+Stress POST /api/book-slot with many concurrent bookings against one lot.
+
+Every request targets a random slot of the same lot, so most of them race
+for slots that another thread is claiming at the same moment. The script
+asserts that no slot ends up with two active bookings and reports latency.
+
+Usage: python benchmarks/bench_booking_contention.py [requests] [threads] [slots]
+"""
+
+import contextlib
+import io
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from _common import load_app, report, seed_lots
+
+
+def main():
+    total_requests = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+    slot_count = int(sys.argv[3]) if len(sys.argv) > 3 else 500
+
+    os.environ.setdefault('PARKING_DB_POOL_SIZE', str(threads))
+    parking_app = load_app()
+
+    conn = parking_app.get_db_connection()
+    lot_id = seed_lots(conn, 1, slots_per_lot=slot_count)[0]
+    slot_ids = [row['id'] for row in conn.execute(
+        'SELECT id FROM parking_slots WHERE lot_id = ?', (lot_id,))]
+    user_ids = []
+    for i in range(threads):
+        cursor = conn.execute('''
+            INSERT INTO users (full_name, email, phone, password, created_at)
+            VALUES (?, ?, '', 'x', ?)
+        ''', (f'Bench User {i}', f'bench{i}@example.com', time.strftime('%Y-%m-%dT%H:%M:%S')))
+        user_ids.append(cursor.lastrowid)
+    conn.commit()
+    conn.close()
+
+    local = threading.local()
+    latencies = []
+    outcomes = {}
+    record_lock = threading.Lock()
+
+    def book(i):
+        if not hasattr(local, 'client'):
+            local.client = parking_app.app.test_client()
+        user_id = user_ids[i % len(user_ids)]
+        token = parking_app.token_signer.issue(user_id)
+        started = time.perf_counter()
+        response = local.client.post('/api/book-slot', json={
+            'lot_id': lot_id,
+            'slot_id': random.choice(slot_ids),
+            'vehicle_number': f'TN{i:06d}',
+        }, headers={'Authorization': f'Bearer {token}'})
+        elapsed = (time.perf_counter() - started) * 1000
+        with record_lock:
+            latencies.append(elapsed)
+            outcomes[response.status_code] = outcomes.get(response.status_code, 0) + 1
+
+    started = time.perf_counter()
+    # The route prints request details; keep them off the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(book, range(total_requests)))
+    wall = time.perf_counter() - started
+
+    conn = parking_app.get_db_connection()
+    double_booked = conn.execute('''
+        SELECT slot_id, COUNT(*) FROM bookings
+        WHERE status = 'active' GROUP BY slot_id HAVING COUNT(*) > 1
+    ''').fetchall()
+    active = conn.execute("SELECT COUNT(*) FROM bookings WHERE status = 'active'").fetchone()[0]
+    occupied = conn.execute(
+        'SELECT COUNT(*) FROM parking_slots WHERE lot_id = ? AND is_available = 0', (lot_id,)
+    ).fetchone()[0]
+    conn.close()
+
+    assert not double_booked, f'double bookings: {double_booked}'
+    assert active == occupied == outcomes.get(201, 0), (active, occupied, outcomes)
+
+    print(f'{total_requests} booking attempts, {threads} threads, {slot_count} slots, '
+          f'{wall:.2f}s ({total_requests / wall:.0f} req/s)')
+    print(f'status codes: {dict(sorted(outcomes.items()))}')
+    report('POST /api/book-slot', latencies)
+    print(f'contention: {parking_app.booking_contention.snapshot()}')
+    print('no double bookings')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""
+Benchmark GET /api/bookings/stats latency as the booking history grows.
+
+The endpoint reads running counters, so latency should stay flat.
+
+Usage: python benchmarks/bench_booking_stats.py [iterations]
+"""
+
+import sys
+
+from _common import load_app, report, seed_bookings, seed_lots, time_requests
+
+BOOKING_COUNTS = (1000, 100000, 500000)
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    parking_app = load_app()
+    client = parking_app.app.test_client()
+
+    conn = parking_app.get_db_connection()
+    lot_ids = seed_lots(conn, 20)
+    conn.close()
+
+    seeded = 0
+    for target in BOOKING_COUNTS:
+        conn = parking_app.get_db_connection()
+        seed_bookings(conn, lot_ids, target - seeded)
+        conn.close()
+        seeded = target
+
+        response = client.post('/api/admin/stats/reconcile')
+        assert response.status_code == 200, response.data
+
+        def fetch():
+            response = client.get('/api/bookings/stats')
+            assert response.status_code == 200, response.data
+
+        fetch()  # warm up
+        report(f'GET /api/bookings/stats ({target} bookings)', time_requests(fetch, iterations))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark GET /api/bookings deep pagination at 1M bookings: OFFSET paging
+against keyset (cursor) paging, and exact against estimated totals.
+
+Usage: python benchmarks/bench_bookings_pagination.py [bookings] [iterations]
+"""
+
+import sys
+
+from _common import load_app, report, seed_bookings, seed_lots, time_requests
+
+PER_PAGE = 10
+DEEP_PAGE = 10000
+
+
+def main():
+    bookings = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    parking_app = load_app()
+    client = parking_app.app.test_client()
+
+    conn = parking_app.get_db_connection()
+    lot_ids = seed_lots(conn, 50)
+    seed_bookings(conn, lot_ids, bookings)
+    conn.execute('ANALYZE')
+    conn.commit()
+
+    # Cursor for the deep page, taken directly instead of walking 10,000 pages
+    last = conn.execute(
+        'SELECT start_ts, id FROM bookings ORDER BY start_ts DESC, id DESC LIMIT 1 OFFSET ?',
+        ((DEEP_PAGE - 1) * PER_PAGE - 1,)
+    ).fetchone()
+    deep_cursor = parking_app.encode_cursor(last['start_ts'], last['id'])
+    conn.close()
+    client.post('/api/admin/stats/reconcile')
+
+    def fetcher(query):
+        def fetch():
+            response = client.get(f'/api/bookings?per_page={PER_PAGE}&status=all&{query}')
+            assert response.status_code == 200, response.data
+        return fetch
+
+    cases = [
+        ('offset page 1 (exact total)', 'page=1'),
+        (f'offset page {DEEP_PAGE} (exact total)', f'page={DEEP_PAGE}'),
+        (f'offset page {DEEP_PAGE} (no total)', f'page={DEEP_PAGE}&include_total=none'),
+        ('keyset page 1 (estimated total)', ''),
+        (f'keyset page {DEEP_PAGE} (estimated total)', f'cursor={deep_cursor}'),
+        (f'keyset page {DEEP_PAGE} (exact total)', f'cursor={deep_cursor}&include_total=exact'),
+    ]
+    for label, query in cases:
+        fetch = fetcher(query)
+        fetch()  # warm up
+        report(f'{label} @{bookings}', time_requests(fetch, iterations))
+
+
+if __name__ == '__main__':
+    main()
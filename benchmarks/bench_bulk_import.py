@@ -0,0 +1,101 @@
+"""
+Measure bulk import throughput for historical bookings.
+
+Generates NDJSON and CSV booking files in memory and imports them one after
+another through the same code path as the import endpoint and the
+`flask import-data` command, with and without deferred indexes. Deferring
+pays off when a load is large next to the rows already in the table, since
+the indexes are rebuilt over the whole table afterwards.
+
+Usage: python benchmarks/bench_bulk_import.py [bookings] [lots]
+"""
+
+import csv
+import io
+import json
+import sys
+import time
+
+from _common import load_app, seed_lots
+
+FIELDS = (
+    'booking_id', 'user_id', 'lot_id', 'slot_number', 'vehicle_number', 'payment_method',
+    'start_time', 'end_time', 'planned_duration_hours', 'actual_duration_hours',
+    'planned_cost', 'final_cost', 'status',
+)
+
+
+def generate_bookings(count, lot_ids, slots_per_lot, prefix):
+    for i in range(count):
+        day = 1 + i % 28
+        status = 'cancelled' if i % 10 == 0 else 'completed'
+        yield {
+            'booking_id': f'BK-{prefix}{i:09d}',
+            'user_id': 1,
+            'lot_id': lot_ids[i % len(lot_ids)],
+            'slot_number': 1 + i % slots_per_lot,
+            'vehicle_number': f'TN{i % 10000:04d}',
+            'payment_method': 'card',
+            'start_time': f'2024-{1 + i % 12:02d}-{day:02d}T{i % 24:02d}:00:00',
+            'end_time': f'2024-{1 + i % 12:02d}-{day:02d}T{i % 24:02d}:45:00',
+            'planned_duration_hours': 1.0,
+            'actual_duration_hours': 0.75,
+            'planned_cost': 50.0,
+            'final_cost': 37.5 if status == 'completed' else 0.0,
+            'status': status,
+        }
+
+
+def as_ndjson(records):
+    return ''.join(json.dumps(record) + '\n' for record in records)
+
+
+def as_csv(records):
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=FIELDS)
+    writer.writeheader()
+    writer.writerows(records)
+    return out.getvalue()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    lot_count = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    parking_app = load_app()
+    conn = parking_app.get_db_connection()
+    lot_ids = seed_lots(conn, lot_count)
+    conn.execute('''
+        INSERT INTO users (full_name, email, phone, password, created_at)
+        VALUES ('Bench User', 'bench@example.com', '', 'x', '2024-01-01T00:00:00')
+    ''')
+    conn.commit()
+
+    runs = [
+        ('ndjson', as_ndjson, True),
+        ('ndjson', as_ndjson, False),
+        ('csv', as_csv, True),
+    ]
+    print(f'{count} bookings per run over {lot_count} lots, batch size {parking_app.IMPORT_BATCH_SIZE}')
+    for n, (fmt, encode, defer) in enumerate(runs):
+        payload = encode(generate_bookings(count, lot_ids, 20, prefix=f'{n}-'))
+        existing = conn.execute('SELECT COUNT(*) FROM bookings').fetchone()[0]
+
+        started = time.perf_counter()
+        for report in parking_app.run_import(conn, 'bookings', io.StringIO(payload), fmt, defer_indexes=defer):
+            pass
+        wall = time.perf_counter() - started
+        assert report['imported'] == count and report['error_count'] == 0, report
+        indexes = 'deferred' if defer else 'kept'
+        print(f'{fmt:<7} indexes {indexes:<9} into {existing:>8} rows  {wall:6.2f}s  '
+              f'{count / wall:9.0f} bookings/s ({len(payload) / wall / 1e6:.1f} MB/s)')
+
+    # The running counters moved with every batch and match a full recount
+    counters, _, _ = parking_app.read_stats(conn)
+    total = conn.execute('SELECT COUNT(*) FROM bookings').fetchone()[0]
+    assert counters['bookings.total'] == total, (counters['bookings.total'], total)
+    conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""
+Benchmark full responses against 304 revalidations on the polled endpoints.
+
+Usage: python benchmarks/bench_conditional_get.py [iterations]
+"""
+
+import sys
+
+from _common import load_app, report, seed_lots, time_requests
+
+LOTS = 1000
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    parking_app = load_app()
+    client = parking_app.app.test_client()
+
+    conn = parking_app.get_db_connection()
+    lot_ids = seed_lots(conn, LOTS)
+    conn.close()
+
+    for url in ('/api/parking-lots', f'/api/parking-lots/{lot_ids[0]}/slots', '/api/users', '/api/bookings/stats'):
+        etag = client.get(url).headers['ETag']
+
+        def full():
+            response = client.get(url)
+            assert response.status_code == 200, response.status_code
+
+        def revalidate():
+            response = client.get(url, headers={'If-None-Match': etag})
+            assert response.status_code == 304, response.status_code
+
+        report(f'{url} 200', time_requests(full, iterations))
+        report(f'{url} 304', time_requests(revalidate, iterations))
+
+
+if __name__ == '__main__':
+    main()
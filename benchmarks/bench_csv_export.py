@@ -0,0 +1,57 @@
+"""
+Benchmark the CSV export job: wall time and peak Python memory per history size.
+
+Rows are streamed with fetchmany(), so peak memory should stay flat as the
+history grows.
+
+Usage: python benchmarks/bench_csv_export.py
+"""
+
+import os
+import tempfile
+import time
+import tracemalloc
+
+from _common import load_app, seed_bookings, seed_lots
+
+BOOKING_COUNTS = (10000, 100000, 200000)
+
+
+def run_export(parking_app, job_id, compress):
+    parking_app.export_jobs.create(job_id, 1)
+    start = time.perf_counter()
+    parking_app.process_csv_export(job_id, 1, None, None, 'all', compress=compress)
+    return parking_app.export_jobs.get(job_id), time.perf_counter() - start
+
+
+def main():
+    parking_app = load_app()
+    os.chdir(tempfile.mkdtemp(prefix='parking_exports_'))
+
+    conn = parking_app.get_db_connection()
+    lot_ids = seed_lots(conn, 20)
+    conn.close()
+
+    seeded = 0
+    for target in BOOKING_COUNTS:
+        conn = parking_app.get_db_connection()
+        seed_bookings(conn, lot_ids, target - seeded)
+        conn.close()
+        seeded = target
+
+        for compress in (False, True):
+            label = f"export {target} rows{' (gzip)' if compress else ''}"
+            job, elapsed = run_export(parking_app, f'bench_{target}_{compress}', compress)
+            assert job['status'] == 'completed', job
+            assert job['record_count'] == target, job
+            size = os.path.getsize(os.path.join(parking_app.EXPORTS_DIR, job['file_name']))
+
+            # Separate run for memory: tracemalloc slows allocation-heavy code a lot
+            tracemalloc.start()
+            run_export(parking_app, f'bench_{target}_{compress}_mem', compress)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"{label:<44} {elapsed * 1000:8.0f}ms peak={peak / 2**20:6.1f}MiB file={size / 2**20:6.1f}MiB")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+"""
+Request throughput under each logging setup, and the caller-side cost of
+one log call.
+
+Each case runs twice in a fresh interpreter (the logging settings are
+read at import): with stdout and stderr going to a log file on disk, and
+to a pipe read at a fixed rate, like a terminal or a log shipper that
+has fallen behind (once the pipe buffer is full, every write waits for
+the reader). Worker threads loop over the hot routes: list bookings,
+book a slot, release it. The log volume per request comes from the file
+run; the pipe run exits without waiting for its backlog. Cases:
+
+  sync DEBUG       every record formatted and written on the request
+                   thread, which is what basicConfig(level=DEBUG) did
+  queued DEBUG     the same records, written by the background thread
+  queued INFO      the default
+  queued INFO 1%   PARKING_LOG_SAMPLE_RATES='*=0.01'
+
+Pass a checkout of the revision before structured logging (for example
+`git worktree add /tmp/parking-before <rev>`) as the third argument to
+add a "before" case: its print() calls and DEBUG basicConfig, as shipped.
+
+Usage: python benchmarks/bench_logging.py [seconds] [threads] [before_checkout] [pipe_kb_per_second]
+"""
+
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+
+from _common import ROOT
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+PROBE = '''
+import json, os, sys, tempfile, threading, time
+sys.path.insert(0, os.environ['BENCH_APP_ROOT'])
+os.environ['PARKING_DB_PATH'] = os.path.join(tempfile.mkdtemp(prefix='parking_bench_'), 'parking.db')
+import app as parking_app
+from _common import seed_bookings, seed_lots
+
+seconds, threads = float(os.environ['BENCH_SECONDS']), int(os.environ['BENCH_THREADS'])
+conn = parking_app.get_db_connection()
+lot_ids = seed_lots(conn, threads)
+seed_bookings(conn, lot_ids, 2000)
+slot_ids = [conn.execute('SELECT MIN(id) FROM parking_slots WHERE lot_id = ?', (lot,)).fetchone()[0] for lot in lot_ids]
+conn.close()
+client = parking_app.app.test_client()
+client.post('/api/auth/user/register', json={'email': 'bench@example.com', 'password': 'pw', 'full_name': 'Bench'})
+token = client.post('/api/auth/user/login', json={'email': 'bench@example.com', 'password': 'pw'}).get_json()['token']
+headers = {'Authorization': f'Bearer {token}'}
+counts = [0] * threads
+deadline = None
+
+def work(i):
+    client = parking_app.app.test_client()
+    while deadline is None or time.perf_counter() < deadline:
+        client.get('/api/bookings?per_page=20').get_data()
+        booked = client.post('/api/book-slot', json={'lot_id': lot_ids[i], 'slot_id': slot_ids[i],
+                                                     'vehicle_number': 'TN01'}, headers=headers)
+        assert booked.status_code == 201, booked.get_data(as_text=True)
+        client.post('/api/release-slot', json={'booking_id': booked.get_json()['booking']['booking_id']},
+                    headers=headers).get_data()
+        if deadline is not None:
+            counts[i] += 3
+
+deadline = time.perf_counter() + 0.5  # warm-up
+work(0)
+counts[0] = 0
+started = time.perf_counter()
+deadline = started + seconds
+workers = [threading.Thread(target=work, args=(i,)) for i in range(threads)]
+for worker in workers:
+    worker.start()
+for worker in workers:
+    worker.join()
+elapsed = time.perf_counter() - started
+pipeline = getattr(parking_app, 'log_pipeline', None)
+with open(os.environ['BENCH_RESULT'], 'w') as f:
+    json.dump({'requests': sum(counts), 'seconds': elapsed,
+               'dropped': pipeline.stats()['dropped'] if pipeline else 0}, f)
+if os.environ.get('BENCH_SKIP_DRAIN'):
+    os._exit(0)  # Do not wait for the backlog to trickle through a slow pipe
+'''
+
+CASES = [
+    ('sync DEBUG', {'PARKING_LOG_LEVEL': 'DEBUG', 'PARKING_LOG_BACKGROUND': '0'}),
+    ('queued DEBUG', {'PARKING_LOG_LEVEL': 'DEBUG'}),
+    ('queued INFO', {'PARKING_LOG_LEVEL': 'INFO'}),
+    ('queued INFO 1%', {'PARKING_LOG_LEVEL': 'INFO', 'PARKING_LOG_SAMPLE_RATES': '*=0.01'}),
+]
+
+
+def read_slowly(pipe, bytes_per_second):
+    started = time.perf_counter()
+    read = 0
+    while True:
+        chunk = pipe.read1(4096)
+        if not chunk:
+            return
+        read += len(chunk)
+        ahead = read / bytes_per_second - (time.perf_counter() - started)
+        if ahead > 0:
+            time.sleep(ahead)
+
+
+def run_case(app_root, settings, seconds, threads, pipe_rate=None):
+    workdir = tempfile.mkdtemp(prefix='parking_logging_')
+    log_path = os.path.join(workdir, 'app.log')
+    result_path = os.path.join(workdir, 'result.json')
+    env = dict(os.environ, BENCH_APP_ROOT=app_root, BENCH_SECONDS=str(seconds), BENCH_THREADS=str(threads),
+               BENCH_RESULT=result_path, **settings)
+    command = [sys.executable, '-c', PROBE]
+    if pipe_rate is None:
+        with open(log_path, 'w') as log:
+            subprocess.run(command, cwd=BENCH_DIR, env=env, stdout=log, stderr=log, check=True)
+    else:
+        env['BENCH_SKIP_DRAIN'] = '1'
+        process = subprocess.Popen(command, cwd=BENCH_DIR, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        read_slowly(process.stdout, pipe_rate)
+        assert process.wait() == 0, f'probe failed with exit code {process.returncode}'
+    with open(result_path) as f:
+        result = json.load(f)
+    if pipe_rate is None:
+        with open(log_path, 'rb') as f:
+            result['log_lines'] = f.read().count(b'\n')
+        result['log_bytes'] = os.path.getsize(log_path)
+    return result
+
+
+def call_costs_ns(number=200000):
+    """Caller-side cost of one call, with records going to a file."""
+    sys.path.insert(0, ROOT)
+    from backend.utils.structured_logging import LogPipeline
+
+    costs = {}
+    with open(os.path.join(tempfile.mkdtemp(prefix='parking_logging_'), 'calls.log'), 'w') as sink:
+        booking = {'booking_id': 'BK-0CGSW9QF', 'lot_id': 7, 'slot_number': 12, 'user_id': 42}
+        costs['print(f"[DEBUG] ...")'] = timeit.timeit(
+            lambda: print(f"[DEBUG] Slot booked successfully: {booking['booking_id']} in lot {booking['lot_id']}",
+                          file=sink), number=number)
+        logger = logging.getLogger('bench')
+        for label, background in (('sync JSON', False), ('queued', True)):
+            pipeline = LogPipeline(stream=sink, background=background).install(logging.INFO)
+            costs[f'logger.info + extra, {label}'] = timeit.timeit(
+                lambda: logger.info("Slot booked", extra=booking), number=number)
+            pipeline.stop()
+        costs['logger.debug at level INFO'] = timeit.timeit(
+            lambda: logger.debug("Booking request: lot_id=%s slot_id=%s", 7, 12), number=number)
+    return {label: seconds / number * 1e9 for label, seconds in costs.items()}
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    before = sys.argv[3] if len(sys.argv) > 3 and sys.argv[3] != '-' else None
+    pipe_kb = float(sys.argv[4]) if len(sys.argv) > 4 else 64
+
+    cases = [(label, ROOT, settings) for label, settings in CASES]
+    if before:
+        cases.insert(0, ('before (print, DEBUG)', os.path.abspath(before), {}))
+
+    print(f'{threads} threads for {seconds:.0f}s per case: list bookings, book, release')
+    print(f'{"":<24} {"log file":>33}   {f"pipe read at {pipe_kb:.0f} KB/s":>24}')
+    print(f'{"case":<24} {"req/s":>8} {"lines/req":>11} {"bytes/req":>11}   {"req/s":>12} {"dropped":>10}')
+    for label, app_root, settings in cases:
+        to_file = run_case(app_root, settings, seconds, threads)
+        to_pipe = run_case(app_root, settings, seconds, threads, pipe_kb * 1024)
+        requests = max(to_file['requests'], 1)
+        print(f'{label:<24} {to_file["requests"] / to_file["seconds"]:8.0f} '
+              f'{to_file["log_lines"] / requests:11.2f} {to_file["log_bytes"] / requests:11.0f}   '
+              f'{to_pipe["requests"] / to_pipe["seconds"]:12.0f} {to_pipe["dropped"]:10}')
+
+    print()
+    for label, cost in call_costs_ns().items():
+        print(f'{label:<40} {cost:7.0f}ns')
+
+
+if __name__ == '__main__':
+    main()
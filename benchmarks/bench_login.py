@@ -0,0 +1,104 @@
+"""
+Measure POST /api/auth/user/login throughput during a login storm.
+
+A fixed number of client threads log in as many different users at once,
+once per password-worker count, while one more thread keeps polling
+GET /api/parking-lots. Reports logins/sec and login p99 for each worker
+count, plus the latency of the polling requests, which should stay flat
+because hashing is confined to the password workers.
+
+Usage: python benchmarks/bench_login.py [logins] [client_threads] [worker_counts]
+       e.g. python benchmarks/bench_login.py 200 32 1,2,4
+The hash cost follows PARKING_PASSWORD_HASH_METHOD.
+"""
+
+import contextlib
+import io
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from _common import load_app, report, seed_lots
+
+
+def main():
+    total_logins = int(sys.argv[1]) if len(sys.argv) > 1 else 120
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    worker_counts = [int(n) for n in (sys.argv[3] if len(sys.argv) > 3 else '1,2,4').split(',')]
+
+    os.environ.setdefault('PARKING_DB_POOL_SIZE', str(threads + 2))
+    # Room for every client thread, so the run measures hashing rather than 429s
+    os.environ.setdefault('PARKING_PASSWORD_QUEUE_SIZE', str(threads * 2))
+    parking_app = load_app()
+    from backend.utils.export_jobs import WorkerPool
+
+    # One hash for every user: the salt does not change the verify cost
+    password = 'bench-password'
+    password_hash = parking_app.password_policy.hash(password)
+    conn = parking_app.get_db_connection()
+    seed_lots(conn, 50)
+    conn.executemany('''
+        INSERT INTO users (full_name, email, phone, password, created_at)
+        VALUES (?, ?, '', ?, ?)
+    ''', [(f'Bench User {i}', f'bench{i}@example.com', password_hash, '2025-01-01T00:00:00')
+          for i in range(threads)])
+    conn.commit()
+    conn.close()
+
+    local = threading.local()
+
+    def client():
+        if not hasattr(local, 'client'):
+            local.client = parking_app.app.test_client()
+        return local.client
+
+    print(f'method {parking_app.password_policy.method}, {total_logins} logins, {threads} client threads')
+    for workers in worker_counts:
+        parking_app.password_workers = WorkerPool(
+            workers=workers, queue_size=parking_app.PASSWORD_QUEUE_SIZE, name='password-hash')
+        latencies = []
+        outcomes = {}
+        record_lock = threading.Lock()
+
+        def login(i):
+            started = time.perf_counter()
+            response = client().post('/api/auth/user/login', json={
+                'email': f'bench{i % threads}@example.com', 'password': password,
+            })
+            elapsed = (time.perf_counter() - started) * 1000
+            with record_lock:
+                latencies.append(elapsed)
+                outcomes[response.status_code] = outcomes.get(response.status_code, 0) + 1
+
+        storm_over = threading.Event()
+        poll_latencies = []
+
+        def poll():
+            poller = parking_app.app.test_client()
+            while not storm_over.is_set():
+                started = time.perf_counter()
+                poller.get('/api/parking-lots')
+                poll_latencies.append((time.perf_counter() - started) * 1000)
+                time.sleep(0.01)
+
+        poller = threading.Thread(target=poll)
+        started = time.perf_counter()
+        # The login route prints request details; keep them off the report
+        with contextlib.redirect_stdout(io.StringIO()):
+            poller.start()
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                list(pool.map(login, range(total_logins)))
+            wall = time.perf_counter() - started
+            storm_over.set()
+            poller.join()
+
+        print(f'\n{workers} password workers: {total_logins / wall:.1f} logins/s, '
+              f'status codes {dict(sorted(outcomes.items()))}')
+        report('POST /api/auth/user/login', latencies)
+        report('GET /api/parking-lots during the storm', poll_latencies)
+
+
+if __name__ == '__main__':
+    main()
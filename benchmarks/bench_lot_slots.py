@@ -0,0 +1,167 @@
+"""
+Time GET /api/parking-lots/<id>/slots for a 1,000-slot lot.
+
+Compares the old read path (the four-table join, then datetime parsing and
+cost arithmetic per occupied slot in Python) with the single read from
+slot_live_view, both against the same data. Then times the full request
+and the book/release routes, which now also rewrite the slot's view row.
+
+Usage: python benchmarks/bench_lot_slots.py [slots] [occupied_pct] [iterations]
+"""
+
+import contextlib
+import io
+import sys
+import time
+from datetime import datetime, timedelta
+
+from _common import load_app, report, seed_lots, time_requests
+
+# The query the route ran before slot_live_view
+JOIN_QUERY = '''
+    SELECT ps.*,
+           pl.name as lot_name,
+           pl.address as lot_address,
+           pl.price_per_hour as hourly_rate,
+           u.full_name as current_user_name,
+           u.email as current_user_email,
+           b.start_time as booking_start_time_actual,
+           b.end_time as booking_end_time_actual,
+           b.planned_duration_hours as booking_planned_duration,
+           b.actual_duration_hours as booking_actual_duration,
+           b.final_cost as booking_final_cost,
+           b.planned_cost as booking_planned_cost,
+           b.status as booking_status
+    FROM parking_slots ps
+    JOIN parking_lots pl ON ps.lot_id = pl.id
+    LEFT JOIN users u ON ps.current_user_id = u.id
+    LEFT JOIN bookings b ON ps.booking_id = b.booking_id
+    WHERE ps.lot_id = ?
+    ORDER BY ps.slot_number
+'''
+
+
+def parse_time(value):
+    if 'T' in value:
+        return datetime.fromisoformat(value.replace('Z', '+00:00') if 'Z' in value else value)
+    return datetime.strptime(value, '%Y-%m-%d %H:%M:%S.%f')
+
+
+def join_path(conn, lot_id):
+    """The route body before slot_live_view (minus its debug print)."""
+    slots_data = []
+    for slot in conn.execute(JOIN_QUERY, (lot_id,)).fetchall():
+        current_duration_hours = None
+        estimated_current_cost = None
+        start_time_formatted = None
+        end_time_formatted = None
+        if not slot['is_available'] and slot['booking_start_time_actual']:
+            try:
+                start_time = parse_time(slot['booking_start_time_actual'])
+                start_time_formatted = start_time.strftime('%Y-%m-%d %H:%M:%S')
+                current_duration_hours = (datetime.now() - start_time).total_seconds() / 3600
+                estimated_current_cost = current_duration_hours * slot['hourly_rate']
+                if slot['booking_end_time_actual']:
+                    end_time_formatted = parse_time(slot['booking_end_time_actual']).strftime('%Y-%m-%d %H:%M:%S')
+            except Exception:
+                current_duration_hours = slot['booking_planned_duration'] or slot['planned_duration_hours']
+                estimated_current_cost = slot['booking_planned_cost'] or slot['planned_cost']
+                start_time_formatted = slot['booking_start_time'] or slot['booking_start_time_actual']
+        slots_data.append({
+            'id': slot['id'],
+            'slot_number': slot['slot_number'],
+            'lot_id': slot['lot_id'],
+            'lot_name': slot['lot_name'],
+            'lot_address': slot['lot_address'],
+            'is_available': bool(slot['is_available']),
+            'current_user_id': slot['current_user_id'],
+            'current_user_name': slot['current_user_name'],
+            'current_user_email': slot['current_user_email'],
+            'booking_id': slot['booking_id'],
+            'vehicle_number': slot['vehicle_number'],
+            'booking_start_time': start_time_formatted or slot['booking_start_time'],
+            'booking_end_time': end_time_formatted,
+            'planned_duration_hours': slot['booking_planned_duration'] or slot['planned_duration_hours'],
+            'current_duration_hours': round(current_duration_hours, 2) if current_duration_hours else None,
+            'estimated_current_cost': round(estimated_current_cost, 2) if estimated_current_cost else (slot['booking_planned_cost'] or slot['planned_cost']),
+            'final_cost': slot['booking_final_cost'],
+            'booking_status': slot['booking_status'],
+            'hourly_rate': slot['hourly_rate'],
+        })
+    return slots_data
+
+
+def view_path(parking_app, conn, lot_id):
+    """What the route does now."""
+    now = time.time()
+    rows = conn.execute(parking_app.LOT_SLOTS_QUERY, (now, now, lot_id)).fetchall()
+    return [dict(slot, is_available=bool(slot['is_available'])) for slot in rows]
+
+
+def main():
+    slots = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    occupied_pct = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+    iterations = int(sys.argv[3]) if len(sys.argv) > 3 else 100
+
+    parking_app = load_app()
+    client = parking_app.app.test_client()
+    conn = parking_app.get_db_connection()
+    lot_id = seed_lots(conn, 1, slots_per_lot=slots)[0]
+    conn.execute('''
+        INSERT INTO users (full_name, email, phone, password, created_at)
+        VALUES ('Bench User', 'bench@example.com', '', 'x', '2025-01-01T00:00:00')
+    ''')
+    conn.commit()
+    conn.close()
+    headers = {'Authorization': f'Bearer {parking_app.token_signer.issue(1)}'}
+
+    # Occupy every n-th slot through the booking route, started up to 5h ago
+    step = max(1, round(100 / occupied_pct)) if occupied_pct else 0
+    grid = client.get(f'/api/parking-lots/{lot_id}/slots').get_json()
+    started_at = datetime.now()
+    booked = grid[::step] if step else []
+    book_ms = []
+    # The booking routes print request details; keep them off the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i, slot in enumerate(booked):
+            started = time.perf_counter()
+            client.post('/api/book-slot', headers=headers, json={
+                'lot_id': lot_id, 'slot_id': slot['id'], 'vehicle_number': f'TN{i:04d}',
+                'start_time': (started_at - timedelta(minutes=i % 300)).isoformat(),
+            })
+            book_ms.append((time.perf_counter() - started) * 1000)
+
+    conn = parking_app.get_db_connection()
+    before, after = join_path(conn, lot_id), view_path(parking_app, conn, lot_id)
+    assert len(before) == len(after) == slots
+    for old, new in zip(before, after):
+        for key, value in old.items():
+            if key in ('current_duration_hours', 'estimated_current_cost') and value is not None:
+                assert abs(value - new[key]) <= 0.05, (key, old, new)
+            else:
+                assert value == new[key], (key, old, new)
+
+    print(f'{slots} slots, {len(booked)} occupied, {iterations} reads each')
+    report('join + Python datetime math (before)', time_requests(lambda: join_path(conn, lot_id), iterations))
+    report('slot_live_view read (after)', time_requests(lambda: view_path(parking_app, conn, lot_id), iterations))
+    conn.close()
+
+    def fetch():
+        response = client.get(f'/api/parking-lots/{lot_id}/slots')
+        assert response.status_code == 200, response.data
+
+    fetch()  # warm up
+    report('GET .../slots (full request, after)', time_requests(fetch, iterations))
+
+    release_ms = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for slot in booked:
+            started = time.perf_counter()
+            client.post('/api/release-slot', headers=headers, json={'slot_id': slot['id']})
+            release_ms.append((time.perf_counter() - started) * 1000)
+    report('POST /api/book-slot (incl. view row)', book_ms)
+    report('POST /api/release-slot (incl. view row)', release_ms)
+
+
+if __name__ == '__main__':
+    main()
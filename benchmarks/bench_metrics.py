@@ -0,0 +1,126 @@
+"""
+Cost of recording and scraping the Prometheus metrics, and a check that
+/metrics adds up counts from several worker processes.
+
+1. Counter.inc and Histogram.observe per call, from 1 and from 8 threads.
+2. GET /metrics with 200 lots, traffic on the main read routes, and the
+   snapshots of 7 other workers in PARKING_METRICS_DIR.
+3. Forks worker processes that each book and release slots through the
+   app and flush their snapshot, then checks that one scrape in the
+   parent reports every process's bookings.
+
+Usage: python benchmarks/bench_metrics.py [workers] [bookings_per_worker]
+"""
+
+import logging
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+
+from _common import load_app, report, seed_lots, time_requests
+
+METRICS_DIR = tempfile.mkdtemp(prefix='parking_metrics_')
+os.environ['PARKING_METRICS_DIR'] = METRICS_DIR
+
+
+def per_call_ns(fn, threads, calls=200000):
+    per_thread = calls // threads
+
+    def run():
+        for _ in range(per_thread):
+            fn()
+
+    workers = [threading.Thread(target=run) for _ in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return (time.perf_counter() - started) / (per_thread * threads) * 1e9
+
+
+def scraped(text, name):
+    match = re.search(rf'^{re.escape(name)} (\S+)$', text, re.M)
+    return float(match.group(1)) if match else 0.0
+
+
+def book_and_release(client, token, lot_id, count):
+    headers = {'Authorization': f'Bearer {token}'}
+    for _ in range(count):
+        booked = client.post('/api/book-any-slot', json={'lot_id': lot_id, 'vehicle_number': 'TN01'},
+                             headers=headers)
+        assert booked.status_code == 201, booked.get_data(as_text=True)
+        released = client.post('/api/release-slot', json={'booking_id': booked.get_json()['booking']['booking_id']},
+                               headers=headers)
+        assert released.status_code == 200, released.get_data(as_text=True)
+
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    bookings = int(sys.argv[2]) if len(sys.argv) > 2 else 25
+
+    parking_app = load_app()
+    logging.disable(logging.INFO)
+    sys.stdout = open(os.devnull, 'w')  # Registration still prints debug lines
+    out = sys.__stdout__
+    client = parking_app.app.test_client()
+    conn = parking_app.get_db_connection()
+    lot_ids = seed_lots(conn, 200)
+    conn.close()
+
+    counter = parking_app.bookings_counter
+    histogram = parking_app.request_seconds
+    for threads in (1, 8):
+        inc = per_call_ns(counter.inc, threads)
+        observe = per_call_ns(lambda: histogram.observe(0.012, method='GET', route='/bench', code=200), threads)
+        print(f'{threads} thread(s): Counter.inc {inc:6.0f}ns  Histogram.observe {observe:6.0f}ns', file=out)
+
+    for path in ['/api/parking-lots', '/api/users', '/api/bookings', '/api/bookings/stats', '/api/search?q=bench',
+                 '/api/users?per_page=5', '/api/no-such-route'] + [f'/api/parking-lots/{lot}/slots' for lot in lot_ids[:50]]:
+        client.get(path).get_data()
+
+    # Seven other workers with the same series
+    parking_app.metrics.flush()
+    own = os.path.join(METRICS_DIR, f'metrics-{os.getpid()}.json')
+    with open(own, encoding='utf-8') as f:
+        snapshot = f.read()
+    for fake_pid in range(1, 8):
+        with open(os.path.join(METRICS_DIR, f'metrics-{fake_pid}.json'), 'w', encoding='utf-8') as f:
+            f.write(snapshot.replace(f'"pid":{os.getpid()}', f'"pid":{fake_pid}', 1))
+    body = client.get('/metrics').get_data(as_text=True)
+    sys.stdout = out
+    report(f'GET /metrics (8 workers, {len(body.splitlines())} lines)',
+           time_requests(lambda: client.get('/metrics').get_data(), 50))
+    sys.stdout = open(os.devnull, 'w')
+    for fake_pid in range(1, 8):
+        os.remove(os.path.join(METRICS_DIR, f'metrics-{fake_pid}.json'))
+
+    # Real worker processes
+    client.post('/api/auth/user/register', json={'email': 'bench@example.com', 'password': 'pw', 'full_name': 'Bench'})
+    token = client.post('/api/auth/user/login', json={'email': 'bench@example.com', 'password': 'pw'}).get_json()['token']
+    before = scraped(client.get('/metrics').get_data(as_text=True), 'parking_bookings_total')
+    children = []
+    for i in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            parking_app.db_pool.close_all()  # Connections are not shared across a fork
+            book_and_release(parking_app.app.test_client(), token, lot_ids[i], bookings)
+            parking_app.metrics.flush()
+            os._exit(0)
+        children.append(pid)
+    for pid in children:
+        _, status = os.waitpid(pid, 0)
+        assert status == 0, f'worker {pid} failed'
+    text = client.get('/metrics').get_data(as_text=True)
+    sys.stdout = out
+    booked = scraped(text, 'parking_bookings_total') - before
+    released = scraped(text, 'parking_releases_total')
+    print(f'{workers} worker processes x {bookings} bookings: /metrics in the parent reports '
+          f'{booked:.0f} booked and {released:.0f} released (expected {workers * bookings} each)')
+
+
+if __name__ == '__main__':
+    main()
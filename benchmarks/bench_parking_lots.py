@@ -0,0 +1,35 @@
+"""
+Benchmark GET /api/parking-lots latency as the number of lots grows.
+
+Usage: python benchmarks/bench_parking_lots.py [iterations]
+"""
+
+import sys
+
+from _common import load_app, report, seed_lots, time_requests
+
+LOT_COUNTS = (10, 100, 1000)
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    parking_app = load_app()
+    client = parking_app.app.test_client()
+
+    seeded = 0
+    for target in LOT_COUNTS:
+        conn = parking_app.get_db_connection()
+        seed_lots(conn, target - seeded)
+        conn.close()
+        seeded = target
+
+        def fetch():
+            response = client.get('/api/parking-lots')
+            assert response.status_code == 200, response.data
+
+        fetch()  # warm up
+        report(f'GET /api/parking-lots ({target} lots)', time_requests(fetch, iterations))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""
+Measure the per-request cost of the profiling middleware and SQL tracing.
+
+Seeds 200 lots and 20k bookings, then times a few read endpoints:
+cached payloads, where the middleware is most of the extra work, and
+paged listings that run several statements each. Profiling is switched
+off and on in-process (the raw wsgi_app and plain sqlite3 connections
+versus RequestProfiler and TracedConnection), alternating in short
+batches so drift on a busy machine hits both sides alike. The median of
+the batch means is reported. Whole requests vary by more than the
+profiler costs, so the fixed costs are also timed alone: the middleware
+around a trivial WSGI app, and one traced statement against a plain one.
+Finally it prints what /api/debug/profiling recorded.
+
+Usage: python benchmarks/bench_profiling.py [batches] [batch_size]
+"""
+
+import contextlib
+import io
+import logging
+import sqlite3
+import statistics
+import sys
+import time
+import timeit
+
+from _common import load_app, seed_bookings, seed_lots
+
+PATHS = ['/api/parking-lots', '/api/parking-lots/{lot}/slots', '/api/bookings/stats',
+         '/api/bookings?per_page=20&status=all', '/api/users?per_page=50']
+
+
+def set_profiling(parking_app, enabled):
+    from backend.utils.profiling import TracedConnection
+
+    profiler = parking_app.request_profiler
+    parking_app.app.wsgi_app = profiler if enabled else profiler.wsgi_app
+    # Idle connections were opened by the old factory
+    parking_app.db_pool.close_all()
+    parking_app.db_pool.connection_factory = TracedConnection if enabled else sqlite3.Connection
+
+
+def batch_mean_us(client, path, size):
+    # Some routes still print debug lines; keep them out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        for _ in range(size):
+            response = client.get(path)
+            response.get_data()
+        return (time.perf_counter() - started) / size * 1e6
+
+
+def fixed_costs_us(db_path, number=100000):
+    from backend.utils.profiling import RequestProfile, RequestProfiler, TracedConnection, _local
+
+    def hello(environ, start_response):
+        start_response('200 OK', [('Content-Type', 'application/json')])
+        return [b'{}']
+
+    def serve(wsgi_app):
+        body = wsgi_app({'REQUEST_METHOD': 'GET', 'PATH_INFO': '/'}, lambda status, headers, exc_info=None: None)
+        for _ in body:
+            pass
+
+    profiled = RequestProfiler(hello)
+    costs = {
+        'middleware': (timeit.timeit(lambda: serve(profiled), number=number)
+                       - timeit.timeit(lambda: serve(hello), number=number)) / number * 1e6,
+    }
+    timings = {}
+    for factory in (sqlite3.Connection, TracedConnection):
+        conn = sqlite3.connect(db_path, factory=factory)
+        _local.profile = RequestProfile('GET', '/') if factory is TracedConnection else None
+        timings[factory] = timeit.timeit(
+            lambda: conn.execute('SELECT id FROM parking_lots WHERE id = ?', (1,)).fetchall(), number=number)
+        _local.profile = None
+        conn.close()
+    costs['per statement'] = (timings[TracedConnection] - timings[sqlite3.Connection]) / number * 1e6
+    return costs
+
+
+def main():
+    batches = int(sys.argv[1]) if len(sys.argv) > 1 else 15
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    parking_app = load_app()
+    logging.disable(logging.INFO)
+    client = parking_app.app.test_client()
+    conn = parking_app.get_db_connection()
+    lot_ids = seed_lots(conn, 200)
+    seed_bookings(conn, lot_ids, 20000)
+    conn.close()
+    client.post('/api/admin/stats/reconcile').get_data()
+
+    print(f'{batches} alternating batches of {batch_size} requests, median batch mean')
+    print(f'{"endpoint":<40} {"off":>9} {"on":>9} {"overhead":>9}')
+    for path in PATHS:
+        path = path.format(lot=lot_ids[7])
+        samples = {False: [], True: []}
+        for _ in range(batches):
+            for enabled in (False, True):
+                set_profiling(parking_app, enabled)
+                batch_mean_us(client, path, 20)  # warm the connection and caches
+                samples[enabled].append(batch_mean_us(client, path, batch_size))
+        off, on = statistics.median(samples[False]), statistics.median(samples[True])
+        print(f'{path:<40} {off:7.0f}us {on:7.0f}us {on - off:7.0f}us')
+
+    print()
+    for label, cost in fixed_costs_us(parking_app.DB_PATH).items():
+        print(f'{label + " cost":<40} {cost:7.2f}us')
+
+    set_profiling(parking_app, True)
+    print('\nrecorded by /api/debug/profiling:')
+    for entry in client.get('/api/debug/profiling').get_json()['endpoints']:
+        if entry['requests'] > 1:
+            print(f"{entry['endpoint']:<40} n={entry['requests']:<6} p50={entry['p50_ms']:6.3f}ms "
+                  f"cpu={entry['avg_cpu_ms']:6.3f}ms sql={entry['avg_sql_ms']:6.3f}ms "
+                  f"queries={entry['queries_per_request']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Time the cached read endpoints cold (cache cleared before every request)
+against warm, and check that a burst of concurrent cold requests runs
+one load per key.
+
+Caches in-process unless PARKING_CACHE_BACKEND is set (redis needs a
+reachable server; see backend/config/redis_config.py).
+
+Usage: python benchmarks/bench_read_cache.py [lots] [iterations] [threads]
+"""
+
+import contextlib
+import io
+import logging
+import os
+import sys
+import threading
+
+os.environ.setdefault('PARKING_CACHE_BACKEND', 'local')
+
+from _common import load_app, report, seed_lots, time_requests
+
+
+def main():
+    lots = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    threads = int(sys.argv[3]) if len(sys.argv) > 3 else 16
+
+    parking_app = load_app()
+    logging.getLogger('app').setLevel(logging.WARNING)
+    client = parking_app.app.test_client()
+    read_cache = parking_app.read_cache
+    conn = parking_app.get_db_connection()
+    lot_ids = seed_lots(conn, lots, slots_per_lot=200)
+    conn.close()
+    print(f'{lots} lots, backend={read_cache.backend}, {iterations} requests each')
+
+    for namespace, url in (('lots', '/api/parking-lots'),
+                           ('slots', f'/api/parking-lots/{lot_ids[0]}/slots'),
+                           ('stats', '/api/bookings/stats')):
+        def fetch():
+            response = client.get(url)
+            assert response.status_code == 200, response.status_code
+
+        def cold():
+            read_cache.clear(namespace)
+            fetch()
+
+        # The stats route prints a debug line per load; keep it off the report
+        with contextlib.redirect_stdout(io.StringIO()):
+            cold_ms = time_requests(cold, iterations)
+            warm_ms = time_requests(fetch, iterations)
+        report(f'{url} cold', cold_ms)
+        report(f'{url} warm', warm_ms)
+
+    # Concurrent misses on one key should share a single load
+    read_cache.clear('lots')
+    before = read_cache.stats()['namespaces']['lots']
+    start = threading.Barrier(threads)
+
+    def burst():
+        start.wait()
+        assert parking_app.app.test_client().get('/api/parking-lots').status_code == 200
+
+    workers = [threading.Thread(target=burst) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    after = read_cache.stats()['namespaces']['lots']
+    print(f'{threads} concurrent cold requests: {after["loads"] - before["loads"]} load(s), '
+          f'{after["coalesced"] - before["coalesced"]} coalesced')
+    print(read_cache.stats())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Time process startup (import app) and the first cached request with Redis
+absent and present.
+
+Each case runs in a fresh interpreter. "absent" points REDIS_HOST/PORT at
+a closed local port and at a non-routable address (where a connect hangs
+until its timeout). "present" uses REDIS_HOST/REDIS_PORT from the
+environment and is skipped if nothing listens there. For comparison,
+"eager connect" times the TCP connect with the 5 s timeout that
+redis_config used to run at import.
+
+Usage: python benchmarks/bench_redis_startup.py [runs]
+"""
+
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+from _common import percentile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+PROBE = '''
+import json, time
+started = time.perf_counter()
+from _common import load_app
+parking_app = load_app()
+imported = time.perf_counter()
+response = parking_app.app.test_client().get('/api/parking-lots')
+assert response.status_code == 200, response.status_code
+done = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'first_request_ms': (done - imported) * 1000,
+    'cache': parking_app.read_cache.stats()['breaker'],
+}))
+'''
+
+
+def closed_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def listening(host, port):
+    try:
+        socket.create_connection((host, port), timeout=1).close()
+        return True
+    except OSError:
+        return False
+
+
+def eager_connect_ms(host, port):
+    started = time.perf_counter()
+    try:
+        socket.create_connection((host, port), timeout=5).close()
+    except OSError:
+        pass
+    return (time.perf_counter() - started) * 1000
+
+
+def run_probe(host, port):
+    env = dict(os.environ, REDIS_HOST=host, REDIS_PORT=str(port), PARKING_CACHE_BACKEND='auto')
+    result = subprocess.run([sys.executable, '-c', PROBE], cwd=BENCH_DIR, env=env,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    try:
+        import redis  # noqa: F401
+        print('redis-py installed')
+    except ImportError:
+        print('redis-py not installed: the app never contacts Redis, results show the fallback path')
+
+    cases = [
+        ('absent (closed port)', '127.0.0.1', closed_port()),
+        ('absent (non-routable)', '10.255.255.1', 6379),
+    ]
+    present = (os.getenv('REDIS_HOST', 'localhost'), int(os.getenv('REDIS_PORT', 6379)))
+    if listening(*present):
+        cases.append(('present', *present))
+    else:
+        print(f'present: skipped, nothing listening on {present[0]}:{present[1]}')
+
+    for label, host, port in cases:
+        results = [run_probe(host, port) for _ in range(runs)]
+        imports = [r['import_ms'] for r in results]
+        firsts = [r['first_request_ms'] for r in results]
+        eager = eager_connect_ms(host, port)
+        print(f'{label:24} import p50={percentile(imports, 50):8.1f}ms  '
+              f'first request p50={percentile(firsts, 50):7.1f}ms  '
+              f'eager connect={eager:7.1f}ms  breaker={results[-1]["cache"]}')
+
+
+if __name__ == '__main__':
+    main()
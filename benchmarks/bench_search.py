@@ -0,0 +1,93 @@
+"""
+Time GET /api/search against a large user base.
+
+Seeds users through plain INSERTs, so the FTS triggers index them the way
+registration does, then times typical admin searches: a name, a
+two-letter prefix shared by many users, name plus surname, an email, a
+phone number and a miss. For comparison it times one GET /api/users,
+the payload the Search tab used to download and filter in the browser.
+
+Usage: python benchmarks/bench_search.py [users] [iterations]
+"""
+
+import random
+import sys
+import time
+
+from _common import load_app, report, seed_lots, time_requests
+
+SYLLABLES = ['ra', 'vi', 'an', 'ku', 'mar', 'pri', 'ya', 'sh', 'ar', 'ma', 'deep', 'la',
+             'ks', 'mi', 'su', 'ni', 'ta', 'jo', 'se', 'ha', 'ri', 'ka', 'lo', 'ven']
+
+
+def make_names(rng, count):
+    return sorted({''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).title()
+                   for _ in range(count)})
+
+
+def seed_users(conn, count, batch_size=50000):
+    rng = random.Random(7)
+    first_names, last_names = make_names(rng, 3000), make_names(rng, 8000)
+    users = []
+    for i in range(1, count + 1):
+        first, last = rng.choice(first_names), rng.choice(last_names)
+        users.append((
+            f'{first.lower()}.{last.lower()}{i}@example.com', 'x', f'{first} {last}',
+            f'+91 9{rng.randint(0, 99999):05d}-{rng.randint(0, 99999):05d}',
+            '1 Main Road', 'Chennai', 'TN', '600001', '2025-01-01T00:00:00',
+        ))
+    started = time.perf_counter()
+    for offset in range(0, count, batch_size):
+        conn.executemany('''
+            INSERT INTO users (email, password, full_name, phone, address_line1, city, state, pin_code, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', users[offset:offset + batch_size])
+        conn.commit()
+    print(f'seeded {count} users (indexed by trigger) in {time.perf_counter() - started:.1f}s')
+    # Keep one user to search for; a million live tuples would slow every GC pass
+    return users[count // 2]
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    parking_app = load_app()
+    client = parking_app.app.test_client()
+    conn = parking_app.get_db_connection()
+    seed_lots(conn, 1000)
+    sample = seed_users(conn, users)
+    conn.execute("INSERT INTO users_fts (users_fts) VALUES ('optimize')")
+    conn.commit()
+    conn.close()
+
+    email, _, full_name, phone = sample[:4]
+    first, last = full_name.split()
+    searches = [
+        ('name', first),
+        ('2-letter prefix', first[:2]),
+        ('name + surname prefix', f'{first} {last[:3]}'),
+        ('email', email),
+        ('phone', phone),
+        ('phone group', phone.split()[1][:5]),
+        ('lot name', 'Lot 512'),
+        ('no match', 'qqqzz'),
+    ]
+    print(f'{users} users, 1000 lots, {iterations} requests each')
+    for label, query in searches:
+        def search():
+            response = client.get('/api/search', query_string={'q': query})
+            assert response.status_code == 200, response.data
+
+        data = client.get('/api/search', query_string={'q': query}).get_json()
+        found = f"{data['users']['matched']}{'+' if data['users']['truncated'] else ''} users, {data['lots']['matched']} lots"
+        report(f'{label} ({found})', time_requests(search, iterations))
+
+    started = time.perf_counter()
+    response = client.get('/api/users')
+    print(f'GET /api/users (what the tab used to filter): {(time.perf_counter() - started) * 1000:.0f}ms, '
+          f'{len(response.data) / 1e6:.1f} MB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Time creating, shrinking and growing lots with 10k slots.
+
+First times the slot-insert transaction alone (which is how long the write
+lock is held) for the per-row INSERT loop the routes used to run, for
+executemany, and for provision_slots' single INSERT ... SELECT. Then times
+the lot create/update routes end to end.
+
+Usage: python benchmarks/bench_slot_provisioning.py [slots] [rounds]
+"""
+
+import sys
+import time
+
+from _common import load_app, report
+
+
+def per_row_insert(cursor, lot_id, total_slots):
+    """The old provisioning loop: one execute per slot."""
+    for slot_num in range(1, total_slots + 1):
+        cursor.execute('''
+            INSERT INTO parking_slots (slot_number, lot_id, is_available)
+            VALUES (?, ?, 1)
+        ''', (slot_num, lot_id))
+
+
+def executemany_insert(cursor, lot_id, total_slots):
+    cursor.executemany(
+        'INSERT INTO parking_slots (slot_number, lot_id, is_available) VALUES (?, ?, 1)',
+        [(slot_num, lot_id) for slot_num in range(1, total_slots + 1)]
+    )
+
+
+def main():
+    slots = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    parking_app = load_app()
+    client = parking_app.app.test_client()
+
+    # Write transaction alone, i.e. how long each approach holds the lock
+    strategies = {
+        'per-row INSERT loop (before)': per_row_insert,
+        'executemany': executemany_insert,
+        'provision_slots (INSERT ... SELECT)': parking_app.provision_slots,
+    }
+    transaction_ms = {label: [] for label in strategies}
+    conn = parking_app.get_db_connection()
+    for i in range(rounds):
+        for label, provision in strategies.items():
+            lot_id = conn.execute('''
+                INSERT INTO parking_lots (name, address, pincode, price_per_hour, total_slots)
+                VALUES (?, 'Bench Street', '110001', 50.0, ?)
+            ''', (f'Raw Lot {i}', slots)).lastrowid
+            conn.commit()
+            started = time.perf_counter()
+            provision(conn.cursor(), lot_id, slots)
+            conn.commit()
+            transaction_ms[label].append((time.perf_counter() - started) * 1000)
+    conn.close()
+
+    created, shrunk, grown = [], [], []
+    for i in range(rounds):
+        started = time.perf_counter()
+        response = client.post('/api/parking-lots', json={
+            'name': f'Bench Garage {i}', 'address': 'Bench Street', 'price': 50, 'total_slots': slots,
+        })
+        created.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 201, response.get_data(as_text=True)
+        lot_id = response.get_json()['id']
+
+        started = time.perf_counter()
+        client.put(f'/api/parking-lots/{lot_id}', json={'total_slots': slots // 2})
+        shrunk.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        client.put(f'/api/parking-lots/{lot_id}', json={'total_slots': slots})
+        grown.append((time.perf_counter() - started) * 1000)
+
+    conn = parking_app.get_db_connection()
+    counts = conn.execute('''
+        SELECT COUNT(*), COUNT(DISTINCT lot_id || '-' || slot_number) FROM parking_slots
+        WHERE lot_id IN (SELECT id FROM parking_lots WHERE name LIKE 'Bench Garage %')
+    ''').fetchone()
+    conn.close()
+    assert counts[0] == counts[1] == slots * rounds, counts
+
+    print(f'{rounds} lots of {slots} slots, write transaction only:')
+    for label, samples in transaction_ms.items():
+        report(label, samples)
+    print('Full requests (including the allocator rebuild after commit):')
+    report('POST /api/parking-lots', created)
+    report(f'PUT total_slots {slots} -> {slots // 2}', shrunk)
+    report(f'PUT total_slots {slots // 2} -> {slots}', grown)
+
+
+if __name__ == '__main__':
+    main()
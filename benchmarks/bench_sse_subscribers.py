@@ -0,0 +1,147 @@
+"""
+Load test for the /api/events/slots stream with many idle subscribers.
+
+Opens SUBSCRIBERS real HTTP streams against a threaded werkzeug server,
+then measures regular API latency while they sit idle, fan-out latency
+of a booking event to every matching stream, and heartbeat delivery.
+
+Usage: python benchmarks/bench_sse_subscribers.py [subscribers]
+"""
+
+import json
+import os
+import selectors
+import socket
+import sys
+import threading
+import time
+import http.client
+
+from _common import load_app, report, seed_lots, time_requests
+
+LOTS = 50
+ALL_LOTS_SHARE = 10  # every Nth subscriber watches all lots
+HEARTBEAT_SECONDS = 2
+
+
+class Stream:
+    def __init__(self, port, lot_id):
+        self.lot_id = lot_id
+        self.buffer = b''
+        self.sock = socket.create_connection(('127.0.0.1', port))
+        path = '/api/events/slots' + (f'?lots={lot_id}' if lot_id else '')
+        self.sock.sendall(f'GET {path} HTTP/1.1\r\nHost: bench\r\nAccept: text/event-stream\r\n\r\n'.encode())
+        self.sock.setblocking(False)
+
+    def read(self):
+        try:
+            chunk = self.sock.recv(65536)
+        except BlockingIOError:
+            return
+        self.buffer += chunk
+
+    def count(self, marker):
+        return self.buffer.count(marker)
+
+
+def pump(selector, until, timeout):
+    """Read from every ready stream until `until()` is true or time runs out."""
+    deadline = time.perf_counter() + timeout
+    while not until():
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            return False
+        for key, _ in selector.select(min(remaining, 0.05)):
+            key.data.read()
+    return True
+
+
+def main():
+    subscribers = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    os.environ['PARKING_SSE_HEARTBEAT_SECONDS'] = str(HEARTBEAT_SECONDS)
+    os.environ['PARKING_SSE_MAX_SUBSCRIBERS'] = str(subscribers + 10)
+    parking_app = load_app()
+    from werkzeug.serving import make_server
+
+    conn = parking_app.get_db_connection()
+    lot_ids = seed_lots(conn, LOTS)
+    conn.close()
+    parking_app.load_slot_allocator()
+
+    client = parking_app.app.test_client()
+    client.post('/api/auth/user/register', json={'email': 'sse@bench', 'password': 'pw', 'full_name': 'SSE'})
+    token = client.post('/api/auth/user/login', json={'email': 'sse@bench', 'password': 'pw'}).get_json()['token']
+
+    server = make_server('127.0.0.1', 0, parking_app.app, threaded=True)
+    server.socket.listen(1024)
+    port = server.server_port
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def get_lots():
+        http_conn = http.client.HTTPConnection('127.0.0.1', port)
+        http_conn.request('GET', '/api/parking-lots')
+        response = http_conn.getresponse()
+        response.read()
+        http_conn.close()
+        assert response.status == 200
+
+    get_lots()
+    report('GET /api/parking-lots (0 streams)', time_requests(get_lots, 100))
+
+    # Open the streams in batches so the listen backlog never overflows
+    selector = selectors.DefaultSelector()
+    streams = []
+    start = time.perf_counter()
+    for batch_start in range(0, subscribers, 100):
+        batch = []
+        for i in range(batch_start, min(subscribers, batch_start + 100)):
+            lot_id = None if i % ALL_LOTS_SHARE == 0 else lot_ids[i % LOTS]
+            stream = Stream(port, lot_id)
+            selector.register(stream.sock, selectors.EVENT_READ, stream)
+            batch.append(stream)
+        streams.extend(batch)
+        assert pump(selector, lambda: all(s.count(b'event: snapshot') for s in batch), 30), 'snapshot timeout'
+    print(f"Opened {len(streams)} streams in {time.perf_counter() - start:.2f}s "
+          f"({threading.active_count()} threads)")
+
+    report(f'GET /api/parking-lots ({subscribers} idle streams)', time_requests(get_lots, 100))
+
+    # Fan-out: book and release slots in one lot, time delivery to every watcher
+    target_lot = lot_ids[1]
+    watchers = [s for s in streams if s.lot_id in (None, target_lot)]
+    others = [s for s in streams if s.lot_id not in (None, target_lot)]
+    http_conn = http.client.HTTPConnection('127.0.0.1', port)
+    http_conn.request('GET', f'/api/parking-lots/{target_lot}/slots')
+    slot_ids = [slot['id'] for slot in json.loads(http_conn.getresponse().read())]
+    headers = {'Authorization': f'Bearer {token}', 'Content-Type': 'application/json'}
+
+    fanout = []
+    for n, slot_id in enumerate(slot_ids[:10], start=1):
+        started = time.perf_counter()
+        http_conn.request('POST', '/api/book-slot', headers=headers,
+                          body=f'{{"lot_id": {target_lot}, "slot_id": {slot_id}, "vehicle_number": "SSE{n}"}}')
+        response = http_conn.getresponse()
+        response.read()
+        assert response.status == 201, response.status
+        assert pump(selector, lambda: all(s.count(b'event: slot') >= n for s in watchers), 10), 'fan-out timeout'
+        fanout.append((time.perf_counter() - started) * 1000)
+    report(f'book -> delivered to {len(watchers)} streams', fanout)
+    assert not any(s.count(b'event: slot') for s in others), 'event leaked to other lots'
+
+    # Heartbeats keep idle streams alive
+    before = sum(s.count(b': heartbeat') for s in streams)
+    pump(selector, lambda: False, HEARTBEAT_SECONDS * 1.5)
+    beats = sum(s.count(b': heartbeat') for s in streams) - before
+    print(f"Heartbeats in {HEARTBEAT_SECONDS * 1.5:.0f}s window: {beats} "
+          f"({sum(1 for s in streams if s.count(b': heartbeat'))}/{len(streams)} streams)")
+
+    for stream in streams:
+        selector.unregister(stream.sock)
+        stream.sock.close()
+    time.sleep(HEARTBEAT_SECONDS + 1)
+    print('Broker after disconnect:', parking_app.slot_events.stats())
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Compare text timestamps with the start_ts/end_ts epoch columns.
+
+Times the export's one-day filter and the listing's month filter as
+DATE(start_time) / text ranges (with the indexes they used to have) against
+integer start_ts ranges. Also times turning a stored start time into a
+duration: the branching fromisoformat/strptime parse the routes used to
+run per row against arithmetic on start_ts.
+
+Usage: python benchmarks/bench_timestamps.py [bookings] [iterations]
+"""
+
+import sys
+import time
+from datetime import date, datetime
+
+from _common import load_app, report, seed_bookings, seed_lots, time_requests
+
+
+def old_parse(value):
+    """The per-row parse get_parking_lot_slots and release_slot used to do."""
+    if 'T' in value:
+        return datetime.fromisoformat(value.replace('Z', '+00:00') if 'Z' in value else value)
+    return datetime.strptime(value, '%Y-%m-%d %H:%M:%S.%f')
+
+
+def main():
+    bookings = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    parking_app = load_app()
+    conn = parking_app.get_db_connection()
+    lot_ids = seed_lots(conn, 50)
+    seed_bookings(conn, lot_ids, bookings)
+    # The text indexes migration 6 replaced, so the old filters get their best plan
+    conn.execute('CREATE INDEX bench_start_date ON bookings (DATE(start_time))')
+    conn.execute('CREATE INDEX bench_user_start_time ON bookings (user_id, start_time)')
+    conn.execute('ANALYZE')
+    conn.commit()
+
+    day = '2025-06-14'
+    month_start = date(2025, 6, 1)
+    start, end = parking_app.day_start_epoch(day), parking_app.day_end_epoch(day)
+    cases = [
+        ('export day: DATE(start_time) range',
+         'SELECT COUNT(*) FROM bookings WHERE user_id = 1 AND DATE(start_time) >= ? AND DATE(start_time) <= ?',
+         (day, day)),
+        ('export day: start_ts range',
+         'SELECT COUNT(*) FROM bookings WHERE user_id = 1 AND start_ts >= ? AND start_ts < ?',
+         (start, end)),
+        ('month: start_time >= text bound',
+         'SELECT COUNT(*) FROM bookings WHERE start_time >= ?',
+         (month_start.isoformat(),)),
+        ('month: start_ts >= epoch bound',
+         'SELECT COUNT(*) FROM bookings WHERE start_ts >= ?',
+         (parking_app.day_start_epoch(month_start),)),
+    ]
+    print(f'{bookings} bookings')
+    counts = {}
+    for label, sql, params in cases:
+        counts[label] = conn.execute(sql, params).fetchone()[0]
+        report(label, time_requests(lambda: conn.execute(sql, params).fetchone(), iterations))
+    assert len(set(list(counts.values())[:2])) == 1 and len(set(list(counts.values())[2:])) == 1, counts
+
+    rows = conn.execute('SELECT start_time, start_ts FROM bookings LIMIT 100000').fetchall()
+    conn.close()
+    now = datetime.now()
+    now_ts = time.time()
+
+    def parse_durations():
+        return [(now - old_parse(row[0])).total_seconds() / 3600 for row in rows]
+
+    def epoch_durations():
+        return [(now_ts - row[1]) / 3600 for row in rows]
+
+    for old, new in zip(parse_durations()[:1000], epoch_durations()[:1000]):
+        assert abs(old - new) < 0.01, (old, new)
+    report(f'{len(rows)} durations: parse start_time', time_requests(parse_durations, 5))
+    report(f'{len(rows)} durations: start_ts arithmetic', time_requests(epoch_durations, 5))
+
+
+if __name__ == '__main__':
+    main()
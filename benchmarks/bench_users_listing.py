@@ -0,0 +1,110 @@
+"""
+Time and size GET /api/users against a large user base.
+
+"full list (old)" is the handler this replaced: fetchall(), a list of
+dicts and one jsonify() of the lot. "streamed" is today's unpaginated
+GET /api/users, consumed chunk by chunk the way a WSGI server sends it.
+Peak Python memory for both comes from tracemalloc, in a second,
+untimed run. The paged requests time the first page, a page deep into
+the listing (by cursor) and city- and date-filtered pages.
+
+Usage: python benchmarks/bench_users_listing.py [users] [iterations]
+"""
+
+import sys
+import time
+import tracemalloc
+
+from _common import load_app, report, time_requests
+
+CITIES = [('Chennai', 'TN'), ('Mumbai', 'MH'), ('Pune', 'MH'), ('Bengaluru', 'KA'),
+          ('Delhi', 'DL'), ('Kolkata', 'WB'), ('Jaipur', 'RJ'), ('Kochi', 'KL')]
+
+
+def seed_users(conn, count, batch_size=50000):
+    started = time.perf_counter()
+    for offset in range(0, count, batch_size):
+        rows = []
+        for i in range(offset, min(count, offset + batch_size)):
+            city, state = CITIES[i % len(CITIES)]
+            rows.append((
+                f'user{i}@example.com', 'x', f'User {i}', f'+91 90000-{i % 100000:05d}',
+                '1 Main Road', city, state, '600001',
+                f'2024-{1 + i % 12:02d}-{1 + i % 28:02d}T{i % 24:02d}:{i % 60:02d}:00',
+            ))
+        conn.executemany('''
+            INSERT INTO users (email, password, full_name, phone, address_line1, city, state, pin_code, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+        conn.commit()
+    print(f'seeded {count} users in {time.perf_counter() - started:.1f}s')
+
+
+def full_list(parking_app):
+    """The old GET /api/users body."""
+    conn = parking_app.get_db_connection()
+    users = conn.execute('''
+        SELECT id, full_name, email, phone, address_line1, city, state, pin_code, created_at
+        FROM users
+        ORDER BY created_at DESC
+    ''').fetchall()
+    users_data = [parking_app.format_user(user) for user in users]
+    conn.close()
+    return len(parking_app.jsonify(users_data).get_data())
+
+
+def streamed(client):
+    response = client.get('/api/users')
+    assert response.status_code == 200, response.status_code
+    size = sum(len(chunk) for chunk in response.response)
+    response.close()
+    return size
+
+
+def measure(label, fn):
+    # Timed untraced; tracemalloc slows allocation-heavy code several times over
+    started = time.perf_counter()
+    size = fn()
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f'{label:<20} {elapsed * 1000:8.0f}ms  body={size / 1e6:6.1f} MB  peak python memory={peak / 1e6:7.1f} MB')
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    parking_app = load_app()
+    client = parking_app.app.test_client()
+    conn = parking_app.get_db_connection()
+    seed_users(conn, users)
+    conn.close()
+
+    with parking_app.app.app_context():
+        measure('full list (old)', lambda: full_list(parking_app))
+    measure('streamed', lambda: streamed(client))
+
+    deep = client.get('/api/users', query_string={'per_page': 50}).get_json()
+    for _ in range(20):
+        deep = client.get('/api/users', query_string={'per_page': 50, 'cursor': deep['pagination']['next_cursor']}).get_json()
+    pages = [
+        ('first page', {'per_page': 50}),
+        ('page 22 (cursor)', {'per_page': 50, 'cursor': deep['pagination']['next_cursor']}),
+        ('city filter, first page', {'per_page': 50, 'city': 'pune'}),
+        ('city + registered in March', {'per_page': 50, 'city': 'pune',
+                                        'created_from': '2024-03-01', 'created_to': '2024-03-31'}),
+    ]
+    print(f'{users} users, {iterations} requests each')
+    for label, params in pages:
+        def page():
+            response = client.get('/api/users', query_string=params)
+            assert response.status_code == 200, response.data
+
+        report(f'GET /api/users {label}', time_requests(page, iterations))
+
+
+if __name__ == '__main__':
+    main()
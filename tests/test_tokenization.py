@@ -0,0 +1,42 @@
+"""
+Tests for the bearer token signer (backend/utils/tokenization.py).
+
+Run from the repository root: python -m pytest tests
+"""
+
+import os
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from backend.utils.tokenization import InvalidToken, TokenSigner  # noqa: E402
+
+
+class TokenSignerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.signer = TokenSigner('secret', ttl_seconds=60)
+
+    def test_round_trip(self):
+        self.assertEqual(self.signer.verify(self.signer.issue(7)), 7)
+
+    def test_forged_signature(self):
+        user_id, expires_at, _ = self.signer.issue(7).split('.')
+        with self.assertRaises(InvalidToken):
+            self.signer.verify(f'{user_id}.{expires_at}.AAAA')
+
+    def test_non_ascii_signature(self):
+        with self.assertRaises(InvalidToken):
+            self.signer.verify('1.9999999999.éé')
+
+    def test_expired(self):
+        token = self.signer.issue(7, now=1000)
+        with self.assertRaises(InvalidToken):
+            self.signer.verify(token, now=1060)
+
+
+if __name__ == '__main__':
+    unittest.main()